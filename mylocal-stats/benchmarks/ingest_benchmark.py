@@ -0,0 +1,388 @@
+"""Throughput of the ingestion paths on synthetic gig-data TSVs.
+
+Writes a deterministic dataset with ``mylocal.synthetic`` (entity TSVs for
+every region level and census table), then runs the loaders on it and
+reports, per loader and region level, rows per second, transactions and SQL
+statements (or Cypher transactions) issued, and peak Python memory::
+
+    cd mylocal-stats
+    PYTHONPATH=.. python -m benchmarks.ingest_benchmark --loader django --scale 0.1
+
+Loaders:
+
+* ``django`` - ``insert_region_data`` for every level, then each
+  ``insert_*`` statistic command for every level, into the benchmark
+  database (see ``benchmarks/settings.py``; ``BENCHMARK_DATABASE_URL``
+  selects PostgreSQL). The regions and statistics in that database are
+  deleted first.
+* ``neo4j`` - ``mylocal.ingest_mylocal.load_files`` level by level against
+  ``NEO4J_MYLOCAL_DB_URI`` (default ``bolt://localhost:7687``) with
+  ``NEO4J_MYLOCAL_USERNAME``/``NEO4J_MYLOCAL_PASSWORD``. Pass
+  ``--neo4j-clear`` to delete the ``GoverningBody`` nodes first.
+
+``rows`` is the number of input rows a step handles and ``rows_written``
+the number of rows (or nodes) it left in the database. A Django step that
+writes fewer rows than its file has for the level, or writes to stderr, is
+reported as an error, since the commands report most failures instead of
+raising them. A transaction is an explicit
+transaction (Django ``atomic`` block, Neo4j managed transaction) or a
+statement run in autocommit mode. Peak memory is measured with
+``tracemalloc``, which slows the loaders down; use ``--no-memory`` when only
+the timings matter.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from io import StringIO
+from pathlib import Path
+
+from benchmarks.api_benchmark import git_commit, setup_django
+
+LOADERS = ('django', 'neo4j')
+DEFAULT_YEAR = 2012
+
+# Django statistic commands: command, census table, model name, whether the
+# command takes the entity file, and the name of its region type option.
+STATISTIC_COMMANDS = [
+    ('insert_total_population', 'population-total', 'TotalPopulation', False, 'region_type'),
+    ('insert_gender_distribution', 'population-gender', 'GenderDistribution', True, 'type'),
+    ('insert_age_group', 'population-age-group', 'AgeDistribution', False, 'region_type'),
+    ('insert_ethnicity_distribution', 'population-ethnicity', 'EthnicityDistribution', False, 'region_type'),
+    ('insert_marital_status', 'population-marital-status', 'MaritalStatus', True, 'region_type'),
+    ('insert_religious_affiliation', 'population-religion', 'ReligiousAffiliation', True, 'region_type'),
+]
+
+
+class Step:
+    """Measurements of one loader run over one input file."""
+
+    def __init__(self, name, rows):
+        self.name = name
+        self.rows = rows
+        self.rows_written = None
+        self.seconds = None
+        self.transactions = 0
+        self.statements = 0
+        self.peak_memory = None
+        self.error = None
+
+    def as_dict(self):
+        result = {
+            'rows': self.rows,
+            'rows_written': self.rows_written,
+            'seconds': round(self.seconds, 3) if self.seconds is not None else None,
+            'rows_per_sec': round(self.rows / self.seconds, 1) if self.seconds else None,
+            'transactions': self.transactions,
+            'statements': self.statements,
+            'peak_memory_bytes': self.peak_memory,
+        }
+        if self.error is not None:
+            result['error'] = self.error
+        return result
+
+
+@contextlib.contextmanager
+def measured(step, memory=True):
+    """Time the block and record its peak traced memory in ``step``."""
+    if memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        yield step
+    except Exception as e:
+        step.error = f"{type(e).__name__}: {e}"
+    finally:
+        step.seconds = time.perf_counter() - started
+        if memory:
+            step.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the commands' progress bars and per-row output."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        yield
+
+
+class SQLTransactionCounter:
+    """Count statements and transactions on a Django connection.
+
+    Statements run outside an ``atomic`` block are committed on their own,
+    so each counts as a transaction; ``atomic`` blocks count once when the
+    outermost block commits or rolls back.
+    """
+
+    def __init__(self, connection, step):
+        self.connection = connection
+        self.step = step
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql == 'BEGIN':
+            # SQLite opens atomic blocks explicitly; the block is counted
+            # when it commits, as on backends that begin implicitly.
+            return execute(sql, params, many, context)
+        self.step.statements += 1
+        if self.connection.get_autocommit():
+            self.step.transactions += 1
+        return execute(sql, params, many, context)
+
+    def _counting(self, method):
+        def wrapper(*args, **kwargs):
+            self.step.transactions += 1
+            return method(*args, **kwargs)
+        return wrapper
+
+    @contextlib.contextmanager
+    def counting(self):
+        connection = self.connection
+        connection.commit = self._counting(connection.commit)
+        connection.rollback = self._counting(connection.rollback)
+        try:
+            with connection.execute_wrapper(self):
+                yield
+        finally:
+            del connection.commit
+            del connection.rollback
+
+
+def _count_rows(path, regions=None):
+    """Rows of a TSV, or only those whose ``entity_id`` is in ``regions``."""
+    with open(path, newline='', encoding='utf-8') as file:
+        rows = csv.DictReader(file, delimiter='\t')
+        if regions is None:
+            return sum(1 for _ in rows)
+        return sum(1 for row in rows if row['entity_id'] in regions)
+
+
+def _check_written(step, stderr=''):
+    """Record an error in ``step`` if it wrote fewer rows than it read or wrote to stderr."""
+    if step.error is not None:
+        return
+    if stderr.strip():
+        step.error = f"stderr: {stderr.strip().splitlines()[-1]}"
+    elif step.rows_written < step.rows:
+        step.error = f"wrote {step.rows_written} of {step.rows} rows"
+
+
+def run_django(dataset, levels, year, memory=True):
+    from benchmarks.seed import clear_database
+    from django.core.management import call_command
+    from django.db import connection
+    from mylocalstats.population_stats import models
+
+    clear_database()
+    steps = []
+
+    def run(step, command, args, options, count):
+        before = count()
+        stderr = StringIO()
+        with measured(step, memory), SQLTransactionCounter(connection, step).counting(), quiet():
+            call_command(command, *args, stderr=stderr, **options)
+        step.rows_written = count() - before
+        _check_written(step, stderr.getvalue())
+        steps.append(step)
+
+    for level in levels:
+        path = dataset['ents'][level]
+        run(
+            Step(f'django:insert_region_data:{level}', _count_rows(path)),
+            'insert_region_data', [path], {'type': level},
+            lambda level=level: models.Region.objects.of_type(level).count(),
+        )
+
+    for command, table, model_name, takes_entity_file, type_option in STATISTIC_COMMANDS:
+        model = getattr(models, model_name)
+        path = dataset['census'][(table, year)]
+        for level in levels:
+            entity_file = dataset['ents'][level]
+            level_ids = {row.split('\t', 1)[0] for row in Path(entity_file).read_text().splitlines()[1:]}
+            args = [path, entity_file] if takes_entity_file else [path]
+            run(
+                Step(f'django:{command}:{level}', _count_rows(path, regions=level_ids)),
+                command, args, {type_option: level, 'year': year},
+                lambda model=model, level=level: model.objects.filter(region__region_type=level, year=year).count(),
+            )
+    return steps
+
+
+class _CountingTransaction:
+    """Neo4j transaction proxy counting the statements run in it."""
+
+    def __init__(self, tx, step):
+        self._tx = tx
+        self._step = step
+
+    def run(self, *args, **kwargs):
+        self._step.statements += 1
+        return self._tx.run(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._tx, name)
+
+
+class _CountingSession:
+    """Neo4j session proxy counting managed and auto-commit transactions."""
+
+    def __init__(self, session, step):
+        self._session = session
+        self._step = step
+
+    def __enter__(self):
+        self._session.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._session.__exit__(*exc_info)
+
+    def _managed(self, method, work, *args, **kwargs):
+        self._step.transactions += 1
+        return method(lambda tx, *a, **kw: work(_CountingTransaction(tx, self._step), *a, **kw), *args, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        return self._managed(self._session.execute_write, work, *args, **kwargs)
+
+    def execute_read(self, work, *args, **kwargs):
+        return self._managed(self._session.execute_read, work, *args, **kwargs)
+
+    def run(self, *args, **kwargs):
+        self._step.transactions += 1
+        self._step.statements += 1
+        return self._session.run(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+class _CountingDriver:
+    """Neo4j driver proxy whose sessions count into the current step."""
+
+    def __init__(self, driver):
+        self._driver = driver
+        self.step = None
+
+    def session(self, *args, **kwargs):
+        return _CountingSession(self._driver.session(*args, **kwargs), self.step)
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+
+def run_neo4j(dataset, levels, memory=True, clear=False):
+    from mylocal.db.neo4j_driver import Neo4jDriver
+    from mylocal.ingest_mylocal import HIERARCHY, PROCESSING_STEPS, load_files
+
+    uri = os.getenv('NEO4J_MYLOCAL_DB_URI', 'bolt://localhost:7687')
+    username = os.getenv('NEO4J_MYLOCAL_USERNAME', 'neo4j')
+    password = os.getenv('NEO4J_MYLOCAL_PASSWORD')
+    if not password:
+        raise SystemExit("Set NEO4J_MYLOCAL_PASSWORD to benchmark the Neo4j loader.")
+
+    governing_types = dict(PROCESSING_STEPS)
+    steps = []
+    with Neo4jDriver(uri, username, password) as driver:
+        if clear:
+            driver.execute_query("MATCH (n:GoverningBody) DETACH DELETE n")
+        counting = _CountingDriver(driver._driver)
+        driver._driver = counting
+        try:
+            for level in levels:
+                path = dataset['ents'][level]
+                governing_type = governing_types[level]
+                # load_files reads the file once per parent relationship.
+                passes = max(1, len(HIERARCHY[governing_type]['parents']))
+                step = Step(f'neo4j:load_files:{level}', _count_rows(path) * passes)
+                counting.step = step
+                with measured(step, memory):
+                    load_files(driver, {level: path})
+                counting.step = Step('count', 0)
+                step.rows_written = driver.execute_read_query(
+                    "MATCH (n:GoverningBody {type: $type}) RETURN count(n) AS count", {'type': governing_type}
+                )[0]['count']
+                steps.append(step)
+        finally:
+            driver._driver = counting._driver
+    return steps
+
+
+def _format_line(name, result):
+    if 'error' in result:
+        return f"{name:<52} ERROR {result['error']}"
+    memory = result['peak_memory_bytes']
+    memory = f"{memory / 2 ** 20:>8.1f} MiB" if memory is not None else ''
+    return (
+        f"{name:<52} {result['rows']:>8} rows {result['rows_written']:>8} written "
+        f"{result['rows_per_sec'] or 0:>10.1f} rows/s {result['transactions']:>8} tx {memory}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--loader', action='append', choices=LOADERS,
+                        help='Loader to benchmark (repeatable, default django)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed of the synthetic data')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplier for the number of DSDs and GNDs')
+    parser.add_argument('--level', action='append', dest='levels',
+                        help='Region level to load (repeatable, default all, parents first)')
+    parser.add_argument('--year', type=int, default=DEFAULT_YEAR, help='Census year of the statistics')
+    parser.add_argument('--data-dir', help='Write the TSVs here and keep them (default: a temporary directory)')
+    parser.add_argument('--no-memory', action='store_true', help='Do not trace memory allocations')
+    parser.add_argument('--neo4j-clear', action='store_true', help='Delete GoverningBody nodes before loading')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    from mylocal.synthetic import LOAD_ORDER, write_dataset
+
+    loaders = args.loader or ['django']
+    levels = [level for level in LOAD_ORDER if level in (args.levels or LOAD_ORDER)]
+    meta = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'seed': args.seed,
+        'scale': args.scale,
+        'year': args.year,
+        'levels': levels,
+    }
+
+    with contextlib.ExitStack() as stack:
+        data_dir = args.data_dir or stack.enter_context(tempfile.TemporaryDirectory(prefix='mylocal-ingest-'))
+        started = time.perf_counter()
+        dataset = write_dataset(data_dir, seed=args.seed, scale=args.scale, years=(args.year,))
+        meta['input_rows'] = dataset['rows']
+        print(f"Wrote {dataset['rows']['gnd']} GNDs to {data_dir} in {time.perf_counter() - started:.1f}s",
+              file=sys.stderr)
+
+        steps = []
+        if 'django' in loaders:
+            setup_django()
+            from django.db import connection
+
+            meta['database'] = connection.vendor
+            steps += run_django(dataset, levels, args.year, memory=not args.no_memory)
+        if 'neo4j' in loaders:
+            steps += run_neo4j(dataset, levels, memory=not args.no_memory, clear=args.neo4j_clear)
+
+    results = {}
+    for step in steps:
+        results[step.name] = step.as_dict()
+        print(_format_line(step.name, results[step.name]), file=sys.stderr)
+
+    output = json.dumps({'meta': meta, 'results': results}, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""Compare the throughput of the WSGI and ASGI read paths.
+
+Start the same project under both servers, e.g.::
+
+    gunicorn mylocalstats.wsgi -w 1 --threads 8 -b :8000
+    uvicorn mylocalstats.asgi:application --workers 1 --port 8001
+
+then run::
+
+    python benchmarks/load_test.py \\
+        --target wsgi=http://localhost:8000/api/v1 \\
+        --target asgi=http://localhost:8001/api/v1/async \\
+        --concurrency 64 --requests 5000
+
+Every target receives the same request mix (``--path``, repeatable, relative
+to the target URL). Each client thread keeps one HTTP/1.1 connection open, so
+the numbers measure the server rather than connection setup. The report gives
+requests per second, latency percentiles and the error count per target, as
+text or ``--json``.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = [
+    '/regions/type/district/',
+    '/regions/type/province/',
+    '/population/type/district/',
+]
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of ``values`` (``fraction`` in 0-1)."""
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(fraction * len(values)) - 1))
+    return values[index]
+
+
+class Target:
+    """One server under test, e.g. ``asgi=http://localhost:8001/api/v1/async``."""
+
+    def __init__(self, spec):
+        name, _, url = spec.partition('=')
+        if not url:
+            name, url = spec, spec
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise argparse.ArgumentTypeError(f"Not an http(s) URL: {url}")
+        self.name = name
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+
+    def connect(self, timeout):
+        connection_class = (
+            http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        )
+        return connection_class(self.netloc, timeout=timeout)
+
+
+def run(target, paths, total_requests, concurrency, timeout=30.0):
+    """Send ``total_requests`` GETs from ``concurrency`` threads and summarize them."""
+    counter = itertools.count()
+    lock = threading.Lock()
+    latencies = []
+    errors = []
+
+    def client():
+        connection = target.connect(timeout)
+        local = []
+        while True:
+            number = next(counter)
+            if number >= total_requests:
+                break
+            path = target.prefix + paths[number % len(paths)]
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path, headers={'Accept': 'application/json'})
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 500:
+                    errors.append(f"{response.status} {path}")
+                else:
+                    local.append(time.perf_counter() - started)
+            except (OSError, http.client.HTTPException) as e:
+                errors.append(f"{type(e).__name__} {path}")
+                connection.close()
+                connection = target.connect(timeout)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    elapsed = time.perf_counter() - started
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        'target': target.name,
+        'requests': total_requests,
+        'concurrency': concurrency,
+        'errors': len(errors),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'latency_ms': {
+            'p50': ms(percentile(latencies, 0.50)),
+            'p95': ms(percentile(latencies, 0.95)),
+            'p99': ms(percentile(latencies, 0.99)),
+            'max': ms(max(latencies, default=None)),
+        },
+        'sample_errors': errors[:5],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--target', action='append', type=Target, required=True,
+                        help='name=base URL of a server to test; repeat to compare')
+    parser.add_argument('--path', action='append', dest='paths',
+                        help='Request path relative to each target (default: a mix of read endpoints)')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per target')
+    parser.add_argument('--concurrency', type=int, default=32, help='Concurrent connections')
+    parser.add_argument('--warmup', type=int, default=100, help='Unmeasured requests per target')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args(argv)
+    paths = args.paths or DEFAULT_PATHS
+
+    results = []
+    for target in args.target:
+        if args.warmup:
+            run(target, paths, args.warmup, min(args.concurrency, args.warmup))
+        results.append(run(target, paths, args.requests, args.concurrency))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'target':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for result in results:
+        latency = result['latency_ms']
+        print(
+            f"{result['target']:<12}{result['requests_per_second'] or 0:>10}"
+            f"{latency['p50'] or 0:>10}{latency['p95'] or 0:>10}{latency['p99'] or 0:>10}"
+            f"{result['errors']:>8}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""Latency of each hierarchy query in ``mylocal.db.hierarchy_queries``.
+
+Runs every query of the catalog against a Neo4j server and reports, per
+query, calls per second, latency percentiles and result rows::
+
+    cd mylocal-stats
+    NEO4J_MYLOCAL_PASSWORD=... PYTHONPATH=.. python -m benchmarks.query_benchmark --load --scale 1
+
+The server is ``NEO4J_MYLOCAL_DB_URI`` (default ``bolt://localhost:7687``)
+with ``NEO4J_MYLOCAL_USERNAME``/``NEO4J_MYLOCAL_PASSWORD``. ``--load``
+replaces the ``GoverningBody`` graph with a synthetic one from
+``mylocal.synthetic`` first; without it the queries run on the graph already
+there. The catalog's indexes are created either way.
+
+Queries run without a result cache, so every call reaches the server; the
+untimed warmup calls let Neo4j plan each query before the timed ones.
+``--cache`` attaches an in-memory ``QueryCache`` instead and adds its
+statistics to the report. ``--compare`` checks a report against a baseline
+like ``api_benchmark.py`` does.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.api_benchmark import (
+    DEFAULT_ITERATIONS,
+    DEFAULT_THRESHOLD,
+    DEFAULT_WARMUP,
+    Measurement,
+    compare,
+    git_commit,
+)
+
+# name, HierarchyQueries method, keyword arguments; ``{province}`` etc. are
+# replaced by the first region id of that type in the graph.
+QUERY_CASES = [
+    ('region', 'region', {'region_id': '{gnd}'}),
+    ('children:province>district', 'children', {'region_id': '{province}', 'child_type': 'District'}),
+    ('parents:dsd', 'parents', {'region_id': '{dsd}'}),
+    ('ancestors:gnd', 'ancestors', {'region_id': '{gnd}'}),
+    ('ancestors:gnd>province', 'ancestors', {'region_id': '{gnd}', 'ancestor_type': 'Province'}),
+    ('descendants:district', 'descendants', {'region_id': '{district}'}),
+    ('descendants:province>gnd', 'descendants', {'region_id': '{province}', 'descendant_type': 'GND'}),
+    ('count_descendants:province>gnd', 'count_descendants', {'region_id': '{province}', 'descendant_type': 'GND'}),
+    ('children_by_parent:dsd>district', 'children_by_parent', {'child_type': 'DSD', 'parent_type': 'District'}),
+    ('related_through:ed>province>dsd', 'related_through',
+     {'region_id': '{ed}', 'ancestor_type': 'Province', 'related_type': 'DSD'}),
+]
+SAMPLE_TYPES = {'province': 'Province', 'district': 'District', 'ed': 'ED', 'dsd': 'DSD', 'gnd': 'GND'}
+FIRST_OF_TYPE = "MATCH (n:GoverningBody {type: $type}) RETURN n.id AS id ORDER BY id LIMIT 1"
+
+
+def sample_parameters(driver):
+    """Return the first region id of each type in ``SAMPLE_TYPES``."""
+    parameters = {}
+    for key, governing_type in SAMPLE_TYPES.items():
+        records = driver.execute_read_query(FIRST_OF_TYPE, {'type': governing_type}, use_cache=False)
+        if not records:
+            raise SystemExit(f"No {governing_type} nodes in the graph; run with --load.")
+        parameters[key] = records[0]['id']
+    return parameters
+
+
+def _rows(result):
+    if isinstance(result, (list, dict)):
+        return len(result)
+    return 0 if result is None else 1
+
+
+def measure(name, call, iterations, warmup):
+    """Time ``call`` ``iterations`` times after ``warmup`` untimed calls."""
+    measurement = Measurement(name)
+    try:
+        rows = _rows(call())
+    except Exception as error:  # noqa: BLE001 - reported per query
+        measurement.error = f'{type(error).__name__}: {error}'
+        return measurement, None
+    # One Cypher query per call.
+    measurement.queries = 1
+    for _ in range(warmup):
+        call()
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call()
+        measurement.timings.append(time.perf_counter() - started)
+    return measurement, rows
+
+
+def load_graph(driver, seed, scale):
+    from mylocal.ingest_mylocal import load_files
+    from mylocal.synthetic import write_dataset
+
+    with tempfile.TemporaryDirectory(prefix='mylocal-queries-') as data_dir:
+        dataset = write_dataset(data_dir, seed=seed, scale=scale)
+        driver.execute_query("MATCH (n:GoverningBody) DETACH DELETE n")
+        started = time.perf_counter()
+        load_files(driver, dataset['ents'])
+        print(f"Loaded {dataset['rows']['gnd']} GNDs in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        return dataset['rows']
+
+
+def run(args):
+    from mylocal.db.hierarchy_queries import HierarchyQueries
+    from mylocal.db.neo4j_driver import Neo4jDriver
+    from mylocal.db.query_cache import QueryCache
+
+    uri = os.getenv('NEO4J_MYLOCAL_DB_URI', 'bolt://localhost:7687')
+    username = os.getenv('NEO4J_MYLOCAL_USERNAME', 'neo4j')
+    password = os.getenv('NEO4J_MYLOCAL_PASSWORD')
+    if not password:
+        raise SystemExit("Set NEO4J_MYLOCAL_PASSWORD to benchmark the hierarchy queries.")
+
+    meta = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'seed': args.seed if args.load else None,
+        'scale': args.scale if args.load else None,
+        'cache': args.cache,
+        'iterations': args.iterations,
+        'warmup': args.warmup,
+    }
+    results = {}
+    with contextlib.ExitStack() as stack:
+        driver = stack.enter_context(Neo4jDriver(uri, username, password))
+        queries = HierarchyQueries(driver)
+        queries.ensure_indexes()
+        if args.load:
+            meta['rows'] = load_graph(driver, args.seed, args.scale)
+        parameters = sample_parameters(driver)
+        meta['parameters'] = parameters
+        if args.cache:
+            driver.cache = QueryCache(ttl=None)
+
+        for name, method, kwargs in QUERY_CASES:
+            if args.only and not any(pattern in name for pattern in args.only):
+                continue
+            kwargs = {key: value.format(**parameters) for key, value in kwargs.items()}
+            call = lambda method=method, kwargs=kwargs: getattr(queries, method)(**kwargs)  # noqa: E731
+            measurement, rows = measure(f'cypher:{name}', call, args.iterations, args.warmup)
+            results[measurement.name] = measurement.as_dict()
+            if rows is not None:
+                del results[measurement.name]['bytes']
+                results[measurement.name]['rows'] = rows
+            print(_format_line(measurement.name, results[measurement.name]), file=sys.stderr)
+        if driver.cache is not None:
+            meta['cache_stats'] = driver.cache.stats.as_dict()
+    return {'meta': meta, 'results': results}
+
+
+def _format_line(name, result):
+    if 'error' in result:
+        return f"{name:<48} ERROR {result['error']}"
+    return (
+        f"{name:<48} {result['rps']:>9.1f} calls/s  p50 {result['p50_ms']:>8.2f} ms  "
+        f"p95 {result['p95_ms']:>8.2f} ms  {result['rows']:>7} rows"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--load', action='store_true', help='Replace the graph with synthetic data first')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed of the synthetic data')
+    parser.add_argument('--scale', type=float, default=1.0, help='Size of the synthetic data (1 = Sri Lanka)')
+    parser.add_argument('--cache', action='store_true', help='Run the queries through an in-memory QueryCache')
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help='Timed calls per query')
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP, help='Untimed calls per query')
+    parser.add_argument('--only', action='append', help='Only run queries whose name contains this (repeatable)')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON report to check for regressions against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed relative growth of the median latency (default 0.25)')
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + '\n')
+    else:
+        print(output)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(report, baseline, args.threshold)
+        for name, reason in regressions:
+            print(f"REGRESSION {name}: {reason}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""Deterministic synthetic regions and statistics for the benchmarks.
+
+``seed_database(seed=42, scale=1.0)`` replaces all regions and statistics
+with a hierarchy the size of Sri Lanka's administrative divisions: 1 country,
+9 provinces, 25 districts, 331 DSDs and 14,022 GNDs (``scale`` shrinks or
+grows the two lowest levels). Every region gets a centroid inside the
+country's bounding box, an area, and a row of each statistic table for
+``YEARS``; parent rows are the sums of their children, as in the census
+imports. The closure table and derived indicators are rebuilt afterwards, so
+every read path has the data it expects.
+
+The same ``seed`` and ``scale`` always produce the same rows, which keeps
+benchmark reports comparable between runs and machines.
+"""
+import random
+from decimal import Decimal
+
+from django.db import transaction
+from mylocalstats.population_stats.aggregation import STATISTIC_MODELS, get_numeric_columns
+from mylocalstats.population_stats.hierarchy import rebuild_region_closure
+from mylocalstats.population_stats.indicators import rebuild_region_indicators
+from mylocalstats.population_stats.models import (
+    Region,
+    RegionClosure,
+    RegionIndicator,
+    RegionRelation,
+    TotalPopulation,
+)
+from mylocalstats.population_stats.ranking import invalidate_rankings
+from mylocalstats.population_stats.spatial import encode_geohash
+from mylocalstats.population_stats.versioning import bump_data_version
+
+COUNTRY_ID = 'LK'
+# Districts per province, in province order (Western, Central, Southern, ...).
+DISTRICTS_PER_PROVINCE = (3, 3, 3, 5, 3, 2, 2, 2, 2)
+DSD_COUNT = 331
+GND_COUNT = 14022
+YEARS = (2012, 2024)
+
+MIN_LATITUDE, MAX_LATITUDE = 5.9, 9.9
+MIN_LONGITUDE, MAX_LONGITUDE = 79.6, 81.9
+# How far a child's centroid may lie from its parent's, in degrees.
+SPREAD = {'province': 1.0, 'district': 0.3, 'dsd': 0.1, 'gnd': 0.03}
+
+SYLLABLES = (
+    'ka', 'ko', 'ma', 'na', 'pi', 'la', 'wa', 'go', 'de', 'hi', 'ra', 'tu',
+    'ga', 'mu', 'ba', 'ya', 'ku', 'po', 'ne', 'di', 'wi', 'ha', 'te', 'lu',
+)
+
+
+def _name(rng):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def _split(total, parts, rng):
+    """Split ``total`` items over ``parts`` parents, at least one each."""
+    counts = [1] * parts
+    for _ in range(max(0, total - parts)):
+        counts[rng.randrange(parts)] += 1
+    return counts
+
+
+def _clamp(value, low, high):
+    return min(max(value, low), high)
+
+
+def _place(parent, region_type, rng):
+    spread = SPREAD[region_type]
+    latitude = _clamp(parent[0] + rng.uniform(-spread, spread), MIN_LATITUDE, MAX_LATITUDE)
+    longitude = _clamp(parent[1] + rng.uniform(-spread, spread), MIN_LONGITUDE, MAX_LONGITUDE)
+    return latitude, longitude
+
+
+def build_regions(rng, scale=1.0):
+    """Return the synthetic hierarchy as unsaved ``Region`` objects, parents first."""
+    centre = ((MIN_LATITUDE + MAX_LATITUDE) / 2, (MIN_LONGITUDE + MAX_LONGITUDE) / 2)
+    nodes = [(COUNTRY_ID, 'country', None, centre)]
+
+    provinces = []
+    for number in range(1, len(DISTRICTS_PER_PROVINCE) + 1):
+        provinces.append((f'{COUNTRY_ID}-{number}', 'province', COUNTRY_ID, _place(centre, 'province', rng)))
+
+    districts = []
+    for (province_id, _, _, location), count in zip(provinces, DISTRICTS_PER_PROVINCE):
+        for number in range(1, count + 1):
+            districts.append((f'{province_id}{number}', 'district', province_id, _place(location, 'district', rng)))
+
+    dsd_count = max(len(districts), round(DSD_COUNT * scale))
+    dsds = []
+    for (district_id, _, _, location), count in zip(districts, _split(dsd_count, len(districts), rng)):
+        for number in range(1, count + 1):
+            dsds.append((f'{district_id}{number:02d}', 'dsd', district_id, _place(location, 'dsd', rng)))
+
+    gnd_count = max(len(dsds), round(GND_COUNT * scale))
+    gnds = []
+    for (dsd_id, _, _, location), count in zip(dsds, _split(gnd_count, len(dsds), rng)):
+        for number in range(1, count + 1):
+            gnds.append((f'{dsd_id}{number:03d}', 'gnd', dsd_id, _place(location, 'gnd', rng)))
+
+    regions = []
+    for region_id, region_type, parent_id, (latitude, longitude) in nodes + provinces + districts + dsds + gnds:
+        regions.append(Region(
+            region_id=region_id,
+            name=_name(rng),
+            region_type=region_type,
+            parent_region_id=parent_id,
+            code=region_id,
+            latitude=Decimal(f'{latitude:.6f}'),
+            longitude=Decimal(f'{longitude:.6f}'),
+            geohash=encode_geohash(latitude, longitude),
+            area_sq_km=Decimal(f'{rng.uniform(0.5, 20.0):.2f}') if region_type == 'gnd' else None,
+        ))
+    return regions
+
+
+def _split_population(total, columns, rng):
+    """Split ``total`` over ``columns`` with random weights; the parts sum to ``total``."""
+    if not columns:
+        return {}
+    weights = [rng.random() + 0.05 for _ in columns]
+    scale = total / sum(weights)
+    values = [int(weight * scale) for weight in weights]
+    values[0] += total - sum(values)
+    return dict(zip(columns, values))
+
+
+def build_statistics(regions, rng):
+    """Return unsaved statistic rows for every region and year.
+
+    GND values are random, with each GND's total changing by -10% to +20%
+    between the years; every other region's values are the sums over its
+    children, so aggregates and rankings agree between levels.
+    """
+    children = {}
+    for region in regions:
+        children.setdefault(region.parent_region_id, []).append(region)
+    gnd_totals = {}
+    for region in regions:
+        if region.region_type == 'gnd':
+            first = rng.randint(300, 4000)
+            gnd_totals[region.region_id] = [first] + [
+                int(first * rng.uniform(0.9, 1.2)) for _ in YEARS[1:]
+            ]
+
+    rows = {model: [] for model in STATISTIC_MODELS.values()}
+    for year_index, year in enumerate(YEARS):
+        values = {}
+        # Children are listed after their parents, so walk the list backwards.
+        for region in reversed(regions):
+            per_model = {}
+            for model in STATISTIC_MODELS.values():
+                columns = get_numeric_columns(model)
+                if region.region_type == 'gnd':
+                    total = gnd_totals[region.region_id][year_index]
+                    parts = [column for column in columns if column != 'total_population']
+                    per_model[model] = {'total_population': total, **_split_population(total, parts, rng)}
+                else:
+                    per_model[model] = {
+                        column: sum(values[child.region_id][model][column]
+                                    for child in children.get(region.region_id, ()))
+                        for column in columns
+                    }
+                rows[model].append(model(region_id=region.region_id, year=year, **per_model[model]))
+            values[region.region_id] = per_model
+    return rows
+
+
+def _fill_parent_areas(regions):
+    by_id = {region.region_id: region for region in regions}
+    for region in reversed(regions):
+        parent = by_id.get(region.parent_region_id)
+        if parent is not None:
+            parent.area_sq_km = (parent.area_sq_km or Decimal('0')) + region.area_sq_km
+
+
+def clear_database():
+    """Delete all regions, statistics and the tables derived from them."""
+    for model in STATISTIC_MODELS.values():
+        model.objects.all().delete()
+    RegionIndicator.objects.all().delete()
+    RegionClosure.objects.all().delete()
+    RegionRelation.objects.all().delete()
+    Region.objects.all().delete()
+
+
+def seed_database(seed=42, scale=1.0, batch_size=5000):
+    """Replace all regions and statistics with synthetic data.
+
+    Args:
+        seed (int): Random seed; the same seed and scale give the same data.
+        scale (float): Multiplier for the number of DSDs and GNDs.
+
+    Returns:
+        dict: Number of rows written per table.
+    """
+    rng = random.Random(seed)
+    regions = build_regions(rng, scale)
+    _fill_parent_areas(regions)
+    statistics = build_statistics(regions, rng)
+    latest = {
+        row.region_id: row.total_population
+        for row in statistics[TotalPopulation] if row.year == YEARS[-1]
+    }
+    for region in regions:
+        region.population = latest[region.region_id]
+
+    with transaction.atomic():
+        clear_database()
+        Region.objects.bulk_create(regions, batch_size=batch_size)
+        for model, rows in statistics.items():
+            model.objects.bulk_create(rows, batch_size=batch_size)
+
+    counts = {'regions': len(regions)}
+    counts.update({model._meta.db_table: len(rows) for model, rows in statistics.items()})
+    counts['region_closure'] = rebuild_region_closure(batch_size=batch_size)
+    counts['region_indicators'] = rebuild_region_indicators(batch_size=batch_size)
+    invalidate_rankings()
+    bump_data_version()
+    return counts
@@ -0,0 +1,47 @@
+"""Settings for the benchmark suite.
+
+SQLite file by default; set BENCHMARK_DATABASE_URL (same format as
+DATABASE_URL) to benchmark against PostgreSQL.
+"""
+import os
+from pathlib import Path
+
+from mylocalstats.population_stats.database import database_from_url
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+SECRET_KEY = "benchmark-key-not-for-production"
+
+DEBUG = False
+
+ALLOWED_HOSTS = ["*"]
+
+INSTALLED_APPS = [
+    "django.contrib.contenttypes",
+    "django.contrib.auth",
+    "rest_framework",
+    "graphene_django",
+    "mylocalstats.population_stats.apps.PopulationStatsConfig",
+]
+
+if os.getenv("BENCHMARK_DATABASE_URL"):
+    DATABASES = {"default": database_from_url(os.getenv("BENCHMARK_DATABASE_URL"))}
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("BENCHMARK_SQLITE_PATH", str(Path(__file__).resolve().parent / "benchmark.sqlite3")),
+        }
+    }
+
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+}
+
+GRAPHENE = {"SCHEMA": "mylocalstats.population_stats.graphql.schema.schema"}
+
+USE_TZ = False
+TIME_ZONE = "UTC"
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
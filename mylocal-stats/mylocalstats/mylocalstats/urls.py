@@ -15,15 +15,17 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, re_path
 from django.views.decorators.csrf import csrf_exempt
-from graphene_django.views import GraphQLView
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
-from mylocalstats.population_stats import views
+from mylocalstats.population_stats import async_views, views
+from mylocalstats.population_stats.instrumentation import metrics_view
+from mylocalstats.population_stats.graphql.views import PopulationStatsGraphQLView
 
 # Swagger schema view configuration
 schema_view = get_schema_view(
@@ -45,7 +47,22 @@ urlpatterns = [
     
     # Region URLs
     path('api/v1/regions/type/<str:region_type>/', views.get_regions_by_type, name='get_regions_by_type'),
+    path('api/v1/regions/bbox/', views.get_regions_in_bbox, name='get_regions_in_bbox'),
+    path('api/v1/regions/nearest/', views.get_nearest_regions, name='get_nearest_regions'),
+    path('api/v1/regions/search/', views.search_regions_by_name, name='search_regions_by_name'),
+    path('api/v1/regions/autocomplete/', views.autocomplete_regions_by_name, name='autocomplete_regions_by_name'),
+    path('api/v1/reverse-geocode/', views.reverse_geocode, name='reverse_geocode'),
+    path('api/v1/reverse-geocode/batch/', views.reverse_geocode_batch, name='reverse_geocode_batch'),
     path('api/v1/region/id/<str:region_id>/', views.get_region_by_id, name='get_region_by_id'),
+    path('api/v1/region/id/<str:region_id>/descendants/', views.get_region_descendants, name='get_region_descendants'),
+    path(
+        'api/v1/region/id/<str:region_id>/related/<str:relation>/', views.get_related_regions_by_id,
+        name='get_related_regions_by_id'
+    ),
+    path(
+        'api/v1/region/id/<str:region_id>/indicators/', views.get_region_indicators_by_id,
+        name='get_region_indicators_by_id'
+    ),
     
     # Population URLs
     path('api/v1/population/type/<str:region_type>/', views.get_population_by_region_type, name='get_population_by_region_type'),
@@ -71,8 +88,43 @@ urlpatterns = [
     path('api/v1/religious-affiliation/type/<str:region_type>/', views.get_religious_affiliation_by_region_type, name='get_religious_affiliation_by_region_type'),
     path('api/v1/religious-affiliation/id/<str:region_id>/', views.get_religious_affiliation_by_region_id, name='get_religious_affiliation_by_region_id'),
 
+    # Aggregation URLs
+    path('api/v1/aggregate/<str:statistic>/', views.get_aggregated_statistic, name='get_aggregated_statistic'),
+
+    # Indicator URLs
+    path('api/v1/indicators/', views.list_indicators, name='list_indicators'),
+    path('api/v1/indicators/<str:indicator>/', views.get_indicator_ranking, name='get_indicator_ranking'),
+
+    # Ranking URLs
+    path('api/v1/rank/<str:statistic>/<str:column>/', views.get_statistic_ranking, name='get_statistic_ranking'),
+    path(
+        'api/v1/quantiles/<str:statistic>/<str:column>/', views.get_statistic_quantiles,
+        name='get_statistic_quantiles'
+    ),
+
+    # Diff URLs
+    path('api/v1/diff/<str:statistic>/', views.get_statistic_diff, name='get_statistic_diff'),
+
+    # Async URLs (served without a thread per request under ASGI)
+    path(
+        'api/v1/async/regions/type/<str:region_type>/', async_views.get_regions_by_type,
+        name='async_get_regions_by_type'
+    ),
+    path('api/v1/async/region/id/<str:region_id>/', async_views.get_region_by_id, name='async_get_region_by_id'),
+    path(
+        'api/v1/async/<str:statistic>/type/<str:region_type>/', async_views.get_statistic_by_region_type,
+        name='async_get_statistic_by_region_type'
+    ),
+    path(
+        'api/v1/async/<str:statistic>/id/<str:region_id>/', async_views.get_statistic_by_region_id,
+        name='async_get_statistic_by_region_id'
+    ),
+
+    # Metrics URLs
+    path('metrics', metrics_view, name='metrics'),
+
     # GraphQL URLs
-    path('graphql/', csrf_exempt(GraphQLView.as_view(graphiql=True))),
+    path('graphql/', csrf_exempt(PopulationStatsGraphQLView.as_view(graphiql=settings.GRAPHQL_GRAPHIQL))),
     
     # Swagger URLs
     re_path(r'^swagger(?P<format>\.json|\.yaml)$', 
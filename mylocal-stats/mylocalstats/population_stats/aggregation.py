@@ -0,0 +1,109 @@
+"""Roll statistics up the region hierarchy.
+
+Statistics are imported per region level (GND, DSD, ...). To answer "totals
+for this DSD" from GND rows, ``aggregate_statistic`` joins the statistic table
+to ``RegionClosure`` and sums every numeric column with one ``GROUP BY
+ancestor`` query, for all requested parents at once.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum
+from mylocalstats.population_stats.models import (
+    TotalPopulation,
+    AgeDistribution,
+    EthnicityDistribution,
+    GenderDistribution,
+    MaritalStatus,
+    ReligiousAffiliation,
+    normalize_region_type,
+)
+
+# Public statistic names, matching the REST URL prefixes.
+STATISTIC_MODELS = {
+    'population': TotalPopulation,
+    'age-distribution': AgeDistribution,
+    'ethnicity-distribution': EthnicityDistribution,
+    'gender-distribution': GenderDistribution,
+    'marital-status': MaritalStatus,
+    'religious-affiliation': ReligiousAffiliation,
+}
+
+NON_SUMMABLE_COLUMNS = {'year'}
+
+
+def get_statistic_model(statistic):
+    """Return the model for a public statistic name.
+
+    Raises:
+        ValueError: If the statistic is unknown.
+    """
+    try:
+        return STATISTIC_MODELS[statistic]
+    except KeyError:
+        raise ValueError(
+            f"Unknown statistic: {statistic}. "
+            f"Expected one of: {', '.join(STATISTIC_MODELS)}"
+        )
+
+
+def get_numeric_columns(model):
+    """Return the summable integer columns of a statistic model."""
+    return [
+        field.name
+        for field in model._meta.concrete_fields
+        if isinstance(field, IntegerField)
+        and not field.is_relation
+        and not field.primary_key
+        and field.name not in NON_SUMMABLE_COLUMNS
+    ]
+
+
+def latest_year(queryset, *partition):
+    """Keep only each region's latest census year in ``queryset``.
+
+    The latest year is taken over all of the model's rows for the region (and
+    the ``partition`` columns, e.g. ``indicator``), so regions imported for
+    different years each contribute one row.
+    """
+    model = queryset.model
+    latest = (
+        model.objects.filter(region_id=OuterRef('region_id'), **{column: OuterRef(column) for column in partition})
+        .order_by('-year')
+        .values('year')[:1]
+    )
+    return queryset.filter(year=Subquery(latest))
+
+
+def aggregate_statistic(model, parent_ids, level, year=None):
+    """Sum a statistic over the descendants of each parent region.
+
+    Args:
+        model: Statistic model, e.g. ``EthnicityDistribution``.
+        parent_ids (list): Region ids to aggregate for (any level, any mix).
+        level (str): Region type of the descendant rows to sum, e.g. ``gnd``.
+            Only one level is summed so rows imported for several levels are
+            not counted twice.
+        year (int, optional): Restrict to one census year; by default each
+            descendant's latest year is summed.
+
+    Returns:
+        list: One dict per parent, in request order, with ``region_id``,
+        ``region_count`` (descendants with data) and one sum per column.
+    """
+    parent_ids = list(dict.fromkeys(parent_ids))
+    columns = get_numeric_columns(model)
+    queryset = model.objects.filter(
+        region__ancestor_links__ancestor_id__in=parent_ids,
+        region__region_type=normalize_region_type(level),
+    )
+    queryset = queryset.filter(year=year) if year else latest_year(queryset)
+    rows = (
+        queryset.values(parent_id=F('region__ancestor_links__ancestor_id'))
+        .annotate(region_count=Count('pk'), **{column: Sum(column) for column in columns})
+        .order_by()
+    )
+    totals = {row.pop('parent_id'): row for row in rows}
+
+    results = []
+    for parent_id in parent_ids:
+        row = totals.get(parent_id, {'region_count': 0, **{column: 0 for column in columns}})
+        results.append({'region_id': parent_id, **row})
+    return results
@@ -5,3 +5,8 @@ class PopulationStatsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "mylocalstats.population_stats"
     app_label = "population_stats"
+
+    def ready(self):
+        from mylocalstats.population_stats.database import connect_signals
+
+        connect_signals()
@@ -0,0 +1,142 @@
+"""Async variants of the read endpoints, for serving under ASGI.
+
+The views in ``views.py`` are synchronous DRF views: under an ASGI server
+each request holds a thread for as long as its queries run. The views here
+are native Django coroutines using the async ORM (``aget``, ``async for``),
+so one ASGI worker keeps many requests in flight while they wait on the
+database. Responses match the synchronous views: regions are serialized
+with ``RegionSerializer``, statistic rows carry ``region_id`` and
+``region_name`` like the statistic serializers, and population by region
+lists every census year. They are mounted under ``/api/v1/async/``.
+
+DRF's ``@api_view`` cannot wrap coroutines, so these are plain Django views
+returning ``JsonResponse``.
+"""
+from django.http import JsonResponse
+from mylocalstats.population_stats.aggregation import get_numeric_columns, get_statistic_model
+from mylocalstats.population_stats.models import Region, TotalPopulation
+from mylocalstats.population_stats.serializers import RegionSerializer
+
+
+def _error(message, status):
+    return JsonResponse({"error": message}, status=status)
+
+
+def _method_not_allowed(request):
+    if request.method not in ('GET', 'HEAD'):
+        response = _error(f'Method "{request.method}" not allowed.', 405)
+        response['Allow'] = 'GET, HEAD'
+        return response
+    return None
+
+
+def _statistic_rows(model):
+    """``values()`` queryset shaped like the statistic serializers' output."""
+    return model.objects.values(
+        'region_id', 'region__name', *get_numeric_columns(model), 'year'
+    )
+
+
+def _statistic_row(row):
+    row = dict(row)
+    row['region_name'] = row.pop('region__name')
+    return row
+
+
+async def get_regions_by_type(request, region_type):
+    """Async ``/api/v1/regions/type/<region_type>/``.
+
+    Args:
+        request: HTTP request object
+        region_type (str): Region type, e.g. province
+
+    Returns:
+        JsonResponse: JSON list of regions, or 404 if there are none
+    """
+    if response := _method_not_allowed(request):
+        return response
+    regions = [
+        RegionSerializer(region).data
+        async for region in Region.objects.of_type(region_type).order_by('region_id')
+    ]
+    if not regions:
+        return _error(f"No regions found of type: {region_type}", 404)
+    return JsonResponse(regions, safe=False)
+
+
+async def get_region_by_id(request, region_id):
+    """Async ``/api/v1/region/id/<region_id>/``.
+
+    Args:
+        request: HTTP request object
+        region_id (str): ID of the region
+
+    Returns:
+        JsonResponse: The region, or 404 if it does not exist
+    """
+    if response := _method_not_allowed(request):
+        return response
+    try:
+        region = await Region.objects.aget(region_id=region_id)
+    except Region.DoesNotExist:
+        return _error("Region not found", 404)
+    return JsonResponse(RegionSerializer(region).data)
+
+
+async def get_statistic_by_region_type(request, statistic, region_type):
+    """Async ``/api/v1/<statistic>/type/<region_type>/``.
+
+    Args:
+        request: HTTP request object with optional query parameter ``year``
+        statistic (str): Statistic name, e.g. population
+        region_type (str): Region type, e.g. province
+
+    Returns:
+        JsonResponse: JSON list of statistic rows with ``region_id`` and
+        ``region_name``, or 404 if there are none
+    """
+    if response := _method_not_allowed(request):
+        return response
+    try:
+        model = get_statistic_model(statistic)
+        rows = _statistic_rows(model).filter(region__in=Region.objects.of_type(region_type))
+        year = request.GET.get('year')
+        if year:
+            rows = rows.filter(year=int(year))
+    except ValueError as e:
+        return _error(str(e), 400)
+    data = [_statistic_row(row) async for row in rows.order_by('region_id', 'year')]
+    if not data:
+        return _error(f"No {statistic} data found for region type: {region_type}", 404)
+    return JsonResponse(data, safe=False)
+
+
+async def get_statistic_by_region_id(request, statistic, region_id):
+    """Async ``/api/v1/<statistic>/id/<region_id>/``, latest census year.
+
+    Args:
+        request: HTTP request object
+        statistic (str): Statistic name, e.g. population
+        region_id (str): ID of the region
+
+    Returns:
+        JsonResponse: The statistic row, or 404 if there is none; for
+        population, the rows of every year, or 404 if the region does not exist
+    """
+    if response := _method_not_allowed(request):
+        return response
+    try:
+        model = get_statistic_model(statistic)
+    except ValueError as e:
+        return _error(str(e), 400)
+    if model is TotalPopulation:
+        rows = _statistic_rows(model).filter(region_id=region_id).order_by('year')
+        data = [_statistic_row(row) async for row in rows]
+        if not data and not await Region.objects.filter(region_id=region_id).aexists():
+            return _error("Region not found", 404)
+        return JsonResponse(data, safe=False)
+    try:
+        row = await _statistic_rows(model).filter(region_id=region_id).alatest('year')
+    except model.DoesNotExist:
+        return _error(f"No {statistic} data found for region: {region_id}", 404)
+    return JsonResponse(_statistic_row(row))
@@ -0,0 +1,176 @@
+"""Database settings from ``DATABASE_URL`` and connection reuse metrics.
+
+``database_from_url`` turns a URL such as::
+
+    postgres://user:secret@db:6432/mylocal?conn_max_age=300&pgbouncer=true&sslmode=require
+
+into a ``DATABASES`` entry. Query parameters configure connection handling:
+
+``conn_max_age``
+    Seconds a connection is kept open between requests (default 60,
+    ``none`` for no limit, 0 to close it after every request).
+``conn_health_checks``
+    Check a persistent connection before reusing it (default true).
+``pool``, ``pool_min_size``, ``pool_max_size``, ``pool_timeout``
+    Use psycopg 3's connection pool instead of persistent connections. This
+    needs Django 5.1 or later and psycopg 3.
+``pgbouncer``
+    The URL points at PgBouncer in transaction mode: server-side cursors and
+    psycopg 3's automatic prepared statements are disabled, since neither
+    survives the server connection changing between transactions.
+
+Other parameters (``sslmode``, ``connect_timeout``, ``application_name``,
+...) are passed to libpq unchanged.
+
+Every request either reuses the connection left open by the previous one
+(a hit) or opens a new one (a miss); ``connection_metrics`` counts both.
+"""
+import importlib.util
+import threading
+from urllib.parse import parse_qsl, unquote, urlparse
+
+import django
+from django.core.exceptions import ImproperlyConfigured
+
+DEFAULT_PORT = 5432
+DEFAULT_CONN_MAX_AGE = 60
+
+_TRUE = {'1', 'true', 'yes', 'on'}
+_FALSE = {'0', 'false', 'no', 'off'}
+
+
+def _bool(name, value):
+    value = value.lower()
+    if value not in _TRUE | _FALSE:
+        raise ImproperlyConfigured(f"DATABASE_URL parameter {name} must be true or false, not {value!r}")
+    return value in _TRUE
+
+
+def _int(name, value):
+    try:
+        return int(value)
+    except ValueError:
+        raise ImproperlyConfigured(f"DATABASE_URL parameter {name} must be an integer, not {value!r}")
+
+
+def _psycopg3_installed():
+    return importlib.util.find_spec('psycopg') is not None
+
+
+def database_from_url(url):
+    """Return a ``DATABASES`` entry for a ``postgres://`` URL.
+
+    Raises:
+        ImproperlyConfigured: If the URL is missing or a parameter is invalid.
+    """
+    if not url:
+        raise ImproperlyConfigured("DATABASE_URL is not set")
+    parsed = urlparse(url)
+    if parsed.scheme not in ('postgres', 'postgresql'):
+        raise ImproperlyConfigured(f"DATABASE_URL must be a postgres:// URL, not {parsed.scheme}://")
+    params = dict(parse_qsl(parsed.query))
+
+    conn_max_age = params.pop('conn_max_age', str(DEFAULT_CONN_MAX_AGE))
+    pool = _bool('pool', params.pop('pool', 'false'))
+    pool_options = {
+        option: _int(f'pool_{option}', params.pop(f'pool_{option}'))
+        for option in ('min_size', 'max_size', 'timeout')
+        if f'pool_{option}' in params
+    }
+    config = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': unquote(parsed.path.lstrip('/')),
+        'USER': unquote(parsed.username) if parsed.username else None,
+        'PASSWORD': unquote(parsed.password) if parsed.password else None,
+        'HOST': parsed.hostname,
+        'PORT': parsed.port or DEFAULT_PORT,
+        'CONN_MAX_AGE': None if conn_max_age.lower() == 'none' else _int('conn_max_age', conn_max_age),
+        'CONN_HEALTH_CHECKS': _bool('conn_health_checks', params.pop('conn_health_checks', 'true')),
+        'DISABLE_SERVER_SIDE_CURSORS': False,
+    }
+    options = {}
+
+    if _bool('pgbouncer', params.pop('pgbouncer', 'false')):
+        config['DISABLE_SERVER_SIDE_CURSORS'] = True
+        if _psycopg3_installed():
+            options['prepare_threshold'] = None
+
+    if pool:
+        if django.VERSION < (5, 1) or not _psycopg3_installed():
+            raise ImproperlyConfigured("DATABASE_URL pool=true needs Django 5.1+ and psycopg 3")
+        # Pooled connections are returned to the pool after each request.
+        config['CONN_MAX_AGE'] = 0
+        options['pool'] = pool_options or True
+
+    options.update(params)
+    config['OPTIONS'] = options
+    return config
+
+
+class ConnectionMetrics:
+    """Thread-safe counters of connection reuse across requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.opened = 0
+
+    def request_started(self, reused):
+        with self._lock:
+            if reused:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def connection_opened(self):
+        with self._lock:
+            self.opened += 1
+
+    def as_dict(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'opened': self.opened,
+                'hit_ratio': round(self.hits / requests, 4) if requests else None,
+            }
+
+
+_metrics = ConnectionMetrics()
+
+
+def connection_metrics():
+    """Return ``hits``, ``misses``, ``opened`` and ``hit_ratio`` since startup."""
+    return _metrics.as_dict()
+
+
+def reset_connection_metrics():
+    _metrics.reset()
+
+
+def _on_request_started(sender, **kwargs):
+    from django.db import connection
+
+    # Runs after Django's close_old_connections, so an open connection here
+    # is one that outlived the previous request and will be reused.
+    _metrics.request_started(reused=connection.connection is not None)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    if connection.alias == 'default':
+        _metrics.connection_opened()
+
+
+def connect_signals():
+    """Start counting; called from ``PopulationStatsConfig.ready``."""
+    from django.core.signals import request_started
+    from django.db.backends.signals import connection_created
+
+    request_started.connect(_on_request_started, dispatch_uid='population_stats.connection_metrics')
+    connection_created.connect(_on_connection_created, dispatch_uid='population_stats.connection_metrics')
@@ -0,0 +1,97 @@
+"""Compare a statistic between two census years.
+
+``diff_statistic`` joins each region's row of the later year to its row of
+the earlier year in one query (a ``FilteredRelation`` self-join through the
+region) and computes every column's absolute and percentage change in SQL,
+so the result can be streamed straight from the cursor without loading
+either year into Python first.
+
+Only regions with a row in both years are compared.
+"""
+from django.db.models import Case, F, FilteredRelation, FloatField, Q, When
+from django.db.models.functions import Cast, Round
+from mylocalstats.population_stats.aggregation import get_numeric_columns, get_statistic_model
+from mylocalstats.population_stats.models import normalize_region_type
+
+_PREVIOUS = 'previous'
+
+
+def get_diff_columns(model, columns=None):
+    """Return the columns to compare, all numeric columns by default.
+
+    Raises:
+        ValueError: If a column is not a numeric column of ``model``.
+    """
+    numeric = get_numeric_columns(model)
+    if not columns:
+        return numeric
+    unknown = [column for column in columns if column not in numeric]
+    if unknown:
+        raise ValueError(
+            f"Unknown column: {', '.join(unknown)}. Expected one of: {', '.join(numeric)}"
+        )
+    return list(columns)
+
+
+def _change_pct(column):
+    previous = F(f'{_PREVIOUS}__{column}')
+    change = Cast(F(column) - previous, FloatField()) * 100.0 / Cast(previous, FloatField())
+    # Undefined when the earlier value is zero or missing.
+    return Case(
+        When(**{f'{_PREVIOUS}__{column}__gt': 0}, then=Round(change, 4)),
+        default=None,
+        output_field=FloatField(),
+    )
+
+
+def diff_statistic(statistic, year_from, year_to, region_type=None, columns=None):
+    """Per-region change of a statistic from ``year_from`` to ``year_to``.
+
+    Args:
+        statistic (str): Public statistic name, e.g. ``population``.
+        year_from (int): Earlier census year.
+        year_to (int): Later census year.
+        region_type (str, optional): Only compare regions of this type.
+        columns (list, optional): Columns to compare (default all numeric).
+
+    Returns:
+        QuerySet: Dicts ordered by ``region_id`` with ``region_id``,
+        ``name``, ``region_type``, ``year_from``, ``year_to`` and, for every
+        column, ``<column>_from``, ``<column>_to``, ``<column>_change`` and
+        ``<column>_change_pct`` (``None`` when the earlier value is 0).
+
+    Raises:
+        ValueError: If the statistic or a column is unknown, or the years
+            are equal.
+    """
+    model = get_statistic_model(statistic)
+    columns = get_diff_columns(model, columns)
+    year_from, year_to = int(year_from), int(year_to)
+    if year_from == year_to:
+        raise ValueError("from and to must be different years")
+
+    # ``region__<model>`` is the related query name declared on each
+    # statistic model's region foreign key.
+    relation = f'region__{model._meta.model_name}'
+    queryset = model.objects.annotate(**{
+        _PREVIOUS: FilteredRelation(relation, condition=Q(**{f'{relation}__year': year_from})),
+    }).filter(year=year_to, **{f'{_PREVIOUS}__year': year_from})
+    region_type = normalize_region_type(region_type)
+    if region_type:
+        queryset = queryset.filter(region__region_type=region_type)
+
+    annotations = {}
+    for column in columns:
+        annotations[f'{column}_from'] = F(f'{_PREVIOUS}__{column}')
+        annotations[f'{column}_to'] = F(column)
+        annotations[f'{column}_change'] = F(column) - F(f'{_PREVIOUS}__{column}')
+        annotations[f'{column}_change_pct'] = _change_pct(column)
+    return queryset.annotate(
+        name=F('region__name'),
+        region_type=F('region__region_type'),
+        year_from=F(f'{_PREVIOUS}__year'),
+        year_to=F('year'),
+        **annotations,
+    ).order_by('region_id').values(
+        'region_id', 'name', 'region_type', 'year_from', 'year_to', *annotations
+    )
@@ -0,0 +1,277 @@
+"""Reverse geocoding: which region of every level contains a point.
+
+Region boundaries come from the gig-data geo files (one JSON file per region,
+named ``<region_id>.json``, holding GeoJSON or a bare polygon coordinate
+list in ``[longitude, latitude]`` order). Each level's polygons go into an
+STR-packed R-tree (``rtree.py``), so a lookup only tests the few polygons
+whose bounding box contains the point.
+
+Regions without geometry fall back to the centroid Voronoi diagram: the
+containing region is the one with the nearest centroid, found with a
+best-first search over an R-tree of centroids. On a level without any
+geometry that is every lookup; on a level where only some regions have
+geometry, points outside every polygon go to the nearest centroid among the
+regions without one.
+
+The geocoder is built lazily and kept until the data version changes (see
+``versioning.py``), so every process rebuilds it after an import.
+"""
+import json
+import math
+import os
+import threading
+
+from django.conf import settings
+from mylocalstats.population_stats.models import Region
+from mylocalstats.population_stats.rtree import STRTree, union_bbox
+from mylocalstats.population_stats.versioning import get_data_version
+
+SOURCE_POLYGON = 'polygon'
+SOURCE_CENTROID = 'centroid'
+
+DEFAULT_MAX_BATCH = 10000
+
+
+def _nesting_depth(value):
+    depth = 0
+    while isinstance(value, (list, tuple)) and value:
+        value = value[0]
+        depth += 1
+    return depth
+
+
+def parse_geometry(data):
+    """Return a region geometry as a list of polygons of ``(lon, lat)`` rings.
+
+    Accepts a GeoJSON ``FeatureCollection``, ``Feature``, ``Polygon`` or
+    ``MultiPolygon``, or a bare ring / polygon / multipolygon coordinate list.
+    Returns an empty list for anything else.
+    """
+    if isinstance(data, dict):
+        kind = data.get('type')
+        if kind == 'FeatureCollection':
+            return [
+                polygon
+                for feature in data.get('features') or []
+                for polygon in parse_geometry(feature)
+            ]
+        if kind == 'Feature':
+            return parse_geometry(data.get('geometry'))
+        if kind in ('Polygon', 'MultiPolygon'):
+            return parse_geometry(data.get('coordinates'))
+        return []
+    depth = _nesting_depth(data)
+    if depth == 2:
+        data = [[data]]
+    elif depth == 3:
+        data = [data]
+    elif depth != 4:
+        return []
+    return [
+        [[(float(point[0]), float(point[1])) for point in ring] for ring in polygon if ring]
+        for polygon in data
+        if polygon
+    ]
+
+
+def geometry_bbox(polygons):
+    return union_bbox([
+        (min(x for x, _ in ring), min(y for _, y in ring), max(x for x, _ in ring), max(y for _, y in ring))
+        for polygon in polygons
+        for ring in polygon
+    ])
+
+
+def point_in_polygons(x, y, polygons):
+    """Even-odd test of a point against polygons with holes."""
+    for polygon in polygons:
+        inside = False
+        for ring in polygon:
+            j = len(ring) - 1
+            for i in range(len(ring)):
+                xi, yi = ring[i]
+                xj, yj = ring[j]
+                if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+                    inside = not inside
+                j = i
+        if inside:
+            return True
+    return False
+
+
+def find_geometry_files(geo_dir):
+    """Map region id to geometry file path for every ``*.json`` under ``geo_dir``."""
+    paths = {}
+    if not geo_dir or not os.path.isdir(geo_dir):
+        return paths
+    for root, _, files in os.walk(geo_dir):
+        for name in files:
+            if name.endswith('.json'):
+                paths.setdefault(name[:-len('.json')], os.path.join(root, name))
+    return paths
+
+
+def load_geometries(geo_dir, region_ids):
+    """Load and parse the geometry files of ``region_ids`` found under ``geo_dir``."""
+    paths = find_geometry_files(geo_dir)
+    geometries = {}
+    for region_id in region_ids:
+        path = paths.get(region_id)
+        if path is None:
+            continue
+        with open(path) as handle:
+            polygons = parse_geometry(json.load(handle))
+        if polygons:
+            geometries[region_id] = polygons
+    return geometries
+
+
+class ReverseGeocoder:
+    """Point lookups against the regions of every level.
+
+    Args:
+        regions: Iterable of dicts with ``region_id``, ``name``,
+            ``region_type``, ``latitude`` and ``longitude``.
+        geometries: Mapping of region id to polygons (see ``parse_geometry``).
+    """
+
+    def __init__(self, regions, geometries=None):
+        geometries = geometries or {}
+        regions = list(regions)
+        by_level = {}
+        for region in regions:
+            by_level.setdefault(region['region_type'].lower(), []).append(region)
+
+        latitudes = [float(r['latitude']) for r in regions if r['latitude'] is not None]
+        # Centroids are compared in an equirectangular projection around the
+        # mean latitude, which is accurate enough at country scale.
+        self._x_scale = math.cos(math.radians(sum(latitudes) / len(latitudes))) if latitudes else 1.0
+
+        self.indexes = {}
+        # Centroids of the regions without geometry on polygon levels.
+        self.fallbacks = {}
+        for level, level_regions in by_level.items():
+            level_regions.sort(key=lambda r: r['region_id'])
+            with_geometry = [r for r in level_regions if r['region_id'] in geometries]
+            centroids = self._centroid_tree([r for r in level_regions if r['region_id'] not in geometries])
+            if with_geometry:
+                entries = [
+                    (geometry_bbox(geometries[r['region_id']]), (r, geometries[r['region_id']]))
+                    for r in with_geometry
+                ]
+                self.indexes[level] = (SOURCE_POLYGON, STRTree(entries))
+                if centroids is not None:
+                    self.fallbacks[level] = centroids
+            elif centroids is not None:
+                self.indexes[level] = (SOURCE_CENTROID, centroids)
+
+    def _project(self, latitude, longitude):
+        return float(longitude) * self._x_scale, float(latitude)
+
+    def _centroid_tree(self, regions):
+        entries = []
+        for r in regions:
+            if r['latitude'] is None or r['longitude'] is None:
+                continue
+            x, y = self._project(r['latitude'], r['longitude'])
+            entries.append(((x, y, x, y), r))
+        return STRTree(entries) if entries else None
+
+    @property
+    def levels(self):
+        return sorted(self.indexes)
+
+    def lookup(self, latitude, longitude, levels=None):
+        """Return ``{level: {region_id, name, source}}`` for the regions containing a point.
+
+        Levels whose polygons do not contain the point, and that have no
+        regions without geometry to fall back to, are omitted.
+        """
+        result = {}
+        for level in levels if levels is not None else self.indexes:
+            index = self.indexes.get(level.lower())
+            if index is None:
+                continue
+            source, tree = index
+            region = None
+            if source == SOURCE_POLYGON:
+                matches = [
+                    candidate
+                    for candidate, polygons in tree.query_point(longitude, latitude)
+                    if point_in_polygons(longitude, latitude, polygons)
+                ]
+                if matches:
+                    region = min(matches, key=lambda r: r['region_id'])
+                else:
+                    source, tree = SOURCE_CENTROID, self.fallbacks.get(level.lower())
+            if region is None and tree is not None:
+                nearest = tree.nearest(*self._project(latitude, longitude))
+                region = nearest[0] if nearest else None
+            if region is not None:
+                result[level.lower()] = {
+                    'region_id': region['region_id'],
+                    'name': region['name'],
+                    'source': source,
+                }
+        return result
+
+    def lookup_many(self, points, levels=None):
+        """Look up many ``(latitude, longitude)`` points; returns one dict per point."""
+        return [self.lookup(latitude, longitude, levels) for latitude, longitude in points]
+
+
+def build_reverse_geocoder(geo_dir=None):
+    """Build a geocoder from the Region table and the geometry files in ``geo_dir``."""
+    if geo_dir is None:
+        geo_dir = getattr(settings, 'REVERSE_GEOCODE_GEO_DIR', None)
+    regions = list(
+        Region.objects.values('region_id', 'name', 'region_type', 'latitude', 'longitude')
+    )
+    geometries = load_geometries(geo_dir, [r['region_id'] for r in regions])
+    return ReverseGeocoder(regions, geometries)
+
+
+_geocoder = {'version': None, 'geocoder': None}
+_geocoder_lock = threading.Lock()
+
+
+def get_reverse_geocoder():
+    """Return the process-wide geocoder, rebuilding it when the data version changes."""
+    version = get_data_version()
+    with _geocoder_lock:
+        if _geocoder['geocoder'] is None or _geocoder['version'] != version:
+            _geocoder.update(version=version, geocoder=build_reverse_geocoder())
+        return _geocoder['geocoder']
+
+
+def reset_reverse_geocoder():
+    """Drop the cached geocoder so the next lookup rebuilds it."""
+    with _geocoder_lock:
+        _geocoder.update(version=None, geocoder=None)
+
+
+def parse_points(points, max_points=None):
+    """Validate a batch of points given as ``[lat, lon]`` pairs or ``{"lat", "lon"}`` dicts.
+
+    Raises:
+        ValueError: If the batch is not a list, too large, or a point is invalid.
+    """
+    if max_points is None:
+        max_points = getattr(settings, 'REVERSE_GEOCODE_MAX_BATCH', DEFAULT_MAX_BATCH)
+    if not isinstance(points, list):
+        raise ValueError("'points' must be a list of [lat, lon] pairs")
+    if len(points) > max_points:
+        raise ValueError(f"At most {max_points} points can be geocoded per request")
+    parsed = []
+    for point in points:
+        try:
+            if isinstance(point, dict):
+                latitude, longitude = float(point['lat']), float(point['lon'])
+            else:
+                latitude, longitude = (float(value) for value in point)
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Invalid point: {point!r}")
+        if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+            raise ValueError(f"Coordinates out of range: {point!r}")
+        parsed.append((latitude, longitude))
+    return parsed
@@ -0,0 +1,151 @@
+"""Per-request DataLoaders for Region and statistic relations.
+
+GraphQL resolves nested fields row by row, so a naive ``region`` resolver on
+``totalPopulations`` issues one query per row. The loaders here batch those
+lookups: every resolver that produces rows queues the keys its children will
+ask for, and the first ``load`` that misses the cache fetches all queued keys
+with a single ``IN`` query. The result is one query per relation per nesting
+level, independent of the number of rows.
+
+Loaders are created lazily and stored on the request (``info.context``) so the
+cache never outlives a single GraphQL operation.
+"""
+from collections import defaultdict
+
+from mylocalstats.population_stats.models import (
+    Region,
+    TotalPopulation,
+    AgeDistribution,
+    EthnicityDistribution,
+    GenderDistribution,
+    MaritalStatus,
+    ReligiousAffiliation
+)
+
+# Statistic models keyed by their GraphQL field name on Region
+# (``region.totalpopulation`` etc.).
+STATISTIC_MODELS = {
+    model._meta.model_name: model
+    for model in (
+        TotalPopulation,
+        AgeDistribution,
+        EthnicityDistribution,
+        GenderDistribution,
+        MaritalStatus,
+        ReligiousAffiliation,
+    )
+}
+
+_CONTEXT_ATTR = "_population_stats_loaders"
+
+
+class DataLoader:
+    """Synchronous batching loader with a per-instance cache.
+
+    Args:
+        batch_load_fn: Callable taking a list of keys and returning a dict
+            mapping each found key to its value.
+        default: Factory for the value of keys missing from the batch result.
+    """
+
+    def __init__(self, batch_load_fn, default=lambda: None):
+        self.batch_load_fn = batch_load_fn
+        self.default = default
+        self._cache = {}
+        self._queue = set()
+
+    def queue(self, keys):
+        """Schedule keys to be fetched with the next batch."""
+        self._queue.update(key for key in keys if key is not None and key not in self._cache)
+
+    def prime(self, key, value):
+        """Seed the cache with an already loaded value."""
+        self._cache.setdefault(key, value)
+        self._queue.discard(key)
+
+    def load(self, key):
+        """Return the value for ``key``, fetching every queued key on a miss."""
+        if key is None:
+            return self.default()
+        if key not in self._cache:
+            self._queue.add(key)
+            keys = list(self._queue)
+            self._queue.clear()
+            results = self.batch_load_fn(keys)
+            for batch_key in keys:
+                self._cache[batch_key] = results.get(batch_key, self.default())
+        return self._cache[key]
+
+    def load_many(self, keys):
+        keys = list(keys)
+        self.queue(keys)
+        return [self.load(key) for key in keys]
+
+
+class Loaders:
+    """All loaders for one request."""
+
+    def __init__(self):
+        self.region = DataLoader(self._load_regions)
+        self.children = DataLoader(self._load_children, default=list)
+        self.statistics = {
+            name: DataLoader(lambda keys, model=model: self._load_statistics(model, keys))
+            for name, model in STATISTIC_MODELS.items()
+        }
+
+    def queue_rows(self, rows):
+        """Queue the relation keys of freshly resolved rows and cache the regions.
+
+        Accepts Region rows or statistic rows (mixed lists are fine) and
+        returns the rows as a list, so resolvers can ``return
+        loaders.queue_rows(queryset)``. Rows loaded with deferred columns
+        (see ``projection.py``) are not cached, and deferred columns are never
+        read, so queueing never triggers a query per row.
+        """
+        rows = list(rows)
+        for row in rows:
+            complete = not row.get_deferred_fields()
+            if isinstance(row, Region):
+                if complete:
+                    self.region.prime(row.region_id, row)
+                self.region.queue([row.__dict__.get("parent_region_id")])
+                self.children.queue([row.region_id])
+                for loader in self.statistics.values():
+                    loader.queue([row.region_id])
+            else:
+                # Statistic rows are not primed: the statistic loaders serve a
+                # region's latest year, and list rows may be of any year.
+                self.region.queue([row.region_id])
+        return rows
+
+    def _load_regions(self, keys):
+        regions = self.queue_rows(Region.objects.filter(region_id__in=keys))
+        return {region.region_id: region for region in regions}
+
+    def _load_children(self, keys):
+        children = defaultdict(list)
+        for region in self.queue_rows(
+            Region.objects.filter(parent_region_id__in=keys).order_by("region_id")
+        ):
+            children[region.parent_region_id].append(region)
+        return children
+
+    def _load_statistics(self, model, keys):
+        # Ordered by year so each region maps to its latest census.
+        return {row.region_id: row for row in model.objects.filter(region_id__in=keys).order_by("year")}
+
+
+def get_loaders(info):
+    """Return the loaders bound to the current request, creating them once.
+
+    When executed without a context object (e.g. ``schema.execute`` in a
+    shell) a fresh, unshared set of loaders is returned.
+    """
+    context = info.context
+    if context is None:
+        return Loaders()
+    loaders = getattr(context, _CONTEXT_ATTR, None)
+    if loaders is None:
+        loaders = Loaders()
+        setattr(context, _CONTEXT_ATTR, loaders)
+    return loaders
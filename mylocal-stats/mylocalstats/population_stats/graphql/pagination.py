@@ -0,0 +1,109 @@
+"""Relay-style connections backed by keyset pagination.
+
+List fields return a ``Connection`` (``edges { node cursor }``, ``pageInfo``
+and ``totalCount``) instead of whole querysets. Pages are fetched with
+``WHERE pk > <after> ORDER BY pk LIMIT first + 1``, which stays an index
+range scan however deep the client pages, unlike ``OFFSET``. The extra row
+tells us whether there is a next page without a separate ``COUNT``;
+``totalCount`` is only computed when the client selects it. Nodes are
+loaded with only the columns the query selects (see ``projection.py``).
+"""
+import base64
+import binascii
+
+import graphene
+from django.conf import settings
+from graphql import GraphQLError
+from mylocalstats.population_stats.graphql.loaders import get_loaders
+from mylocalstats.population_stats.graphql.projection import project
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+_CURSOR_PREFIX = "pk:"
+
+# Where the rows of a connection sit in its selection set.
+NODE_PATH = ("edges", "node")
+
+
+def get_page_size_limits():
+    """Return ``(default, maximum)`` page sizes from settings."""
+    return (
+        getattr(settings, "GRAPHQL_DEFAULT_PAGE_SIZE", DEFAULT_PAGE_SIZE),
+        getattr(settings, "GRAPHQL_MAX_PAGE_SIZE", MAX_PAGE_SIZE),
+    )
+
+
+def encode_cursor(pk):
+    return base64.urlsafe_b64encode(f"{_CURSOR_PREFIX}{pk}".encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    try:
+        value = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    except (binascii.Error, UnicodeError, ValueError):
+        raise GraphQLError(f"Invalid cursor: {cursor}")
+    if not value.startswith(_CURSOR_PREFIX):
+        raise GraphQLError(f"Invalid cursor: {cursor}")
+    return value[len(_CURSOR_PREFIX):]
+
+
+class CountableConnection(graphene.relay.Connection):
+    """Connection with a lazily evaluated ``totalCount``."""
+
+    class Meta:
+        abstract = True
+
+    total_count = graphene.Int(required=True)
+
+    def resolve_total_count(self, info):
+        return self.queryset.count()
+
+
+def connection_field(connection_type, **kwargs):
+    """Declare a paginated field accepting ``first`` and ``after``."""
+    return graphene.Field(
+        connection_type,
+        first=graphene.Int(required=False),
+        after=graphene.String(required=False),
+        **kwargs
+    )
+
+
+def paginate(queryset, info, connection_type, first=None, after=None):
+    """Return one keyset page of ``queryset`` as ``connection_type``.
+
+    Args:
+        queryset: Filtered, unsliced queryset to page through.
+        info: GraphQL resolve info, used to queue the page for the loaders.
+        connection_type: ``CountableConnection`` subclass to build.
+        first: Page size; defaults to ``GRAPHQL_DEFAULT_PAGE_SIZE``.
+        after: Cursor of the last row of the previous page.
+    """
+    default_size, max_size = get_page_size_limits()
+    if first is None:
+        first = default_size
+    if first < 0:
+        raise GraphQLError("Argument 'first' must be a non-negative integer.")
+    if first > max_size:
+        raise GraphQLError(f"Argument 'first' must not exceed {max_size}.")
+
+    page = project(queryset, info, NODE_PATH).order_by("pk")
+    if after is not None:
+        page = page.filter(pk__gt=decode_cursor(after))
+    rows = get_loaders(info).queue_rows(page[:first + 1])
+    has_next_page = len(rows) > first
+    rows = rows[:first]
+
+    edges = [connection_type.Edge(node=row, cursor=encode_cursor(row.pk)) for row in rows]
+    connection = connection_type(
+        edges=edges,
+        page_info=graphene.relay.PageInfo(
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+            has_previous_page=after is not None,
+            has_next_page=has_next_page,
+        ),
+    )
+    connection.queryset = queryset
+    return connection
@@ -0,0 +1,77 @@
+"""Persisted GraphQL queries.
+
+Clients that send ``{"extensions": {"persistedQuery": {"sha256Hash": ...}}}``
+instead of a query string are served from documents that were parsed and
+validated once, when the registry was loaded. The hot path therefore skips
+parsing and validation entirely and goes straight to execution.
+
+Documents are loaded from ``*.graphql`` files in
+``GRAPHQL_PERSISTED_QUERIES_DIR``; the hash of a document is the SHA-256 of
+the file contents.
+"""
+import hashlib
+from pathlib import Path
+
+from django.conf import settings
+from graphql import parse, validate
+
+
+class PersistedQueryError(ValueError):
+    """Raised when a persisted document fails to parse or validate."""
+
+
+class PersistedQueryRegistry:
+    """Map of SHA-256 hash to a pre-parsed, pre-validated document.
+
+    Args:
+        schema: The ``GraphQLSchema`` documents are validated against.
+        validation_rules: Rules applied at registration time.
+    """
+
+    def __init__(self, schema, validation_rules=None):
+        self.schema = schema
+        self.validation_rules = validation_rules
+        self._documents = {}
+
+    def __contains__(self, query_hash):
+        return query_hash in self._documents
+
+    def __len__(self):
+        return len(self._documents)
+
+    def get(self, query_hash):
+        return self._documents.get(query_hash)
+
+    def register(self, query):
+        """Parse and validate ``query`` and return its hash."""
+        query_hash = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        if query_hash in self._documents:
+            return query_hash
+        try:
+            document = parse(query)
+        except Exception as e:
+            raise PersistedQueryError(f"Could not parse persisted query: {e}") from e
+        errors = validate(self.schema, document, self.validation_rules)
+        if errors:
+            messages = "; ".join(error.message for error in errors)
+            raise PersistedQueryError(f"Persisted query failed validation: {messages}")
+        self._documents[query_hash] = document
+        return query_hash
+
+    def load_directory(self, path):
+        """Register every ``*.graphql`` file below ``path``."""
+        for file_path in sorted(Path(path).rglob("*.graphql")):
+            try:
+                self.register(file_path.read_text(encoding="utf-8"))
+            except PersistedQueryError as e:
+                raise PersistedQueryError(f"{file_path}: {e}") from e
+        return self
+
+
+def build_registry(schema, validation_rules=None):
+    """Create a registry populated from ``GRAPHQL_PERSISTED_QUERIES_DIR``."""
+    registry = PersistedQueryRegistry(schema, validation_rules)
+    directory = getattr(settings, "GRAPHQL_PERSISTED_QUERIES_DIR", None)
+    if directory:
+        registry.load_directory(directory)
+    return registry
@@ -0,0 +1,79 @@
+"""Restrict GraphQL querysets to the columns a query selects.
+
+``DjangoObjectType`` resolvers load whole rows, including the JSON columns on
+``Region`` (``subs``, ``supers``, ``eqs``, ``ints``, ``other_ids``), even when
+the client only asks for ``name``. ``project`` reads the selection set from
+the resolve info and applies ``.only()`` with the concrete columns needed to
+answer it: selected model fields, foreign key columns for selected forward
+relations, and the columns computed fields depend on. The primary key is
+always loaded, which is all reverse relations and loaders need.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from graphene.utils.str_converters import to_snake_case
+from graphql.language import FieldNode, FragmentSpreadNode, InlineFragmentNode
+from mylocalstats.population_stats.models import Region
+
+# Columns needed by GraphQL fields that are not model fields.
+FIELD_DEPENDENCIES = {
+    Region: {
+        "parent": ("parent_region_id",),
+    },
+}
+
+
+def _fields(selection_set, fragments):
+    if selection_set is None:
+        return
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            yield selection
+        elif isinstance(selection, InlineFragmentNode):
+            yield from _fields(selection.selection_set, fragments)
+        elif isinstance(selection, FragmentSpreadNode):
+            fragment = fragments.get(selection.name.value)
+            if fragment is not None:
+                yield from _fields(fragment.selection_set, fragments)
+
+
+def selected_field_names(info, path=()):
+    """Return the snake_case names selected below the current field.
+
+    Args:
+        info: GraphQL resolve info of the field being resolved.
+        path: Field names to descend through first, e.g. ``("edges", "node")``
+            for the nodes of a connection.
+    """
+    selection_sets = [node.selection_set for node in info.field_nodes]
+    for name in path:
+        selection_sets = [
+            field.selection_set
+            for selection_set in selection_sets
+            for field in _fields(selection_set, info.fragments)
+            if field.name.value == name
+        ]
+    return {
+        to_snake_case(field.name.value)
+        for selection_set in selection_sets
+        for field in _fields(selection_set, info.fragments)
+    }
+
+
+def get_columns(model, names):
+    """Map selected GraphQL field names to the model fields to load."""
+    dependencies = FIELD_DEPENDENCIES.get(model, {})
+    columns = set()
+    for name in names:
+        columns.update(dependencies.get(name, ()))
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if field.concrete:
+            columns.add(field.name)
+    return columns
+
+
+def project(queryset, info, path=()):
+    """Apply ``.only()`` for the columns selected at ``path``."""
+    columns = get_columns(queryset.model, selected_field_names(info, path))
+    return queryset.only(queryset.model._meta.pk.name, *sorted(columns))
@@ -1,5 +1,31 @@
 import graphene
+from graphql import GraphQLError
+from mylocalstats.population_stats.aggregation import aggregate_statistic, get_statistic_model
+from mylocalstats.population_stats.diff import diff_statistic, get_diff_columns
+from mylocalstats.population_stats.indicators import rank_regions
+from mylocalstats.population_stats.ranking import quantile_bins, top_regions
+from mylocalstats.population_stats.relations import get_related_regions
+from mylocalstats.population_stats.search import search_regions
+from mylocalstats.population_stats.spatial import nearest_regions, regions_in_bbox
+from mylocalstats.population_stats.graphql.loaders import get_loaders
+from mylocalstats.population_stats.graphql.pagination import connection_field, paginate
+from mylocalstats.population_stats.graphql.projection import project
 from mylocalstats.population_stats.graphql.types import (
+    AggregateType,
+    ColumnChangeType,
+    IndicatorRankType,
+    QuantileBinType,
+    RankedRegionType,
+    StatisticDiffType,
+    NearestRegionType,
+    RegionSearchResultType,
+    RegionConnection,
+    TotalPopulationConnection,
+    AgeDistributionConnection,
+    EthnicityDistributionConnection,
+    GenderDistributionConnection,
+    MaritalStatusConnection,
+    ReligiousAffiliationConnection,
     RegionType,
     TotalPopulationType,
     AgeDistributionType,
@@ -15,23 +41,58 @@ from mylocalstats.population_stats.models import (
     EthnicityDistribution,
     GenderDistribution,
     MaritalStatus,
-    ReligiousAffiliation
+    ReligiousAffiliation,
+    normalize_region_type,
 )
 
 class Query(graphene.ObjectType):
     # Region queries
-    regions = graphene.List(
-        RegionType,
+    regions = connection_field(
+        RegionConnection,
         type=graphene.String(required=False)
     )
     region = graphene.Field(
         RegionType,
         entity_id=graphene.String(required=True)
     )
+    descendants = connection_field(
+        RegionConnection,
+        region_id=graphene.String(required=True),
+        level=graphene.String(required=False),
+        max_depth=graphene.Int(required=False)
+    )
+    related_regions = connection_field(
+        RegionConnection,
+        region_id=graphene.String(required=True),
+        relation=graphene.String(
+            required=True, description="subs, supers, equivalents or intersecting"
+        )
+    )
+    regions_in_bbox = connection_field(
+        RegionConnection,
+        min_latitude=graphene.Float(required=True),
+        min_longitude=graphene.Float(required=True),
+        max_latitude=graphene.Float(required=True),
+        max_longitude=graphene.Float(required=True),
+        region_type=graphene.String(required=False)
+    )
+    search_regions = graphene.List(
+        RegionSearchResultType,
+        query=graphene.String(required=True),
+        region_type=graphene.String(required=False),
+        limit=graphene.Int(required=False)
+    )
+    nearest_regions = graphene.List(
+        NearestRegionType,
+        latitude=graphene.Float(required=True),
+        longitude=graphene.Float(required=True),
+        k=graphene.Int(required=False, default_value=5),
+        region_type=graphene.String(required=False)
+    )
 
     # Total Population queries
-    total_populations = graphene.List(
-        TotalPopulationType,
+    total_populations = connection_field(
+        TotalPopulationConnection,
         region_type=graphene.String(required=False),
         year=graphene.Int(required=False)
     )
@@ -41,8 +102,8 @@ class Query(graphene.ObjectType):
     )
 
     # Age Distribution queries
-    age_distributions = graphene.List(
-        AgeDistributionType,
+    age_distributions = connection_field(
+        AgeDistributionConnection,
         region_type=graphene.String(required=False),
         year=graphene.Int(required=False)
     )
@@ -52,8 +113,8 @@ class Query(graphene.ObjectType):
     )
 
     # Ethnicity Distribution queries
-    ethnicity_distributions = graphene.List(
-        EthnicityDistributionType,
+    ethnicity_distributions = connection_field(
+        EthnicityDistributionConnection,
         region_type=graphene.String(required=False),
         year=graphene.Int(required=False)
     )
@@ -63,8 +124,8 @@ class Query(graphene.ObjectType):
     )
 
     # Gender Distribution queries
-    gender_distributions = graphene.List(
-        GenderDistributionType,
+    gender_distributions = connection_field(
+        GenderDistributionConnection,
         region_type=graphene.String(required=False),
         year=graphene.Int(required=False)
     )
@@ -74,8 +135,8 @@ class Query(graphene.ObjectType):
     )
 
     # Marital Status queries
-    marital_statuses = graphene.List(
-        MaritalStatusType,
+    marital_statuses = connection_field(
+        MaritalStatusConnection,
         region_type=graphene.String(required=False),
         year=graphene.Int(required=False)
     )
@@ -85,8 +146,8 @@ class Query(graphene.ObjectType):
     )
 
     # Religious Affiliation queries
-    religious_affiliations = graphene.List(
-        ReligiousAffiliationType,
+    religious_affiliations = connection_field(
+        ReligiousAffiliationConnection,
         region_type=graphene.String(required=False),
         year=graphene.Int(required=False)
     )
@@ -95,84 +156,259 @@ class Query(graphene.ObjectType):
         region_id=graphene.String(required=True)
     )
 
+    # Hierarchy aggregation queries
+    aggregates = graphene.List(
+        AggregateType,
+        statistic=graphene.String(required=True),
+        parent_ids=graphene.List(graphene.String, required=True),
+        level=graphene.String(required=True),
+        year=graphene.Int(required=False)
+    )
+
+    # Derived indicators
+    indicator_ranking = graphene.List(
+        IndicatorRankType,
+        indicator=graphene.String(required=True),
+        region_type=graphene.String(required=False),
+        year=graphene.Int(required=False),
+        ascending=graphene.Boolean(required=False, default_value=False),
+        limit=graphene.Int(required=False)
+    )
+
+    # Rankings over any numeric column
+    ranking = graphene.List(
+        RankedRegionType,
+        statistic=graphene.String(required=True),
+        column=graphene.String(required=True),
+        region_type=graphene.String(required=False),
+        year=graphene.Int(required=False),
+        ascending=graphene.Boolean(required=False, default_value=False),
+        limit=graphene.Int(required=False),
+        min_percentile=graphene.Float(required=False),
+        max_percentile=graphene.Float(required=False)
+    )
+    quantiles = graphene.List(
+        QuantileBinType,
+        statistic=graphene.String(required=True),
+        column=graphene.String(required=True),
+        region_type=graphene.String(required=False),
+        year=graphene.Int(required=False),
+        bins=graphene.Int(required=False)
+    )
+
+    # Changes between census years
+    statistic_diff = graphene.List(
+        StatisticDiffType,
+        statistic=graphene.String(required=True),
+        year_from=graphene.Int(required=True),
+        year_to=graphene.Int(required=True),
+        region_type=graphene.String(required=False),
+        columns=graphene.List(graphene.String, required=False)
+    )
+
     # Region resolvers
-    def resolve_regions(self, info, type=None):
+    def resolve_regions(self, info, type=None, first=None, after=None):
         queryset = Region.objects.all()
         if type:
-            queryset = queryset.filter(type__iexact=type)
-        return queryset
+            queryset = queryset.of_type(type)
+        return paginate(queryset, info, RegionConnection, first, after)
 
     def resolve_region(self, info, entity_id):
-        return Region.objects.get(entity_id=entity_id)
+        return project(Region.objects.all(), info).get(region_id=entity_id)
+
+    def resolve_descendants(self, info, region_id, level=None, max_depth=None, first=None, after=None):
+        queryset = Region.objects.descendants_of(region_id, level=level, max_depth=max_depth)
+        return paginate(queryset, info, RegionConnection, first, after)
+
+    def resolve_related_regions(self, info, region_id, relation, first=None, after=None):
+        try:
+            queryset = get_related_regions(region_id, relation)
+        except ValueError as e:
+            raise GraphQLError(str(e))
+        return paginate(queryset, info, RegionConnection, first, after)
+
+    def resolve_regions_in_bbox(self, info, min_latitude, min_longitude, max_latitude, max_longitude,
+                                region_type=None, first=None, after=None):
+        try:
+            queryset = regions_in_bbox(
+                min_latitude, min_longitude, max_latitude, max_longitude, region_type=region_type
+            )
+        except ValueError as e:
+            raise GraphQLError(str(e))
+        return paginate(queryset, info, RegionConnection, first, after)
+
+    def resolve_search_regions(self, info, query, region_type=None, limit=None):
+        try:
+            results = search_regions(query, region_type=region_type, limit=limit)
+        except ValueError as e:
+            raise GraphQLError(str(e))
+        regions = get_loaders(info).region.load_many([region['region_id'] for region, _ in results])
+        return [
+            RegionSearchResultType(region=region, score=score)
+            for region, (_, score) in zip(regions, results)
+        ]
+
+    def resolve_nearest_regions(self, info, latitude, longitude, k=5, region_type=None):
+        try:
+            nearest = nearest_regions(latitude, longitude, k=k, region_type=region_type)
+        except ValueError as e:
+            raise GraphQLError(str(e))
+        get_loaders(info).queue_rows([region for region, _ in nearest])
+        return [
+            NearestRegionType(region=region, distance_km=distance)
+            for region, distance in nearest
+        ]
 
     # Total Population resolvers
-    def resolve_total_populations(self, info, region_type=None, year=None):
+    def resolve_total_populations(self, info, region_type=None, year=None, first=None, after=None):
         queryset = TotalPopulation.objects.all()
         if region_type:
-            queryset = queryset.filter(region__type__iexact=region_type)
+            queryset = queryset.filter(region__region_type=normalize_region_type(region_type))
         if year:
             queryset = queryset.filter(year=year)
-        return queryset
+        return paginate(queryset, info, TotalPopulationConnection, first, after)
 
     def resolve_total_population(self, info, region_id):
-        return TotalPopulation.objects.get(region__entity_id=region_id)
+        return project(TotalPopulation.objects.all(), info).filter(region_id=region_id).latest("year")
 
     # Age Distribution resolvers
-    def resolve_age_distributions(self, info, region_type=None, year=None):
+    def resolve_age_distributions(self, info, region_type=None, year=None, first=None, after=None):
         queryset = AgeDistribution.objects.all()
         if region_type:
-            queryset = queryset.filter(region__type__iexact=region_type)
+            queryset = queryset.filter(region__region_type=normalize_region_type(region_type))
         if year:
             queryset = queryset.filter(year=year)
-        return queryset
+        return paginate(queryset, info, AgeDistributionConnection, first, after)
 
     def resolve_age_distribution(self, info, region_id):
-        return AgeDistribution.objects.get(region__entity_id=region_id)
+        return project(AgeDistribution.objects.all(), info).filter(region_id=region_id).latest("year")
 
     # Ethnicity Distribution resolvers
-    def resolve_ethnicity_distributions(self, info, region_type=None, year=None):
+    def resolve_ethnicity_distributions(self, info, region_type=None, year=None, first=None, after=None):
         queryset = EthnicityDistribution.objects.all()
         if region_type:
-            queryset = queryset.filter(region__type__iexact=region_type)
+            queryset = queryset.filter(region__region_type=normalize_region_type(region_type))
         if year:
             queryset = queryset.filter(year=year)
-        return queryset
+        return paginate(queryset, info, EthnicityDistributionConnection, first, after)
 
     def resolve_ethnicity_distribution(self, info, region_id):
-        return EthnicityDistribution.objects.get(region__entity_id=region_id)
+        return project(EthnicityDistribution.objects.all(), info).filter(region_id=region_id).latest("year")
 
     # Gender Distribution resolvers
-    def resolve_gender_distributions(self, info, region_type=None, year=None):
+    def resolve_gender_distributions(self, info, region_type=None, year=None, first=None, after=None):
         queryset = GenderDistribution.objects.all()
         if region_type:
-            queryset = queryset.filter(region__type__iexact=region_type)
+            queryset = queryset.filter(region__region_type=normalize_region_type(region_type))
         if year:
             queryset = queryset.filter(year=year)
-        return queryset
+        return paginate(queryset, info, GenderDistributionConnection, first, after)
 
     def resolve_gender_distribution(self, info, region_id):
-        return GenderDistribution.objects.get(region__entity_id=region_id)
+        return project(GenderDistribution.objects.all(), info).filter(region_id=region_id).latest("year")
 
     # Marital Status resolvers
-    def resolve_marital_statuses(self, info, region_type=None, year=None):
+    def resolve_marital_statuses(self, info, region_type=None, year=None, first=None, after=None):
         queryset = MaritalStatus.objects.all()
         if region_type:
-            queryset = queryset.filter(region__type__iexact=region_type)
+            queryset = queryset.filter(region__region_type=normalize_region_type(region_type))
         if year:
             queryset = queryset.filter(year=year)
-        return queryset
+        return paginate(queryset, info, MaritalStatusConnection, first, after)
 
     def resolve_marital_status(self, info, region_id):
-        return MaritalStatus.objects.get(region__entity_id=region_id)
+        return project(MaritalStatus.objects.all(), info).filter(region_id=region_id).latest("year")
 
     # Religious Affiliation resolvers
-    def resolve_religious_affiliations(self, info, region_type=None, year=None):
+    def resolve_religious_affiliations(self, info, region_type=None, year=None, first=None, after=None):
         queryset = ReligiousAffiliation.objects.all()
         if region_type:
-            queryset = queryset.filter(region__type__iexact=region_type)
+            queryset = queryset.filter(region__region_type=normalize_region_type(region_type))
         if year:
             queryset = queryset.filter(year=year)
-        return queryset
+        return paginate(queryset, info, ReligiousAffiliationConnection, first, after)
 
     def resolve_religious_affiliation(self, info, region_id):
-        return ReligiousAffiliation.objects.get(region__entity_id=region_id)
+        return project(ReligiousAffiliation.objects.all(), info).filter(region_id=region_id).latest("year")
+
+    # Hierarchy aggregation resolvers
+    def resolve_aggregates(self, info, statistic, parent_ids, level, year=None):
+        try:
+            model = get_statistic_model(statistic)
+        except ValueError as e:
+            raise GraphQLError(str(e))
+        return [
+            AggregateType(
+                region_id=row.pop('region_id'),
+                region_count=row.pop('region_count'),
+                values=row,
+            )
+            for row in aggregate_statistic(model, parent_ids, level, year)
+        ]
+
+    def resolve_indicator_ranking(self, info, indicator, region_type=None, year=None,
+                                  ascending=False, limit=None):
+        try:
+            rows = list(rank_regions(
+                indicator, region_type=region_type, year=year, descending=not ascending, limit=limit
+            ))
+        except ValueError as e:
+            raise GraphQLError(str(e))
+        get_loaders(info).queue_rows([row.region for row in rows])
+        return [
+            IndicatorRankType(rank=rank, region=row.region, year=row.year, value=row.value)
+            for rank, row in enumerate(rows, start=1)
+        ]
+
+    def resolve_ranking(self, info, statistic, column, region_type=None, year=None, ascending=False,
+                        limit=None, min_percentile=None, max_percentile=None):
+        try:
+            rows = top_regions(
+                statistic, column, region_type=region_type, year=year, limit=limit, ascending=ascending,
+                min_percentile=min_percentile, max_percentile=max_percentile,
+            )
+        except ValueError as e:
+            raise GraphQLError(str(e))
+        regions = get_loaders(info).region.load_many([row['region_id'] for row in rows])
+        return [
+            RankedRegionType(
+                rank=row['rank'], percentile=row['percentile'], value=row['value'], year=row['year'],
+                region=region,
+            )
+            for row, region in zip(rows, regions)
+        ]
+
+    def resolve_quantiles(self, info, statistic, column, region_type=None, year=None, bins=None):
+        try:
+            return [
+                QuantileBinType(**row)
+                for row in quantile_bins(statistic, column, region_type=region_type, year=year, bins=bins)
+            ]
+        except ValueError as e:
+            raise GraphQLError(str(e))
+
+    def resolve_statistic_diff(self, info, statistic, year_from, year_to, region_type=None, columns=None):
+        try:
+            columns = get_diff_columns(get_statistic_model(statistic), columns)
+            rows = list(diff_statistic(statistic, year_from, year_to, region_type=region_type, columns=columns))
+        except ValueError as e:
+            raise GraphQLError(str(e))
+        regions = get_loaders(info).region.load_many([row['region_id'] for row in rows])
+        return [
+            StatisticDiffType(
+                region=region,
+                year_from=row['year_from'],
+                year_to=row['year_to'],
+                changes=[
+                    ColumnChangeType(
+                        column=column,
+                        from_value=row[f'{column}_from'],
+                        to_value=row[f'{column}_to'],
+                        change=row[f'{column}_change'],
+                        change_pct=row[f'{column}_change_pct'],
+                    )
+                    for column in columns
+                ],
+            )
+            for row, region in zip(rows, regions)
+        ]
@@ -1,4 +1,8 @@
+import graphene
+from graphene.types.generic import GenericScalar
 from graphene_django import DjangoObjectType
+from mylocalstats.population_stats.graphql.loaders import get_loaders
+from mylocalstats.population_stats.graphql.pagination import CountableConnection
 from mylocalstats.population_stats.models import (
     Region,
     TotalPopulation,
@@ -9,37 +13,176 @@ from mylocalstats.population_stats.models import (
     ReligiousAffiliation
 )
 
+
+def _statistic_resolver(name):
+    def resolve(root, info):
+        return get_loaders(info).statistics[name].load(root.region_id)
+    return resolve
+
+
+def _region_resolver(root, info):
+    return get_loaders(info).region.load(root.region_id)
+
+
 class RegionType(DjangoObjectType):
+    parent = graphene.Field(lambda: RegionType)
+    children = graphene.List(lambda: RegionType)
+    # Latest census year of each statistic.
+    totalpopulation = graphene.Field(lambda: TotalPopulationType)
+    agedistribution = graphene.Field(lambda: AgeDistributionType)
+    ethnicitydistribution = graphene.Field(lambda: EthnicityDistributionType)
+    genderdistribution = graphene.Field(lambda: GenderDistributionType)
+    maritalstatus = graphene.Field(lambda: MaritalStatusType)
+    religiousaffiliation = graphene.Field(lambda: ReligiousAffiliationType)
+
     class Meta:
         model = Region
         fields = "__all__"
+        # Keep regionType a plain string rather than an enum of RegionType values.
+        convert_choices_to_enum = False
+
+    def resolve_parent(self, info):
+        return get_loaders(info).region.load(self.parent_region_id)
+
+    def resolve_children(self, info):
+        return get_loaders(info).children.load(self.region_id)
+
+    resolve_totalpopulation = _statistic_resolver("totalpopulation")
+    resolve_agedistribution = _statistic_resolver("agedistribution")
+    resolve_ethnicitydistribution = _statistic_resolver("ethnicitydistribution")
+    resolve_genderdistribution = _statistic_resolver("genderdistribution")
+    resolve_maritalstatus = _statistic_resolver("maritalstatus")
+    resolve_religiousaffiliation = _statistic_resolver("religiousaffiliation")
 
 class TotalPopulationType(DjangoObjectType):
+    resolve_region = _region_resolver
+
     class Meta:
         model = TotalPopulation
         fields = "__all__"
 
 class AgeDistributionType(DjangoObjectType):
+    resolve_region = _region_resolver
+
     class Meta:
         model = AgeDistribution
         fields = "__all__"
 
 class EthnicityDistributionType(DjangoObjectType):
+    resolve_region = _region_resolver
+
     class Meta:
         model = EthnicityDistribution
         fields = "__all__"
 
 class GenderDistributionType(DjangoObjectType):
+    resolve_region = _region_resolver
+
     class Meta:
         model = GenderDistribution
         fields = "__all__"
 
 class MaritalStatusType(DjangoObjectType):
+    resolve_region = _region_resolver
+
     class Meta:
         model = MaritalStatus
         fields = "__all__"
 
 class ReligiousAffiliationType(DjangoObjectType):
+    resolve_region = _region_resolver
+
     class Meta:
         model = ReligiousAffiliation
         fields = "__all__"
+
+
+class RegionConnection(CountableConnection):
+    class Meta:
+        node = RegionType
+
+class TotalPopulationConnection(CountableConnection):
+    class Meta:
+        node = TotalPopulationType
+
+class AgeDistributionConnection(CountableConnection):
+    class Meta:
+        node = AgeDistributionType
+
+class EthnicityDistributionConnection(CountableConnection):
+    class Meta:
+        node = EthnicityDistributionType
+
+class GenderDistributionConnection(CountableConnection):
+    class Meta:
+        node = GenderDistributionType
+
+class MaritalStatusConnection(CountableConnection):
+    class Meta:
+        node = MaritalStatusType
+
+class ReligiousAffiliationConnection(CountableConnection):
+    class Meta:
+        node = ReligiousAffiliationType
+
+
+class AggregateType(graphene.ObjectType):
+    """Statistic totals over the descendants of one parent region."""
+    region_id = graphene.String(required=True)
+    region_count = graphene.Int(required=True)
+    values = GenericScalar(description="Column name to summed value")
+
+
+class NearestRegionType(graphene.ObjectType):
+    """A region and the distance from the query point to its centroid."""
+    region = graphene.Field(RegionType, required=True)
+    distance_km = graphene.Float(required=True)
+
+
+class RegionSearchResultType(graphene.ObjectType):
+    """A region matched by name search and its trigram similarity."""
+    region = graphene.Field(RegionType, required=True)
+    score = graphene.Float(required=True)
+
+
+class IndicatorRankType(graphene.ObjectType):
+    """A region's value of a derived indicator and its rank among the matches."""
+    rank = graphene.Int(required=True)
+    region = graphene.Field(RegionType, required=True)
+    year = graphene.Int(required=True)
+    value = graphene.Float(required=True)
+
+
+class RankedRegionType(graphene.ObjectType):
+    """A region's value of a ranked column with its rank and percentile."""
+    rank = graphene.Int(required=True)
+    percentile = graphene.Float(required=True, description="0 for the lowest value, 100 for the highest")
+    value = graphene.Float(required=True)
+    year = graphene.Int(required=True)
+    region = graphene.Field(RegionType, required=True)
+
+
+class QuantileBinType(graphene.ObjectType):
+    """One NTILE bin of ranked regions, bin 1 holding the lowest values."""
+    bin = graphene.Int(required=True)
+    count = graphene.Int(required=True)
+    min_value = graphene.Float(required=True)
+    max_value = graphene.Float(required=True)
+    region_ids = graphene.List(graphene.NonNull(graphene.String), required=True)
+
+
+class ColumnChangeType(graphene.ObjectType):
+    """Change of one statistic column between two census years."""
+    column = graphene.String(required=True)
+    from_value = graphene.Float()
+    to_value = graphene.Float()
+    change = graphene.Float()
+    change_pct = graphene.Float(description="Null when the earlier value is 0")
+
+
+class StatisticDiffType(graphene.ObjectType):
+    """A region's statistic columns compared between two census years."""
+    region = graphene.Field(RegionType, required=True)
+    year_from = graphene.Int(required=True)
+    year_to = graphene.Int(required=True)
+    changes = graphene.List(graphene.NonNull(ColumnChangeType), required=True)
@@ -0,0 +1,193 @@
+"""Query cost analysis for the population_stats GraphQL schema.
+
+Every operation is walked once against the schema to compute its nesting
+depth and an estimate of how many objects it can return. List fields multiply
+the row count of their parent by an estimated size and each list is capped at
+``GRAPHQL_MAX_LIST_ROWS``, the size of the largest table. Connection fields
+size their ``edges`` by the page requested: a literal ``first``, the maximum
+page size when ``first`` is a variable, or the default page size. Operations
+that exceed ``GRAPHQL_MAX_QUERY_DEPTH`` or ``GRAPHQL_MAX_ESTIMATED_ROWS`` are
+rejected during validation, before any SQL runs.
+"""
+from dataclasses import dataclass
+
+from django.conf import settings
+from graphql import GraphQLError, get_named_type, get_nullable_type, is_list_type
+from graphql.language import (
+    FieldNode,
+    FragmentSpreadNode,
+    InlineFragmentNode,
+    IntValueNode,
+    OperationDefinitionNode,
+)
+from graphql.validation import ValidationRule, specified_rules
+from mylocalstats.population_stats.graphql.pagination import get_page_size_limits
+from mylocalstats.population_stats.indicators import MAX_RANK_LIMIT
+from mylocalstats.population_stats.ranking import MAX_BINS, MAX_LIMIT as MAX_RANKING_RESULTS
+from mylocalstats.population_stats.search import MAX_LIMIT as MAX_SEARCH_RESULTS
+from mylocalstats.population_stats.spatial import MAX_NEAREST
+
+DEFAULT_MAX_QUERY_DEPTH = 10
+DEFAULT_MAX_ESTIMATED_ROWS = 200000
+# Roughly the number of GNDs, the largest region level.
+DEFAULT_MAX_LIST_ROWS = 15000
+# Expected items per parent for nested list fields; other lists default to
+# the full table (``GRAPHQL_MAX_LIST_ROWS``).
+DEFAULT_LIST_SIZE_ESTIMATES = {
+    "children": 50,
+    "indicatorRanking": MAX_RANK_LIMIT,
+    "ranking": MAX_RANKING_RESULTS,
+    "quantiles": MAX_BINS,
+    "nearestRegions": MAX_NEAREST,
+    "searchRegions": MAX_SEARCH_RESULTS,
+}
+
+
+@dataclass
+class QueryCost:
+    """Result of analyzing one operation."""
+    depth: int = 0
+    estimated_rows: int = 0
+
+
+class QueryCostAnalyzer:
+    """Compute depth and estimated row count of GraphQL operations.
+
+    Args:
+        schema: The ``GraphQLSchema`` the documents are validated against.
+        fragments: Mapping of fragment name to ``FragmentDefinitionNode``.
+        list_size_estimates: Per-field override of the items a list returns
+            for one parent object.
+        max_list_rows: Upper bound on the total size of any one list field.
+    """
+
+    def __init__(self, schema, fragments, list_size_estimates=None, max_list_rows=None):
+        self.schema = schema
+        self.fragments = fragments
+        self.list_size_estimates = {**DEFAULT_LIST_SIZE_ESTIMATES, **(list_size_estimates or {})}
+        self.max_list_rows = max_list_rows or DEFAULT_MAX_LIST_ROWS
+
+    def analyze(self, operation):
+        root_type = self.schema.get_root_type(operation.operation)
+        cost = QueryCost()
+        if root_type is not None:
+            self._visit(operation.selection_set, root_type, 1, 0, cost, frozenset())
+        return cost
+
+    def list_size(self, field_node, parent_rows):
+        per_parent = self.list_size_estimates.get(field_node.name.value, self.max_list_rows)
+        return min(parent_rows * per_parent, self.max_list_rows)
+
+    def page_size(self, field_node, parent_rows):
+        default_size, max_size = get_page_size_limits()
+        per_parent = default_size
+        for argument in field_node.arguments or ():
+            if argument.name.value == "first":
+                if isinstance(argument.value, IntValueNode):
+                    per_parent = min(int(argument.value.value), max_size)
+                else:
+                    per_parent = max_size
+        return min(parent_rows * per_parent, self.max_list_rows)
+
+    def _visit(self, selection_set, parent_type, parent_rows, depth, cost, seen_fragments,
+               page_rows=None):
+        if selection_set is None:
+            return
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                self._visit_field(
+                    selection, parent_type, parent_rows, depth, cost, seen_fragments, page_rows
+                )
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = parent_type
+                if selection.type_condition is not None:
+                    fragment_type = self.schema.get_type(selection.type_condition.name.value)
+                self._visit(
+                    selection.selection_set, fragment_type, parent_rows, depth, cost,
+                    seen_fragments, page_rows
+                )
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is None or name in seen_fragments:
+                    continue
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value)
+                self._visit(
+                    fragment.selection_set, fragment_type, parent_rows, depth, cost,
+                    seen_fragments | {name}, page_rows
+                )
+
+    def _visit_field(self, node, parent_type, parent_rows, depth, cost, seen_fragments,
+                     page_rows):
+        name = node.name.value
+        fields = getattr(parent_type, "fields", None)
+        if name.startswith("__") or not fields or name not in fields:
+            return
+        field = fields[name]
+        field_type = get_nullable_type(field.type)
+        child_page_rows = None
+        if is_list_type(field_type):
+            rows = page_rows if page_rows is not None else self.list_size(node, parent_rows)
+        elif node.selection_set is not None:
+            rows = parent_rows
+            if "first" in field.args:
+                child_page_rows = self.page_size(node, parent_rows)
+        else:
+            return
+        cost.estimated_rows += rows
+        cost.depth = max(cost.depth, depth + 1)
+        self._visit(
+            node.selection_set, get_named_type(field_type), rows, depth + 1, cost, seen_fragments,
+            child_page_rows
+        )
+
+
+def query_cost_validator(max_depth=None, max_estimated_rows=None, list_size_estimates=None,
+                         max_list_rows=None):
+    """Build a validation rule enforcing depth and estimated-row limits.
+
+    Limits left as ``None`` are read from Django settings.
+    """
+    if max_depth is None:
+        max_depth = getattr(settings, "GRAPHQL_MAX_QUERY_DEPTH", DEFAULT_MAX_QUERY_DEPTH)
+    if max_estimated_rows is None:
+        max_estimated_rows = getattr(settings, "GRAPHQL_MAX_ESTIMATED_ROWS", DEFAULT_MAX_ESTIMATED_ROWS)
+    if list_size_estimates is None:
+        list_size_estimates = getattr(settings, "GRAPHQL_LIST_SIZE_ESTIMATES", None)
+    if max_list_rows is None:
+        max_list_rows = getattr(settings, "GRAPHQL_MAX_LIST_ROWS", None)
+
+    class QueryCostValidator(ValidationRule):
+        def enter_document(self, document, *_args):
+            fragments = {
+                definition.name.value: definition
+                for definition in document.definitions
+                if not isinstance(definition, OperationDefinitionNode)
+            }
+            analyzer = QueryCostAnalyzer(
+                self.context.schema, fragments, list_size_estimates, max_list_rows
+            )
+            for definition in document.definitions:
+                if not isinstance(definition, OperationDefinitionNode):
+                    continue
+                cost = analyzer.analyze(definition)
+                name = definition.name.value if definition.name else "anonymous"
+                if cost.depth > max_depth:
+                    self.report_error(GraphQLError(
+                        f"Operation '{name}' has depth {cost.depth}, "
+                        f"exceeding the maximum of {max_depth}.",
+                        definition,
+                    ))
+                if cost.estimated_rows > max_estimated_rows:
+                    self.report_error(GraphQLError(
+                        f"Operation '{name}' may return {cost.estimated_rows} rows, "
+                        f"exceeding the maximum of {max_estimated_rows}.",
+                        definition,
+                    ))
+
+    return QueryCostValidator
+
+
+def get_validation_rules():
+    """Return the full rule set used by the GraphQL endpoint."""
+    return [*specified_rules, query_cost_validator()]
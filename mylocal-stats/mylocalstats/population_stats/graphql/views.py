@@ -0,0 +1,89 @@
+import json
+
+from django.conf import settings
+from django.http import HttpResponseBadRequest
+from graphene_django.views import GraphQLView, HttpError
+from graphql import ExecutionResult, GraphQLError, execute
+from mylocalstats.population_stats.graphql.persisted import build_registry
+from mylocalstats.population_stats.graphql.validation import get_validation_rules
+
+# Registries are built once per schema and shared by every request.
+_registries = {}
+
+
+def get_persisted_queries(schema, validation_rules):
+    if schema not in _registries:
+        _registries[schema] = build_registry(schema, validation_rules)
+    return _registries[schema]
+
+
+class PopulationStatsGraphQLView(GraphQLView):
+    """GraphQL endpoint with query cost limits and persisted queries.
+
+    Ad-hoc queries are validated with the standard rules plus the depth and
+    estimated-row limits from ``validation.py``. Requests carrying a persisted
+    query hash are executed from the pre-validated document without parsing or
+    validating again. With ``persisted_queries_only`` (or the
+    ``GRAPHQL_PERSISTED_QUERIES_ONLY`` setting) ad-hoc queries are refused.
+    """
+
+    persisted_queries = None
+    persisted_queries_only = None
+    # The schema has no mutations, so POSTed queries may read from replicas.
+    replica_reads = True
+
+    def __init__(self, persisted_queries=None, persisted_queries_only=None, **kwargs):
+        super().__init__(**kwargs)
+        if self.validation_rules is None:
+            self.validation_rules = get_validation_rules()
+        # An empty registry is falsy but still replaces the default one.
+        if persisted_queries is not None:
+            self.persisted_queries = persisted_queries
+        if self.persisted_queries is None:
+            self.persisted_queries = get_persisted_queries(
+                self.schema.graphql_schema, self.validation_rules
+            )
+        if persisted_queries_only is None:
+            persisted_queries_only = getattr(settings, "GRAPHQL_PERSISTED_QUERIES_ONLY", False)
+        self.persisted_queries_only = persisted_queries_only
+
+    @staticmethod
+    def get_persisted_query_hash(request, data):
+        extensions = request.GET.get("extensions") or data.get("extensions")
+        if not extensions:
+            return None
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+        persisted_query = extensions.get("persistedQuery") or {}
+        return persisted_query.get("sha256Hash")
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        query_hash = self.get_persisted_query_hash(request, data)
+        if query_hash:
+            document = self.persisted_queries.get(query_hash)
+            if document is None:
+                return ExecutionResult(errors=[GraphQLError("PersistedQueryNotFound")])
+            try:
+                return execute(
+                    self.schema.graphql_schema,
+                    document,
+                    root_value=self.get_root_value(request),
+                    context_value=self.get_context(request),
+                    variable_values=variables,
+                    operation_name=operation_name,
+                    middleware=self.get_middleware(request),
+                )
+            except Exception as e:
+                return ExecutionResult(errors=[e])
+
+        if query and self.persisted_queries_only:
+            raise HttpError(HttpResponseBadRequest("Only persisted queries are accepted."))
+
+        return super().execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
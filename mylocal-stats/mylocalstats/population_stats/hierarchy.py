@@ -0,0 +1,140 @@
+"""Region hierarchy helpers.
+
+The region TSVs describe the hierarchy twice: ``parent_region_id`` (when
+present) and the ``*_id`` columns that ``insert_region_data`` collects into
+``other_ids`` (``{"province": "LK-1", "district": "LK-11", ...}``). The
+latter also links regions across hierarchies, e.g. a GND to its ED and MOH.
+``RegionClosure`` materializes the transitive closure of both so that "all
+descendants of X" is a single indexed join instead of a recursive walk.
+"""
+import json
+from collections import defaultdict, deque
+
+from django.db import transaction
+from mylocalstats.population_stats.models import Region, RegionClosure
+
+
+def as_json(value):
+    """Return a JSONField value, decoding rows stored as JSON strings."""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+    return value
+
+
+def get_direct_ancestor_ids(parent_region_id, other_ids):
+    """Return the ids a region links to directly as its ancestors."""
+    ancestor_ids = set()
+    if parent_region_id:
+        ancestor_ids.add(parent_region_id)
+    other_ids = as_json(other_ids)
+    if isinstance(other_ids, dict):
+        ancestor_ids.update(str(value) for value in other_ids.values() if value)
+    return ancestor_ids
+
+
+def compute_closure(links, descendant_ids=None):
+    """Compute ``{(ancestor, descendant): depth}`` for a link graph.
+
+    Args:
+        links: Mapping of region id to the ids of its direct ancestors. Ids
+            that are not keys of ``links`` (unknown regions) are ignored.
+        descendant_ids: Only compute the ancestors of these regions
+            (default: every region in ``links``).
+
+    Returns:
+        dict: Shortest link distance for every ancestor/descendant pair,
+        including each region paired with itself at depth 0.
+    """
+    closure = {}
+    for region_id in (links if descendant_ids is None else descendant_ids):
+        if region_id not in links:
+            continue
+        depths = {region_id: 0}
+        queue = deque([region_id])
+        while queue:
+            current = queue.popleft()
+            for ancestor_id in links[current]:
+                if ancestor_id in links and ancestor_id not in depths:
+                    depths[ancestor_id] = depths[current] + 1
+                    queue.append(ancestor_id)
+        for ancestor_id, depth in depths.items():
+            closure[(ancestor_id, region_id)] = depth
+    return closure
+
+
+def expand_descendants(links, region_ids):
+    """Return ``region_ids`` plus every region that links to them, transitively.
+
+    These are the regions whose ancestor sets change when ``region_ids`` are
+    inserted or re-linked, including regions imported earlier that already
+    referenced an id which did not exist yet.
+    """
+    children = defaultdict(set)
+    for region_id, ancestor_ids in links.items():
+        for ancestor_id in ancestor_ids:
+            children[ancestor_id].add(region_id)
+    affected = set(region_ids)
+    queue = deque(affected)
+    while queue:
+        for child_id in children[queue.popleft()]:
+            if child_id not in affected:
+                affected.add(child_id)
+                queue.append(child_id)
+    return affected
+
+
+def load_links(queryset=None):
+    """Read the direct ancestor links of every region from the database."""
+    queryset = queryset if queryset is not None else Region.objects.all()
+    return {
+        region_id: get_direct_ancestor_ids(parent_region_id, other_ids)
+        for region_id, parent_region_id, other_ids in queryset.values_list(
+            "region_id", "parent_region_id", "other_ids"
+        ).iterator()
+    }
+
+
+def rebuild_region_closure(batch_size=5000):
+    """Recompute the whole ``RegionClosure`` table.
+
+    Returns:
+        int: Number of closure rows written.
+    """
+    closure = compute_closure(load_links())
+    rows = [
+        RegionClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+        for (ancestor_id, descendant_id), depth in closure.items()
+    ]
+    with transaction.atomic():
+        RegionClosure.objects.all().delete()
+        RegionClosure.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def update_region_closure(region_ids, batch_size=5000):
+    """Refresh the closure rows affected by inserting or updating regions.
+
+    Only the ancestor rows of ``region_ids`` and of their descendants are
+    replaced, so importing one level does not rewrite the whole table.
+
+    Returns:
+        int: Number of closure rows written.
+    """
+    links = load_links()
+    affected = expand_descendants(links, region_ids)
+    closure = compute_closure(links, affected)
+    rows = [
+        RegionClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+        for (ancestor_id, descendant_id), depth in closure.items()
+    ]
+    affected = list(affected)
+    with transaction.atomic():
+        for start in range(0, len(affected), batch_size):
+            RegionClosure.objects.filter(
+                descendant_id__in=affected[start:start + batch_size]
+            ).delete()
+        RegionClosure.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
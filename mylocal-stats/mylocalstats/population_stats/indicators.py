@@ -0,0 +1,213 @@
+"""Derived indicators: ratios, shares and densities per region.
+
+Clients used to compute sex ratios, dependency ratios and percentage shares
+from the raw statistic tables on every page load. ``rebuild_region_indicators``
+computes them once, after imports, for every region at a time: each statistic
+table is read into NumPy column arrays and every indicator is one vectorized
+expression over those arrays. The results go into ``RegionIndicator``, whose
+``(indicator, region_type, year, value)`` index serves rankings such as "top 10
+DSDs by dependency ratio" without any per-request arithmetic.
+
+Indicators whose denominator is zero or missing are not stored.
+"""
+import numpy as np
+from django.db import transaction
+from mylocalstats.population_stats.aggregation import get_numeric_columns, latest_year
+from mylocalstats.population_stats.models import (
+    TotalPopulation,
+    AgeDistribution,
+    EthnicityDistribution,
+    GenderDistribution,
+    ReligiousAffiliation,
+    RegionIndicator,
+    normalize_region_type,
+)
+
+DEFAULT_RANK_LIMIT = 10
+MAX_RANK_LIMIT = 1000
+
+# The census publishes ten-year age bands, so the dependency ratios use
+# 0-19 / 20-59 / 60+ rather than the usual 0-14 / 15-64 / 65+.
+YOUNG_COLUMNS = ['less_than_10', 'age_10_to_19']
+WORKING_AGE_COLUMNS = ['age_20_to_29', 'age_30_to_39', 'age_40_to_49', 'age_50_to_59']
+OLD_COLUMNS = ['age_60_to_69', 'age_70_to_79', 'age_80_to_89', 'age_90_and_above']
+
+
+def ratio(numerator, denominator, scale=100.0):
+    """Elementwise ``scale * numerator / denominator``, NaN where the denominator is not positive."""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    result = np.full(numerator.shape, np.nan)
+    np.divide(numerator * scale, denominator, out=result, where=denominator > 0)
+    return result
+
+
+def _total(columns, names):
+    return sum(columns[name] for name in names)
+
+
+def _shares(model, prefix):
+    return {
+        f'{prefix}_{column}': (lambda c, column=column: ratio(c[column], c['total_population']))
+        for column in get_numeric_columns(model)
+        if column != 'total_population'
+    }
+
+
+class IndicatorSource:
+    """Indicators computed from one statistic table.
+
+    Args:
+        model: Statistic model the indicators are derived from.
+        indicators (dict): Indicator name to a function of the column arrays
+            (a dict of column name to ``numpy.ndarray``).
+        region_columns (list, optional): ``Region`` columns to load as well.
+    """
+
+    def __init__(self, model, indicators, region_columns=()):
+        self.model = model
+        self.indicators = indicators
+        self.region_columns = list(region_columns)
+
+    def load(self):
+        """Return ``(region_ids, region_types, years, columns)`` for every row of the table."""
+        columns = get_numeric_columns(self.model) + [f'region__{column}' for column in self.region_columns]
+        rows = list(
+            self.model.objects.values_list('region_id', 'region__region_type', 'year', *columns)
+            .order_by('region_id')
+        )
+        arrays = {}
+        for position, column in enumerate(columns, start=3):
+            values = [row[position] for row in rows]
+            arrays[column.replace('region__', '', 1)] = np.array(
+                [np.nan if value is None else float(value) for value in values], dtype=float
+            )
+        return (
+            [row[0] for row in rows],
+            [row[1] for row in rows],
+            [row[2] for row in rows],
+            arrays,
+        )
+
+    def compute(self):
+        """Yield ``(region_id, region_type, year, indicator, value)`` for every finite value."""
+        region_ids, region_types, years, columns = self.load()
+        if not region_ids:
+            return
+        for name, function in self.indicators.items():
+            values = function(columns)
+            for position in np.flatnonzero(np.isfinite(values)):
+                yield (
+                    region_ids[position], region_types[position], years[position],
+                    name, float(values[position]),
+                )
+
+
+# Keyed by the public statistic names of ``aggregation.STATISTIC_MODELS``.
+INDICATOR_SOURCES = {
+    'population': IndicatorSource(
+        TotalPopulation,
+        {'population_density': lambda c: ratio(c['total_population'], c['area_sq_km'], scale=1.0)},
+        region_columns=['area_sq_km'],
+    ),
+    'gender-distribution': IndicatorSource(
+        GenderDistribution,
+        # Males per 100 females.
+        {'sex_ratio': lambda c: ratio(c['male'], c['female'])},
+    ),
+    'age-distribution': IndicatorSource(
+        AgeDistribution,
+        {
+            'dependency_ratio': lambda c: ratio(
+                _total(c, YOUNG_COLUMNS) + _total(c, OLD_COLUMNS), _total(c, WORKING_AGE_COLUMNS)
+            ),
+            'youth_dependency_ratio': lambda c: ratio(
+                _total(c, YOUNG_COLUMNS), _total(c, WORKING_AGE_COLUMNS)
+            ),
+            'old_age_dependency_ratio': lambda c: ratio(
+                _total(c, OLD_COLUMNS), _total(c, WORKING_AGE_COLUMNS)
+            ),
+        },
+    ),
+    'ethnicity-distribution': IndicatorSource(
+        EthnicityDistribution, _shares(EthnicityDistribution, 'ethnicity_share')
+    ),
+    'religious-affiliation': IndicatorSource(
+        ReligiousAffiliation, _shares(ReligiousAffiliation, 'religion_share')
+    ),
+}
+
+INDICATORS = {
+    name: statistic
+    for statistic, source in INDICATOR_SOURCES.items()
+    for name in source.indicators
+}
+
+
+def validate_indicator(indicator):
+    """Raise ``ValueError`` unless ``indicator`` is a known indicator name."""
+    if indicator not in INDICATORS:
+        raise ValueError(
+            f"Unknown indicator: {indicator}. Expected one of: {', '.join(INDICATORS)}"
+        )
+    return indicator
+
+
+def rebuild_region_indicators(statistics=None, batch_size=5000):
+    """Recompute the indicators derived from ``statistics`` (default all).
+
+    Args:
+        statistics (list, optional): Public statistic names, e.g.
+            ``['gender-distribution']``. Statistics without indicators are
+            ignored.
+
+    Returns:
+        int: Number of indicator rows written.
+    """
+    if statistics is None:
+        statistics = list(INDICATOR_SOURCES)
+    sources = [INDICATOR_SOURCES[statistic] for statistic in statistics if statistic in INDICATOR_SOURCES]
+    rows = [
+        RegionIndicator(
+            region_id=region_id, region_type=region_type, year=year, indicator=indicator, value=value
+        )
+        for source in sources
+        for region_id, region_type, year, indicator, value in source.compute()
+    ]
+    with transaction.atomic():
+        RegionIndicator.objects.filter(
+            indicator__in=[name for source in sources for name in source.indicators]
+        ).delete()
+        RegionIndicator.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def rank_regions(indicator, region_type=None, year=None, descending=True, limit=None):
+    """Return the regions with the highest (or lowest) value of an indicator.
+
+    Without ``year``, each region is ranked by its latest year's value.
+
+    Returns:
+        QuerySet: ``RegionIndicator`` rows with their region, best first.
+
+    Raises:
+        ValueError: If the indicator is unknown or ``limit`` is out of range.
+    """
+    validate_indicator(indicator)
+    limit = DEFAULT_RANK_LIMIT if limit is None else int(limit)
+    if not 1 <= limit <= MAX_RANK_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_RANK_LIMIT}")
+    queryset = RegionIndicator.objects.filter(indicator=indicator)
+    if region_type:
+        queryset = queryset.filter(region_type=normalize_region_type(region_type))
+    queryset = queryset.filter(year=year) if year else latest_year(queryset, 'indicator')
+    order = ('-value', 'region_id') if descending else ('value', 'region_id')
+    return queryset.select_related('region').order_by(*order)[:limit]
+
+
+def get_region_indicators(region_id, year=None):
+    """Return ``{indicator: value}`` for one region, from the latest year unless ``year`` is given."""
+    queryset = RegionIndicator.objects.filter(region_id=region_id)
+    if year:
+        queryset = queryset.filter(year=year)
+    return dict(queryset.order_by('indicator', 'year').values_list('indicator', 'value'))
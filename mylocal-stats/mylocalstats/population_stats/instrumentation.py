@@ -0,0 +1,304 @@
+"""Per-endpoint latency, SQL and payload metrics in Prometheus format.
+
+With ``METRICS_ENABLED``, ``MetricsMiddleware`` records for every request:
+
+* ``http_request_duration_seconds`` - latency histogram,
+* ``http_request_db_queries`` and ``http_request_db_duration_seconds`` -
+  SQL statements issued and time spent in them, over all database aliases,
+* ``http_response_size_bytes`` - body size as sent (after compression),
+* ``http_responses_total`` - responses by status and cache status
+  (``snapshot``, ``not_modified`` or ``miss``),
+
+labelled with the matched URL route (``api/v1/regions/type/<str:region_type>/``),
+so label values stay bounded. ``GraphQLMetricsMiddleware`` times each
+top-level GraphQL field. ``metrics_view`` serves everything at ``/metrics``,
+together with the connection reuse counters from ``database.py``; with
+``METRICS_LOG_REQUESTS`` each request is also logged as one JSON line to the
+``mylocalstats.requests`` logger.
+
+When ``METRICS_ENABLED`` is off the HTTP middleware removes itself at
+startup (``MiddlewareNotUsed``), the GraphQL middleware is not installed
+and ``/metrics`` returns 404, so there is no per-request cost.
+"""
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse
+from django.urls import Resolver404, resolve
+from mylocalstats.population_stats.database import connection_metrics
+
+request_logger = logging.getLogger('mylocalstats.requests')
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+UNMATCHED = '<unmatched>'
+
+
+def metrics_enabled():
+    return getattr(settings, 'METRICS_ENABLED', False)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def collect(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {_format_number(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            counts, total = self._values.get(label_values, (None, 0.0))
+            if counts is None:
+                counts = [0] * (len(self.buckets) + 1)
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[label_values] = (counts, total + value)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def collect(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for label_values, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += count
+                    labels = _format_labels(self.labels, label_values, [('le', _format_number(bound))])
+                    lines.append(f'{self.name}_bucket{labels} {cumulative}')
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f'{self.name}_sum{labels} {_format_number(total)}')
+                lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Request latency by endpoint.', ('endpoint', 'method'),
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', 'SQL statements per request.', ('endpoint',), QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    'http_request_db_duration_seconds', 'Time spent in SQL per request.', ('endpoint',),
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Response body size as sent.', ('endpoint',), SIZE_BUCKETS,
+)
+RESPONSES = Counter(
+    'http_responses_total', 'Responses by status and cache status.', ('endpoint', 'status', 'cache'),
+)
+GRAPHQL_FIELD_DURATION = Histogram(
+    'graphql_field_duration_seconds', 'Resolution time of top-level GraphQL fields.', ('field',),
+)
+
+METRICS = [REQUEST_DURATION, REQUEST_QUERIES, REQUEST_DB_DURATION, RESPONSE_SIZE, RESPONSES, GRAPHQL_FIELD_DURATION]
+
+
+def reset_metrics():
+    for metric in METRICS:
+        metric.reset()
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.collect())
+    reuse = connection_metrics()
+    lines.extend([
+        '# HELP db_connection_reuse_total Requests that found an open database connection (hit) or not (miss).',
+        '# TYPE db_connection_reuse_total counter',
+        f'db_connection_reuse_total{{result="hit"}} {reuse["hits"]}',
+        f'db_connection_reuse_total{{result="miss"}} {reuse["misses"]}',
+        '# HELP db_connections_opened_total Database connections opened.',
+        '# TYPE db_connections_opened_total counter',
+        f'db_connections_opened_total {reuse["opened"]}',
+    ])
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; 404 unless ``METRICS_ENABLED``."""
+    if not metrics_enabled():
+        raise Http404("Metrics are disabled")
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class _QueryTimer:
+    """``execute_wrapper`` counting statements and their duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+def _time_queries(timer):
+    """Install ``timer`` on every database connection of the current thread.
+
+    Returns:
+        ExitStack: Close it to remove the wrappers again.
+    """
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(timer))
+    return stack
+
+
+def _endpoint(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        # Answered before URL resolution, e.g. by the snapshot middleware.
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return UNMATCHED
+    return match.route or UNMATCHED
+
+
+def _cache_status(response):
+    if response.status_code == 304:
+        return 'not_modified'
+    if getattr(response, 'from_snapshot', False):
+        return 'snapshot'
+    return 'miss'
+
+
+def _response_size(response):
+    if not response.streaming:
+        return len(response.content)
+    length = response.get('Content-Length')
+    return int(length) if length else None
+
+
+class MetricsMiddleware:
+    """Record latency, SQL and payload metrics per endpoint; see module docs."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = _QueryTimer()
+        started = time.perf_counter()
+        with _time_queries(timer):
+            response = self.get_response(request)
+        return self.record(request, response, time.perf_counter() - started, timer)
+
+    async def __acall__(self, request):
+        timer = _QueryTimer()
+        started = time.perf_counter()
+        # Connections are per thread: the ORM runs in the thread of the
+        # request's thread-sensitive sync_to_async calls, so the wrappers
+        # are installed (and removed) there.
+        stack = await sync_to_async(_time_queries)(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.record(request, response, time.perf_counter() - started, timer)
+
+    def record(self, request, response, duration, timer):
+        endpoint = _endpoint(request)
+        size = _response_size(response)
+        cache = _cache_status(response)
+        REQUEST_DURATION.observe(duration, endpoint, request.method)
+        REQUEST_QUERIES.observe(timer.count, endpoint)
+        REQUEST_DB_DURATION.observe(timer.duration, endpoint)
+        if size is not None:
+            RESPONSE_SIZE.observe(size, endpoint)
+        RESPONSES.inc(endpoint, str(response.status_code), cache)
+
+        if getattr(settings, 'METRICS_LOG_REQUESTS', False):
+            request_logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'endpoint': endpoint,
+                'status': response.status_code,
+                'duration_ms': round(duration * 1000, 3),
+                'db_queries': timer.count,
+                'db_ms': round(timer.duration * 1000, 3),
+                'size_bytes': size,
+                'cache': cache,
+            }))
+        return response
+
+
+class GraphQLMetricsMiddleware:
+    """Graphene middleware timing top-level fields; nested fields pass straight through."""
+
+    def resolve(self, next, root, info, **args):
+        if root is not None:
+            return next(root, info, **args)
+        started = time.perf_counter()
+        try:
+            return next(root, info, **args)
+        finally:
+            GRAPHQL_FIELD_DURATION.observe(time.perf_counter() - started, info.field_name)
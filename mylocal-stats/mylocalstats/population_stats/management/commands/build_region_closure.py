@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from mylocalstats.population_stats.hierarchy import rebuild_region_closure
+from mylocalstats.population_stats.versioning import bump_data_version
+
+
+class Command(BaseCommand):
+    """Rebuild the region ancestor/descendant closure table.
+
+    The closure table backs hierarchy aggregation (summing GND statistics up
+    to DSDs, districts, EDs, ...). Run it after importing region data.
+
+    Examples:
+        Rebuild the closure table:
+            >>> python manage.py build_region_closure
+    """
+
+    help = "Rebuild the region ancestor/descendant closure table"
+
+    def handle(self, *args, **options):
+        try:
+            row_count = rebuild_region_closure()
+            # Aggregated responses are read through the closure table.
+            bump_data_version()
+            self.stdout.write(
+                self.style.SUCCESS(f"Region closure rebuilt with {row_count} rows")
+            )
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"An error occurred: {str(e)}"))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from mylocalstats.population_stats.indicators import INDICATOR_SOURCES, rebuild_region_indicators
+from mylocalstats.population_stats.ranking import invalidate_rankings
+from mylocalstats.population_stats.versioning import bump_data_version
+
+
+class Command(BaseCommand):
+    """Recompute the derived indicators table (ratios, shares, densities).
+
+    The insert_* commands update the indicators of the statistic they import;
+    run this after bulk loads that skipped it or after editing data by hand.
+
+    Examples:
+        Rebuild every indicator:
+            >>> python manage.py build_region_indicators
+
+        Rebuild only the indicators derived from the age distribution:
+            >>> python manage.py build_region_indicators --statistic age-distribution
+    """
+
+    help = "Recompute the derived region indicators table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--statistic",
+            action="append",
+            choices=list(INDICATOR_SOURCES),
+            help="Only rebuild indicators derived from this statistic (repeatable)"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            row_count = rebuild_region_indicators(options["statistic"])
+            invalidate_rankings()
+            bump_data_version()
+            self.stdout.write(
+                self.style.SUCCESS(f"Region indicators rebuilt with {row_count} rows")
+            )
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"An error occurred: {str(e)}"))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from mylocalstats.population_stats.relations import update_region_relations
+from mylocalstats.population_stats.versioning import bump_data_version
+
+
+class Command(BaseCommand):
+    """Rebuild the region relation table from the Region JSON fields.
+
+    ``insert_region_data`` keeps the table in sync for the regions it imports.
+    Run this once for databases imported before the table existed.
+
+    Examples:
+        Rebuild the relation table:
+            >>> python manage.py build_region_relations
+    """
+
+    help = "Rebuild the region relation table (subs/supers/eqs/ints)"
+
+    def handle(self, *args, **options):
+        try:
+            row_count = update_region_relations()
+            # Related-region responses are read from the relation table.
+            bump_data_version()
+            self.stdout.write(
+                self.style.SUCCESS(f"Region relations rebuilt with {row_count} rows")
+            )
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"An error occurred: {str(e)}"))
@@ -2,7 +2,10 @@ import sys
 import pandas as pd
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from mylocalstats.population_stats.models import Region, AgeDistribution
+from mylocalstats.population_stats.indicators import rebuild_region_indicators
+from mylocalstats.population_stats.models import Region, AgeDistribution, RegionType, normalize_region_type
+from mylocalstats.population_stats.ranking import invalidate_rankings
+from mylocalstats.population_stats.versioning import bump_data_version
 from tqdm import tqdm
 
 class Command(BaseCommand):
@@ -43,11 +46,16 @@ class Command(BaseCommand):
         )
         parser.add_argument(
             "--region_type",
-            type=str,
-            choices=["pd", "district", "province", "gnd", "lg", "country", "moh", "ed", "dsd"],
+            type=normalize_region_type,
+            choices=RegionType.values,
             required=True,
             help="Type of regions to process (e.g., 'state', 'county')"
         )
+        parser.add_argument(
+            "--skip-indicators",
+            action="store_true",
+            help="Do not update the derived indicators table after the import"
+        )
 
     def handle(self, *args, **options):
         file_path = options["file_path"]
@@ -72,14 +80,11 @@ class Command(BaseCommand):
             if missing_columns:
                 raise KeyError(f"Missing columns: {', '.join(missing_columns)}")
 
-            # Get existing region IDs for the specified region type
-            existing_region_ids = set(
-                Region.objects.filter(type=region_type)
-                .values_list('entity_id', flat=True)
-            )
+            # Get existing regions for the specified region type, keyed by region_id
+            existing_regions = Region.objects.filter(region_type=region_type).in_bulk()
             
             self.stdout.write(
-                f"Found {len(existing_region_ids)} existing {region_type} regions in database"
+                f"Found {len(existing_regions)} existing {region_type} regions in database"
             )
             self.stdout.write(f"Starting import for {total_rows} age distribution records for year {year}...")
 
@@ -96,13 +101,12 @@ class Command(BaseCommand):
                     total_population = row["total_population"]
                     
                     # Skip if region doesn't exist
-                    if entity_id not in existing_region_ids:
+                    if entity_id not in existing_regions:
                         skipped_count += 1
                         continue
 
                     try:
-                        # Get the region
-                        region = Region.objects.get(entity_id=entity_id)
+                        region = existing_regions[entity_id]
 
                         # Convert age group values to integers and validate
                         age_groups = {}
@@ -160,6 +164,14 @@ class Command(BaseCommand):
                 )
             )
 
+            if not options["skip_indicators"]:
+                indicator_count = rebuild_region_indicators(["age-distribution"])
+                self.stdout.write(
+                    self.style.SUCCESS(f"Region indicators updated with {indicator_count} rows")
+                )
+            invalidate_rankings()
+            bump_data_version()
+
         except FileNotFoundError:
             self.stdout.write(self.style.ERROR(f"File not found: {file_path}"))
         except pd.errors.EmptyDataError:
@@ -1,6 +1,9 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from mylocalstats.population_stats.models import Region, EthnicityDistribution
+from mylocalstats.population_stats.indicators import rebuild_region_indicators
+from mylocalstats.population_stats.models import Region, EthnicityDistribution, RegionType, normalize_region_type
+from mylocalstats.population_stats.ranking import invalidate_rankings
+from mylocalstats.population_stats.versioning import bump_data_version
 import csv
 from tqdm import tqdm
 import sys
@@ -32,11 +35,16 @@ class Command(BaseCommand):
         )
         parser.add_argument(
             '--region-type',
-            type=str,
-            choices=['pd', 'district', 'province', 'gnd', 'lg', 'country', 'moh', 'ed', 'dsd', 'ec'],
+            type=normalize_region_type,
+            choices=RegionType.values,
             required=True,
             help='Type of region (e.g., MOH, EC)'
         )
+        parser.add_argument(
+            "--skip-indicators",
+            action="store_true",
+            help="Do not update the derived indicators table after the import"
+        )
 
     def validate_numeric(self, value, field_name, entity_id):
         """Validate and convert numeric values"""
@@ -81,18 +89,14 @@ class Command(BaseCommand):
     def handle(self, *args, **kwargs):
         file_path = kwargs['file_path']
         year = kwargs['year']
-        region_type = kwargs['region_type'].lower()  # Convert to lowercase for consistency
+        region_type = normalize_region_type(kwargs['region_type'])
         success_count = 0
         error_count = 0
         skipped_count = 0
         
         try:
-            # First, get all existing region IDs for the specified type
-            existing_regions = set(
-                Region.objects.filter(
-                    type=region_type
-                ).values_list('entity_id', flat=True)
-            )
+            # First, get all existing regions for the specified type, keyed by region_id
+            existing_regions = Region.objects.filter(region_type=region_type).in_bulk()
             
             if not existing_regions:
                 self.stdout.write(
@@ -139,7 +143,7 @@ class Command(BaseCommand):
                                 error_count += 1
                                 continue
                             
-                            region = Region.objects.get(entity_id=entity_id)
+                            region = existing_regions[entity_id]
                             
                             # Create or update ethnicity distribution
                             ethnicity_dist, created = EthnicityDistribution.objects.update_or_create(
@@ -193,6 +197,14 @@ class Command(BaseCommand):
                     f"Processed {success_count} out of {total_rows} records."
                 )
             )
+
+            if not kwargs["skip_indicators"]:
+                indicator_count = rebuild_region_indicators(["ethnicity-distribution"])
+                self.stdout.write(
+                    self.style.SUCCESS(f"Region indicators updated with {indicator_count} rows")
+                )
+            invalidate_rankings()
+            bump_data_version()
                     
         except FileNotFoundError:
             self.stdout.write(self.style.ERROR(f"File not found: {file_path}"))
@@ -1,7 +1,10 @@
 import sys
 import pandas as pd
 from django.core.management.base import BaseCommand
-from mylocalstats.population_stats.models import Region, GenderDistribution
+from mylocalstats.population_stats.indicators import rebuild_region_indicators
+from mylocalstats.population_stats.models import Region, GenderDistribution, RegionType, normalize_region_type
+from mylocalstats.population_stats.ranking import invalidate_rankings
+from mylocalstats.population_stats.versioning import bump_data_version
 from tqdm import tqdm
 
 
@@ -39,8 +42,8 @@ class Command(BaseCommand):
         parser.add_argument("region_file", type=str, help="Path to the TSV file containing region entities")
         parser.add_argument(
             "--type",
-            type=str,
-            choices=["pd", "district", "province", "gnd", "lg", "country", "moh", "ed", "dsd"],
+            type=normalize_region_type,
+            choices=RegionType.values,
             required=True,
             help="Type of regions to process"
         )
@@ -50,6 +53,11 @@ class Command(BaseCommand):
             default=2012,
             help="Year of the data (default: 2012)"
         )
+        parser.add_argument(
+            "--skip-indicators",
+            action="store_true",
+            help="Do not update the derived indicators table after the import"
+        )
 
     def handle(self, *args, **options):
         file_path = options["file_path"]
@@ -76,11 +84,17 @@ class Command(BaseCommand):
             print(merged_df.head())
             
             self.stdout.write(f"Found {len(merged_df)} matching records to process...")
+
+            # Get existing regions of the specified type, keyed by region_id
+            existing_regions = Region.objects.filter(region_type=region_type).in_bulk()
             
             success_count = 0
             for _, row in tqdm(merged_df.iterrows(), total=len(merged_df)):
                 try:
-                    region = Region.objects.get(entity_id=row['entity_id'], type=region_type)
+                    region = existing_regions.get(row['entity_id'])
+                    if region is None:
+                        self.stdout.write(f'\rSkipping {row["entity_id"]}: Region not found')
+                        continue
                     
                     print_region(region=region)
                     
@@ -107,9 +121,6 @@ class Command(BaseCommand):
                     if created:
                         success_count += 1
                     
-                except Region.DoesNotExist:
-                    self.stdout.write(f'\rSkipping {row["entity_id"]}: Region not found')
-                    continue
                 except Exception as e:
                     self.stdout.write(f'\rError processing {row["entity_id"]}: {str(e)}')
                     continue
@@ -119,6 +130,14 @@ class Command(BaseCommand):
                     f"Successfully processed {success_count} new records out of {len(merged_df)} total records"
                 )
             )
+
+            if not options["skip_indicators"]:
+                indicator_count = rebuild_region_indicators(["gender-distribution"])
+                self.stdout.write(
+                    self.style.SUCCESS(f"Region indicators updated with {indicator_count} rows")
+                )
+            invalidate_rankings()
+            bump_data_version()
             
         except FileNotFoundError as e:
             self.stdout.write(self.style.ERROR(f"File not found: {str(e)}"))
@@ -127,5 +146,5 @@ class Command(BaseCommand):
 
 
 def print_region(region: Region):
-    print(f"\rCurrently evaluating region: {region.entity_id} - {region.name}\n", end='', flush=True)
+    print(f"\rCurrently evaluating region: {region.region_id} - {region.name}\n", end='', flush=True)
     sys.stdout.flush()
\ No newline at end of file
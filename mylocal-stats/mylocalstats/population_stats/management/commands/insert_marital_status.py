@@ -1,7 +1,9 @@
 import pandas as pd
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from mylocalstats.population_stats.models import Region, MaritalStatus
+from mylocalstats.population_stats.models import Region, MaritalStatus, RegionType, normalize_region_type
+from mylocalstats.population_stats.ranking import invalidate_rankings
+from mylocalstats.population_stats.versioning import bump_data_version
 from tqdm import tqdm
 
 class Command(BaseCommand):
@@ -17,9 +19,9 @@ class Command(BaseCommand):
         parser.add_argument('--year', type=int, default=2012)
         parser.add_argument(
             '--region_type',
-            type=str,
+            type=normalize_region_type,
             required=True,
-            choices=['province', 'district', 'dsd', 'gnd', 'ed', 'lg', 'pd', 'moh', 'country']
+            choices=RegionType.values
         )
 
     def handle(self, *args, **options):
@@ -40,9 +42,7 @@ class Command(BaseCommand):
             self.stdout.write(f"Found {len(merged_df)} matching records in files")
             
             # Get existing regions of the specified type
-            existing_regions = {
-                r.entity_id: r for r in Region.objects.filter(type=options['region_type'])
-            }
+            existing_regions = Region.objects.filter(region_type=options['region_type']).in_bulk()
             
             self.stdout.write(f"Found {len(existing_regions)} existing regions in database")
             
@@ -88,6 +88,8 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS(
                 f"\nSuccessfully imported marital status data for {processed} regions"
             ))
+            invalidate_rankings()
+            bump_data_version()
 
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"Error: {str(e)}"))
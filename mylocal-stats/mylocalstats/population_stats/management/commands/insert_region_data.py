@@ -3,7 +3,14 @@ import json
 import pandas as pd
 import ast  # For safely evaluating string representations of arrays
 from django.core.management.base import BaseCommand
-from mylocalstats.population_stats.models import Region
+from mylocalstats.population_stats.hierarchy import update_region_closure
+from mylocalstats.population_stats.indicators import rebuild_region_indicators
+from mylocalstats.population_stats.models import Region, RegionAlternateName, RegionType, normalize_region_type
+from mylocalstats.population_stats.ranking import invalidate_rankings
+from mylocalstats.population_stats.search import reset_region_name_index
+from mylocalstats.population_stats.versioning import bump_data_version
+from mylocalstats.population_stats.relations import parse_id_list, update_region_relations
+from mylocalstats.population_stats.spatial import encode_geohash
 from tqdm import tqdm
 
 
@@ -12,12 +19,21 @@ class Command(BaseCommand):
 
     This command processes a TSV (Tab-Separated Values) file containing region data 
     and inserts it into the Region model. The TSV should have columns for region 
-    ID and name. Region type is provided via command line argument.
+    ID and name. Region type is provided via command line argument. After the
+    import, the region relation table (subs/supers/eqs/ints) is refreshed for
+    the imported regions, and the region closure table for the imported regions
+    and their descendants.
+    The values of any ``name_*`` columns (``name_si``, ``name_ta``, ...) become
+    the region's alternate names, matched by name search.
 
     Examples:
         Insert province data:
             >>> python manage.py insert_region_data /path/to/regions.tsv --type province
 
+        Import without touching the closure table (rebuild it once at the end
+        with build_region_closure):
+            >>> python manage.py insert_region_data /path/to/gnds.tsv --type GND --skip-closure
+
     TSV Format Expected:
         region_id    name    region_type  parent_region_id  code    latitude    longitude   centroid_altitude   population  area_sq_km   subs    supers  eqs     ints    other_ids   etc...
         EC-01       Name1   Province     null              CODE1   6.927079    79.861243   45.5                1000000     234.5       []      []      []      []      {}          ...
@@ -25,6 +41,7 @@ class Command(BaseCommand):
     Args:
         file_path (str): Path to the TSV file containing the region data
         --type (str): Type of regions being inserted (province/district/city)
+        --skip-closure: Do not update the region closure table
 
     Returns:
         None. Prints success message with number of records inserted.
@@ -40,11 +57,21 @@ class Command(BaseCommand):
         parser.add_argument("file_path", type=str, help="Path to the TSV file")
         parser.add_argument(
             "--type",
-            type=str,
-            choices=["PD", "District", "Province", "GND", "LG", "Country", "MOH", "ED", "DSD"],
+            type=normalize_region_type,
+            choices=RegionType.values,
             required=True,
             help="Type of regions being inserted"
         )
+        parser.add_argument(
+            "--skip-closure",
+            action="store_true",
+            help="Do not update the region closure table after the import"
+        )
+        parser.add_argument(
+            "--skip-indicators",
+            action="store_true",
+            help="Do not update the derived indicators table after the import"
+        )
 
     def collect_other_ids(self, row):
         """Collect all columns ending with '_id' into a dictionary, excluding region_id and parent_region_id"""
@@ -60,6 +87,15 @@ class Command(BaseCommand):
         
         return other_ids
 
+    def collect_alternate_names(self, row):
+        """Collect the distinct values of the 'name_*' columns (name_si, name_ta, ...)"""
+        names = [
+            str(row[column]).strip()
+            for column in row.index
+            if column.startswith('name_') and pd.notna(row[column])
+        ]
+        return [name for name in dict.fromkeys(names) if name]
+
     def extract_coordinates(self, centroid_str):
         """Extract latitude and longitude from centroid string"""
         if pd.isna(centroid_str):
@@ -84,7 +120,7 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         file_path = options["file_path"]
-        region_type = options["type"]
+        region_type = normalize_region_type(options["type"])
 
         try:
             # Use sep='\t' for TSV files
@@ -97,6 +133,7 @@ class Command(BaseCommand):
             processed_count = 0
             updated_count = 0
             created_count = 0
+            imported_ids = []
 
             # Create progress bar for regions
             for index, row in tqdm(data.iterrows(), total=total_rows, desc=f"Importing {region_type}s"):
@@ -115,11 +152,11 @@ class Command(BaseCommand):
                     # Collect all *_id fields into other_ids
                     other_ids = self.collect_other_ids(row)
                     
-                    # Convert JSON strings to proper format if they exist
-                    subs = json.dumps(row.get("subs", [])) if pd.notna(row.get("subs")) else None
-                    supers = json.dumps(row.get("supers", [])) if pd.notna(row.get("supers")) else None
-                    eqs = json.dumps(row.get("eqs", [])) if pd.notna(row.get("eqs")) else None
-                    ints = json.dumps(row.get("ints", [])) if pd.notna(row.get("ints")) else None
+                    # Parse the list literals into JSON arrays so they can be indexed
+                    subs = parse_id_list(row.get("subs")) if pd.notna(row.get("subs")) else None
+                    supers = parse_id_list(row.get("supers")) if pd.notna(row.get("supers")) else None
+                    eqs = parse_id_list(row.get("eqs")) if pd.notna(row.get("eqs")) else None
+                    ints = parse_id_list(row.get("ints")) if pd.notna(row.get("ints")) else None
                     other_ids_json = json.dumps(other_ids) if other_ids else None
 
                     # Create or update region
@@ -134,6 +171,7 @@ class Command(BaseCommand):
                             "fips": row.get("fips") if pd.notna(row.get("fips")) else None,
                             "latitude": latitude,
                             "longitude": longitude,
+                            "geohash": encode_geohash(latitude, longitude),
                             "centroid_altitude": row.get("centroid_altitude") if pd.notna(row.get("centroid_altitude")) else None,
                             "population": row.get("population") if pd.notna(row.get("population")) else None,
                             "area_sq_km": row.get("area") if pd.notna(row.get("area")) else None,
@@ -145,6 +183,14 @@ class Command(BaseCommand):
                         }
                     )
 
+                    alternate_names = self.collect_alternate_names(row)
+                    RegionAlternateName.objects.filter(region=obj).exclude(name__in=alternate_names).delete()
+                    RegionAlternateName.objects.bulk_create(
+                        [RegionAlternateName(region=obj, name=name) for name in alternate_names],
+                        ignore_conflicts=True,
+                    )
+
+                    imported_ids.append(region_id)
                     processed_count += 1
                     if created:
                         created_count += 1
@@ -168,6 +214,30 @@ class Command(BaseCommand):
                 )
             )
 
+            if imported_ids:
+                relation_count = update_region_relations(imported_ids)
+                self.stdout.write(
+                    self.style.SUCCESS(f"Region relations updated with {relation_count} rows")
+                )
+
+            if imported_ids and not options["skip_closure"]:
+                closure_count = update_region_closure(imported_ids)
+                self.stdout.write(
+                    self.style.SUCCESS(f"Region closure updated with {closure_count} rows")
+                )
+
+            # Densities depend on the region areas just imported.
+            if imported_ids and not options["skip_indicators"]:
+                indicator_count = rebuild_region_indicators(["population"])
+                self.stdout.write(
+                    self.style.SUCCESS(f"Region indicators updated with {indicator_count} rows")
+                )
+
+            if imported_ids:
+                invalidate_rankings()
+                bump_data_version()
+                reset_region_name_index()
+
         except FileNotFoundError:
             self.stdout.write(self.style.ERROR(f"File not found: {file_path}"))
         except pd.errors.EmptyDataError:
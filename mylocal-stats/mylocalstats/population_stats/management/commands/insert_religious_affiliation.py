@@ -1,7 +1,10 @@
 import pandas as pd
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from mylocalstats.population_stats.models import Region, ReligiousAffiliation
+from mylocalstats.population_stats.indicators import rebuild_region_indicators
+from mylocalstats.population_stats.models import Region, ReligiousAffiliation, RegionType, normalize_region_type
+from mylocalstats.population_stats.ranking import invalidate_rankings
+from mylocalstats.population_stats.versioning import bump_data_version
 from tqdm import tqdm
 
 
@@ -35,9 +38,14 @@ class Command(BaseCommand):
         parser.add_argument('--year', type=int, default=2012)
         parser.add_argument(
             '--region_type',
-            type=str,
+            type=normalize_region_type,
             required=True,
-            choices=['province', 'district', 'dsd', 'gnd', 'ed', 'lg', 'pd', 'moh', 'country']
+            choices=RegionType.values
+        )
+        parser.add_argument(
+            "--skip-indicators",
+            action="store_true",
+            help="Do not update the derived indicators table after the import"
         )
 
     def handle(self, *args, **kwargs):
@@ -75,9 +83,7 @@ class Command(BaseCommand):
             self.stdout.write(f"Found {len(merged_df)} matching records in files")
             
             # Get existing regions of the specified type
-            existing_regions = {
-                r.entity_id: r for r in Region.objects.filter(type=kwargs['region_type'].lower())
-            }
+            existing_regions = Region.objects.filter(region_type=kwargs['region_type']).in_bulk()
             
             self.stdout.write(f"Found {len(existing_regions)} existing regions in database")
             
@@ -87,7 +93,7 @@ class Command(BaseCommand):
             with transaction.atomic():
                 # Delete existing records for the specified region type
                 ReligiousAffiliation.objects.filter(
-                    region__type__iexact=kwargs['region_type'],
+                    region__region_type=kwargs['region_type'],
                     year=kwargs['year']
                 ).delete()
                 
@@ -131,6 +137,14 @@ class Command(BaseCommand):
                 )
             )
 
+            if not kwargs["skip_indicators"]:
+                indicator_count = rebuild_region_indicators(["religious-affiliation"])
+                self.stdout.write(
+                    self.style.SUCCESS(f"Region indicators updated with {indicator_count} rows")
+                )
+            invalidate_rankings()
+            bump_data_version()
+
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f"Error: {str(e)}")
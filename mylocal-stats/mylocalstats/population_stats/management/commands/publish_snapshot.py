@@ -0,0 +1,80 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from mylocalstats.population_stats.models import Region
+from mylocalstats.population_stats.snapshots import (
+    SnapshotWriter,
+    brotli,
+    get_snapshot_dir,
+    render_path,
+    snapshot_paths,
+)
+
+
+class Command(BaseCommand):
+    """Render the REST list and detail endpoints to static, compressed files.
+
+    Every ``*/type/<region_type>/`` and ``*/id/<region_id>/`` response is
+    rendered through its view and written to the snapshot directory with
+    gzip (and brotli, if installed) variants, keyed by content hash. When
+    ``SNAPSHOT_DIR`` is set, ``SnapshotMiddleware`` serves these files instead
+    of running the views. Run it after every import: the manifest records
+    the data version, and a snapshot older than the data is not served.
+
+    Examples:
+        Publish to SNAPSHOT_DIR:
+            >>> python manage.py publish_snapshot
+
+        Publish elsewhere and delete objects of older snapshots:
+            >>> python manage.py publish_snapshot --output /srv/snapshots --prune
+    """
+
+    help = "Render REST responses to compressed static files served by SnapshotMiddleware"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="Snapshot directory (default: the SNAPSHOT_DIR setting)"
+        )
+        parser.add_argument(
+            "--no-brotli",
+            action="store_true",
+            help="Only write gzip variants"
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Delete objects not referenced by the new snapshot"
+        )
+
+    def handle(self, *args, **options):
+        directory = options["output"] or get_snapshot_dir()
+        if directory is None:
+            raise CommandError("Set SNAPSHOT_DIR or pass --output")
+        if brotli is None and not options["no_brotli"]:
+            self.stdout.write(self.style.WARNING("brotli is not installed; writing gzip only"))
+
+        writer = SnapshotWriter(directory, use_brotli=not options["no_brotli"])
+        region_types = Region.objects.order_by().values_list("region_type", flat=True).distinct()
+        region_ids = Region.objects.order_by("region_id").values_list("region_id", flat=True)
+        skipped = {}
+        for path in snapshot_paths(sorted(region_types), list(region_ids)):
+            try:
+                status_code, body = render_path(path)
+            except Exception as e:
+                status_code, body = type(e).__name__, None
+            if status_code == 200:
+                writer.add(path, body)
+            else:
+                skipped[status_code] = skipped.get(status_code, 0) + 1
+
+        writer.publish()
+        self.stdout.write(self.style.SUCCESS(
+            f"Published {len(writer.entries)} responses to {directory}"
+        ))
+        if skipped:
+            summary = ", ".join(f"{count} x {status}" for status, count in sorted(skipped.items(), key=str))
+            self.stdout.write(self.style.WARNING(f"Skipped responses that were not 200 OK: {summary}"))
+        if options["prune"]:
+            self.stdout.write(f"Pruned {writer.prune()} unreferenced objects")
@@ -0,0 +1,250 @@
+"""HTTP middleware for the read API: compression and conditional GET.
+
+``CompressionMiddleware`` compresses JSON (and other text) responses with
+brotli, when installed and accepted, or gzip. Bodies below
+``COMPRESSION_MIN_SIZE`` bytes are sent as they are, since compressing them
+costs more than it saves.
+
+``ConditionalDataMiddleware`` gives GET/HEAD responses under
+``CONDITIONAL_GET_PATHS`` (the REST API and GraphQL GET queries) a strong
+ETag built from the data version (see ``versioning.py``) and the request.
+Because the ETag does not depend on the body, a matching ``If-None-Match``
+is answered with 304 before the view runs.
+
+Place ``CompressionMiddleware`` above ``ConditionalDataMiddleware`` so the
+ETag of a compressed response gets the encoding suffix (``"7-ab12-gzip"``)
+that keeps it strong.
+
+Both work under WSGI and ASGI: like Django's own middleware they run as
+coroutines when the rest of the chain is asynchronous, so async views are not
+switched to a thread for every request.
+"""
+import gzip
+import hashlib
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from mylocalstats.population_stats.versioning import get_data_version
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_GZIP_LEVEL = 6
+# Brotli's higher levels are too slow for per-request compression.
+DEFAULT_BROTLI_QUALITY = 5
+DEFAULT_CONDITIONAL_GET_PATHS = ('/api/', '/graphql/')
+
+COMPRESSIBLE_TYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'application/graphql-response+json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+}
+ENCODING_SUFFIXES = ('-br', '-gzip')
+
+
+def accepted_encodings(request):
+    """Content codings the client accepts (``q=0`` excluded), lowercased."""
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = part.partition(';')
+        name, _, quality = params.partition('=')
+        try:
+            if name.strip() == 'q' and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _is_compressible(response):
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    return content_type.startswith('text/') or content_type in COMPRESSIBLE_TYPES
+
+
+class _StreamCompressor:
+    """Incremental brotli or gzip compressor for streamed responses."""
+
+    def __init__(self, encoding, quality, level):
+        self.encoding = encoding
+        if encoding == 'br':
+            self.compressor = brotli.Compressor(quality=quality)
+        else:
+            # wbits 16 + 15 writes a gzip header and trailer.
+            self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, data):
+        # Flush per item so streamed rows reach the client promptly.
+        if self.encoding == 'br':
+            return self.compressor.process(data) + self.compressor.flush()
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.finish() if self.encoding == 'br' else self.compressor.flush()
+
+
+def _compress_sequence(sequence, compressor):
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def _compress_async_sequence(sequence, compressor):
+    async for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def _suffix_etag(response, encoding):
+    etag = response.get('ETag')
+    if etag and not etag.startswith('W/') and etag.endswith('"'):
+        response['ETag'] = f'{etag[:-1]}-{encoding}"'
+
+
+class CompressionMiddleware:
+    """Compress text and JSON responses with brotli or gzip."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if response.status_code != 200 or response.has_header('Content-Encoding'):
+            return response
+        if not _is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        accepted = accepted_encodings(request)
+        if brotli is not None and 'br' in accepted:
+            encoding = 'br'
+        elif 'gzip' in accepted:
+            encoding = 'gzip'
+        else:
+            return response
+        quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', DEFAULT_BROTLI_QUALITY)
+        level = getattr(settings, 'COMPRESSION_GZIP_LEVEL', DEFAULT_GZIP_LEVEL)
+
+        if response.streaming:
+            compressor = _StreamCompressor(encoding, quality, level)
+            if response.is_async:
+                response.streaming_content = _compress_async_sequence(response.streaming_content, compressor)
+            else:
+                response.streaming_content = _compress_sequence(response.streaming_content, compressor)
+            del response['Content-Length']
+        else:
+            if len(response.content) < getattr(settings, 'COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE):
+                return response
+            if encoding == 'br':
+                compressed = brotli.compress(response.content, quality=quality)
+            else:
+                compressed = gzip.compress(response.content, compresslevel=level, mtime=0)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        response['Content-Encoding'] = encoding
+        _suffix_etag(response, encoding)
+        return response
+
+
+def data_etag(request):
+    """Strong ETag of ``request``'s response at the current data version."""
+    digest = hashlib.sha1(
+        f"{request.get_full_path()}\n{request.META.get('HTTP_ACCEPT', '')}".encode()
+    ).hexdigest()[:20]
+    return f'"{get_data_version()}-{digest}"'
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of ``If-None-Match`` with ``etag``, ignoring encoding suffixes."""
+    if not if_none_match:
+        return False
+    tags = parse_etags(if_none_match)
+    if '*' in tags:
+        return True
+    for tag in tags:
+        tag = tag[2:] if tag.startswith('W/') else tag
+        for suffix in ENCODING_SUFFIXES:
+            if tag.endswith(f'{suffix}"'):
+                tag = f'{tag[:-len(suffix) - 1]}"'
+                break
+        if tag == etag:
+            return True
+    return False
+
+
+class ConditionalDataMiddleware:
+    """Data-version ETags and early 304 responses for read requests."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def applies(self, request):
+        paths = getattr(settings, 'CONDITIONAL_GET_PATHS', DEFAULT_CONDITIONAL_GET_PATHS)
+        return request.method in ('GET', 'HEAD') and request.path.startswith(tuple(paths))
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.applies(request):
+            return self.get_response(request)
+        etag = data_etag(request)
+        if etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+            return self.not_modified(etag)
+        return self.tag(self.get_response(request), etag)
+
+    async def __acall__(self, request):
+        if not self.applies(request):
+            return await self.get_response(request)
+        # The data version may have to be read from the database.
+        etag = await sync_to_async(data_etag)(request)
+        if etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+            return self.not_modified(etag)
+        return self.tag(await self.get_response(request), etag)
+
+    def not_modified(self, etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+        return response
+
+    def tag(self, response, etag):
+        if response.status_code == 200 and not response.has_header('ETag'):
+            response['ETag'] = etag
+            # Cacheable, but revalidated on every use.
+            patch_cache_control(response, no_cache=True)
+            patch_vary_headers(response, ('Accept',))
+        return response
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-19 05:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("population_stats", "0004_region_fips_region_hasc"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RegionClosure",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("depth", models.PositiveIntegerField()),
+                (
+                    "ancestor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="descendant_links",
+                        to="population_stats.region",
+                    ),
+                ),
+                (
+                    "descendant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ancestor_links",
+                        to="population_stats.region",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "region_closure",
+            },
+        ),
+    ]
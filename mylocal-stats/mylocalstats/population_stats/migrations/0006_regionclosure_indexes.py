@@ -0,0 +1,52 @@
+# Generated by Django 4.2.30 on 2026-10-19 06:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("population_stats", "0005_regionclosure"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="regionclosure",
+            name="ancestor",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="descendant_links",
+                to="population_stats.region",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="regionclosure",
+            name="descendant",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="ancestor_links",
+                to="population_stats.region",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="regionclosure",
+            index=models.Index(
+                fields=["ancestor", "depth", "descendant"], name="region_closure_anc_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="regionclosure",
+            index=models.Index(
+                fields=["descendant", "depth", "ancestor"], name="region_closure_desc_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="regionclosure",
+            constraint=models.UniqueConstraint(
+                fields=("ancestor", "descendant"), name="region_closure_unique_pair"
+            ),
+        ),
+    ]
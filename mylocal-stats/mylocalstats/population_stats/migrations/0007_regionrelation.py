@@ -0,0 +1,83 @@
+# Generated by Django 4.2.30 on 2026-10-19 06:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+JSON_RELATION_COLUMNS = ("subs", "supers", "eqs", "ints")
+
+
+def create_json_gin_indexes(apps, schema_editor):
+    # GIN indexes only exist on PostgreSQL; other backends keep plain JSON.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for column in JSON_RELATION_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS regions_{column}_gin "
+            f"ON regions USING gin ({column} jsonb_path_ops)"
+        )
+
+
+def drop_json_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for column in JSON_RELATION_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS regions_{column}_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("population_stats", "0006_regionclosure_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RegionRelation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("to_region_id", models.CharField(max_length=50)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("sub", "Sub-region"),
+                            ("super", "Super-region"),
+                            ("eq", "Equivalent region"),
+                            ("int", "Intersecting region"),
+                        ],
+                        max_length=5,
+                    ),
+                ),
+                (
+                    "from_region",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="relations",
+                        to="population_stats.region",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "region_relations",
+                "indexes": [
+                    models.Index(
+                        fields=["to_region_id", "kind", "from_region"],
+                        name="region_relation_to_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="regionrelation",
+            constraint=models.UniqueConstraint(
+                fields=("from_region", "kind", "to_region_id"), name="region_relation_unique"
+            ),
+        ),
+        migrations.RunPython(create_json_gin_indexes, drop_json_gin_indexes),
+    ]
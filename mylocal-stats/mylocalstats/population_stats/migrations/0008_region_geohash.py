@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-19 06:03
+
+from django.db import migrations, models
+from mylocalstats.population_stats.spatial import encode_geohash
+
+
+def populate_geohash(apps, schema_editor):
+    Region = apps.get_model("population_stats", "Region")
+    regions = Region.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    batch = []
+    for region in regions.only("region_id", "latitude", "longitude").iterator():
+        region.geohash = encode_geohash(region.latitude, region.longitude)
+        batch.append(region)
+        if len(batch) >= 5000:
+            Region.objects.bulk_update(batch, ["geohash"])
+            batch = []
+    Region.objects.bulk_update(batch, ["geohash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("population_stats", "0007_regionrelation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="region",
+            name="geohash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="Geohash of the centroid, used for nearest-region lookups",
+                max_length=12,
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="region",
+            index=models.Index(fields=["latitude", "longitude"], name="regions_latitud_7a9ae1_idx"),
+        ),
+        migrations.RunPython(populate_geohash, migrations.RunPython.noop),
+    ]
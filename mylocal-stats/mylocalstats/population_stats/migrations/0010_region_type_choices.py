@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-19 06:09
+
+from django.db import migrations, models
+from django.db.models.functions import Lower, Trim
+
+
+def normalize_region_types(apps, schema_editor):
+    """Store region types in their canonical lowercase form."""
+    Region = apps.get_model("population_stats", "Region")
+    Region.objects.update(region_type=Lower(Trim("region_type")))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("population_stats", "0009_region_name_trigram"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="region",
+            name="region_type",
+            field=models.CharField(
+                choices=[
+                    ("country", "Country"),
+                    ("province", "Province"),
+                    ("district", "District"),
+                    ("dsd", "Divisional Secretariat Division"),
+                    ("gnd", "Grama Niladhari Division"),
+                    ("ed", "Electoral District"),
+                    ("pd", "Polling Division"),
+                    ("lg", "Local Government Area"),
+                    ("moh", "Medical Officer of Health Area"),
+                    ("ec", "Election Commission Area"),
+                ],
+                max_length=50,
+            ),
+        ),
+        migrations.RunPython(normalize_region_types, migrations.RunPython.noop),
+    ]
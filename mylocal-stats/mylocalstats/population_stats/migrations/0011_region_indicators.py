@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-19 06:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("population_stats", "0010_region_type_choices"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RegionIndicator",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("indicator", models.CharField(max_length=64)),
+                ("region_type", models.CharField(max_length=50)),
+                ("year", models.IntegerField(default=2012)),
+                ("value", models.FloatField()),
+                (
+                    "region",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="indicators",
+                        to="population_stats.region",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "region_indicators",
+                "indexes": [
+                    models.Index(
+                        fields=["indicator", "region_type", "year", "value"],
+                        name="region_indicator_rank_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="regionindicator",
+            constraint=models.UniqueConstraint(
+                fields=("region", "indicator", "year"), name="region_indicator_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,270 @@
+"""Key the statistic tables by (region, year) instead of region alone.
+
+The tables used the region as their primary key, so a second census year
+could only overwrite the first. Each table is rebuilt with an ``id`` primary
+key and a unique (region, year) constraint, and its rows are copied over.
+"""
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+STATISTIC_MODELS = [
+    "TotalPopulation",
+    "AgeDistribution",
+    "EthnicityDistribution",
+    "GenderDistribution",
+    "MaritalStatus",
+    "ReligiousAffiliation",
+]
+
+
+def copy_rows(apps, schema_editor):
+    for name in STATISTIC_MODELS:
+        old = apps.get_model("population_stats", name)
+        new = apps.get_model("population_stats", f"{name}ByYear")
+        columns = [field.attname for field in old._meta.concrete_fields]
+        new.objects.bulk_create(
+            (new(**row) for row in old.objects.values(*columns).iterator()), batch_size=5000
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("population_stats", "0011_region_indicators"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TotalPopulationByYear",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "region",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        related_query_name="totalpopulation",
+                        to="population_stats.region",
+                    ),
+                ),
+                ("total_population", models.IntegerField()),
+                ("year", models.IntegerField(default=2012)),
+            ],
+            options={"verbose_name_plural": "Total Population"},
+        ),
+        migrations.CreateModel(
+            name="AgeDistributionByYear",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "region",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        related_query_name="agedistribution",
+                        to="population_stats.region",
+                    ),
+                ),
+                ("total_population", models.IntegerField()),
+                ("less_than_10", models.IntegerField()),
+                ("age_10_to_19", models.IntegerField()),
+                ("age_20_to_29", models.IntegerField()),
+                ("age_30_to_39", models.IntegerField()),
+                ("age_40_to_49", models.IntegerField()),
+                ("age_50_to_59", models.IntegerField()),
+                ("age_60_to_69", models.IntegerField()),
+                ("age_70_to_79", models.IntegerField()),
+                ("age_80_to_89", models.IntegerField()),
+                ("age_90_and_above", models.IntegerField()),
+                ("year", models.IntegerField(default=2012)),
+            ],
+            options={"verbose_name_plural": "Age Distributions"},
+        ),
+        migrations.CreateModel(
+            name="EthnicityDistributionByYear",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "region",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        related_query_name="ethnicitydistribution",
+                        to="population_stats.region",
+                    ),
+                ),
+                ("total_population", models.IntegerField()),
+                ("sinhalese", models.IntegerField()),
+                ("sl_tamil", models.IntegerField()),
+                ("ind_tamil", models.IntegerField()),
+                ("sl_moor", models.IntegerField()),
+                ("burgher", models.IntegerField()),
+                ("malay", models.IntegerField()),
+                ("sl_chetty", models.IntegerField()),
+                ("bharatha", models.IntegerField()),
+                ("other_eth", models.IntegerField()),
+                ("year", models.IntegerField(default=2012)),
+            ],
+            options={"verbose_name_plural": "Ethnicity Distributions"},
+        ),
+        migrations.CreateModel(
+            name="GenderDistributionByYear",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "region",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        related_query_name="genderdistribution",
+                        to="population_stats.region",
+                    ),
+                ),
+                ("total_population", models.IntegerField()),
+                ("male", models.IntegerField()),
+                ("female", models.IntegerField()),
+                ("year", models.IntegerField(default=2012)),
+            ],
+            options={"verbose_name_plural": "Gender Distributions"},
+        ),
+        migrations.CreateModel(
+            name="MaritalStatusByYear",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "region",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        related_query_name="maritalstatus",
+                        to="population_stats.region",
+                    ),
+                ),
+                ("total_population", models.IntegerField()),
+                ("never_married", models.IntegerField()),
+                ("married_registered", models.IntegerField()),
+                ("married_customary", models.IntegerField()),
+                ("separated_legally", models.IntegerField()),
+                ("separated_non_legal", models.IntegerField()),
+                ("divorced", models.IntegerField()),
+                ("widowed", models.IntegerField()),
+                ("not_stated", models.IntegerField()),
+                ("year", models.IntegerField(default=2012)),
+            ],
+            options={"verbose_name_plural": "Marital Status Distributions"},
+        ),
+        migrations.CreateModel(
+            name="ReligiousAffiliationByYear",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "region",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        related_query_name="religiousaffiliation",
+                        to="population_stats.region",
+                    ),
+                ),
+                ("total_population", models.IntegerField()),
+                ("buddhist", models.IntegerField()),
+                ("hindu", models.IntegerField()),
+                ("islam", models.IntegerField()),
+                ("roman_catholic", models.IntegerField()),
+                ("other_christian", models.IntegerField()),
+                ("other", models.IntegerField()),
+                ("year", models.IntegerField(default=2012)),
+            ],
+            options={"verbose_name_plural": "Religious Affiliations"},
+        ),
+        migrations.RunPython(copy_rows, migrations.RunPython.noop),
+        migrations.DeleteModel(name="TotalPopulation"),
+        migrations.RenameModel(old_name="TotalPopulationByYear", new_name="TotalPopulation"),
+        migrations.AddConstraint(
+            model_name="totalpopulation",
+            constraint=models.UniqueConstraint(
+                fields=("region", "year"), name="total_population_region_year_unique"
+            ),
+        ),
+        migrations.DeleteModel(name="AgeDistribution"),
+        migrations.RenameModel(old_name="AgeDistributionByYear", new_name="AgeDistribution"),
+        migrations.AddConstraint(
+            model_name="agedistribution",
+            constraint=models.UniqueConstraint(
+                fields=("region", "year"), name="age_distribution_region_year_unique"
+            ),
+        ),
+        migrations.DeleteModel(name="EthnicityDistribution"),
+        migrations.RenameModel(
+            old_name="EthnicityDistributionByYear", new_name="EthnicityDistribution"
+        ),
+        migrations.AddConstraint(
+            model_name="ethnicitydistribution",
+            constraint=models.UniqueConstraint(
+                fields=("region", "year"), name="ethnicity_distribution_region_year_unique"
+            ),
+        ),
+        migrations.DeleteModel(name="GenderDistribution"),
+        migrations.RenameModel(old_name="GenderDistributionByYear", new_name="GenderDistribution"),
+        migrations.AddConstraint(
+            model_name="genderdistribution",
+            constraint=models.UniqueConstraint(
+                fields=("region", "year"), name="gender_distribution_region_year_unique"
+            ),
+        ),
+        migrations.DeleteModel(name="MaritalStatus"),
+        migrations.RenameModel(old_name="MaritalStatusByYear", new_name="MaritalStatus"),
+        migrations.AddConstraint(
+            model_name="maritalstatus",
+            constraint=models.UniqueConstraint(
+                fields=("region", "year"), name="marital_status_region_year_unique"
+            ),
+        ),
+        migrations.DeleteModel(name="ReligiousAffiliation"),
+        migrations.RenameModel(
+            old_name="ReligiousAffiliationByYear", new_name="ReligiousAffiliation"
+        ),
+        migrations.AddConstraint(
+            model_name="religiousaffiliation",
+            constraint=models.UniqueConstraint(
+                fields=("region", "year"), name="religious_affiliation_region_year_unique"
+            ),
+        ),
+    ]
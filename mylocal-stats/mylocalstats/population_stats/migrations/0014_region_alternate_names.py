@@ -0,0 +1,66 @@
+# Generated by Django 4.2.30 on 2026-10-19 07:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_trigram_index(apps, schema_editor):
+    # Alternate names used to be searched in the whole other_ids JSON text,
+    # which holds no names; they are matched in their own column instead.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS regions_other_ids_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS region_alternate_names_trgm "
+        "ON region_alternate_names USING gin (name gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS region_alternate_names_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS regions_other_ids_trgm ON regions USING gin ((other_ids::text) gin_trgm_ops)"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("population_stats", "0013_data_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RegionAlternateName",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("name", models.CharField(max_length=255)),
+                (
+                    "region",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="alternate_names",
+                        to="population_stats.region",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "region_alternate_names",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="regionalternatename",
+            constraint=models.UniqueConstraint(
+                fields=("region", "name"), name="region_alternate_name_unique"
+            ),
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
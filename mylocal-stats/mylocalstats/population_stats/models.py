@@ -2,11 +2,99 @@ from django.db import models
 from django.contrib.postgres.fields import JSONField
 from django.utils import timezone
 
+class RegionType(models.TextChoices):
+    """Canonical region types.
+
+    Types are stored lowercase so lookups can use an exact match on the
+    ``region_type`` index instead of ``UPPER(region_type) = UPPER(...)``.
+    Normalize user input with ``normalize_region_type``.
+    """
+    COUNTRY = 'country', 'Country'
+    PROVINCE = 'province', 'Province'
+    DISTRICT = 'district', 'District'
+    DSD = 'dsd', 'Divisional Secretariat Division'
+    GND = 'gnd', 'Grama Niladhari Division'
+    ED = 'ed', 'Electoral District'
+    PD = 'pd', 'Polling Division'
+    LG = 'lg', 'Local Government Area'
+    MOH = 'moh', 'Medical Officer of Health Area'
+    EC = 'ec', 'Election Commission Area'
+
+
+def normalize_region_type(value):
+    """Return the canonical (lowercase) form of a region type, e.g. ``GND`` -> ``gnd``."""
+    if value is None:
+        return None
+    return str(value).strip().lower()
+
+
+class RegionQuerySet(models.QuerySet):
+    """Subtree lookups backed by ``RegionClosure``.
+
+    Each method is a single join against the closure table, e.g.
+    ``Region.objects.descendants_of('LK-1', level='gnd')``.
+    """
+
+    def descendants_of(self, region_id, level=None, max_depth=None, include_self=False):
+        """Regions below ``region_id``, optionally of one type and within ``max_depth`` links."""
+        filters = {'ancestor_links__ancestor_id': region_id}
+        if not include_self:
+            filters['ancestor_links__depth__gte'] = 1
+        if max_depth is not None:
+            filters['ancestor_links__depth__lte'] = max_depth
+        if level:
+            filters['region_type'] = normalize_region_type(level)
+        return self.filter(**filters)
+
+    def of_type(self, region_type):
+        """Regions of one type, matched on the ``region_type`` index."""
+        return self.filter(region_type=normalize_region_type(region_type))
+
+    def related_to(self, region_id, kind, symmetric=False):
+        """Regions listed in ``region_id``'s ``subs``/``supers``/``eqs``/``ints``.
+
+        Args:
+            region_id (str): Region whose relations to follow.
+            kind (str): A ``RegionRelation.Kind`` value.
+            symmetric (bool): Also include regions that list ``region_id``
+                under the same kind (for equivalence and intersection).
+        """
+        relations = RegionRelation.objects.filter(kind=kind)
+        condition = models.Q(
+            region_id__in=relations.filter(from_region_id=region_id).values('to_region_id')
+        )
+        if symmetric:
+            condition |= models.Q(
+                region_id__in=relations.filter(to_region_id=region_id).values('from_region_id')
+            )
+        return self.filter(condition)
+
+    def subs_of(self, region_id):
+        return self.related_to(region_id, RegionRelation.Kind.SUB)
+
+    def supers_of(self, region_id):
+        return self.related_to(region_id, RegionRelation.Kind.SUPER)
+
+    def equivalents_of(self, region_id):
+        return self.related_to(region_id, RegionRelation.Kind.EQUIVALENT, symmetric=True)
+
+    def intersecting(self, region_id):
+        return self.related_to(region_id, RegionRelation.Kind.INTERSECTING, symmetric=True)
+
+    def ancestors_of(self, region_id, level=None, include_self=False):
+        """Regions above ``region_id``, optionally of one type."""
+        filters = {'descendant_links__descendant_id': region_id}
+        if not include_self:
+            filters['descendant_links__depth__gte'] = 1
+        if level:
+            filters['region_type'] = normalize_region_type(level)
+        return self.filter(**filters)
+
 class Region(models.Model):
     """Base model for regions/entities with enhanced attributes"""
     region_id = models.CharField(max_length=50, primary_key=True)
     name = models.CharField(max_length=255)
-    region_type = models.CharField(max_length=50)  # country, district, etc.
+    region_type = models.CharField(max_length=50, choices=RegionType.choices)
     parent_region_id = models.CharField(max_length=50, null=True, blank=True)
     code = models.CharField(max_length=50, null=True, blank=True)
     hasc = models.CharField(max_length=50, null=True, blank=True)
@@ -23,6 +111,13 @@ class Region(models.Model):
         null=True,
         blank=True
     )
+    geohash = models.CharField(
+        max_length=12,
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="Geohash of the centroid, used for nearest-region lookups"
+    )
     centroid_altitude = models.DecimalField(
         max_digits=10,
         decimal_places=2,
@@ -52,6 +147,8 @@ class Region(models.Model):
     other_ids = models.JSONField(null=True, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = RegionQuerySet.as_manager()
     
     class Meta:
         app_label = 'population_stats'
@@ -60,6 +157,7 @@ class Region(models.Model):
             models.Index(fields=['region_type']),
             models.Index(fields=['code']),
             models.Index(fields=['parent_region_id']),
+            models.Index(fields=['latitude', 'longitude']),
         ]
     
     def __str__(self):
@@ -71,22 +169,129 @@ class Region(models.Model):
             self.updated_at = timezone.now()
         super().save(*args, **kwargs)
 
+class RegionClosure(models.Model):
+    """Ancestor/descendant pairs of the region hierarchy.
+
+    Built from ``parent_region_id`` and the ancestor ids collected in
+    ``other_ids`` (province, district, dsd, ...). Every region is also its own
+    ancestor at depth 0; ``depth`` is the number of links on the shortest path.
+    """
+    # The composite indexes below lead with each foreign key, so the
+    # single-column FK indexes would be redundant.
+    ancestor = models.ForeignKey(
+        Region, on_delete=models.CASCADE, related_name='descendant_links', db_index=False
+    )
+    descendant = models.ForeignKey(
+        Region, on_delete=models.CASCADE, related_name='ancestor_links', db_index=False
+    )
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        app_label = 'population_stats'
+        db_table = 'region_closure'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['ancestor', 'descendant'], name='region_closure_unique_pair'
+            ),
+        ]
+        indexes = [
+            # Subtree scans: descendants of X, optionally within a depth.
+            models.Index(fields=['ancestor', 'depth', 'descendant'], name='region_closure_anc_idx'),
+            # Ancestor lookups and incremental rebuilds by descendant.
+            models.Index(fields=['descendant', 'depth', 'ancestor'], name='region_closure_desc_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} > {self.descendant_id} ({self.depth})"
+
+class RegionRelation(models.Model):
+    """One entry of a region's ``subs``/``supers``/``eqs``/``ints`` lists.
+
+    The JSON fields on ``Region`` are kept for compatibility; this table is
+    what relation lookups query. ``to_region_id`` is not a foreign key because
+    the gig-data files reference regions that are imported later (or never).
+    """
+
+    class Kind(models.TextChoices):
+        SUB = 'sub', 'Sub-region'
+        SUPER = 'super', 'Super-region'
+        EQUIVALENT = 'eq', 'Equivalent region'
+        INTERSECTING = 'int', 'Intersecting region'
+
+    # Covered by the unique constraint below, which leads with from_region.
+    from_region = models.ForeignKey(
+        Region, on_delete=models.CASCADE, related_name='relations', db_index=False
+    )
+    to_region_id = models.CharField(max_length=50)
+    kind = models.CharField(max_length=5, choices=Kind.choices)
+
+    class Meta:
+        app_label = 'population_stats'
+        db_table = 'region_relations'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['from_region', 'kind', 'to_region_id'], name='region_relation_unique'
+            ),
+        ]
+        indexes = [
+            # Reverse lookups: which regions list X as a sub/super/eq/int.
+            models.Index(fields=['to_region_id', 'kind', 'from_region'], name='region_relation_to_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.from_region_id} {self.kind} {self.to_region_id}"
+
+class RegionAlternateName(models.Model):
+    """Another name of a region, e.g. its Sinhala or Tamil name.
+
+    Imported from the ``name_*`` columns (``name_si``, ``name_ta``, ...) of
+    the region TSV files. Name search matches these as well as
+    ``Region.name``; on PostgreSQL ``name`` has a trigram GIN index.
+    """
+    # Covered by the unique constraint below, which leads with region.
+    region = models.ForeignKey(
+        Region, on_delete=models.CASCADE, related_name='alternate_names', db_index=False
+    )
+    name = models.CharField(max_length=255)
+
+    class Meta:
+        app_label = 'population_stats'
+        db_table = 'region_alternate_names'
+        constraints = [
+            models.UniqueConstraint(fields=['region', 'name'], name='region_alternate_name_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.region_id}: {self.name}"
+
 class TotalPopulation(models.Model):
     """Total population statistics"""
-    region = models.OneToOneField(Region, on_delete=models.CASCADE, primary_key=True)
+    # Statistic tables hold one row per region and census year; the unique
+    # (region, year) index serves lookups by region. The reverse accessor is
+    # hidden so ``region.totalpopulation`` stays a single object in GraphQL.
+    region = models.ForeignKey(
+        Region, on_delete=models.CASCADE, related_name='+', related_query_name='totalpopulation',
+        db_index=False
+    )
     total_population = models.IntegerField()
     year = models.IntegerField(default=2012)
     
     class Meta:
         app_label = 'population_stats'
         verbose_name_plural = "Total Population"
+        constraints = [
+            models.UniqueConstraint(fields=['region', 'year'], name='total_population_region_year_unique'),
+        ]
     
     def __str__(self):
         return f"{self.region} - Population: {self.total_population}"
 
 class AgeDistribution(models.Model):
     """Population by age groups"""
-    region = models.OneToOneField(Region, on_delete=models.CASCADE, primary_key=True)
+    region = models.ForeignKey(
+        Region, on_delete=models.CASCADE, related_name='+', related_query_name='agedistribution',
+        db_index=False
+    )
     total_population = models.IntegerField()
     less_than_10 = models.IntegerField()
     age_10_to_19 = models.IntegerField()
@@ -102,10 +307,16 @@ class AgeDistribution(models.Model):
 
     class Meta:
         verbose_name_plural = "Age Distributions"
+        constraints = [
+            models.UniqueConstraint(fields=['region', 'year'], name='age_distribution_region_year_unique'),
+        ]
 
 class EthnicityDistribution(models.Model):
     """Population by ethnicity"""
-    region = models.OneToOneField(Region, on_delete=models.CASCADE, primary_key=True)
+    region = models.ForeignKey(
+        Region, on_delete=models.CASCADE, related_name='+', related_query_name='ethnicitydistribution',
+        db_index=False
+    )
     total_population = models.IntegerField()
     sinhalese = models.IntegerField()
     sl_tamil = models.IntegerField()
@@ -120,10 +331,16 @@ class EthnicityDistribution(models.Model):
 
     class Meta:
         verbose_name_plural = "Ethnicity Distributions"
+        constraints = [
+            models.UniqueConstraint(fields=['region', 'year'], name='ethnicity_distribution_region_year_unique'),
+        ]
 
 class GenderDistribution(models.Model):
     """Population by gender"""
-    region = models.OneToOneField(Region, on_delete=models.CASCADE, primary_key=True)
+    region = models.ForeignKey(
+        Region, on_delete=models.CASCADE, related_name='+', related_query_name='genderdistribution',
+        db_index=False
+    )
     total_population = models.IntegerField()
     male = models.IntegerField()
     female = models.IntegerField()
@@ -131,10 +348,16 @@ class GenderDistribution(models.Model):
 
     class Meta:
         verbose_name_plural = "Gender Distributions"
+        constraints = [
+            models.UniqueConstraint(fields=['region', 'year'], name='gender_distribution_region_year_unique'),
+        ]
 
 class MaritalStatus(models.Model):
     """Population by marital status"""
-    region = models.OneToOneField(Region, on_delete=models.CASCADE, primary_key=True)
+    region = models.ForeignKey(
+        Region, on_delete=models.CASCADE, related_name='+', related_query_name='maritalstatus',
+        db_index=False
+    )
     total_population = models.IntegerField()
     never_married = models.IntegerField()
     married_registered = models.IntegerField()
@@ -149,10 +372,16 @@ class MaritalStatus(models.Model):
 
     class Meta:
         verbose_name_plural = "Marital Status Distributions"
+        constraints = [
+            models.UniqueConstraint(fields=['region', 'year'], name='marital_status_region_year_unique'),
+        ]
 
 class ReligiousAffiliation(models.Model):
     """Population by religious affiliation"""
-    region = models.OneToOneField(Region, on_delete=models.CASCADE, primary_key=True)
+    region = models.ForeignKey(
+        Region, on_delete=models.CASCADE, related_name='+', related_query_name='religiousaffiliation',
+        db_index=False
+    )
     total_population = models.IntegerField()
     buddhist = models.IntegerField()
     hindu = models.IntegerField()
@@ -163,4 +392,54 @@ class ReligiousAffiliation(models.Model):
     year = models.IntegerField(default=2012)
 
     class Meta:
-        verbose_name_plural = "Religious Affiliations"
\ No newline at end of file
+        verbose_name_plural = "Religious Affiliations"
+        constraints = [
+            models.UniqueConstraint(fields=['region', 'year'], name='religious_affiliation_region_year_unique'),
+        ]
+
+class RegionIndicator(models.Model):
+    """A derived indicator of one region, e.g. sex ratio or population density.
+
+    Rows are computed from the statistic tables by ``indicators.py`` after
+    imports; ``region_type`` is copied from the region so rankings within a
+    level are a single index range scan.
+    """
+    region = models.ForeignKey(
+        Region, on_delete=models.CASCADE, related_name='indicators', db_index=False
+    )
+    indicator = models.CharField(max_length=64)
+    region_type = models.CharField(max_length=50)
+    year = models.IntegerField(default=2012)
+    value = models.FloatField()
+
+    class Meta:
+        app_label = 'population_stats'
+        db_table = 'region_indicators'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['region', 'indicator', 'year'], name='region_indicator_unique'
+            ),
+        ]
+        indexes = [
+            # Rankings: top N regions of a level by one indicator.
+            models.Index(
+                fields=['indicator', 'region_type', 'year', 'value'],
+                name='region_indicator_rank_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.region_id} {self.indicator} ({self.year}): {self.value}"
+
+class DataVersion(models.Model):
+    """Counter bumped by every import; HTTP ETags are derived from it.
+
+    A single row (``pk=1``), stored in the database rather than the cache so
+    that imports run from a separate process reach every server process.
+    """
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = 'population_stats'
+        db_table = 'data_version'
@@ -0,0 +1,179 @@
+"""Rank regions by any numeric statistic column or derived indicator.
+
+``get_ranking`` orders the regions of one level by a column with a single
+query: ``RANK()`` (highest value first) and ``PERCENT_RANK()`` (0 for the
+lowest value, 100 for the highest) are window functions evaluated by the
+database over the ``region_type``/``year`` filtered rows, so no region data
+is shipped to the client to be sorted. The ranked list is cached per
+``(statistic, column, region_type, year)`` in the Django cache; top-N,
+percentile ranges and quantile bins are all slices of that list.
+
+Every cache key includes the data version of ``versioning``, which imports
+bump in the database, so a ranking cached before an import is not read again
+by any process, whichever cache backend is configured. ``invalidate_rankings``
+also bumps a version kept in the Django cache itself, which is enough on its
+own only when that cache is shared by every server.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Window
+from django.db.models.functions import PercentRank, Rank
+from mylocalstats.population_stats.aggregation import get_numeric_columns, get_statistic_model, latest_year
+from mylocalstats.population_stats.indicators import validate_indicator
+from mylocalstats.population_stats.models import RegionIndicator, normalize_region_type
+from mylocalstats.population_stats.versioning import get_data_version
+
+# Pseudo-statistic ranking the precomputed ``RegionIndicator`` values.
+INDICATORS_STATISTIC = 'indicators'
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 1000
+MAX_BINS = 100
+DEFAULT_CACHE_TIMEOUT = 3600
+
+_VERSION_KEY = 'ranking:version'
+
+
+def _version():
+    return cache.get_or_set(_VERSION_KEY, 1, timeout=None)
+
+
+def invalidate_rankings():
+    """Make every cached ranking stale; call after importing statistics."""
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.set(_VERSION_KEY, 1, timeout=None)
+
+
+def _ranked_queryset(statistic, column, region_type, year):
+    if statistic == INDICATORS_STATISTIC:
+        validate_indicator(column)
+        queryset = RegionIndicator.objects.filter(indicator=column)
+        if region_type:
+            queryset = queryset.filter(region_type=region_type)
+        value = F('value')
+        partition = ('indicator',)
+    else:
+        model = get_statistic_model(statistic)
+        if column not in get_numeric_columns(model):
+            raise ValueError(
+                f"Unknown column for {statistic}: {column}. "
+                f"Expected one of: {', '.join(get_numeric_columns(model))}"
+            )
+        queryset = model.objects.all()
+        if region_type:
+            queryset = queryset.filter(region__region_type=region_type)
+        value = F(column)
+        partition = ()
+    queryset = queryset.filter(year=year) if year else latest_year(queryset, *partition)
+    return queryset.annotate(
+        ranked_value=value,
+        name=F('region__name'),
+        level=F('region__region_type'),
+        rank=Window(Rank(), order_by=value.desc()),
+        percent_rank=Window(PercentRank(), order_by=value.asc()),
+    ).order_by('rank', 'region_id')
+
+
+def get_ranking(statistic, column, region_type=None, year=None):
+    """Return every region ranked by ``column``, highest value first.
+
+    Args:
+        statistic (str): Public statistic name (e.g. ``population``) or
+            ``indicators`` to rank a derived indicator.
+        column (str): Numeric column, or indicator name.
+        region_type (str, optional): Only rank regions of this type.
+        year (int, optional): Only rank rows of this census year; by default
+            each region's latest year.
+
+    Returns:
+        list: Dicts with ``region_id``, ``name``, ``region_type``, ``year``,
+        ``value``, ``rank`` (1 = highest, ties share a rank) and
+        ``percentile`` (0-100).
+
+    Raises:
+        ValueError: If the statistic or column is unknown.
+    """
+    region_type = normalize_region_type(region_type) or None
+    key = f"ranking:{get_data_version()}.{_version()}:{statistic}:{column}:{region_type or '*'}:{year or '*'}"
+    rows = cache.get(key)
+    if rows is None:
+        rows = [
+            {
+                'region_id': row['region_id'],
+                'name': row['name'],
+                'region_type': row['level'],
+                'year': row['year'],
+                'value': row['ranked_value'],
+                'rank': row['rank'],
+                'percentile': round(100 * row['percent_rank'], 4),
+            }
+            for row in _ranked_queryset(statistic, column, region_type, year).values(
+                'region_id', 'name', 'level', 'year', 'ranked_value', 'rank', 'percent_rank'
+            )
+        ]
+        cache.set(key, rows, getattr(settings, 'RANKING_CACHE_TIMEOUT', DEFAULT_CACHE_TIMEOUT))
+    return rows
+
+
+def _clamp(value, default, maximum, name):
+    value = default if value is None else int(value)
+    if not 1 <= value <= maximum:
+        raise ValueError(f"{name} must be between 1 and {maximum}")
+    return value
+
+
+def top_regions(statistic, column, region_type=None, year=None, limit=None, ascending=False,
+                min_percentile=None, max_percentile=None):
+    """Return the top (or bottom) ``limit`` regions, optionally within a percentile range.
+
+    Raises:
+        ValueError: If an argument is unknown or out of range.
+    """
+    limit = _clamp(limit, DEFAULT_LIMIT, MAX_LIMIT, 'limit')
+    for bound in (min_percentile, max_percentile):
+        if bound is not None and not 0 <= float(bound) <= 100:
+            raise ValueError("Percentiles must be between 0 and 100")
+    rows = get_ranking(statistic, column, region_type, year)
+    if min_percentile is not None or max_percentile is not None:
+        low = 0.0 if min_percentile is None else float(min_percentile)
+        high = 100.0 if max_percentile is None else float(max_percentile)
+        rows = [row for row in rows if low <= row['percentile'] <= high]
+    if ascending:
+        rows = rows[::-1]
+    return rows[:limit]
+
+
+def quantile_bins(statistic, column, region_type=None, year=None, bins=4):
+    """Split the ranked regions into ``bins`` groups like SQL ``NTILE(bins)``.
+
+    Bin 1 holds the lowest values. Bin sizes differ by at most one, with the
+    larger bins first, exactly as ``NTILE`` assigns them.
+
+    Returns:
+        list: One dict per non-empty bin with ``bin``, ``count``,
+        ``min_value``, ``max_value`` and ``region_ids``.
+
+    Raises:
+        ValueError: If an argument is unknown or out of range.
+    """
+    bins = _clamp(bins, 4, MAX_BINS, 'bins')
+    rows = get_ranking(statistic, column, region_type, year)[::-1]
+    size, larger = divmod(len(rows), bins)
+    result = []
+    start = 0
+    for number in range(1, bins + 1):
+        end = start + size + (1 if number <= larger else 0)
+        members = rows[start:end]
+        start = end
+        if not members:
+            continue
+        result.append({
+            'bin': number,
+            'count': len(members),
+            'min_value': members[0]['value'],
+            'max_value': members[-1]['value'],
+            'region_ids': [row['region_id'] for row in members],
+        })
+    return result
@@ -0,0 +1,110 @@
+"""Keep ``RegionRelation`` in sync with the JSON relation lists on ``Region``.
+
+The gig-data TSVs hold ``subs``/``supers``/``eqs``/``ints`` as Python list
+literals (``"['LK-11', 'LK-12']"``). Older imports stored that text
+JSON-encoded as a string; newer ones store a JSON array. ``parse_id_list``
+accepts all of these so the relation table can be built from any row.
+"""
+import ast
+import json
+
+from django.db import transaction
+from mylocalstats.population_stats.models import Region, RegionRelation
+
+# Region JSON field -> relation kind.
+RELATION_FIELDS = {
+    "subs": RegionRelation.Kind.SUB,
+    "supers": RegionRelation.Kind.SUPER,
+    "eqs": RegionRelation.Kind.EQUIVALENT,
+    "ints": RegionRelation.Kind.INTERSECTING,
+}
+
+# URL/GraphQL names of each kind.
+RELATION_KINDS = {
+    "subs": RegionRelation.Kind.SUB,
+    "supers": RegionRelation.Kind.SUPER,
+    "equivalents": RegionRelation.Kind.EQUIVALENT,
+    "intersecting": RegionRelation.Kind.INTERSECTING,
+}
+
+
+def parse_id_list(value):
+    """Return the region ids in a relation field value, in order, without duplicates."""
+    for _ in range(2):
+        if not isinstance(value, str):
+            break
+        value = value.strip()
+        if not value:
+            return []
+        try:
+            value = json.loads(value)
+        except ValueError:
+            try:
+                value = ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                return []
+    if not isinstance(value, (list, tuple)):
+        return []
+    return list(dict.fromkeys(str(item) for item in value if item not in (None, "")))
+
+
+def get_relation_kind(name):
+    """Return the relation kind for a public name (``subs``, ``intersecting``, ...).
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    try:
+        return RELATION_KINDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown relation: {name}. Expected one of: {', '.join(RELATION_KINDS)}"
+        )
+
+
+def get_related_regions(region_id, name):
+    """Regions related to ``region_id`` by a public relation name.
+
+    Equivalence and intersection are treated as symmetric.
+    """
+    kind = get_relation_kind(name)
+    symmetric = kind in (RegionRelation.Kind.EQUIVALENT, RegionRelation.Kind.INTERSECTING)
+    return Region.objects.related_to(region_id, kind, symmetric=symmetric)
+
+
+def build_relations(rows):
+    """Build unsaved ``RegionRelation`` rows from ``(region_id, subs, supers, eqs, ints)``."""
+    relations = []
+    for region_id, *values in rows:
+        for kind, value in zip(RELATION_FIELDS.values(), values):
+            relations.extend(
+                RegionRelation(from_region_id=region_id, to_region_id=to_region_id, kind=kind)
+                for to_region_id in parse_id_list(value)
+            )
+    return relations
+
+
+def update_region_relations(region_ids=None, batch_size=5000):
+    """Replace the relation rows of ``region_ids`` (default: all regions).
+
+    Returns:
+        int: Number of relation rows written.
+    """
+    columns = ("region_id", *RELATION_FIELDS)
+    written = 0
+    with transaction.atomic():
+        if region_ids is None:
+            RegionRelation.objects.all().delete()
+            batches = [Region.objects.values_list(*columns).iterator()]
+        else:
+            region_ids = list(region_ids)
+            batches = []
+            for start in range(0, len(region_ids), batch_size):
+                batch = region_ids[start:start + batch_size]
+                RegionRelation.objects.filter(from_region_id__in=batch).delete()
+                batches.append(Region.objects.filter(region_id__in=batch).values_list(*columns))
+        for rows in batches:
+            relations = build_relations(rows)
+            RegionRelation.objects.bulk_create(relations, batch_size=batch_size)
+            written += len(relations)
+    return written
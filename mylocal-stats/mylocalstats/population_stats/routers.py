@@ -0,0 +1,165 @@
+"""Send read-only traffic to read replicas.
+
+Replicas are the database aliases listed in ``DATABASE_REPLICAS`` (built
+from ``DATABASE_REPLICA_URLS`` in settings). ``ReplicaRouter`` sends every
+write to ``default``. Reads go to ``default`` too, except inside
+``replica_reads()``, which ``ReplicaReadMiddleware`` enters for GET and HEAD
+requests and for views marked ``replica_reads = True`` (the read-only
+GraphQL endpoint). Management commands (``insert_*``, index rebuilds) and
+admin writes therefore never read data a replica has not caught up with.
+
+Inside ``replica_reads()`` each query goes to the next healthy replica in
+round-robin order. A replica is healthy if its replication lag is at most
+``DATABASE_REPLICA_MAX_LAG`` seconds; lag is measured at most every
+``DATABASE_REPLICA_CHECK_INTERVAL`` seconds, and a replica that cannot be
+reached counts as unhealthy. With no healthy replica, reads fall back to
+``default``.
+"""
+import contextvars
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = 'default'
+DEFAULT_MAX_LAG = 30.0
+DEFAULT_CHECK_INTERVAL = 5.0
+
+# 0 while the replica has replayed everything it received; otherwise the age
+# of the last replayed transaction.
+LAG_QUERY = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Allow the queries run inside the block to read from replicas."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def replica_lag(alias):
+    """Replication lag of ``alias`` in seconds.
+
+    Raises:
+        DatabaseError: If the replica cannot be queried.
+    """
+    with connections[alias].cursor() as cursor:
+        cursor.execute(LAG_QUERY)
+        return float(cursor.fetchone()[0])
+
+
+class ReplicaRouter:
+    """Database router for a primary with round-robin, lag-aware read replicas."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_at = None
+        self._healthy = []
+        self._cycle = iter(())
+
+    @property
+    def replicas(self):
+        return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+    def healthy_replicas(self):
+        """Replicas within the lag limit, re-measured once per check interval."""
+        interval = getattr(settings, 'DATABASE_REPLICA_CHECK_INTERVAL', DEFAULT_CHECK_INTERVAL)
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < interval:
+                return self._healthy
+            self._checked_at = now
+        max_lag = getattr(settings, 'DATABASE_REPLICA_MAX_LAG', DEFAULT_MAX_LAG)
+        healthy = []
+        for alias in self.replicas:
+            try:
+                lag = replica_lag(alias)
+            except DatabaseError as e:
+                logger.warning("Replica %s is unavailable: %s", alias, e)
+                continue
+            if lag <= max_lag:
+                healthy.append(alias)
+            else:
+                logger.warning("Replica %s is %.1fs behind; reading from others", alias, lag)
+        with self._lock:
+            if healthy != self._healthy:
+                self._cycle = itertools.cycle(healthy)
+            self._healthy = healthy
+        return healthy
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or not self.replicas:
+            return PRIMARY
+        if not self.healthy_replicas():
+            return PRIMARY
+        with self._lock:
+            return next(self._cycle, PRIMARY)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+class ReplicaReadMiddleware:
+    """Let read-only requests read from replicas (see ``replica_reads``)."""
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        try:
+            return self.get_response(request)
+        finally:
+            token = getattr(request, '_replica_reads_token', None)
+            if token is not None:
+                _replica_reads.reset(token)
+
+    async def __acall__(self, request):
+        # The async handler runs process_view through sync_to_async, which
+        # copies its context variables back into this task but not its
+        # token, so the previous value is restored instead.
+        reads = _replica_reads.get()
+        try:
+            return await self.get_response(request)
+        finally:
+            _replica_reads.set(reads)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        excluded = getattr(settings, 'DATABASE_REPLICA_EXCLUDED_PATHS', ('/admin/',))
+        if request.path.startswith(tuple(excluded)):
+            return None
+        view = getattr(view_func, 'view_class', view_func)
+        if request.method in self.SAFE_METHODS or getattr(view, 'replica_reads', False):
+            request._replica_reads_token = _replica_reads.set(True)
+        return None
@@ -0,0 +1,94 @@
+"""Static in-memory R-tree packed with Sort-Tile-Recursive (STR).
+
+The tree is built once from all entries and never modified, which is what
+STR packing is for: nodes are filled completely and siblings barely overlap,
+so a point query visits O(log n) nodes. Entries are ``(bbox, value)`` pairs
+with ``bbox = (min_x, min_y, max_x, max_y)``; points use a degenerate bbox.
+"""
+import heapq
+import math
+
+DEFAULT_NODE_CAPACITY = 16
+
+
+def union_bbox(bboxes):
+    min_xs, min_ys, max_xs, max_ys = zip(*bboxes)
+    return min(min_xs), min(min_ys), max(max_xs), max(max_ys)
+
+
+def bbox_distance2(bbox, x, y):
+    """Squared distance from a point to the nearest edge of a bbox (0 inside)."""
+    dx = max(bbox[0] - x, 0.0, x - bbox[2])
+    dy = max(bbox[1] - y, 0.0, y - bbox[3])
+    return dx * dx + dy * dy
+
+
+class STRTree:
+    """Read-only R-tree over ``(bbox, value)`` entries.
+
+    Args:
+        entries: Iterable of ``(bbox, value)``.
+        node_capacity (int): Maximum children per node.
+    """
+
+    def __init__(self, entries, node_capacity=DEFAULT_NODE_CAPACITY):
+        self.node_capacity = node_capacity
+        # A node is (bbox, children, is_leaf); leaf children are entries.
+        nodes = self._pack([tuple(entry) for entry in entries], leaf=True)
+        self.size = sum(len(node[1]) for node in nodes)
+        while len(nodes) > 1:
+            nodes = self._pack(nodes, leaf=False)
+        self.root = nodes[0] if nodes else None
+
+    def __len__(self):
+        return self.size
+
+    def _pack(self, items, leaf):
+        if not items:
+            return []
+        capacity = self.node_capacity
+        node_count = math.ceil(len(items) / capacity)
+        slice_size = math.ceil(math.sqrt(node_count)) * capacity
+        items = sorted(items, key=lambda item: item[0][0] + item[0][2])
+        nodes = []
+        for start in range(0, len(items), slice_size):
+            vertical_slice = sorted(
+                items[start:start + slice_size], key=lambda item: item[0][1] + item[0][3]
+            )
+            for offset in range(0, len(vertical_slice), capacity):
+                children = vertical_slice[offset:offset + capacity]
+                nodes.append((union_bbox([child[0] for child in children]), children, leaf))
+        return nodes
+
+    def query_point(self, x, y):
+        """Yield the values whose bbox contains ``(x, y)``."""
+        if self.root is None:
+            return
+        stack = [self.root]
+        while stack:
+            _, children, leaf = stack.pop()
+            for child in children:
+                bbox = child[0]
+                if bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]:
+                    if leaf:
+                        yield child[1]
+                    else:
+                        stack.append(child)
+
+    def nearest(self, x, y, k=1):
+        """Return the ``k`` values whose bbox is closest to ``(x, y)``, nearest first."""
+        if self.root is None:
+            return []
+        counter = 0
+        heap = [(0.0, counter, self.root, False)]
+        results = []
+        while heap and len(results) < k:
+            _, _, item, is_entry = heapq.heappop(heap)
+            if is_entry:
+                results.append(item[1])
+                continue
+            _, children, leaf = item
+            for child in children:
+                counter += 1
+                heapq.heappush(heap, (bbox_distance2(child[0], x, y), counter, child, leaf))
+        return results
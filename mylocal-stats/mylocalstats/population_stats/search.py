@@ -0,0 +1,234 @@
+"""Typo-tolerant region name search and autocomplete.
+
+``search_regions`` ranks regions by trigram similarity of the query to their
+name or, if closer, to one of their alternate names (``RegionAlternateName``,
+imported from the ``name_*`` columns of the region files). On PostgreSQL this
+is ``pg_trgm``: the ``%`` operator is answered from GIN trigram indexes on
+both name columns and ``similarity()`` orders the matches. Other databases use
+``RegionNameIndex``, an in-process trigram inverted index with the same
+scoring (pg_trgm's padding rules and 0.3 threshold).
+
+``autocomplete_regions`` serves prefix matches from ``RegionNameIndex`` on
+every backend. Keys are each name suffix starting at a word boundary
+("dehiwala mount lavinia", "mount lavinia", "lavinia"), kept in one sorted
+list so a prefix is a ``bisect`` range, a flattened trie without per-node
+objects.
+
+The in-process index is built lazily from the Region table and kept until the
+data version changes (see ``versioning.py``), so every process rebuilds it
+after an import.
+"""
+import bisect
+import re
+import threading
+from collections import defaultdict
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q, Subquery
+from django.db.models.functions import Greatest
+from mylocalstats.population_stats.models import Region, RegionAlternateName, normalize_region_type
+from mylocalstats.population_stats.versioning import get_data_version
+
+SIMILARITY_THRESHOLD = 0.3
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+_WORD_SPLIT = re.compile(r"[\s\-_,./()'\"]+")
+
+
+def normalize(text):
+    """Lowercase ``text`` and collapse punctuation and whitespace to single spaces."""
+    return " ".join(word for word in _WORD_SPLIT.split(str(text).lower()) if word)
+
+
+def trigrams(text):
+    """Return the pg_trgm trigram set of ``text``."""
+    grams = set()
+    for word in normalize(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a, b):
+    """pg_trgm ``similarity()``: shared trigrams over distinct trigrams."""
+    a, b = trigrams(a), trigrams(b)
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def clamp_limit(limit):
+    """Validate a result limit.
+
+    Raises:
+        ValueError: If ``limit`` is outside ``1..MAX_LIMIT``.
+    """
+    limit = DEFAULT_LIMIT if limit is None else int(limit)
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+    return limit
+
+
+class RegionNameIndex:
+    """In-process trigram and prefix index over region names.
+
+    Args:
+        regions: Iterable of dicts with ``region_id``, ``name``,
+            ``region_type``, ``population`` and ``alternate_names`` (a list).
+    """
+
+    def __init__(self, regions):
+        self.regions = []
+        self._names = []
+        self._populations = []
+        postings = defaultdict(set)
+        prefix_keys = []
+        for index, region in enumerate(regions):
+            names = [region['name'], *region.get('alternate_names', ())]
+            self.regions.append({
+                'region_id': region['region_id'],
+                'name': region['name'],
+                'region_type': region['region_type'],
+            })
+            self._names.append([(name, trigrams(name)) for name in names])
+            self._populations.append(region.get('population') or 0)
+            for name in names:
+                for gram in trigrams(name):
+                    postings[gram].add(index)
+                words = normalize(name).split()
+                prefix_keys.extend((" ".join(words[start:]), index) for start in range(len(words)))
+        self._postings = dict(postings)
+        prefix_keys.sort()
+        self._prefix_keys = [key for key, _ in prefix_keys]
+        self._prefix_rows = [index for _, index in prefix_keys]
+
+    def __len__(self):
+        return len(self.regions)
+
+    def _matches_type(self, index, region_type):
+        return region_type is None or self.regions[index]['region_type'].lower() == region_type.lower()
+
+    def search(self, query, region_type=None, limit=DEFAULT_LIMIT):
+        """Return ``(region, score)`` pairs with similarity of at least the threshold, best first."""
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        candidates = set()
+        for gram in query_grams:
+            candidates.update(self._postings.get(gram, ()))
+        scored = []
+        for index in candidates:
+            if not self._matches_type(index, region_type):
+                continue
+            score = 0.0
+            for _, name_grams in self._names[index]:
+                shared = len(query_grams & name_grams)
+                score = max(score, shared / (len(query_grams) + len(name_grams) - shared))
+            if score >= SIMILARITY_THRESHOLD:
+                scored.append((-score, self.regions[index]['name'], index))
+        scored.sort()
+        return [(self.regions[index], -score) for score, _, index in scored[:limit]]
+
+    def autocomplete(self, prefix, region_type=None, limit=DEFAULT_LIMIT):
+        """Return regions with a name (or name suffix at a word boundary) starting with ``prefix``."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        start = bisect.bisect_left(self._prefix_keys, prefix)
+        results = []
+        seen = set()
+        for position in range(start, len(self._prefix_keys)):
+            if not self._prefix_keys[position].startswith(prefix):
+                break
+            index = self._prefix_rows[position]
+            if index in seen or not self._matches_type(index, region_type):
+                continue
+            seen.add(index)
+            results.append(index)
+        # Whole-name matches before word matches, then larger regions first.
+        ranked = sorted(results, key=lambda index: self._rank(index, prefix))
+        return [self.regions[index] for index in ranked[:limit]]
+
+    def _rank(self, index, prefix):
+        name = normalize(self.regions[index]['name'])
+        return (not name.startswith(prefix), -self._populations[index], len(name), name)
+
+
+def build_region_name_index():
+    alternate_names = defaultdict(list)
+    for region_id, name in RegionAlternateName.objects.values_list('region_id', 'name').order_by('pk').iterator():
+        alternate_names[region_id].append(name)
+    return RegionNameIndex(
+        {**region, 'alternate_names': alternate_names.get(region['region_id'], [])}
+        for region in Region.objects.values('region_id', 'name', 'region_type', 'population').iterator()
+    )
+
+
+_name_index = {'version': None, 'index': None}
+_name_index_lock = threading.Lock()
+
+
+def get_region_name_index():
+    """Return the process-wide name index, rebuilding it when the data version changes."""
+    version = get_data_version()
+    with _name_index_lock:
+        if _name_index['index'] is None or _name_index['version'] != version:
+            _name_index.update(version=version, index=build_region_name_index())
+        return _name_index['index']
+
+
+def reset_region_name_index():
+    """Drop the cached name index so the next lookup rebuilds it."""
+    with _name_index_lock:
+        _name_index.update(version=None, index=None)
+
+
+def _search_postgresql(query, region_type, limit):
+    alternate_names = RegionAlternateName.objects.filter(region=OuterRef('pk'), name__trigram_similar=query)
+    best_alternate_score = Subquery(
+        alternate_names.annotate(score=TrigramSimilarity('name', query)).order_by('-score').values('score')[:1]
+    )
+    # GREATEST ignores the NULL score of regions without a matching alternate name.
+    queryset = Region.objects.annotate(
+        score=Greatest(TrigramSimilarity('name', query), best_alternate_score)
+    ).filter(Q(name__trigram_similar=query) | Exists(alternate_names))
+    if region_type:
+        queryset = queryset.filter(region_type=normalize_region_type(region_type))
+    rows = queryset.order_by('-score', 'name').values('region_id', 'name', 'region_type', 'score')[:limit]
+    return [
+        ({key: row[key] for key in ('region_id', 'name', 'region_type')}, row['score'])
+        for row in rows
+    ]
+
+
+def search_regions(query, region_type=None, limit=None):
+    """Fuzzy search regions by name.
+
+    Returns:
+        list: ``(region, score)`` pairs, best first, where ``region`` is a dict
+        with ``region_id``, ``name`` and ``region_type``.
+
+    Raises:
+        ValueError: If the query is empty or ``limit`` is out of range.
+    """
+    limit = clamp_limit(limit)
+    if not normalize(query or ''):
+        raise ValueError("Query must not be empty")
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(query, region_type, limit)
+    return get_region_name_index().search(query, region_type, limit)
+
+
+def autocomplete_regions(prefix, region_type=None, limit=None):
+    """Prefix-match region names from the in-process index.
+
+    Raises:
+        ValueError: If the prefix is empty or ``limit`` is out of range.
+    """
+    limit = clamp_limit(limit)
+    if not normalize(prefix or ''):
+        raise ValueError("Query must not be empty")
+    return get_region_name_index().autocomplete(prefix, region_type, limit)
@@ -12,12 +12,20 @@ class RegionSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 class TotalPopulationSerializer(serializers.ModelSerializer):
+    region_id = serializers.CharField(source='region.region_id')
+    region_name = serializers.CharField(source='region.name')
+
     class Meta:
         model = TotalPopulation
-        fields = '__all__'
+        fields = [
+            'region_id',
+            'region_name',
+            'year',
+            'total_population'
+        ]
 
 class AgeDistributionSerializer(serializers.ModelSerializer):
-    region_id = serializers.CharField(source='region.entity_id')
+    region_id = serializers.CharField(source='region.region_id')
     region_name = serializers.CharField(source='region.name')
     
     class Meta:
@@ -40,7 +48,7 @@ class AgeDistributionSerializer(serializers.ModelSerializer):
         ]
 
 class EthnicityDistributionSerializer(serializers.ModelSerializer):
-    region_id = serializers.CharField(source='region.entity_id')
+    region_id = serializers.CharField(source='region.region_id')
     region_name = serializers.CharField(source='region.name')
     
     class Meta:
@@ -62,7 +70,7 @@ class EthnicityDistributionSerializer(serializers.ModelSerializer):
         ]
 
 class GenderDistributionSerializer(serializers.ModelSerializer):
-    region_id = serializers.CharField(source='region.entity_id')
+    region_id = serializers.CharField(source='region.region_id')
     region_name = serializers.CharField(source='region.name')
     
     class Meta:
@@ -77,7 +85,7 @@ class GenderDistributionSerializer(serializers.ModelSerializer):
         ]
 
 class MaritalStatusSerializer(serializers.ModelSerializer):
-    region_id = serializers.CharField(source='region.entity_id')
+    region_id = serializers.CharField(source='region.region_id')
     region_name = serializers.CharField(source='region.name')
     
     class Meta:
@@ -100,7 +108,7 @@ class ReligiousAffiliationSerializer(serializers.ModelSerializer):
     
     Converts ReligiousAffiliation model instances to/from JSON format.
     """
-    region_id = serializers.CharField(source='region.entity_id')
+    region_id = serializers.CharField(source='region.region_id')
     region_name = serializers.CharField(source='region.name')
     
     class Meta:
@@ -0,0 +1,248 @@
+"""Static snapshots of the REST read endpoints.
+
+Census data only changes when it is imported, so the JSON of every list and
+detail endpoint can be rendered once, after the import, and served as a file.
+``publish_snapshot`` renders each endpoint through its view and stores the
+body under its SHA-256 content hash::
+
+    SNAPSHOT_DIR/
+        manifest.json                       # data version; URL path -> hash, size, encodings
+        objects/3f/3fa4...e1.json           # identity
+        objects/3f/3fa4...e1.json.gz        # gzip
+        objects/3f/3fa4...e1.json.br        # brotli, if installed
+
+Identical responses share one object, and the manifest is replaced
+atomically, so a new snapshot never mixes with the old one mid-request.
+
+``SnapshotMiddleware`` answers GET and HEAD requests without a query string
+from the manifest: the best encoding the client accepts is streamed from
+disk, with the content hash as ETag, and no view, ORM or serializer code
+runs. Paths missing from the manifest fall through to the views, and so does
+every request once an import has bumped the data version past the one the
+snapshot was rendered at, until the snapshot is published again.
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotModified
+from django.test import RequestFactory
+from django.urls import NoReverseMatch, resolve, reverse
+from django.utils.cache import patch_vary_headers
+from mylocalstats.population_stats.middleware import accepted_encodings, etag_matches
+from mylocalstats.population_stats.versioning import get_data_version
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+MANIFEST_NAME = 'manifest.json'
+
+# URL names of the endpoints rendered once per region type and per region.
+TYPE_URL_NAMES = [
+    'get_regions_by_type',
+    'get_population_by_region_type',
+    'get_age_distribution_by_region_type',
+    'get_ethnicity_distribution_by_region_type',
+    'get_gender_distribution_by_region_type',
+    'get_marital_status_by_region_type',
+    'get_religious_affiliation_by_region_type',
+]
+ID_URL_NAMES = [
+    'get_region_by_id',
+    'get_population_by_region_id',
+    'get_age_distribution_by_region_id',
+    'get_ethnicity_distribution_by_region_id',
+    'get_gender_distribution_by_region_id',
+    'get_marital_status_by_region_id',
+    'get_religious_affiliation_by_region_id',
+    'get_region_indicators_by_id',
+]
+
+# Preferred first.
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def get_snapshot_dir():
+    directory = getattr(settings, 'SNAPSHOT_DIR', None)
+    return Path(directory) if directory else None
+
+
+def snapshot_paths(region_types, region_ids):
+    """Yield the URL path of every endpoint to render."""
+    for names, values in ((TYPE_URL_NAMES, region_types), (ID_URL_NAMES, region_ids)):
+        for name in names:
+            for value in values:
+                try:
+                    yield reverse(name, args=[value])
+                except NoReverseMatch:
+                    break
+
+
+def render_path(path):
+    """Render ``path`` through its view.
+
+    Returns:
+        tuple: ``(status_code, body)``.
+    """
+    match = resolve(path)
+    request = RequestFactory().get(path, HTTP_ACCEPT='application/json')
+    response = match.func(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response.status_code, response.content
+
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    with os.fdopen(descriptor, 'wb') as handle:
+        handle.write(data)
+    os.replace(temporary, path)
+
+
+class SnapshotWriter:
+    """Stores rendered bodies as content-addressed objects and writes the manifest.
+
+    The data version is read before anything is rendered, so a snapshot that
+    races with an import is stale as soon as it is published.
+    """
+
+    def __init__(self, directory, use_brotli=True):
+        self.directory = Path(directory)
+        self.data_version = get_data_version()
+        self.encoders = {'gzip': lambda body: gzip.compress(body, compresslevel=9, mtime=0)}
+        if use_brotli and brotli is not None:
+            self.encoders['br'] = lambda body: brotli.compress(body, quality=11)
+        self.entries = {}
+
+    def object_path(self, digest, suffix=''):
+        return self.directory / 'objects' / digest[:2] / f'{digest}.json{suffix}'
+
+    def add(self, path, body):
+        digest = hashlib.sha256(body).hexdigest()
+        if not self.object_path(digest).exists():
+            _write_atomic(self.object_path(digest), body)
+            for encoding, suffix in ENCODINGS:
+                if encoding in self.encoders:
+                    _write_atomic(self.object_path(digest, suffix), self.encoders[encoding](body))
+        self.entries[path] = {
+            'hash': digest,
+            'size': len(body),
+            'encodings': [encoding for encoding, _ in ENCODINGS if encoding in self.encoders],
+        }
+
+    def publish(self):
+        manifest = {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'data_version': self.data_version,
+            'entries': self.entries,
+        }
+        _write_atomic(self.directory / MANIFEST_NAME, json.dumps(manifest, sort_keys=True).encode())
+        return manifest
+
+    def prune(self):
+        """Delete objects no longer referenced by the manifest; return how many."""
+        referenced = {entry['hash'] for entry in self.entries.values()}
+        removed = 0
+        for path in (self.directory / 'objects').glob('*/*.json*'):
+            if path.name.split('.', 1)[0] not in referenced:
+                path.unlink()
+                removed += 1
+        return removed
+
+
+class _ManifestCache:
+    """The manifest of ``SNAPSHOT_DIR``, re-read when the file changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key = None
+        self._manifest = {}
+
+    def load(self, directory):
+        try:
+            stat = (directory / MANIFEST_NAME).stat()
+        except FileNotFoundError:
+            return {}
+        key = (str(directory), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if key != self._key:
+                with open(directory / MANIFEST_NAME, 'rb') as handle:
+                    self._manifest = json.load(handle)
+                self._key = key
+            return self._manifest
+
+
+_manifest = _ManifestCache()
+
+
+def serve_snapshot(request):
+    """Return the snapshot response for ``request``, or ``None`` to fall through."""
+    directory = get_snapshot_dir()
+    if directory is None or request.method not in ('GET', 'HEAD') or request.META.get('QUERY_STRING'):
+        return None
+    manifest = _manifest.load(directory)
+    entry = manifest.get('entries', {}).get(request.path)
+    if entry is None or manifest.get('data_version') != get_data_version():
+        return None
+
+    etag = f'W/"{entry["hash"]}"'
+    if etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), f'"{entry["hash"]}"'):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    accepted = accepted_encodings(request)
+    encoding, suffix = next(
+        ((encoding, suffix) for encoding, suffix in ENCODINGS
+         if encoding in entry['encodings'] and encoding in accepted),
+        (None, ''),
+    )
+    path = directory / 'objects' / entry['hash'][:2] / f'{entry["hash"]}.json{suffix}'
+    try:
+        handle = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    response = FileResponse(handle, content_type='application/json')
+    response.from_snapshot = True
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+class SnapshotMiddleware:
+    """Serve published snapshots before URL resolution; see ``serve_snapshot``."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = serve_snapshot(request)
+        if response is not None:
+            return response
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # The data version may have to be read from the database.
+        response = await sync_to_async(serve_snapshot)(request)
+        if response is not None:
+            return response
+        return await self.get_response(request)
@@ -0,0 +1,153 @@
+"""Location queries over region centroids without PostGIS.
+
+Each region stores the geohash of its centroid in an indexed ``geohash``
+column. Nearby points share geohash prefixes, so "regions near (lat, lon)"
+becomes a handful of ``geohash LIKE 'prefix%'`` B-tree range scans over the
+3x3 block of cells around the point. The block is widened (shorter prefix)
+until the k-th candidate is provably closer than any region outside it.
+Bounding boxes use the composite ``(latitude, longitude)`` index.
+"""
+import math
+
+from django.db.models import Q
+from mylocalstats.population_stats.models import Region, normalize_region_type
+
+GEOHASH_PRECISION = 9
+# First search with ~1.2 x 0.6 km cells, about the size of a GND.
+_START_PRECISION = 6
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_EARTH_RADIUS_KM = 6371.0088
+_KM_PER_DEGREE = math.pi * _EARTH_RADIUS_KM / 180
+
+MAX_NEAREST = 100
+MAX_BBOX_RESULTS = 5000
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Return the geohash of a point, or ``None`` if a coordinate is missing."""
+    if latitude is None or longitude is None:
+        return None
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+    chars = []
+    bit_count = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        coordinate, interval = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[value])
+            bit_count = 0
+            value = 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """Return ``(height, width)`` in degrees of a geohash cell."""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def neighbour_cells(latitude, longitude, precision):
+    """Return the geohash of the cell containing a point and its 8 neighbours."""
+    height, width = cell_size(precision)
+    cells = set()
+    for dlat in (-height, 0, height):
+        for dlon in (-width, 0, width):
+            lat = min(max(latitude + dlat, -90.0), 90.0)
+            lon = (longitude + dlon + 180.0) % 360.0 - 180.0
+            cells.add(encode_geohash(lat, lon, precision))
+    return sorted(cells)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres."""
+    lat1, lon1, lat2, lon2 = map(math.radians, map(float, (lat1, lon1, lat2, lon2)))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * _EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _covered_radius_km(latitude, precision):
+    # The 3x3 block extends at least one full cell from the point in every
+    # direction; east-west cells shrink with latitude.
+    height, width = cell_size(precision)
+    shrink = math.cos(math.radians(min(abs(latitude) + height, 90.0)))
+    return min(height, width * shrink) * _KM_PER_DEGREE
+
+
+def nearest_regions(latitude, longitude, k=5, region_type=None, queryset=None):
+    """Return the ``k`` regions whose centroids are closest to a point.
+
+    Args:
+        latitude, longitude: The query point in degrees.
+        k (int): Number of regions to return, at most ``MAX_NEAREST``.
+        region_type (str, optional): Only consider regions of this type.
+        queryset: Base queryset (default ``Region.objects.all()``).
+
+    Returns:
+        list: ``(region, distance_km)`` tuples, nearest first.
+
+    Raises:
+        ValueError: If the point or ``k`` is out of range.
+    """
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise ValueError("Coordinates out of range")
+    if not 1 <= k <= MAX_NEAREST:
+        raise ValueError(f"k must be between 1 and {MAX_NEAREST}")
+    queryset = queryset if queryset is not None else Region.objects.all()
+    queryset = queryset.filter(geohash__isnull=False)
+    if region_type:
+        queryset = queryset.filter(region_type=normalize_region_type(region_type))
+
+    for precision in range(_START_PRECISION, 0, -1):
+        prefixes = Q()
+        for prefix in neighbour_cells(latitude, longitude, precision):
+            prefixes |= Q(geohash__startswith=prefix)
+        candidates = _by_distance(queryset.filter(prefixes), latitude, longitude)
+        if len(candidates) >= k and candidates[k - 1][1] <= _covered_radius_km(latitude, precision):
+            return candidates[:k]
+    # Even the coarsest block leaves out regions that may be closer: scan all.
+    return _by_distance(queryset, latitude, longitude)[:k]
+
+
+def _by_distance(queryset, latitude, longitude):
+    candidates = [
+        (region, haversine_km(latitude, longitude, region.latitude, region.longitude))
+        for region in queryset
+    ]
+    candidates.sort(key=lambda item: item[1])
+    return candidates
+
+
+def regions_in_bbox(min_latitude, min_longitude, max_latitude, max_longitude, region_type=None,
+                    queryset=None):
+    """Return the regions whose centroid lies inside a bounding box.
+
+    Raises:
+        ValueError: If the box is empty or out of range.
+    """
+    if min_latitude > max_latitude or min_longitude > max_longitude:
+        raise ValueError("Bounding box minimum must not exceed its maximum")
+    if not -90 <= min_latitude <= max_latitude <= 90 or not -180 <= min_longitude <= max_longitude <= 180:
+        raise ValueError("Coordinates out of range")
+    queryset = queryset if queryset is not None else Region.objects.all()
+    queryset = queryset.filter(
+        latitude__range=(min_latitude, max_latitude),
+        longitude__range=(min_longitude, max_longitude),
+    )
+    if region_type:
+        queryset = queryset.filter(region_type=normalize_region_type(region_type))
+    return queryset
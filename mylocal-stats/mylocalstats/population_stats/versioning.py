@@ -0,0 +1,54 @@
+"""Version number of the imported data, used for HTTP validators.
+
+Every import calls ``bump_data_version``. Responses of the read API depend
+only on the data and the request, so ``"<version>-<request digest>"`` is a
+valid strong ETag that can be computed, and compared with ``If-None-Match``,
+before the view runs (see ``middleware.ConditionalDataMiddleware``).
+
+The version is read from the database at most once per
+``DATA_VERSION_TTL`` seconds per process.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from mylocalstats.population_stats.models import DataVersion
+
+DEFAULT_TTL = 1.0
+
+_lock = threading.Lock()
+_cached = {'version': None, 'read_at': 0.0}
+
+
+def get_data_version():
+    """Return the current data version (0 before the first import)."""
+    ttl = getattr(settings, 'DATA_VERSION_TTL', DEFAULT_TTL)
+    now = time.monotonic()
+    with _lock:
+        if _cached['version'] is not None and now - _cached['read_at'] < ttl:
+            return _cached['version']
+    version = DataVersion.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+    with _lock:
+        _cached.update(version=version, read_at=now)
+    return version
+
+
+def bump_data_version():
+    """Record that the data changed; call after importing statistics or regions.
+
+    Returns:
+        int: The new version.
+    """
+    with transaction.atomic():
+        updated = DataVersion.objects.filter(pk=1).update(
+            version=F('version') + 1, updated_at=timezone.now()
+        )
+        if not updated:
+            DataVersion.objects.get_or_create(pk=1, defaults={'version': 1})
+        version = DataVersion.objects.get(pk=1).version
+    with _lock:
+        _cached.update(version=None, read_at=0.0)
+    return version
@@ -1,3 +1,7 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework import viewsets, status
 from rest_framework.response import Response
@@ -13,11 +17,19 @@ from mylocalstats.population_stats.serializers import (
     ReligiousAffiliationSerializer
 )
 from rest_framework.reverse import reverse
+from mylocalstats.population_stats.aggregation import aggregate_statistic, get_statistic_model
+from mylocalstats.population_stats.diff import diff_statistic
+from mylocalstats.population_stats.geocoding import get_reverse_geocoder, parse_points
+from mylocalstats.population_stats.indicators import INDICATORS, get_region_indicators, rank_regions
+from mylocalstats.population_stats.ranking import quantile_bins, top_regions
+from mylocalstats.population_stats.relations import get_related_regions
+from mylocalstats.population_stats.search import autocomplete_regions, search_regions
+from mylocalstats.population_stats.spatial import MAX_BBOX_RESULTS, nearest_regions, regions_in_bbox
 
 @api_view(['GET'])
 def get_regions_by_type(request, region_type):
     try:
-        regions = Region.objects.filter(type__iexact=region_type)
+        regions = Region.objects.of_type(region_type)
         if not regions.exists():
             return Response(
                 {"error": f"No regions found of type: {region_type}"}, 
@@ -34,7 +46,7 @@ def get_regions_by_type(request, region_type):
 @api_view(['GET'])
 def get_region_by_id(request, region_id):
     try:
-        region = Region.objects.get(entity_id=region_id)
+        region = Region.objects.get(region_id=region_id)
         serializer = RegionSerializer(region)
         return Response(serializer.data)
     except Region.DoesNotExist:
@@ -43,16 +55,241 @@ def get_region_by_id(request, region_id):
             status=status.HTTP_404_NOT_FOUND
         )
 
+
+@api_view(['GET'])
+def get_region_descendants(request, region_id):
+    """List the regions below a region, e.g. every GND in a district.
+
+    Args:
+        request: HTTP request object with optional query parameters ``level``
+            (region type to return) and ``max_depth`` (links below the region)
+        region_id (str): ID of the ancestor region
+
+    Returns:
+        Response: JSON list of regions, ordered by region_id
+    """
+    try:
+        if not Region.objects.filter(region_id=region_id).exists():
+            return Response(
+                {"error": "Region not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        max_depth = request.query_params.get('max_depth')
+        regions = Region.objects.descendants_of(
+            region_id,
+            level=request.query_params.get('level'),
+            max_depth=int(max_depth) if max_depth else None
+        ).order_by('region_id')
+        serializer = RegionSerializer(regions, many=True)
+        return Response(serializer.data)
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+@api_view(['GET'])
+def get_related_regions_by_id(request, region_id, relation):
+    """List regions related to a region through its subs/supers/eqs/ints.
+
+    Args:
+        request: HTTP request object
+        region_id (str): ID of the region
+        relation (str): One of subs, supers, equivalents, intersecting
+
+    Returns:
+        Response: JSON list of regions, ordered by region_id
+    """
+    try:
+        regions = get_related_regions(region_id, relation).order_by('region_id')
+        serializer = RegionSerializer(regions, many=True)
+        return Response(serializer.data)
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+@api_view(['GET'])
+def get_regions_in_bbox(request):
+    """List regions whose centroid lies inside a bounding box.
+
+    Args:
+        request: HTTP request object with query parameters ``min_lat``,
+            ``min_lon``, ``max_lat``, ``max_lon`` and optionally ``type``
+
+    Returns:
+        Response: JSON list of at most ``MAX_BBOX_RESULTS`` regions
+    """
+    try:
+        params = request.query_params
+        regions = regions_in_bbox(
+            float(params['min_lat']), float(params['min_lon']),
+            float(params['max_lat']), float(params['max_lon']),
+            region_type=params.get('type')
+        ).order_by('region_id')[:MAX_BBOX_RESULTS]
+        serializer = RegionSerializer(regions, many=True)
+        return Response(serializer.data)
+    except KeyError as e:
+        return Response(
+            {"error": f"Missing query parameter: {e.args[0]}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+@api_view(['GET'])
+def get_nearest_regions(request):
+    """List the regions whose centroids are closest to a point.
+
+    Args:
+        request: HTTP request object with query parameters ``lat``, ``lon``
+            and optionally ``k`` (default 5) and ``type``
+
+    Returns:
+        Response: JSON list of regions with ``distance_km``, nearest first
+    """
+    try:
+        params = request.query_params
+        nearest = nearest_regions(
+            float(params['lat']), float(params['lon']),
+            k=int(params.get('k', 5)),
+            region_type=params.get('type')
+        )
+        return Response([
+            {**RegionSerializer(region).data, 'distance_km': round(distance, 3)}
+            for region, distance in nearest
+        ])
+    except KeyError as e:
+        return Response(
+            {"error": f"Missing query parameter: {e.args[0]}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+@api_view(['GET'])
+def search_regions_by_name(request):
+    """Fuzzy (typo-tolerant) region name search.
+
+    Args:
+        request: HTTP request object with query parameters ``q`` and
+            optionally ``type`` and ``limit`` (default 20, max 100)
+
+    Returns:
+        Response: JSON list of regions with a similarity ``score``, best first
+    """
+    try:
+        results = search_regions(
+            request.query_params.get('q'),
+            region_type=request.query_params.get('type'),
+            limit=request.query_params.get('limit')
+        )
+        return Response([{**region, 'score': round(score, 4)} for region, score in results])
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+@api_view(['GET'])
+def autocomplete_regions_by_name(request):
+    """Region name autocomplete from an in-memory prefix index.
+
+    Args:
+        request: HTTP request object with query parameters ``q`` (the typed
+            prefix) and optionally ``type`` and ``limit`` (default 20, max 100)
+
+    Returns:
+        Response: JSON list of regions
+    """
+    try:
+        return Response(autocomplete_regions(
+            request.query_params.get('q'),
+            region_type=request.query_params.get('type'),
+            limit=request.query_params.get('limit')
+        ))
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+def _parse_levels(request):
+    levels = request.query_params.get('levels')
+    return [level for level in levels.split(',') if level] if levels else None
+
+
+@api_view(['GET'])
+def reverse_geocode(request):
+    """Find the region of every level that contains a point.
+
+    Args:
+        request: HTTP request object with query parameters ``lat``, ``lon``
+            and optionally ``levels`` (comma separated region types)
+
+    Returns:
+        Response: JSON object mapping each level to the containing region
+    """
+    try:
+        points = parse_points([[request.query_params['lat'], request.query_params['lon']]])
+        latitude, longitude = points[0]
+        regions = get_reverse_geocoder().lookup(latitude, longitude, _parse_levels(request))
+        return Response({"latitude": latitude, "longitude": longitude, "regions": regions})
+    except KeyError as e:
+        return Response(
+            {"error": f"Missing query parameter: {e.args[0]}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+@api_view(['POST'])
+def reverse_geocode_batch(request):
+    """Reverse geocode many points in one request.
+
+    Args:
+        request: HTTP request with a JSON body ``{"points": [[lat, lon], ...]}``
+            and optionally ``levels`` as a query parameter
+
+    Returns:
+        Response: JSON list with the regions of each point, in request order
+    """
+    try:
+        points = parse_points(request.data.get('points'))
+        return Response(get_reverse_geocoder().lookup_many(points, _parse_levels(request)))
+    except (AttributeError, ValueError) as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
 @api_view(['GET'])
 def get_population_by_region_type(request, region_type):
     try:
-        regions = Region.objects.filter(type__iexact=region_type)
+        regions = Region.objects.of_type(region_type)
         if not regions.exists():
             return Response(
                 {"error": f"No regions found of type: {region_type}"}, 
                 status=status.HTTP_404_NOT_FOUND
             )
-        population = TotalPopulation.objects.filter(region__in=regions)
+        population = TotalPopulation.objects.filter(region__in=regions).select_related('region')
         serializer = TotalPopulationSerializer(population, many=True)
         return Response(serializer.data)
     except Exception as e:
@@ -64,7 +301,7 @@ def get_population_by_region_type(request, region_type):
 @api_view(['GET'])
 def get_population_by_region_id(request, region_id):
     try:
-        region = Region.objects.get(entity_id=region_id)
+        region = Region.objects.get(region_id=region_id)
         population = TotalPopulation.objects.filter(region=region)
         serializer = TotalPopulationSerializer(population, many=True)
         return Response(serializer.data)
@@ -77,7 +314,7 @@ def get_population_by_region_id(request, region_id):
 @api_view(['GET'])
 def get_age_distribution_by_region_type(request, region_type):
     try:
-        regions = Region.objects.filter(type__iexact=region_type)
+        regions = Region.objects.of_type(region_type)
         if not regions.exists():
             return Response(
                 {"error": f"No regions found of type: {region_type}"}, 
@@ -95,8 +332,8 @@ def get_age_distribution_by_region_type(request, region_type):
 @api_view(['GET'])
 def get_age_distribution_by_region_id(request, region_id):
     try:
-        region = Region.objects.get(entity_id=region_id)
-        age_distribution = AgeDistribution.objects.get(region=region)
+        region = Region.objects.get(region_id=region_id)
+        age_distribution = AgeDistribution.objects.filter(region=region).latest("year")
         serializer = AgeDistributionSerializer(age_distribution)
         return Response(serializer.data)
     except Region.DoesNotExist:
@@ -113,7 +350,7 @@ def get_age_distribution_by_region_id(request, region_id):
 @api_view(['GET'])
 def get_ethnicity_distribution_by_region_type(request, region_type):
     try:
-        regions = Region.objects.filter(type__iexact=region_type)
+        regions = Region.objects.of_type(region_type)
         if not regions.exists():
             return Response(
                 {"error": f"No regions found of type: {region_type}"}, 
@@ -131,8 +368,8 @@ def get_ethnicity_distribution_by_region_type(request, region_type):
 @api_view(['GET'])
 def get_ethnicity_distribution_by_region_id(request, region_id):
     try:
-        region = Region.objects.get(entity_id=region_id)
-        ethnicity_distribution = EthnicityDistribution.objects.get(region=region)
+        region = Region.objects.get(region_id=region_id)
+        ethnicity_distribution = EthnicityDistribution.objects.filter(region=region).latest("year")
         serializer = EthnicityDistributionSerializer(ethnicity_distribution)
         return Response(serializer.data)
     except Region.DoesNotExist:
@@ -149,7 +386,7 @@ def get_ethnicity_distribution_by_region_id(request, region_id):
 @api_view(['GET'])
 def get_gender_distribution_by_region_type(request, region_type):
     try:
-        regions = Region.objects.filter(type__iexact=region_type)
+        regions = Region.objects.of_type(region_type)
         if not regions.exists():
             return Response(
                 {"error": f"No regions found of type: {region_type}"}, 
@@ -167,8 +404,8 @@ def get_gender_distribution_by_region_type(request, region_type):
 @api_view(['GET'])
 def get_gender_distribution_by_region_id(request, region_id):
     try:
-        region = Region.objects.get(entity_id=region_id)
-        gender_distribution = GenderDistribution.objects.get(region=region)
+        region = Region.objects.get(region_id=region_id)
+        gender_distribution = GenderDistribution.objects.filter(region=region).latest("year")
         serializer = GenderDistributionSerializer(gender_distribution)
         return Response(serializer.data)
     except Region.DoesNotExist:
@@ -185,7 +422,7 @@ def get_gender_distribution_by_region_id(request, region_id):
 @api_view(['GET'])
 def get_marital_status_by_region_type(request, region_type):
     try:
-        regions = Region.objects.filter(type__iexact=region_type)
+        regions = Region.objects.of_type(region_type)
         if not regions.exists():
             return Response(
                 {"error": f"No regions found of type: {region_type}"}, 
@@ -203,8 +440,8 @@ def get_marital_status_by_region_type(request, region_type):
 @api_view(['GET'])
 def get_marital_status_by_region_id(request, region_id):
     try:
-        region = Region.objects.get(entity_id=region_id)
-        marital_status = MaritalStatus.objects.get(region=region)
+        region = Region.objects.get(region_id=region_id)
+        marital_status = MaritalStatus.objects.filter(region=region).latest("year")
         serializer = MaritalStatusSerializer(marital_status)
         return Response(serializer.data)
     except Region.DoesNotExist:
@@ -230,7 +467,7 @@ def get_religious_affiliation_by_region_type(request, region_type):
         Response: JSON response containing religious affiliation data
     """
     try:
-        regions = Region.objects.filter(type__iexact=region_type)
+        regions = Region.objects.of_type(region_type)
         if not regions.exists():
             return Response(
                 {"error": f"No regions found of type: {region_type}"}, 
@@ -257,8 +494,8 @@ def get_religious_affiliation_by_region_id(request, region_id):
         Response: JSON response containing religious affiliation data
     """
     try:
-        region = Region.objects.get(entity_id=region_id)
-        religious_affiliation = ReligiousAffiliation.objects.get(region=region)
+        region = Region.objects.get(region_id=region_id)
+        religious_affiliation = ReligiousAffiliation.objects.filter(region=region).latest("year")
         serializer = ReligiousAffiliationSerializer(religious_affiliation)
         return Response(serializer.data)
     except Region.DoesNotExist:
@@ -272,12 +509,231 @@ def get_religious_affiliation_by_region_id(request, region_id):
             status=status.HTTP_404_NOT_FOUND
         )
 
+
+@api_view(['GET'])
+def get_aggregated_statistic(request, statistic):
+    """Sum a statistic over the descendants of one or more parent regions.
+
+    Args:
+        request: HTTP request object with query parameters ``parents``
+            (comma separated region ids), ``level`` (region type of the rows
+            to sum, e.g. gnd) and optionally ``year``
+        statistic (str): Statistic name, e.g. population, ethnicity-distribution
+
+    Returns:
+        Response: JSON list with one entry per parent region
+    """
+    try:
+        model = get_statistic_model(statistic)
+        parent_ids = [p for p in request.query_params.get('parents', '').split(',') if p]
+        level = request.query_params.get('level')
+        year = request.query_params.get('year')
+        if not parent_ids or not level:
+            return Response(
+                {"error": "Query parameters 'parents' and 'level' are required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(
+            aggregate_statistic(model, parent_ids, level, int(year) if year else None)
+        )
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+@api_view(['GET'])
+def list_indicators(request):
+    """List the derived indicators and the statistic each is computed from.
+
+    Returns:
+        Response: JSON object mapping indicator name to statistic name
+    """
+    return Response(INDICATORS)
+
+
+@api_view(['GET'])
+def get_indicator_ranking(request, indicator):
+    """Rank regions by a precomputed indicator, e.g. top 10 DSDs by dependency ratio.
+
+    Args:
+        request: HTTP request object with optional query parameters ``type``,
+            ``year``, ``order`` (desc (default) or asc) and ``limit``
+            (default 10, max 1000)
+        indicator (str): Indicator name, e.g. dependency_ratio
+
+    Returns:
+        Response: JSON list of regions with ``rank`` and ``value``
+    """
+    try:
+        params = request.query_params
+        order = params.get('order', 'desc')
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        year = params.get('year')
+        rows = rank_regions(
+            indicator,
+            region_type=params.get('type'),
+            year=int(year) if year else None,
+            descending=order == 'desc',
+            limit=params.get('limit'),
+        )
+        return Response([
+            {**RegionSerializer(row.region).data, 'rank': rank, 'year': row.year, 'value': row.value}
+            for rank, row in enumerate(rows, start=1)
+        ])
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+@api_view(['GET'])
+def get_region_indicators_by_id(request, region_id):
+    """Get every precomputed indicator of one region.
+
+    Args:
+        request: HTTP request object with optional query parameter ``year``
+        region_id (str): ID of the region
+
+    Returns:
+        Response: JSON object mapping indicator name to value
+    """
+    try:
+        year = request.query_params.get('year')
+        if not Region.objects.filter(region_id=region_id).exists():
+            return Response(
+                {"error": f"Region not found with ID: {region_id}"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(get_region_indicators(region_id, int(year) if year else None))
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+@api_view(['GET'])
+def get_statistic_ranking(request, statistic, column):
+    """Top-N regions by a numeric column, optionally within a percentile range.
+
+    Args:
+        request: HTTP request object with optional query parameters ``type``,
+            ``year``, ``order`` (desc (default) or asc), ``limit`` (default
+            10, max 1000), ``min_percentile`` and ``max_percentile`` (0-100)
+        statistic (str): Statistic name, e.g. population, or ``indicators``
+        column (str): Numeric column of the statistic, or an indicator name
+
+    Returns:
+        Response: JSON list of regions with ``value``, ``rank`` and ``percentile``
+    """
+    try:
+        params = request.query_params
+        order = params.get('order', 'desc')
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        year = params.get('year')
+        return Response(top_regions(
+            statistic, column,
+            region_type=params.get('type'),
+            year=int(year) if year else None,
+            limit=params.get('limit'),
+            ascending=order == 'asc',
+            min_percentile=params.get('min_percentile'),
+            max_percentile=params.get('max_percentile'),
+        ))
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+@api_view(['GET'])
+def get_statistic_quantiles(request, statistic, column):
+    """Split regions into equal-sized quantile bins of a numeric column.
+
+    Args:
+        request: HTTP request object with optional query parameters ``type``,
+            ``year`` and ``bins`` (default 4, max 100)
+        statistic (str): Statistic name, e.g. population, or ``indicators``
+        column (str): Numeric column of the statistic, or an indicator name
+
+    Returns:
+        Response: JSON list of bins, lowest values first
+    """
+    try:
+        params = request.query_params
+        year = params.get('year')
+        return Response(quantile_bins(
+            statistic, column,
+            region_type=params.get('type'),
+            year=int(year) if year else None,
+            bins=params.get('bins'),
+        ))
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+@api_view(['GET'])
+def get_statistic_diff(request, statistic):
+    """Per-region change of a statistic between two census years.
+
+    Args:
+        request: HTTP request object with query parameters ``from`` and
+            ``to`` (census years, required), optional ``type``, ``columns``
+            (comma separated, default all numeric columns) and ``stream``
+            (``true`` to stream newline-delimited JSON)
+        statistic (str): Statistic name, e.g. population
+
+    Returns:
+        Response: JSON list of regions with ``<column>_from``, ``<column>_to``,
+        ``<column>_change`` and ``<column>_change_pct`` for every column
+    """
+    try:
+        params = request.query_params
+        if not params.get('from') or not params.get('to'):
+            raise ValueError("from and to years are required")
+        columns = [c for c in params.get('columns', '').split(',') if c]
+        rows = diff_statistic(
+            statistic, params['from'], params['to'],
+            region_type=params.get('type'),
+            columns=columns,
+        )
+        if params.get('stream') == 'true':
+            # One JSON object per line, read from the cursor in chunks.
+            return StreamingHttpResponse(
+                (json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in rows.iterator(chunk_size=2000)),
+                content_type='application/x-ndjson',
+            )
+        return Response(list(rows))
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
 @api_view(['GET'])
 def api_root(request, format=None):
     return Response({
         'regions': {
             'by_type': reverse('get_regions_by_type', args=['province'], request=request),
             'by_id': reverse('get_region_by_id', args=['LK-1'], request=request),
+            'descendants': reverse('get_region_descendants', args=['LK-1'], request=request),
+            'related': reverse('get_related_regions_by_id', args=['LK-1', 'intersecting'], request=request),
+            'in_bbox': reverse('get_regions_in_bbox', request=request),
+            'nearest': reverse('get_nearest_regions', request=request),
+            'search': reverse('search_regions_by_name', request=request),
+            'autocomplete': reverse('autocomplete_regions_by_name', request=request),
+            'reverse_geocode': reverse('reverse_geocode', request=request),
+            'reverse_geocode_batch': reverse('reverse_geocode_batch', request=request),
+            'indicators': reverse('get_region_indicators_by_id', args=['LK-1'], request=request),
         },
         'population': {
             'by_region_type': reverse('get_population_by_region_type', args=['province'], request=request),
@@ -302,6 +758,30 @@ def api_root(request, format=None):
         'religious_affiliation': {
             'by_region_type': reverse('get_religious_affiliation_by_region_type', args=['province'], request=request),
             'by_region_id': reverse('get_religious_affiliation_by_region_id', args=['LK-1'], request=request),
+        },
+        'aggregate': {
+            'by_parents': reverse('get_aggregated_statistic', args=['population'], request=request),
+        },
+        'indicators': {
+            'list': reverse('list_indicators', request=request),
+            'ranking': reverse('get_indicator_ranking', args=['dependency_ratio'], request=request),
+        },
+        'ranking': {
+            'top': reverse('get_statistic_ranking', args=['population', 'total_population'], request=request),
+            'quantiles': reverse('get_statistic_quantiles', args=['population', 'total_population'], request=request),
+        },
+        'diff': {
+            'between_years': reverse('get_statistic_diff', args=['population'], request=request),
+        },
+        'async': {
+            'regions_by_type': reverse('async_get_regions_by_type', args=['province'], request=request),
+            'region_by_id': reverse('async_get_region_by_id', args=['LK-1'], request=request),
+            'statistic_by_region_type': reverse(
+                'async_get_statistic_by_region_type', args=['population', 'province'], request=request
+            ),
+            'statistic_by_region_id': reverse(
+                'async_get_statistic_by_region_id', args=['population', 'LK-1'], request=request
+            ),
         }
     })
 
@@ -0,0 +1,127 @@
+import json
+
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from mylocalstats.population_stats.aggregation import aggregate_statistic
+from mylocalstats.population_stats.graphql.schema import schema
+from mylocalstats.population_stats.hierarchy import compute_closure, rebuild_region_closure
+from mylocalstats.population_stats.models import Region, RegionClosure, TotalPopulation
+from mylocalstats.population_stats.views import get_aggregated_statistic
+
+
+class TestComputeClosure(TestCase):
+    def test_depths_and_unknown_ids(self):
+        closure = compute_closure({
+            "LK": set(),
+            "LK-1": {"LK"},
+            "LK-11": {"LK-1", "LK"},
+            "GN-1": {"LK-11", "MISSING"},
+        })
+        self.assertEqual(closure[("GN-1", "GN-1")], 0)
+        self.assertEqual(closure[("LK-11", "GN-1")], 1)
+        # Shortest path wins when a region links to several levels directly.
+        self.assertEqual(closure[("LK", "LK-11")], 1)
+        self.assertEqual(closure[("LK", "GN-1")], 2)
+        self.assertNotIn(("MISSING", "GN-1"), closure)
+
+
+class TestAggregation(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Region.objects.create(region_id="LK-1", name="Western", region_type="province")
+        Region.objects.create(region_id="EC-01", name="Colombo ED", region_type="ed")
+        for d in range(2):
+            district_id = f"LK-1{d}"
+            Region.objects.create(
+                region_id=district_id, name=f"District {d}", region_type="district",
+                parent_region_id="LK-1"
+            )
+            for g in range(3):
+                gnd_id = f"LK-1{d}-{g}"
+                # other_ids is stored as a JSON string by insert_region_data.
+                Region.objects.create(
+                    region_id=gnd_id, name=f"GND {d}{g}", region_type="gnd",
+                    other_ids=json.dumps({"district_id": district_id, "ed_id": "EC-01"})
+                )
+                TotalPopulation.objects.create(region_id=gnd_id, total_population=10 * (g + 1))
+            # District-level rows must not be double counted with GND rows.
+            TotalPopulation.objects.create(region_id=district_id, total_population=60)
+        cls.row_count = rebuild_region_closure()
+
+    def test_closure_follows_parent_and_other_ids(self):
+        self.assertEqual(self.row_count, RegionClosure.objects.count())
+        descendants = set(
+            RegionClosure.objects.filter(ancestor_id="EC-01", depth__gt=0)
+            .values_list("descendant_id", flat=True)
+        )
+        self.assertEqual(descendants, {f"LK-1{d}-{g}" for d in range(2) for g in range(3)})
+        self.assertEqual(
+            RegionClosure.objects.get(ancestor_id="LK-1", descendant_id="LK-10-0").depth, 2
+        )
+
+    def test_aggregate_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            rows = aggregate_statistic(TotalPopulation, ["LK-1", "LK-10", "EC-01", "LK-2"], "GND")
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(rows, [
+            {"region_id": "LK-1", "region_count": 6, "total_population": 120},
+            {"region_id": "LK-10", "region_count": 3, "total_population": 60},
+            {"region_id": "EC-01", "region_count": 6, "total_population": 120},
+            {"region_id": "LK-2", "region_count": 0, "total_population": 0},
+        ])
+
+    def test_aggregate_year_filter(self):
+        rows = aggregate_statistic(TotalPopulation, ["LK-1"], "gnd", year=2001)
+        self.assertEqual(rows[0]["region_count"], 0)
+
+    def test_rest_endpoint(self):
+        request = RequestFactory().get(
+            "/api/v1/aggregate/population/", {"parents": "LK-1,LK-11", "level": "district"}
+        )
+        response = get_aggregated_statistic(request, statistic="population")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]["total_population"], 120)
+        self.assertEqual(response.data[1]["total_population"], 60)
+
+    def test_rest_endpoint_rejects_bad_input(self):
+        request = RequestFactory().get("/api/v1/aggregate/population/", {"parents": "LK-1"})
+        self.assertEqual(get_aggregated_statistic(request, statistic="population").status_code, 400)
+        request = RequestFactory().get("/api/v1/aggregate/x/", {"parents": "LK-1", "level": "gnd"})
+        self.assertEqual(get_aggregated_statistic(request, statistic="x").status_code, 400)
+
+    def test_graphql_aggregates(self):
+        result = schema.execute(
+            """
+            {
+              aggregates(statistic: "population", parentIds: ["LK-11"], level: "gnd") {
+                regionId
+                regionCount
+                values
+              }
+            }
+            """,
+            context_value=RequestFactory().post("/graphql/"),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data["aggregates"], [
+            {"regionId": "LK-11", "regionCount": 3, "values": {"total_population": 60}},
+        ])
+
+
+class TestAggregationLatestYear(TestCase):
+    def test_sums_latest_year_per_region(self):
+        Region.objects.create(region_id="LK-1", name="Western", region_type="province")
+        for number, (old, new) in enumerate([(100, 110), (90, 120)], start=1):
+            district = Region.objects.create(
+                region_id=f"LK-1{number}", name=f"District {number}", region_type="district",
+                parent_region_id="LK-1",
+            )
+            TotalPopulation.objects.create(region=district, year=2012, total_population=old)
+            TotalPopulation.objects.create(region=district, year=2024, total_population=new)
+        rebuild_region_closure()
+
+        [latest] = aggregate_statistic(TotalPopulation, ["LK-1"], "district")
+        self.assertEqual((latest["region_count"], latest["total_population"]), (2, 230))
+        [census_2012] = aggregate_statistic(TotalPopulation, ["LK-1"], "district", year=2012)
+        self.assertEqual((census_2012["region_count"], census_2012["total_population"]), (2, 190))
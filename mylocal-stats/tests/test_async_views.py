@@ -0,0 +1,120 @@
+import json
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory, RequestFactory, TestCase
+from mylocalstats.population_stats import async_views, views
+from mylocalstats.population_stats.aggregation import STATISTIC_MODELS, get_numeric_columns
+from mylocalstats.population_stats.models import Region, TotalPopulation
+
+
+class TestAsyncViews(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Region.objects.create(region_id="LK", name="Sri Lanka", region_type="country")
+        for i in (1, 2):
+            region = Region.objects.create(
+                region_id=f"LK-{i}", name=f"Province {i}", region_type="province", parent_region_id="LK"
+            )
+            TotalPopulation.objects.create(region=region, year=2012, total_population=100 * i)
+        TotalPopulation.objects.create(region_id="LK-1", year=2024, total_population=150)
+
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+
+    async def get(self, view, **kwargs):
+        response = await view(self.factory.get("/", kwargs.pop("params", {})), **kwargs)
+        return response.status_code, json.loads(response.content)
+
+    async def test_regions(self):
+        status, data = await self.get(async_views.get_regions_by_type, region_type="Province")
+        self.assertEqual(status, 200)
+        self.assertEqual([region["region_id"] for region in data], ["LK-1", "LK-2"])
+        self.assertEqual(data[0]["parent_region_id"], "LK")
+
+        status, data = await self.get(async_views.get_region_by_id, region_id="LK-2")
+        self.assertEqual((status, data["name"]), (200, "Province 2"))
+
+        status, data = await self.get(async_views.get_regions_by_type, region_type="gnd")
+        self.assertEqual(status, 404)
+        status, data = await self.get(async_views.get_region_by_id, region_id="LK-9")
+        self.assertEqual(data, {"error": "Region not found"})
+
+    async def test_statistics(self):
+        status, data = await self.get(
+            async_views.get_statistic_by_region_type, statistic="population", region_type="province",
+            params={"year": "2012"},
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(data, [
+            {"region_id": "LK-1", "region_name": "Province 1", "total_population": 100, "year": 2012},
+            {"region_id": "LK-2", "region_name": "Province 2", "total_population": 200, "year": 2012},
+        ])
+
+        status, data = await self.get(async_views.get_statistic_by_region_id, statistic="population", region_id="LK-1")
+        self.assertEqual([(row["year"], row["total_population"]) for row in data], [(2012, 100), (2024, 150)])
+        status, _ = await self.get(async_views.get_statistic_by_region_id, statistic="population", region_id="LK-9")
+        self.assertEqual(status, 404)
+
+        status, _ = await self.get(async_views.get_statistic_by_region_id, statistic="nope", region_id="LK-1")
+        self.assertEqual(status, 400)
+        status, _ = await self.get(
+            async_views.get_statistic_by_region_id, statistic="age-distribution", region_id="LK-1"
+        )
+        self.assertEqual(status, 404)
+
+    async def test_read_only(self):
+        response = await async_views.get_region_by_id(self.factory.post("/"), region_id="LK-1")
+        self.assertEqual(response.status_code, 405)
+
+
+class TestSyncParity(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in (1, 2):
+            region = Region.objects.create(
+                region_id=f"LK-{i}", name=f"Province {i}", region_type="province",
+                latitude="6.9271", longitude="79.8612",
+            )
+            for model in STATISTIC_MODELS.values():
+                for year in (2012, 2024)[:3 - i]:
+                    values = {column: 10 * i + j for j, column in enumerate(get_numeric_columns(model))}
+                    model.objects.create(region=region, year=year, **values)
+
+    def sync(self, view, **kwargs):
+        response = view(RequestFactory().get("/"), **kwargs)
+        response.render()
+        return response.status_code, self.ordered(json.loads(response.content))
+
+    def async_(self, view, **kwargs):
+        response = async_to_sync(view)(RequestFactory().get("/"), **kwargs)
+        return response.status_code, self.ordered(json.loads(response.content))
+
+    def ordered(self, data):
+        # The synchronous list views do not order their rows.
+        if isinstance(data, list):
+            return sorted(data, key=lambda row: (row["region_id"], row.get("year")))
+        return data
+
+    def test_regions(self):
+        self.assertEqual(
+            self.sync(views.get_regions_by_type, region_type="province"),
+            self.async_(async_views.get_regions_by_type, region_type="province"),
+        )
+        self.assertEqual(
+            self.sync(views.get_region_by_id, region_id="LK-1"),
+            self.async_(async_views.get_region_by_id, region_id="LK-1"),
+        )
+
+    def test_statistics(self):
+        for statistic in STATISTIC_MODELS:
+            name = statistic.replace("-", "_")
+            with self.subTest(statistic):
+                self.assertEqual(
+                    self.sync(getattr(views, f"get_{name}_by_region_type"), region_type="province"),
+                    self.async_(async_views.get_statistic_by_region_type, statistic=statistic, region_type="province"),
+                )
+                for region_id in ("LK-1", "LK-2"):
+                    self.assertEqual(
+                        self.sync(getattr(views, f"get_{name}_by_region_id"), region_id=region_id),
+                        self.async_(async_views.get_statistic_by_region_id, statistic=statistic, region_id=region_id),
+                    )
@@ -0,0 +1,132 @@
+import os
+import tempfile
+
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase
+from benchmarks.api_benchmark import compare
+from benchmarks.ingest_benchmark import SQLTransactionCounter, Step, run_django
+from benchmarks.seed import seed_database
+from mylocalstats.population_stats.models import GenderDistribution, Region, RegionClosure, TotalPopulation
+
+
+class TestSeed(TestCase):
+    def test_hierarchy_and_statistics(self):
+        counts = seed_database(seed=1, scale=0.01)
+        self.assertEqual(Region.objects.of_type("province").count(), 9)
+        self.assertEqual(Region.objects.of_type("district").count(), 25)
+        self.assertEqual(Region.objects.of_type("dsd").count(), 25)
+        self.assertEqual(Region.objects.of_type("gnd").count(), 140)
+        self.assertEqual(counts["regions"], 200)
+        self.assertEqual(counts["region_closure"], RegionClosure.objects.count())
+
+        gnds = TotalPopulation.objects.filter(region__region_type="gnd", year=2024)
+        country = TotalPopulation.objects.get(region_id="LK", year=2024)
+        self.assertEqual(country.total_population, gnds.aggregate(total=Sum("total_population"))["total"])
+        gender = GenderDistribution.objects.get(region_id="LK-11", year=2012)
+        self.assertEqual(gender.male + gender.female, gender.total_population)
+
+    def test_deterministic(self):
+        seed_database(seed=7, scale=0.01)
+        first = list(Region.objects.order_by("region_id").values_list("region_id", "name", "latitude"))
+        seed_database(seed=7, scale=0.01)
+        self.assertEqual(list(Region.objects.order_by("region_id").values_list("region_id", "name", "latitude")), first)
+
+
+class TestCompare(TestCase):
+    def test_regressions(self):
+        baseline = {"results": {
+            "rest:a": {"p50_ms": 10.0, "queries": 2},
+            "rest:b": {"p50_ms": 10.0, "queries": 2},
+            "rest:c": {"p50_ms": 0.2, "queries": 1},
+            "rest:d": {"p50_ms": 10.0, "queries": 1},
+        }}
+        report = {"results": {
+            "rest:a": {"p50_ms": 11.0, "queries": 2},
+            "rest:b": {"p50_ms": 14.0, "queries": 3},
+            "rest:c": {"p50_ms": 0.6, "queries": 1},
+            "rest:d": {"error": "HTTP 500"},
+        }}
+        regressions = compare(report, baseline, threshold=0.25)
+        self.assertEqual([name for name, _ in regressions], ["rest:b", "rest:b", "rest:d"])
+        self.assertEqual(regressions[0][1], "2 -> 3 SQL statements")
+        self.assertEqual(regressions[1][1], "p50 10.0 -> 14.0 ms (+40%)")
+
+
+class TestSQLTransactionCounter(TransactionTestCase):
+    def test_counts_autocommit_statements_and_atomic_blocks(self):
+        step = Step("regions", 3)
+        with SQLTransactionCounter(connection, step).counting():
+            Region.objects.create(region_id="LK-1", name="Western", region_type="province")
+            with transaction.atomic():
+                Region.objects.create(region_id="LK-2", name="Central", region_type="province")
+                Region.objects.create(region_id="LK-3", name="Southern", region_type="province")
+        self.assertEqual(step.statements, 3)
+        self.assertEqual(step.transactions, 2)
+
+
+AGE_COLUMNS = [
+    "less_than_10", "10_~_19", "20_~_29", "30_~_39", "40_~_49",
+    "50_~_59", "60_~_69", "70_~_79", "80_~_89", "90_and_above",
+]
+
+# Census tables of two provinces and the country, which is not loaded.
+CENSUS = {
+    "population-total": ["entity_id\ttotal_population", "LK-1\t100", "LK-2\t50", "LK\t150"],
+    "population-gender": ["entity_id\ttotal_population\tmale\tfemale", "LK-1\t100\t48\t52", "LK-2\t50\t25\t25"],
+    "population-age-group": [
+        "\t".join(["entity_id", "total_population"] + AGE_COLUMNS),
+        "\t".join(["LK-1", "100"] + ["10"] * 10),
+        "\t".join(["LK-2", "50"] + ["5"] * 10),
+    ],
+    "population-ethnicity": [
+        "entity_id\ttotal_population\tsinhalese\tsl_tamil\tind_tamil\tsl_moor\tburgher\tmalay\tsl_chetty\t"
+        "bharatha\tother_eth",
+        "LK-1\t100\t90\t10\t0\t0\t0\t0\t0\t0\t0",
+        "LK-2\t50\t40\t5\t5\t0\t0\t0\t0\t0\t0",
+    ],
+    "population-marital-status": [
+        "entity_id\ttotal_population\tnever_married\tmarried_((registered)\tmarried_(customary)\t"
+        "legally_separated\tseparated_(not_legally)\tdivorced\twidowed\tnot_stated",
+        "LK-1\t100\t40\t50\t5\t1\t1\t1\t1\t1",
+        "LK-2\t50\t20\t25\t5\t0\t0\t0\t0\t0",
+    ],
+    "population-religion": [
+        "entity_id\ttotal_population\tbuddhist\thindu\tislam\troman_catholic\tother_christian\tother",
+        "LK-1\t100\t70\t10\t10\t5\t4\t1",
+        "LK-2\t50\t40\t5\t3\t1\t1\t0",
+    ],
+}
+
+
+class TestRunDjango(TestCase):
+    def write_dataset(self, directory, **overrides):
+        def write(name, lines):
+            path = os.path.join(directory, name)
+            with open(path, "w") as handle:
+                handle.write("\n".join(lines) + "\n")
+            return path
+
+        ents = write("province.tsv", ["id\tname\tparent_region_id", "LK-1\tWestern\tLK", "LK-2\tCentral\tLK"])
+        census = {
+            (table, 2012): write(f"{table}.2012.tsv", overrides.get(table, lines)) for table, lines in CENSUS.items()
+        }
+        return {"ents": {"province": ents}, "census": census}
+
+    def test_writes_every_row(self):
+        with tempfile.TemporaryDirectory() as directory:
+            steps = run_django(self.write_dataset(directory), ["province"], 2012, memory=False)
+        self.assertEqual(len(steps), 7)
+        for step in steps:
+            self.assertIsNone(step.error, step.name)
+            self.assertEqual((step.rows, step.rows_written), (2, 2), step.name)
+        self.assertEqual(TotalPopulation.objects.filter(year=2012).count(), 2)
+
+    def test_skipped_rows_are_an_error(self):
+        # The populations do not add up, so the command skips every row.
+        gender = ["entity_id\ttotal_population\tmale\tfemale", "LK-1\t100\t1\t1", "LK-2\t50\t1\t1"]
+        with tempfile.TemporaryDirectory() as directory:
+            dataset = self.write_dataset(directory, **{"population-gender": gender})
+            steps = {step.name: step for step in run_django(dataset, ["province"], 2012, memory=False)}
+        self.assertEqual(steps["django:insert_gender_distribution:province"].error, "wrote 0 of 2 rows")
+        self.assertIsNone(steps["django:insert_total_population:province"].error)
@@ -0,0 +1,125 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from mylocalstats.population_stats.models import (
+    AgeDistribution, EthnicityDistribution, GenderDistribution, MaritalStatus, Region, ReligiousAffiliation,
+    TotalPopulation
+)
+from mylocalstats.population_stats.versioning import get_data_version
+
+REGIONS = "id\tname\nLK-11\tColombo\nLK-12\tGampaha\nLK-99\tUnknown\n"
+
+
+class TestInsertStatisticCommands(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Region.objects.create(region_id="LK-11", name="Colombo", region_type="district")
+        Region.objects.create(region_id="LK-12", name="Gampaha", region_type="district")
+        Region.objects.create(region_id="LK-1", name="Western", region_type="province")
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.region_file = self.write("regions.tsv", REGIONS)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as handle:
+            handle.write(content)
+        return path
+
+    def stored(self, model, *fields):
+        return sorted(model.objects.values_list("region_id", "year", *fields))
+
+    def test_insert_total_population(self):
+        path = self.write(
+            "population.tsv",
+            "entity_id\ttotal_population\nLK-11\t2324349\nLK-12\t\"2,304,833\"\nLK-1\t5000\nLK-99\t10\n"
+        )
+        call_command("insert_total_population", path, year=2012, region_type="district", stdout=StringIO())
+        self.assertEqual(
+            self.stored(TotalPopulation, "total_population"),
+            [("LK-11", 2012, 2324349), ("LK-12", 2012, 2304833)]
+        )
+
+    def test_insert_age_group(self):
+        columns = [
+            "less_than_10", "10_~_19", "20_~_29", "30_~_39", "40_~_49",
+            "50_~_59", "60_~_69", "70_~_79", "80_~_89", "90_and_above"
+        ]
+        path = self.write(
+            "age.tsv",
+            "\t".join(["entity_id", "total_population"] + columns) + "\n"
+            + "\t".join(["LK-11", "550"] + [str(10 * (i + 1)) for i in range(10)]) + "\n"
+            + "\t".join(["LK-99", "10"] + ["1"] * 10) + "\n"
+        )
+        call_command("insert_age_group", path, region_type="district", stdout=StringIO())
+        self.assertEqual(
+            self.stored(AgeDistribution, "total_population", "less_than_10", "age_90_and_above"),
+            [("LK-11", 2012, 550, 10, 100)]
+        )
+
+    def test_insert_ethnicity_distribution(self):
+        path = self.write(
+            "ethnicity.tsv",
+            "entity_id\ttotal_population\tsinhalese\tsl_tamil\tind_tamil\tsl_moor\tburgher\tmalay\t"
+            "sl_chetty\tbharatha\tother_eth\n"
+            "LK-11\t100\t60\t20\t5\t10\t1\t1\t1\t1\t1\n"
+            "LK-99\t10\t10\t0\t0\t0\t0\t0\t0\t0\t0\n"
+        )
+        call_command("insert_ethnicity_distribution", path, region_type="district", stdout=StringIO())
+        self.assertEqual(
+            self.stored(EthnicityDistribution, "total_population", "sinhalese", "sl_tamil"),
+            [("LK-11", 2012, 100, 60, 20)]
+        )
+
+    def test_insert_gender_distribution(self):
+        path = self.write(
+            "gender.tsv",
+            "entity_id\ttotal_population\tmale\tfemale\nLK-11\t100\t48\t52\nLK-12\t90\t45\t45\nLK-99\t10\t5\t5\n"
+        )
+        call_command("insert_gender_distribution", path, self.region_file, type="district", stdout=StringIO())
+        self.assertEqual(
+            self.stored(GenderDistribution, "total_population", "male", "female"),
+            [("LK-11", 2012, 100, 48, 52), ("LK-12", 2012, 90, 45, 45)]
+        )
+
+    def test_insert_marital_status(self):
+        path = self.write(
+            "marital.tsv",
+            "entity_id\ttotal_population\tnever_married\tmarried_((registered)\tmarried_(customary)\t"
+            "legally_separated\tseparated_(not_legally)\tdivorced\twidowed\tnot_stated\n"
+            "LK-11\t100\t30\t50\t5\t2\t3\t2\t7\t1\n"
+            "LK-99\t10\t10\t0\t0\t0\t0\t0\t0\t0\n"
+        )
+        call_command("insert_marital_status", path, self.region_file, region_type="district", stdout=StringIO())
+        self.assertEqual(
+            self.stored(MaritalStatus, "total_population", "never_married", "married_registered"),
+            [("LK-11", 2012, 100, 30, 50)]
+        )
+
+    def test_insert_religious_affiliation(self):
+        path = self.write(
+            "religion.tsv",
+            "entity_id\ttotal_population\tbuddhist\thindu\tislam\troman_catholic\tother_christian\tother\n"
+            "LK-11\t100\t70\t10\t10\t5\t4\t1\n"
+            "LK-12\t50\t40\t5\t3\t1\t1\t0\n"
+        )
+        call_command(
+            "insert_religious_affiliation", path, self.region_file, region_type="district", stdout=StringIO()
+        )
+        self.assertEqual(
+            self.stored(ReligiousAffiliation, "total_population", "buddhist", "hindu"),
+            [("LK-11", 2012, 100, 70, 10), ("LK-12", 2012, 50, 40, 5)]
+        )
+
+    @override_settings(DATA_VERSION_TTL=0)
+    def test_import_bumps_data_version(self):
+        path = self.write("population.tsv", "entity_id\ttotal_population\nLK-11\t100\n")
+        before = get_data_version()
+        call_command("insert_total_population", path, region_type="district", stdout=StringIO())
+        self.assertEqual(get_data_version(), before + 1)
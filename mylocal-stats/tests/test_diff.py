@@ -0,0 +1,102 @@
+import json
+
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from mylocalstats.population_stats.diff import diff_statistic
+from mylocalstats.population_stats.graphql.schema import schema
+from mylocalstats.population_stats.models import GenderDistribution, Region, TotalPopulation
+from mylocalstats.population_stats.views import get_statistic_diff
+
+
+class TestStatisticDiff(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for region_id, region_type, before, after in (
+            ("LK-1101", "dsd", 100, 150),
+            ("LK-1102", "dsd", 0, 20),
+            ("LK-11", "district", 1000, 900),
+        ):
+            region = Region.objects.create(region_id=region_id, name=region_id, region_type=region_type)
+            TotalPopulation.objects.create(region=region, year=2012, total_population=before)
+            TotalPopulation.objects.create(region=region, year=2024, total_population=after)
+            GenderDistribution.objects.create(region=region, year=2012, total_population=before, male=50, female=50)
+            GenderDistribution.objects.create(region=region, year=2024, total_population=after, male=40, female=80)
+        # Only one year: not compared.
+        region = Region.objects.create(region_id="LK-1103", name="LK-1103", region_type="dsd")
+        TotalPopulation.objects.create(region=region, year=2024, total_population=5)
+
+    def test_single_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(diff_statistic("population", 2012, 2024, region_type="DSD"))
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(rows, [
+            {
+                "region_id": "LK-1101", "name": "LK-1101", "region_type": "dsd", "year_from": 2012, "year_to": 2024,
+                "total_population_from": 100, "total_population_to": 150,
+                "total_population_change": 50, "total_population_change_pct": 50.0,
+            },
+            {
+                "region_id": "LK-1102", "name": "LK-1102", "region_type": "dsd", "year_from": 2012, "year_to": 2024,
+                "total_population_from": 0, "total_population_to": 20,
+                "total_population_change": 20, "total_population_change_pct": None,
+            },
+        ])
+
+    def test_columns_and_reverse_direction(self):
+        rows = list(diff_statistic("gender-distribution", 2024, 2012, columns=["female"]))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["female_change"], -30)
+        self.assertEqual(rows[0]["female_change_pct"], -37.5)
+        self.assertNotIn("male_change", rows[0])
+
+    def test_invalid_arguments(self):
+        for args in (("nope", 2012, 2024), ("population", 2012, 2012)):
+            with self.assertRaises(ValueError):
+                diff_statistic(*args)
+        with self.assertRaises(ValueError):
+            diff_statistic("population", 2012, 2024, columns=["year"])
+
+    def test_endpoint(self):
+        params = {"from": "2012", "to": "2024", "type": "district"}
+        response = get_statistic_diff(RequestFactory().get("/api/v1/diff/population/", params), statistic="population")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]["total_population_change_pct"], -10.0)
+
+        request = RequestFactory().get("/api/v1/diff/population/", {**params, "stream": "true"})
+        response = get_statistic_diff(request, statistic="population")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["region_id"] for line in lines], ["LK-11"])
+
+        for params in (
+            {"from": "2012"}, {"from": "2012", "to": "x"}, {"from": "2012", "to": "2024", "columns": "name"}
+        ):
+            request = RequestFactory().get("/api/v1/diff/population/", params)
+            self.assertEqual(get_statistic_diff(request, statistic="population").status_code, 400)
+
+    def test_graphql(self):
+        result = schema.execute(
+            """{
+              statisticDiff(statistic: "gender-distribution", yearFrom: 2012, yearTo: 2024, regionType: "district") {
+                yearFrom yearTo region { name } changes { column fromValue toValue change changePct }
+              }
+            }""",
+            context_value=RequestFactory().post("/graphql/"),
+        )
+        self.assertIsNone(result.errors)
+        diff = result.data["statisticDiff"][0]
+        self.assertEqual((diff["yearFrom"], diff["yearTo"], diff["region"]["name"]), (2012, 2024, "LK-11"))
+        self.assertEqual(
+            [change["column"] for change in diff["changes"]], ["total_population", "male", "female"]
+        )
+        self.assertEqual(diff["changes"][2], {
+            "column": "female", "fromValue": 50.0, "toValue": 80.0, "change": 30.0, "changePct": 60.0,
+        })
+
+    def test_latest_year_by_region(self):
+        result = schema.execute(
+            '{ totalPopulation(regionId: "LK-11") { year totalPopulation } }',
+            context_value=RequestFactory().post("/graphql/"),
+        )
+        self.assertEqual(result.data["totalPopulation"], {"year": 2024, "totalPopulation": 900})
@@ -0,0 +1,193 @@
+import json
+import os
+import random
+import tempfile
+
+from django.test import RequestFactory, TestCase, override_settings
+from mylocalstats.population_stats.geocoding import (
+    ReverseGeocoder,
+    build_reverse_geocoder,
+    get_reverse_geocoder,
+    parse_geometry,
+    parse_points,
+    point_in_polygons,
+    reset_reverse_geocoder,
+)
+from mylocalstats.population_stats.models import Region
+from mylocalstats.population_stats.rtree import STRTree
+from mylocalstats.population_stats.versioning import bump_data_version
+from mylocalstats.population_stats.views import reverse_geocode, reverse_geocode_batch
+
+
+def square(x, y, size=1.0):
+    return [[(x, y), (x + size, y), (x + size, y + size), (x, y + size), (x, y)]]
+
+
+class TestSTRTree(TestCase):
+    def test_point_and_nearest_queries_match_brute_force(self):
+        rng = random.Random(3)
+        boxes = []
+        for i in range(500):
+            x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+            boxes.append(((x, y, x + rng.uniform(0, 5), y + rng.uniform(0, 5)), i))
+        tree = STRTree(boxes, node_capacity=8)
+        self.assertEqual(len(tree), 500)
+        for _ in range(50):
+            x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+            expected = {i for (x0, y0, x1, y1), i in boxes if x0 <= x <= x1 and y0 <= y <= y1}
+            self.assertEqual(set(tree.query_point(x, y)), expected)
+
+        points = [((x0, y0, x0, y0), i) for (x0, y0, _, _), i in boxes]
+        tree = STRTree(points)
+        for _ in range(50):
+            x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+            expected = sorted(points, key=lambda p: (p[0][0] - x) ** 2 + (p[0][1] - y) ** 2)[:3]
+            self.assertEqual(tree.nearest(x, y, k=3), [i for _, i in expected])
+
+    def test_empty(self):
+        tree = STRTree([])
+        self.assertEqual(list(tree.query_point(0, 0)), [])
+        self.assertEqual(tree.nearest(0, 0), [])
+
+
+class TestGeometry(TestCase):
+    def test_parse_formats(self):
+        ring = [[0, 0], [1, 0], [1, 1], [0, 0]]
+        self.assertEqual(len(parse_geometry(ring)), 1)
+        self.assertEqual(len(parse_geometry([[ring], [ring]])), 2)
+        feature = {"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [ring]}}
+        collection = {"type": "FeatureCollection", "features": [feature, feature]}
+        self.assertEqual(parse_geometry(collection)[0][0][1], (1.0, 0.0))
+        self.assertEqual(parse_geometry({"type": "Point", "coordinates": [0, 0]}), [])
+
+    def test_point_in_polygon_with_hole(self):
+        polygon = [square(0, 0, 4)[0], square(1, 1, 2)[0]]
+        self.assertTrue(point_in_polygons(0.5, 0.5, [polygon]))
+        self.assertFalse(point_in_polygons(2, 2, [polygon]))
+        self.assertFalse(point_in_polygons(5, 5, [polygon]))
+
+
+class TestReverseGeocoder(TestCase):
+    def setUp(self):
+        # A 4x4 grid of 1-degree "districts" with polygons and two
+        # "provinces" with centroids only.
+        self.regions = [
+            {"region_id": "LK-1", "name": "West", "region_type": "Province", "latitude": 7.0, "longitude": 80.0},
+            {"region_id": "LK-2", "name": "East", "region_type": "Province", "latitude": 7.0, "longitude": 82.0},
+        ]
+        self.geometries = {}
+        for i in range(4):
+            for j in range(4):
+                region_id = f"D-{i}{j}"
+                self.regions.append({
+                    "region_id": region_id, "name": region_id, "region_type": "District",
+                    "latitude": 5.5 + j, "longitude": 79.5 + i,
+                })
+                self.geometries[region_id] = [square(79 + i, 5 + j)]
+
+    def test_lookup_all_levels(self):
+        geocoder = ReverseGeocoder(self.regions, self.geometries)
+        self.assertEqual(geocoder.levels, ["district", "province"])
+        result = geocoder.lookup(6.5, 80.2)
+        self.assertEqual(result["district"], {"region_id": "D-11", "name": "D-11", "source": "polygon"})
+        self.assertEqual(result["province"]["region_id"], "LK-1")
+        self.assertEqual(result["province"]["source"], "centroid")
+        self.assertEqual(geocoder.lookup(6.5, 82.9)["province"]["region_id"], "LK-2")
+
+    def test_point_outside_polygons(self):
+        geocoder = ReverseGeocoder(self.regions, self.geometries)
+        self.assertEqual(set(geocoder.lookup(20.0, 80.0)), {"province"})
+        self.assertEqual(geocoder.lookup(6.5, 80.2, levels=["District"]).keys(), {"district"})
+
+    def test_regions_without_geometry_fall_back_to_centroids(self):
+        # D-33 has no polygon: points outside every polygon go to the
+        # nearest centroid among the districts without one.
+        del self.geometries["D-33"]
+        self.regions.append({
+            "region_id": "D-99", "name": "D-99", "region_type": "District", "latitude": 20.0, "longitude": 80.0,
+        })
+        geocoder = ReverseGeocoder(self.regions, self.geometries)
+        self.assertEqual(geocoder.lookup(6.5, 80.2)["district"]["source"], "polygon")
+        self.assertEqual(
+            geocoder.lookup(8.5, 82.5)["district"], {"region_id": "D-33", "name": "D-33", "source": "centroid"}
+        )
+        self.assertEqual(geocoder.lookup(19.0, 80.0)["district"]["region_id"], "D-99")
+
+    def test_lookup_many(self):
+        geocoder = ReverseGeocoder(self.regions, self.geometries)
+        results = geocoder.lookup_many([(5.1, 79.1), (8.9, 82.9)], levels=["district"])
+        self.assertEqual([r["district"]["region_id"] for r in results], ["D-00", "D-33"])
+
+    def test_parse_points(self):
+        self.assertEqual(parse_points([[7, 80], {"lat": "6.5", "lon": "81"}]), [(7.0, 80.0), (6.5, 81.0)])
+        for bad in ("7,80", [[7]], [[91, 0]], [{"lat": 1}]):
+            with self.assertRaises(ValueError):
+                parse_points(bad)
+        with self.assertRaises(ValueError):
+            parse_points([[7, 80]] * 3, max_points=2)
+
+
+class TestReverseGeocodeEndpoints(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Region.objects.create(region_id="LK-11", name="Colombo", region_type="District", latitude=6.9, longitude=79.9)
+        Region.objects.create(region_id="LK-12", name="Gampaha", region_type="District", latitude=7.1, longitude=80.0)
+        Region.objects.create(region_id="LK-1", name="Western", region_type="Province", latitude=7.0, longitude=80.0)
+
+    def setUp(self):
+        self.geo_dir = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.geo_dir.name, "district"))
+        for region_id, y in (("LK-11", 6.5), ("LK-12", 7.0)):
+            with open(os.path.join(self.geo_dir.name, "district", f"{region_id}.json"), "w") as handle:
+                json.dump([square(79.5, y, 0.5)], handle)
+        reset_reverse_geocoder()
+        self.addCleanup(reset_reverse_geocoder)
+        self.addCleanup(self.geo_dir.cleanup)
+
+    def test_build_from_database_and_files(self):
+        geocoder = build_reverse_geocoder(self.geo_dir.name)
+        self.assertEqual(geocoder.indexes["district"][0], "polygon")
+        self.assertEqual(geocoder.indexes["province"][0], "centroid")
+
+    def test_single_and_batch(self):
+        with override_settings(REVERSE_GEOCODE_GEO_DIR=self.geo_dir.name):
+            request = RequestFactory().get("/api/v1/reverse-geocode/", {"lat": "7.2", "lon": "79.8"})
+            response = reverse_geocode(request)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["regions"]["district"]["region_id"], "LK-12")
+            self.assertEqual(response.data["regions"]["province"]["region_id"], "LK-1")
+
+            request = RequestFactory().post(
+                "/api/v1/reverse-geocode/batch/?levels=district",
+                data=json.dumps({"points": [[6.7, 79.7], [7.4, 79.6], [0, 0]]}),
+                content_type="application/json",
+            )
+            response = reverse_geocode_batch(request)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                response.data,
+                [
+                    {"district": {"region_id": "LK-11", "name": "Colombo", "source": "polygon"}},
+                    {"district": {"region_id": "LK-12", "name": "Gampaha", "source": "polygon"}},
+                    {},
+                ],
+            )
+
+    @override_settings(DATA_VERSION_TTL=0)
+    def test_rebuilt_after_import(self):
+        with override_settings(REVERSE_GEOCODE_GEO_DIR=self.geo_dir.name):
+            geocoder = get_reverse_geocoder()
+            self.assertIs(get_reverse_geocoder(), geocoder)
+            Region.objects.create(
+                region_id="LK-2", name="Central", region_type="Province", latitude=7.3, longitude=80.6
+            )
+            bump_data_version()
+            self.assertEqual(get_reverse_geocoder().lookup(7.3, 80.7)["province"]["region_id"], "LK-2")
+
+    def test_bad_requests(self):
+        request = RequestFactory().get("/api/v1/reverse-geocode/", {"lat": "7.2"})
+        self.assertEqual(reverse_geocode(request).status_code, 400)
+        request = RequestFactory().post(
+            "/api/v1/reverse-geocode/batch/", data=json.dumps({"points": "x"}), content_type="application/json"
+        )
+        self.assertEqual(reverse_geocode_batch(request).status_code, 400)
@@ -0,0 +1,147 @@
+import hashlib
+import json
+from unittest import mock
+
+from django.test import RequestFactory, TestCase, override_settings
+from graphql import parse, validate
+from mylocalstats.population_stats.graphql.persisted import (
+    PersistedQueryError,
+    PersistedQueryRegistry,
+)
+from mylocalstats.population_stats.graphql.schema import schema
+from mylocalstats.population_stats.graphql.validation import (
+    QueryCostAnalyzer,
+    get_validation_rules,
+    query_cost_validator,
+)
+from mylocalstats.population_stats.graphql.views import PopulationStatsGraphQLView
+from mylocalstats.population_stats.models import Region, TotalPopulation
+
+REGION_NAMES = "query RegionNames { totalPopulations { edges { node { region { name } } } } }"
+
+
+class TestQueryCost(TestCase):
+    def analyze(self, query):
+        document = parse(query)
+        analyzer = QueryCostAnalyzer(schema.graphql_schema, {}, max_list_rows=1000)
+        return analyzer.analyze(document.definitions[0])
+
+    def test_depth_and_rows(self):
+        cost = self.analyze("{ regions { edges { node { children { parent { name } } } } } }")
+        self.assertEqual(cost.depth, 5)
+        # connection + 100 edges + 100 nodes + 1000 children (capped) + 1000 parents
+        self.assertEqual(cost.estimated_rows, 2201)
+
+    def test_connection_page_size(self):
+        cost = self.analyze("{ regions(first: 7) { totalCount edges { node { name } } } }")
+        self.assertEqual(cost.estimated_rows, 15)
+        cost = self.analyze(
+            "query ($n: Int) { regions(first: $n) { edges { node { name } } } }"
+        )
+        # a variable page size is assumed to be the maximum page size
+        self.assertEqual(cost.estimated_rows, 1 + 1000 + 1000)
+
+    def test_single_object_is_one_row(self):
+        cost = self.analyze('{ totalPopulation(regionId: "LK-1") { totalPopulation } }')
+        self.assertEqual((cost.depth, cost.estimated_rows), (1, 1))
+
+    def test_fragments_are_followed(self):
+        document = parse(
+            "{ regions(first: 2) { edges { node { ...R } } } } "
+            "fragment R on RegionType { children { name } }"
+        )
+        fragments = {"R": document.definitions[1]}
+        analyzer = QueryCostAnalyzer(schema.graphql_schema, fragments)
+        cost = analyzer.analyze(document.definitions[0])
+        self.assertEqual((cost.depth, cost.estimated_rows), (4, 1 + 2 + 2 + 100))
+
+    def test_validator_rejects_deep_and_wide_queries(self):
+        rules = [query_cost_validator(max_depth=2, max_estimated_rows=10 ** 9)]
+        errors = validate(
+            schema.graphql_schema,
+            parse("{ regions { edges { node { children { name } } } } }"),
+            rules,
+        )
+        self.assertEqual(len(errors), 1)
+        self.assertIn("depth 4", errors[0].message)
+
+        rules = [query_cost_validator(max_depth=10, max_estimated_rows=100)]
+        errors = validate(
+            schema.graphql_schema, parse("{ regions { edges { node { name } } } }"), rules
+        )
+        self.assertEqual(len(errors), 1)
+        self.assertIn("exceeding the maximum of 100", errors[0].message)
+
+    @override_settings(GRAPHQL_MAX_QUERY_DEPTH=10)
+    def test_zero_limit_is_not_replaced_by_setting(self):
+        rules = [query_cost_validator(max_depth=0, max_estimated_rows=10 ** 9)]
+        errors = validate(schema.graphql_schema, parse("{ regions { totalCount } }"), rules)
+        self.assertEqual(len(errors), 1)
+        self.assertIn("exceeding the maximum of 0", errors[0].message)
+
+
+class TestPersistedQueries(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Region.objects.create(region_id="LK-1", name="Western", region_type="Province")
+        TotalPopulation.objects.create(region_id="LK-1", total_population=5)
+
+    def setUp(self):
+        self.registry = PersistedQueryRegistry(schema.graphql_schema, get_validation_rules())
+        self.query_hash = self.registry.register(REGION_NAMES)
+
+    def post(self, body, **view_kwargs):
+        view = PopulationStatsGraphQLView.as_view(
+            schema=schema, persisted_queries=self.registry, **view_kwargs
+        )
+        request = RequestFactory().post(
+            "/graphql/", json.dumps(body), content_type="application/json"
+        )
+        response = view(request)
+        return response.status_code, json.loads(response.content)
+
+    def persisted_body(self, query_hash):
+        return {"extensions": {"persistedQuery": {"version": 1, "sha256Hash": query_hash}}}
+
+    def test_registry_hash_is_sha256_of_query(self):
+        self.assertEqual(self.query_hash, hashlib.sha256(REGION_NAMES.encode()).hexdigest())
+        self.assertIn(self.query_hash, self.registry)
+
+    def test_registry_rejects_invalid_documents(self):
+        with self.assertRaises(PersistedQueryError):
+            self.registry.register("{ regions { doesNotExist } }")
+
+    def test_persisted_query_skips_parse(self):
+        with mock.patch("graphene_django.views.parse") as parse_mock:
+            status, body = self.post(self.persisted_body(self.query_hash))
+        parse_mock.assert_not_called()
+        self.assertEqual(status, 200)
+        node = body["data"]["totalPopulations"]["edges"][0]["node"]
+        self.assertEqual(node["region"]["name"], "Western")
+
+    def test_empty_registry_is_used(self):
+        self.registry = PersistedQueryRegistry(schema.graphql_schema, get_validation_rules())
+        with mock.patch(
+            "mylocalstats.population_stats.graphql.views.get_persisted_queries"
+        ) as default_registry:
+            status, body = self.post(self.persisted_body(self.query_hash))
+        default_registry.assert_not_called()
+        self.assertEqual(status, 400)
+        self.assertEqual(body["errors"][0]["message"], "PersistedQueryNotFound")
+
+    def test_unknown_hash(self):
+        status, body = self.post(self.persisted_body("0" * 64))
+        self.assertEqual(status, 400)
+        self.assertEqual(body["errors"][0]["message"], "PersistedQueryNotFound")
+
+    def test_persisted_queries_only(self):
+        status, _ = self.post({"query": REGION_NAMES}, persisted_queries_only=True)
+        self.assertEqual(status, 400)
+        status, _ = self.post(self.persisted_body(self.query_hash), persisted_queries_only=True)
+        self.assertEqual(status, 200)
+
+    @override_settings(GRAPHQL_MAX_ESTIMATED_ROWS=10)
+    def test_ad_hoc_queries_are_cost_limited(self):
+        status, body = self.post({"query": "{ regions { edges { node { name } } } }"})
+        self.assertEqual(status, 400)
+        self.assertIn("may return", body["errors"][0]["message"])
@@ -0,0 +1,93 @@
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from mylocalstats.population_stats.graphql.schema import schema
+from mylocalstats.population_stats.models import AgeDistribution, Region, TotalPopulation
+
+
+class TestGraphQLLoaders(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Region.objects.create(region_id="LK", name="Sri Lanka", region_type="Country")
+        for p in range(3):
+            province_id = f"LK-{p}"
+            Region.objects.create(
+                region_id=province_id, name=f"Province {p}", region_type="Province",
+                parent_region_id="LK"
+            )
+            for d in range(4):
+                district_id = f"LK-{p}{d}"
+                Region.objects.create(
+                    region_id=district_id, name=f"District {p}{d}", region_type="District",
+                    parent_region_id=province_id
+                )
+                TotalPopulation.objects.create(region_id=district_id, total_population=100 + d)
+                AgeDistribution.objects.create(
+                    region_id=district_id, total_population=100 + d, less_than_10=10,
+                    age_10_to_19=10, age_20_to_29=10, age_30_to_39=10, age_40_to_49=10,
+                    age_50_to_59=10, age_60_to_69=10, age_70_to_79=10, age_80_to_89=10,
+                    age_90_and_above=10 + d
+                )
+
+    def execute(self, query):
+        request = RequestFactory().post("/graphql/")
+        with CaptureQueriesContext(connection) as queries:
+            result = schema.execute(query, context_value=request)
+        self.assertIsNone(result.errors)
+        return result.data, len(queries)
+
+    def test_statistic_region_is_batched(self):
+        data, num_queries = self.execute(
+            "{ totalPopulations { edges { node { totalPopulation region { name } } } } }"
+        )
+        nodes = [edge["node"] for edge in data["totalPopulations"]["edges"]]
+        self.assertEqual(len(nodes), 12)
+        self.assertEqual(nodes[0]["region"]["name"], "District 00")
+        self.assertEqual(num_queries, 2)
+
+    def test_nested_hierarchy_is_bounded(self):
+        data, num_queries = self.execute(
+            """
+            {
+              regions {
+                edges {
+                  node {
+                    regionId
+                    parent { name }
+                    children {
+                      name
+                      totalpopulation { totalPopulation }
+                      agedistribution { age90AndAbove region { parent { name } } }
+                    }
+                  }
+                }
+              }
+            }
+            """
+        )
+        regions = {edge["node"]["regionId"]: edge["node"] for edge in data["regions"]["edges"]}
+        self.assertEqual(regions["LK-1"]["parent"]["name"], "Sri Lanka")
+        self.assertEqual(len(regions["LK-1"]["children"]), 4)
+        child = regions["LK-1"]["children"][3]
+        self.assertEqual(child["totalpopulation"]["totalPopulation"], 103)
+        self.assertEqual(child["agedistribution"]["region"]["parent"]["name"], "Province 1")
+        # regions, parents, children, total populations, age distributions
+        self.assertEqual(num_queries, 5)
+
+    def test_loaders_are_scoped_per_request(self):
+        query = "{ totalPopulations(first: 1) { edges { node { region { name } } } } }"
+        self.execute(query)
+        Region.objects.filter(region_id="LK-00").update(name="Renamed")
+        data, _ = self.execute(query)
+        self.assertEqual(data["totalPopulations"]["edges"][0]["node"]["region"]["name"], "Renamed")
+
+    def test_region_statistic_is_latest_year_for_year_filtered_lists(self):
+        TotalPopulation.objects.create(region_id="LK-00", year=2024, total_population=150)
+        data, _ = self.execute(
+            # Every column is selected, so the list rows are complete.
+            '{ totalPopulations(year: 2012, first: 1) { edges { node { id year totalPopulation region {'
+            ' totalpopulation { year totalPopulation } } } } } }'
+        )
+        node = data["totalPopulations"]["edges"][0]["node"]
+        self.assertEqual(node["year"], 2012)
+        self.assertEqual(node["region"]["totalpopulation"], {"year": 2024, "totalPopulation": 150})
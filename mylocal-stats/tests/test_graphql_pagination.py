@@ -0,0 +1,69 @@
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from mylocalstats.population_stats.graphql.pagination import decode_cursor, encode_cursor
+from mylocalstats.population_stats.graphql.schema import schema
+from mylocalstats.population_stats.models import Region
+
+PAGE = """
+query ($first: Int, $after: String) {
+  regions(first: $first, after: $after) {
+    edges { cursor node { regionId } }
+    pageInfo { hasNextPage hasPreviousPage endCursor }
+    %s
+  }
+}
+"""
+
+
+class TestKeysetPagination(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Region.objects.bulk_create(
+            Region(region_id=f"LK-{i:02d}", name=f"Region {i}", region_type="GND")
+            for i in range(25)
+        )
+
+    def execute(self, query, **variables):
+        request = RequestFactory().post("/graphql/")
+        with CaptureQueriesContext(connection) as queries:
+            result = schema.execute(query, context_value=request, variable_values=variables)
+        self.assertIsNone(result.errors)
+        return result.data["regions"], queries
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor("LK-1")), "LK-1")
+
+    def test_pages_cover_all_rows_once(self):
+        seen, after = [], None
+        while True:
+            page, _ = self.execute(PAGE % "", first=10, after=after)
+            seen.extend(edge["node"]["regionId"] for edge in page["edges"])
+            self.assertEqual(page["pageInfo"]["hasPreviousPage"], after is not None)
+            if not page["pageInfo"]["hasNextPage"]:
+                break
+            after = page["pageInfo"]["endCursor"]
+        self.assertEqual(seen, [f"LK-{i:02d}" for i in range(25)])
+
+    def test_page_uses_keyset_not_offset(self):
+        _, queries = self.execute(PAGE % "", first=5, after=encode_cursor("LK-10"))
+        sql = queries.captured_queries[0]["sql"]
+        self.assertIn('"region_id" > \'LK-10\'', sql)
+        self.assertNotIn("OFFSET", sql)
+
+    def test_total_count_is_lazy(self):
+        _, queries = self.execute(PAGE % "", first=5)
+        self.assertEqual(len(queries), 1)
+        page, queries = self.execute(PAGE % "totalCount", first=5)
+        self.assertEqual(page["totalCount"], 25)
+        self.assertEqual(len(queries), 2)
+        self.assertIn("COUNT(*)", queries.captured_queries[1]["sql"])
+
+    @override_settings(GRAPHQL_MAX_PAGE_SIZE=10)
+    def test_invalid_arguments(self):
+        for variables in ({"first": 11}, {"first": -1}, {"after": "not-a-cursor"}):
+            result = schema.execute(
+                PAGE % "", context_value=RequestFactory().post("/graphql/"),
+                variable_values=variables
+            )
+            self.assertIsNotNone(result.errors, variables)
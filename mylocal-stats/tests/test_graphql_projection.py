@@ -0,0 +1,61 @@
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from mylocalstats.population_stats.graphql.schema import schema
+from mylocalstats.population_stats.models import Region, TotalPopulation
+
+JSON_COLUMNS = ("subs", "supers", "eqs", "ints", "other_ids")
+
+
+class TestGraphQLProjection(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Region.objects.create(
+            region_id="LK", name="Sri Lanka", region_type="Country", subs=["LK-1"]
+        )
+        Region.objects.create(
+            region_id="LK-1", name="Western", region_type="Province", parent_region_id="LK",
+            subs=["LK-11"], supers=["LK"], eqs=[], ints=[], other_ids={"country": "LK"}
+        )
+        TotalPopulation.objects.create(region_id="LK-1", total_population=5)
+
+    def execute(self, query):
+        with CaptureQueriesContext(connection) as queries:
+            result = schema.execute(query, context_value=RequestFactory().post("/graphql/"))
+        self.assertIsNone(result.errors)
+        return result.data, [query["sql"] for query in queries.captured_queries]
+
+    def assert_columns(self, sql, present=(), absent=()):
+        for column in present:
+            self.assertIn(f'"regions"."{column}"', sql)
+        for column in absent:
+            self.assertNotIn(f'"regions"."{column}"', sql)
+
+    def test_json_columns_not_fetched_unless_selected(self):
+        data, queries = self.execute("{ regions { edges { node { name } } } }")
+        self.assertEqual(data["regions"]["edges"][1]["node"]["name"], "Western")
+        self.assertEqual(len(queries), 1)
+        self.assert_columns(queries[0], present=("region_id", "name"), absent=JSON_COLUMNS)
+
+    def test_selected_json_column_is_fetched(self):
+        data, queries = self.execute("{ regions { edges { node { name subs } } } }")
+        self.assertIn("LK-11", data["regions"]["edges"][1]["node"]["subs"])
+        self.assert_columns(queries[0], present=("subs",), absent=("supers", "other_ids"))
+
+    def test_relations_and_fragments(self):
+        data, queries = self.execute(
+            """
+            { regions { edges { node { ...F } } } }
+            fragment F on RegionType { parent { name } }
+            """
+        )
+        self.assertEqual(data["regions"]["edges"][1]["node"]["parent"]["name"], "Sri Lanka")
+        self.assert_columns(queries[0], present=("parent_region_id",), absent=("name",))
+
+    def test_single_object_resolver(self):
+        data, queries = self.execute(
+            '{ totalPopulation(regionId: "LK-1") { totalPopulation } }'
+        )
+        self.assertEqual(data["totalPopulation"]["totalPopulation"], 5)
+        # The year only picks the latest row; it is not selected.
+        self.assertNotIn('"year"', queries[0].split(" FROM ")[0])
@@ -0,0 +1,114 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from mylocalstats.population_stats.graphql.schema import schema
+from mylocalstats.population_stats.hierarchy import rebuild_region_closure, update_region_closure
+from mylocalstats.population_stats.models import Region, RegionClosure
+from mylocalstats.population_stats.versioning import get_data_version
+from mylocalstats.population_stats.views import get_region_descendants
+
+
+def closure_pairs():
+    return set(RegionClosure.objects.values_list("ancestor_id", "descendant_id", "depth"))
+
+
+class TestRegionManager(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Region.objects.create(region_id="LK-1", name="Western", region_type="province")
+        for d in range(2):
+            district_id = f"LK-1{d}"
+            Region.objects.create(
+                region_id=district_id, name=f"District {d}", region_type="district",
+                parent_region_id="LK-1"
+            )
+            for g in range(3):
+                Region.objects.create(
+                    region_id=f"{district_id}-{g}", name=f"GND {d}{g}", region_type="gnd",
+                    parent_region_id=district_id
+                )
+        rebuild_region_closure()
+
+    def ids(self, queryset):
+        return sorted(queryset.values_list("region_id", flat=True))
+
+    def test_descendants_of(self):
+        self.assertEqual(len(self.ids(Region.objects.descendants_of("LK-1"))), 8)
+        self.assertEqual(
+            self.ids(Region.objects.descendants_of("LK-1", level="district")), ["LK-10", "LK-11"]
+        )
+        self.assertEqual(self.ids(Region.objects.descendants_of("LK-1", max_depth=1)), ["LK-10", "LK-11"])
+        self.assertIn("LK-11", self.ids(Region.objects.descendants_of("LK-11", include_self=True)))
+
+    def test_descendants_of_is_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            list(Region.objects.descendants_of("LK-1", level="gnd"))
+        self.assertEqual(len(queries), 1)
+
+    def test_ancestors_of(self):
+        self.assertEqual(self.ids(Region.objects.ancestors_of("LK-10-2")), ["LK-1", "LK-10"])
+
+    def test_rest_endpoint(self):
+        request = RequestFactory().get("/api/v1/region/id/LK-10/descendants/", {"level": "gnd"})
+        response = get_region_descendants(request, region_id="LK-10")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["region_id"] for row in response.data], ["LK-10-0", "LK-10-1", "LK-10-2"])
+        request = RequestFactory().get("/api/v1/region/id/LK-9/descendants/")
+        self.assertEqual(get_region_descendants(request, region_id="LK-9").status_code, 404)
+
+    def test_graphql_descendants(self):
+        result = schema.execute(
+            '{ descendants(regionId: "LK-1", level: "district") { edges { node { regionId } } } }',
+            context_value=RequestFactory().post("/graphql/"),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            [edge["node"]["regionId"] for edge in result.data["descendants"]["edges"]],
+            ["LK-10", "LK-11"],
+        )
+
+
+class TestIncrementalClosure(TestCase):
+    def test_matches_full_rebuild(self):
+        # Children imported before their parent exists.
+        Region.objects.create(region_id="LK-11", name="Colombo", region_type="District", parent_region_id="LK-1")
+        Region.objects.create(region_id="LK-11-1", name="GND", region_type="GND", parent_region_id="LK-11")
+        update_region_closure(["LK-11", "LK-11-1"])
+        self.assertNotIn(("LK-1", "LK-11-1", 2), closure_pairs())
+
+        Region.objects.create(region_id="LK", name="Sri Lanka", region_type="Country")
+        Region.objects.create(region_id="LK-1", name="Western", region_type="Province", parent_region_id="LK")
+        with CaptureQueriesContext(connection) as queries:
+            update_region_closure(["LK-1"])
+        incremental = closure_pairs()
+        self.assertIn(("LK-1", "LK-11-1", 2), incremental)
+        # The country was not imported in this batch and has no ancestors of
+        # its own, so its self row is the only one missing.
+        self.assertNotIn(("LK", "LK", 0), incremental)
+        self.assertLess(len(queries), 10)
+
+        rebuild_region_closure()
+        self.assertEqual(incremental | {("LK", "LK", 0)}, closure_pairs())
+
+    def test_insert_region_data_updates_closure(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "districts.tsv")
+            with open(path, "w") as handle:
+                handle.write("id\tname\tparent_region_id\tprovince_id\n")
+                handle.write("LK-11\tColombo\t\tLK-1\n")
+            Region.objects.create(region_id="LK-1", name="Western", region_type="Province")
+            call_command("insert_region_data", path, type="District", stdout=StringIO())
+        self.assertIn(("LK-1", "LK-11", 1), closure_pairs())
+
+
+class TestBuildRegionClosure(TestCase):
+    @override_settings(DATA_VERSION_TTL=0)
+    def test_bumps_data_version(self):
+        before = get_data_version()
+        call_command("build_region_closure", stdout=StringIO())
+        self.assertEqual(get_data_version(), before + 1)
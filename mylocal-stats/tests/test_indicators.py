@@ -0,0 +1,144 @@
+import math
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from mylocalstats.population_stats.graphql.schema import schema
+from mylocalstats.population_stats.indicators import INDICATORS, rank_regions, ratio, rebuild_region_indicators
+from mylocalstats.population_stats.models import (
+    AgeDistribution,
+    EthnicityDistribution,
+    GenderDistribution,
+    Region,
+    RegionIndicator,
+    TotalPopulation,
+)
+from mylocalstats.population_stats.views import get_indicator_ranking, get_region_indicators_by_id
+
+AGE_COLUMNS = [
+    "less_than_10", "age_10_to_19", "age_20_to_29", "age_30_to_39", "age_40_to_49",
+    "age_50_to_59", "age_60_to_69", "age_70_to_79", "age_80_to_89", "age_90_and_above",
+]
+
+
+class TestRatio(TestCase):
+    def test_zero_denominator_is_nan(self):
+        values = ratio([1, 2, 3], [4, 0, -1])
+        self.assertEqual(values[0], 25.0)
+        self.assertTrue(math.isnan(values[1]))
+        self.assertTrue(math.isnan(values[2]))
+
+
+class TestRegionIndicators(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Region.objects.create(region_id="LK-11", name="Colombo", region_type="district", area_sq_km=699)
+        for i, (young, working, old) in enumerate([(300, 500, 200), (100, 800, 100), (200, 600, 200)]):
+            region = Region.objects.create(
+                region_id=f"LK-110{i}", name=f"DSD {i}", region_type="dsd", area_sq_km=10 * (i + 1)
+            )
+            ages = dict.fromkeys(AGE_COLUMNS, 0)
+            ages.update(less_than_10=young, age_30_to_39=working, age_70_to_79=old)
+            AgeDistribution.objects.create(region=region, total_population=young + working + old, **ages)
+            GenderDistribution.objects.create(
+                region=region, total_population=1000, male=400 + 50 * i, female=600 - 50 * i
+            )
+            TotalPopulation.objects.create(region=region, total_population=1000)
+        EthnicityDistribution.objects.create(
+            region_id="LK-11", total_population=200, sinhalese=150, sl_tamil=50, ind_tamil=0, sl_moor=0,
+            burgher=0, malay=0, sl_chetty=0, bharatha=0, other_eth=0,
+        )
+        # No females: the sex ratio is undefined and must not be stored.
+        GenderDistribution.objects.create(region_id="LK-11", total_population=10, male=10, female=0)
+
+    def setUp(self):
+        rebuild_region_indicators()
+
+    def value(self, region_id, indicator):
+        return RegionIndicator.objects.get(region_id=region_id, indicator=indicator).value
+
+    def test_computed_values(self):
+        self.assertAlmostEqual(self.value("LK-1100", "dependency_ratio"), 100.0)
+        self.assertAlmostEqual(self.value("LK-1100", "youth_dependency_ratio"), 60.0)
+        self.assertAlmostEqual(self.value("LK-1101", "old_age_dependency_ratio"), 12.5)
+        self.assertAlmostEqual(self.value("LK-1102", "sex_ratio"), 500 / 500 * 100)
+        self.assertAlmostEqual(self.value("LK-1101", "population_density"), 50.0)
+        self.assertAlmostEqual(self.value("LK-11", "ethnicity_share_sinhalese"), 75.0)
+        self.assertFalse(RegionIndicator.objects.filter(region_id="LK-11", indicator="sex_ratio").exists())
+        self.assertEqual(RegionIndicator.objects.get(region_id="LK-1100", indicator="sex_ratio").region_type, "dsd")
+        self.assertIn("religion_share_buddhist", INDICATORS)
+
+    def test_partial_rebuild(self):
+        GenderDistribution.objects.filter(region_id="LK-1100").update(male=500, female=500)
+        AgeDistribution.objects.all().delete()
+        rebuild_region_indicators(["gender-distribution"])
+        self.assertAlmostEqual(self.value("LK-1100", "sex_ratio"), 100.0)
+        # Indicators of other statistics are left alone.
+        self.assertTrue(RegionIndicator.objects.filter(indicator="dependency_ratio").exists())
+
+    def test_import_command_rebuilds_indicators(self):
+        with tempfile.TemporaryDirectory() as directory:
+            data_path = os.path.join(directory, "gender.tsv")
+            with open(data_path, "w") as handle:
+                handle.write("entity_id\ttotal_population\tmale\tfemale\nLK-1100\t1000\t500\t500\n")
+            region_path = os.path.join(directory, "regions.tsv")
+            with open(region_path, "w") as handle:
+                handle.write("id\tname\nLK-1100\tDSD 0\n")
+            call_command("insert_gender_distribution", data_path, region_path, type="dsd", stdout=StringIO())
+        self.assertAlmostEqual(self.value("LK-1100", "sex_ratio"), 100.0)
+
+    def test_rank_latest_year_per_region(self):
+        # LK-1101 has the lowest sex ratio in 2012 and the highest in 2024.
+        GenderDistribution.objects.create(region_id="LK-1101", year=2024, total_population=1000, male=700, female=300)
+        rebuild_region_indicators(["gender-distribution"])
+        rows = list(rank_regions("sex_ratio", region_type="dsd"))
+        self.assertEqual([(row.region_id, row.year) for row in rows],
+                         [("LK-1101", 2024), ("LK-1102", 2012), ("LK-1100", 2012)])
+        rows = list(rank_regions("sex_ratio", region_type="dsd", year=2012))
+        self.assertEqual([row.region_id for row in rows], ["LK-1102", "LK-1101", "LK-1100"])
+
+    def test_ranking_endpoint(self):
+        request = RequestFactory().get("/api/v1/indicators/dependency_ratio/", {"type": "DSD", "limit": "2"})
+        response = get_indicator_ranking(request, indicator="dependency_ratio")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(row["rank"], row["region_id"]) for row in response.data], [(1, "LK-1100"), (2, "LK-1102")])
+        self.assertAlmostEqual(response.data[0]["value"], 100.0)
+
+        request = RequestFactory().get("/api/v1/indicators/dependency_ratio/", {"order": "asc", "limit": "1"})
+        response = get_indicator_ranking(request, indicator="dependency_ratio")
+        self.assertEqual([row["region_id"] for row in response.data], ["LK-1101"])
+
+        for indicator, params in (("unknown", {}), ("sex_ratio", {"order": "up"}), ("sex_ratio", {"limit": "0"})):
+            request = RequestFactory().get(f"/api/v1/indicators/{indicator}/", params)
+            self.assertEqual(get_indicator_ranking(request, indicator=indicator).status_code, 400)
+
+    def test_region_indicators_endpoint(self):
+        request = RequestFactory().get("/api/v1/region/id/LK-1101/indicators/")
+        response = get_region_indicators_by_id(request, region_id="LK-1101")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(response.data),
+            {
+                "dependency_ratio", "youth_dependency_ratio", "old_age_dependency_ratio", "sex_ratio",
+                "population_density",
+            },
+        )
+        request = RequestFactory().get("/api/v1/region/id/LK-99/indicators/")
+        self.assertEqual(get_region_indicators_by_id(request, region_id="LK-99").status_code, 404)
+
+    def test_graphql(self):
+        result = schema.execute(
+            '{ indicatorRanking(indicator: "sex_ratio", regionType: "dsd", limit: 3) { rank value region { name } } }',
+            context_value=RequestFactory().post("/graphql/"),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            [(row["rank"], row["region"]["name"]) for row in result.data["indicatorRanking"]],
+            [(1, "DSD 2"), (2, "DSD 1"), (3, "DSD 0")],
+        )
+        result = schema.execute(
+            '{ indicatorRanking(indicator: "nope") { rank } }', context_value=RequestFactory().post("/graphql/")
+        )
+        self.assertIn("Unknown indicator", result.errors[0].message)
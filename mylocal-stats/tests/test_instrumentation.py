@@ -0,0 +1,111 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import Http404, JsonResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.urls import path
+from mylocalstats.population_stats.graphql.schema import schema
+from mylocalstats.population_stats.instrumentation import (
+    GraphQLMetricsMiddleware,
+    Histogram,
+    MetricsMiddleware,
+    metrics_view,
+    render_metrics,
+    reset_metrics,
+)
+from mylocalstats.population_stats.models import Region
+
+
+def regions_view(request, region_type):
+    return JsonResponse([region.region_id for region in Region.objects.of_type(region_type)], safe=False)
+
+
+urlpatterns = [
+    path('api/v1/regions/type/<str:region_type>/', regions_view),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__, METRICS_ENABLED=True)
+class TestMetrics(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Region.objects.create(region_id="LK-1", name="Western", region_type="province")
+
+    def setUp(self):
+        reset_metrics()
+        self.factory = RequestFactory()
+
+    def request(self, path):
+        middleware = MetricsMiddleware(lambda request: regions_view(request, path.rstrip("/").split("/")[-1]))
+        return middleware(self.factory.get(path))
+
+    def test_records_latency_queries_and_size(self):
+        response = self.request("/api/v1/regions/type/province/")
+        self.request("/api/v1/regions/type/district/")
+        text = render_metrics()
+        endpoint = 'endpoint="api/v1/regions/type/<str:region_type>/"'
+        self.assertIn(f'http_request_duration_seconds_count{{{endpoint},method="GET"}} 2', text)
+        self.assertIn(f'http_request_db_queries_bucket{{{endpoint},le="1"}} 2', text)
+        self.assertIn(f'http_request_db_queries_bucket{{{endpoint},le="0"}} 0', text)
+        self.assertIn(f'http_response_size_bytes_sum{{{endpoint}}} {len(response.content) + 2}.0', text)
+        self.assertIn(f'http_responses_total{{{endpoint},status="200",cache="miss"}} 2', text)
+        self.assertIn('db_connection_reuse_total{result="hit"}', text)
+
+    async def test_async(self):
+        async def view(request):
+            return await sync_to_async(regions_view)(request, "province")
+
+        middleware = MetricsMiddleware(view)
+        response = await middleware(AsyncRequestFactory().get("/api/v1/regions/type/province/"))
+        self.assertEqual(response.status_code, 200)
+        text = render_metrics()
+        endpoint = 'endpoint="api/v1/regions/type/<str:region_type>/"'
+        self.assertIn(f'http_request_db_queries_bucket{{{endpoint},le="0"}} 0', text)
+        self.assertIn(f'http_request_db_queries_bucket{{{endpoint},le="1"}} 1', text)
+        self.assertIn(f'http_responses_total{{{endpoint},status="200",cache="miss"}} 1', text)
+
+    def test_json_request_log(self):
+        with override_settings(METRICS_LOG_REQUESTS=True):
+            with self.assertLogs("mylocalstats.requests", "INFO") as logs:
+                self.request("/api/v1/regions/type/province/")
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual((entry["status"], entry["db_queries"], entry["cache"]), (200, 1, "miss"))
+        self.assertEqual(entry["endpoint"], "api/v1/regions/type/<str:region_type>/")
+
+    def test_graphql_fields(self):
+        result = schema.execute(
+            "{ regions { edges { node { name } } } }",
+            context_value=self.factory.post("/graphql/"),
+            middleware=[GraphQLMetricsMiddleware()],
+        )
+        self.assertIsNone(result.errors)
+        text = render_metrics()
+        self.assertIn('graphql_field_duration_seconds_count{field="regions"} 1', text)
+        self.assertNotIn('field="name"', text)
+
+    def test_metrics_endpoint(self):
+        response = metrics_view(self.factory.get("/metrics"))
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn(b"# TYPE http_request_duration_seconds histogram", response.content)
+
+    def test_disabled(self):
+        with override_settings(METRICS_ENABLED=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                MetricsMiddleware(lambda request: None)
+            with self.assertRaises(Http404):
+                metrics_view(self.factory.get("/metrics"))
+
+
+class TestHistogram(TestCase):
+    def test_cumulative_buckets(self):
+        histogram = Histogram("latency", "Latency.", ("endpoint",), buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value, 'a"b')
+        self.assertEqual(histogram.collect()[2:], [
+            'latency_bucket{endpoint="a\\"b",le="0.1"} 2',
+            'latency_bucket{endpoint="a\\"b",le="1"} 3',
+            'latency_bucket{endpoint="a\\"b",le="+Inf"} 4',
+            'latency_sum{endpoint="a\\"b"} 3.65',
+            'latency_count{endpoint="a\\"b"} 4',
+        ])
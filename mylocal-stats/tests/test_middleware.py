@@ -0,0 +1,147 @@
+import gzip
+import json
+from unittest import mock, skipUnless
+
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from mylocalstats.population_stats import middleware
+from mylocalstats.population_stats.middleware import (
+    CompressionMiddleware,
+    ConditionalDataMiddleware,
+    etag_matches,
+)
+from mylocalstats.population_stats.versioning import bump_data_version, get_data_version
+
+LARGE = [{"region_id": f"LK-{i}", "total_population": i} for i in range(500)]
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1024)
+class TestCompressionMiddleware(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def compress(self, response, accept_encoding="gzip, deflate, br"):
+        request = self.factory.get("/api/v1/regions/type/gnd/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda r: response)(request)
+
+    def test_gzip(self):
+        with mock.patch.object(middleware, "brotli", None):
+            response = self.compress(JsonResponse(LARGE, safe=False))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+        self.assertEqual(json.loads(gzip.decompress(response.content)), LARGE)
+
+    @skipUnless(middleware.brotli, "brotli is not installed")
+    def test_brotli_preferred(self):
+        response = self.compress(JsonResponse(LARGE, safe=False))
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(json.loads(middleware.brotli.decompress(response.content)), LARGE)
+
+    def test_skipped(self):
+        small = self.compress(JsonResponse({"error": "Region not found"}))
+        self.assertNotIn("Content-Encoding", small)
+        self.assertEqual(small["Vary"], "Accept-Encoding")
+        self.assertNotIn("Content-Encoding", self.compress(JsonResponse(LARGE, safe=False), "identity"))
+        self.assertNotIn("Content-Encoding", self.compress(JsonResponse(LARGE, safe=False), "gzip;q=0"))
+        binary = HttpResponse(b"\0" * 4096, content_type="application/octet-stream")
+        self.assertNotIn("Content-Encoding", self.compress(binary))
+
+    def test_streaming_and_strong_etag(self):
+        rows = (json.dumps(row) + "\n" for row in LARGE)
+        response = StreamingHttpResponse(rows, content_type="application/x-ndjson")
+        response["ETag"] = '"3-abc"'
+        with mock.patch.object(middleware, "brotli", None):
+            response = self.compress(response)
+        self.assertEqual(response["ETag"], '"3-abc-gzip"')
+        body = gzip.decompress(b"".join(response.streaming_content)).decode()
+        self.assertEqual(len(body.splitlines()), 500)
+
+    async def test_async(self):
+        async def rows():
+            for row in LARGE:
+                yield json.dumps(row) + "\n"
+
+        async def get_response(request):
+            if request.path.endswith(".ndjson"):
+                return StreamingHttpResponse(rows(), content_type="application/x-ndjson")
+            return JsonResponse(LARGE, safe=False)
+
+        compress = CompressionMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(compress))
+        factory = AsyncRequestFactory()
+        with mock.patch.object(middleware, "brotli", None):
+            response = await compress(factory.get("/api/v1/regions/type/gnd/", headers={"Accept-Encoding": "gzip"}))
+            self.assertEqual(json.loads(gzip.decompress(response.content)), LARGE)
+            response = await compress(factory.get("/api/v1/rows.ndjson", headers={"Accept-Encoding": "gzip"}))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(gzip.decompress(body).splitlines()), 500)
+
+
+class TestConditionalDataMiddleware(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.calls = 0
+
+    def view(self, request):
+        self.calls += 1
+        return JsonResponse({"ok": True})
+
+    def get(self, path, **headers):
+        return ConditionalDataMiddleware(self.view)(self.factory.get(path, **headers))
+
+    @override_settings(DATA_VERSION_TTL=0)
+    def test_not_modified_without_running_the_view(self):
+        response = self.get("/api/v1/regions/type/gnd/")
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith(f'"{get_data_version()}-'))
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        response = self.get("/api/v1/regions/type/gnd/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(self.calls, 1)
+
+        # Other URLs, query strings and versions get other ETags.
+        self.assertNotEqual(self.get("/api/v1/regions/type/dsd/")["ETag"], etag)
+        self.assertNotEqual(self.get("/graphql/?query=%7Bregions%7D")["ETag"], etag)
+        bump_data_version()
+        response = self.get("/api/v1/regions/type/gnd/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    @override_settings(DATA_VERSION_TTL=0)
+    async def test_async(self):
+        async def view(request):
+            self.calls += 1
+            return JsonResponse({"ok": True})
+
+        conditional = ConditionalDataMiddleware(view)
+        self.assertTrue(iscoroutinefunction(conditional))
+        factory = AsyncRequestFactory()
+        response = await conditional(factory.get("/api/v1/regions/type/gnd/"))
+        self.assertIn("no-cache", response["Cache-Control"])
+        headers = {"If-None-Match": response["ETag"]}
+        response = await conditional(factory.get("/api/v1/regions/type/gnd/", headers=headers))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.calls, 1)
+        self.assertFalse((await conditional(factory.post("/graphql/"))).has_header("ETag"))
+
+    def test_only_read_requests_under_api_paths(self):
+        self.assertFalse(ConditionalDataMiddleware(self.view)(self.factory.post("/graphql/")).has_header("ETag"))
+        self.assertFalse(self.get("/admin/").has_header("ETag"))
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches('"4-ab-gzip"', '"4-ab"'))
+        self.assertTrue(etag_matches('W/"4-ab", "5-cd"', '"4-ab"'))
+        self.assertTrue(etag_matches("*", '"4-ab"'))
+        self.assertFalse(etag_matches('"3-ab"', '"4-ab"'))
+        self.assertFalse(etag_matches(None, '"4-ab"'))
+
+    def test_data_version(self):
+        with override_settings(DATA_VERSION_TTL=0):
+            before = get_data_version()
+            self.assertEqual(bump_data_version(), before + 1)
+            self.assertEqual(get_data_version(), before + 1)
@@ -0,0 +1,156 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from mylocalstats.population_stats.graphql.schema import schema
+from mylocalstats.population_stats.indicators import rebuild_region_indicators
+from mylocalstats.population_stats.models import GenderDistribution, Region, TotalPopulation
+from mylocalstats.population_stats.ranking import (
+    get_ranking,
+    invalidate_rankings,
+    quantile_bins,
+    top_regions,
+)
+from mylocalstats.population_stats.versioning import bump_data_version
+from mylocalstats.population_stats.views import get_statistic_quantiles, get_statistic_ranking
+
+
+class TestRanking(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Ten GNDs with populations 100, 200, ..., 1000 (GN-3 and GN-4 tie)
+        # and one district that must not be ranked with them.
+        for i in range(10):
+            region = Region.objects.create(region_id=f"GN-{i}", name=f"GND {i}", region_type="gnd", area_sq_km=1)
+            population = 450 if i in (3, 4) else 100 * (i + 1)
+            TotalPopulation.objects.create(region=region, total_population=population)
+            GenderDistribution.objects.create(region=region, total_population=100, male=40 + i, female=60 - i)
+        district = Region.objects.create(region_id="LK-11", name="Colombo", region_type="district")
+        TotalPopulation.objects.create(region=district, total_population=10 ** 6)
+
+    def setUp(self):
+        invalidate_rankings()
+
+    def test_latest_year_per_region_by_default(self):
+        TotalPopulation.objects.create(region_id="GN-0", year=2024, total_population=2000)
+        rows = get_ranking("population", "total_population", region_type="gnd")
+        self.assertEqual(len(rows), 10)
+        self.assertEqual((rows[0]["region_id"], rows[0]["year"]), ("GN-0", 2024))
+        self.assertEqual({row["year"] for row in rows[1:]}, {2012})
+        rows_2012 = get_ranking("population", "total_population", region_type="gnd", year=2012)
+        self.assertEqual(rows_2012[-1]["region_id"], "GN-0")
+
+    def test_rank_and_percentile(self):
+        rows = get_ranking("population", "total_population", region_type="GND")
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(rows[0]["region_id"], "GN-9")
+        self.assertEqual((rows[0]["rank"], rows[0]["percentile"]), (1, 100.0))
+        self.assertEqual(rows[-1]["percentile"], 0.0)
+        ties = [row for row in rows if row["value"] == 450]
+        self.assertEqual([row["rank"] for row in ties], [6, 6])
+        self.assertEqual(get_ranking("population", "total_population")[0]["region_id"], "LK-11")
+
+    @override_settings(DATA_VERSION_TTL=60)
+    def test_cached_until_invalidated(self):
+        get_ranking("population", "total_population", region_type="gnd", year=2012)
+        with CaptureQueriesContext(connection) as queries:
+            top_regions("population", "total_population", region_type="gnd", year=2012, limit=3)
+            quantile_bins("population", "total_population", region_type="gnd", year=2012)
+        self.assertEqual(len(queries), 0)
+
+        TotalPopulation.objects.filter(region_id="GN-0").update(total_population=5000)
+        invalidate_rankings()
+        rows = top_regions("population", "total_population", region_type="gnd", limit=1)
+        self.assertEqual(rows[0]["region_id"], "GN-0")
+
+    @override_settings(DATA_VERSION_TTL=0)
+    def test_data_version_invalidates_other_processes(self):
+        # An import in another process bumps the data version in the
+        # database but cannot reach this process's local cache.
+        get_ranking("population", "total_population", region_type="gnd")
+        TotalPopulation.objects.filter(region_id="GN-0").update(total_population=5000)
+        bump_data_version()
+        self.assertEqual(get_ranking("population", "total_population", region_type="gnd")[0]["region_id"], "GN-0")
+
+    def test_import_command_invalidates_rankings(self):
+        get_ranking("population", "total_population", region_type="gnd")
+        before = cache.get("ranking:version")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "population.tsv")
+            with open(path, "w") as handle:
+                handle.write("entity_id\ttotal_population\nGN-0\t5000\n")
+            call_command(
+                "insert_total_population", path, region_type="gnd", skip_indicators=True, stdout=StringIO()
+            )
+        self.assertEqual(cache.get("ranking:version"), before + 1)
+        rows = top_regions("population", "total_population", region_type="gnd", limit=1)
+        self.assertEqual(rows[0]["region_id"], "GN-0")
+
+    def test_top_n_and_percentiles(self):
+        rows = top_regions("population", "total_population", region_type="gnd", limit=3)
+        self.assertEqual([row["region_id"] for row in rows], ["GN-9", "GN-8", "GN-7"])
+        rows = top_regions("population", "total_population", region_type="gnd", limit=2, ascending=True)
+        self.assertEqual([row["region_id"] for row in rows], ["GN-0", "GN-1"])
+        rows = top_regions("population", "total_population", region_type="gnd", limit=100, min_percentile=80)
+        self.assertEqual([row["region_id"] for row in rows], ["GN-9", "GN-8"])
+
+    def test_quantile_bins_match_ntile(self):
+        bins = quantile_bins("population", "total_population", region_type="gnd", bins=4)
+        self.assertEqual([b["count"] for b in bins], [3, 3, 2, 2])
+        self.assertEqual(bins[0]["min_value"], 100)
+        self.assertEqual(bins[-1]["region_ids"], ["GN-8", "GN-9"])
+
+    def test_indicators(self):
+        rebuild_region_indicators(["gender-distribution"])
+        rows = top_regions("indicators", "sex_ratio", region_type="gnd", limit=1)
+        self.assertEqual(rows[0]["region_id"], "GN-9")
+
+    def test_invalid_arguments(self):
+        for statistic, column in (("population", "year"), ("population", "nope"), ("nope", "x"), ("indicators", "x")):
+            with self.assertRaises(ValueError):
+                get_ranking(statistic, column)
+        with self.assertRaises(ValueError):
+            top_regions("population", "total_population", min_percentile=120)
+
+    def test_endpoints(self):
+        request = RequestFactory().get("/api/v1/rank/population/total_population/", {"type": "gnd", "limit": "2"})
+        response = get_statistic_ranking(request, statistic="population", column="total_population")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["region_id"] for row in response.data], ["GN-9", "GN-8"])
+
+        request = RequestFactory().get("/api/v1/quantiles/population/total_population/", {"type": "gnd", "bins": "2"})
+        response = get_statistic_quantiles(request, statistic="population", column="total_population")
+        self.assertEqual([b["count"] for b in response.data], [5, 5])
+
+        request = RequestFactory().get("/api/v1/rank/population/name/")
+        self.assertEqual(get_statistic_ranking(request, statistic="population", column="name").status_code, 400)
+        request = RequestFactory().get("/api/v1/quantiles/population/total_population/", {"bins": "0"})
+        response = get_statistic_quantiles(request, statistic="population", column="total_population")
+        self.assertEqual(response.status_code, 400)
+
+    def test_graphql(self):
+        result = schema.execute(
+            """{
+              ranking(statistic: "gender-distribution", column: "male", regionType: "gnd", limit: 2) {
+                rank percentile value region { regionId }
+              }
+              quantiles(statistic: "population", column: "total_population", regionType: "gnd", bins: 5) {
+                bin count
+              }
+            }""",
+            context_value=RequestFactory().post("/graphql/"),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data["ranking"],
+            [
+                {"rank": 1, "percentile": 100.0, "value": 49.0, "region": {"regionId": "GN-9"}},
+                {"rank": 2, "percentile": 88.8889, "value": 48.0, "region": {"regionId": "GN-8"}},
+            ],
+        )
+        self.assertEqual([b["count"] for b in result.data["quantiles"]], [2] * 5)
@@ -0,0 +1,71 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import RequestFactory, TestCase
+from mylocalstats.population_stats.graphql.schema import schema
+from mylocalstats.population_stats.models import Region, RegionType, normalize_region_type
+from mylocalstats.population_stats.views import get_regions_by_type
+
+
+class TestNormalizeRegionType(TestCase):
+    def test_canonical_values(self):
+        self.assertEqual(normalize_region_type(" GND "), RegionType.GND)
+        self.assertEqual(normalize_region_type("District"), "district")
+        self.assertIsNone(normalize_region_type(None))
+
+
+class TestRegionTypeLookups(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Region.objects.bulk_create(
+            Region(region_id=f"GN-{i}", name=f"GND {i}", region_type="gnd" if i % 10 else "dsd")
+            for i in range(200)
+        )
+        Region.objects.create(region_id="LK-1", name="Western", region_type="province")
+
+    def explain(self, queryset):
+        return queryset.explain().upper()
+
+    def test_exact_lookup_uses_index(self):
+        # SQLite: "SEARCH regions USING INDEX regions_region_..._idx (region_type=?)".
+        plan = self.explain(Region.objects.of_type("GND"))
+        self.assertIn("USING INDEX", plan)
+        self.assertIn("(REGION_TYPE=?)", plan)
+        # The old case-insensitive filter wraps the column and scans the table.
+        plan = self.explain(Region.objects.filter(region_type__iexact="GND"))
+        self.assertNotIn("INDEX", plan)
+
+    def test_any_case_matches(self):
+        self.assertEqual(Region.objects.of_type("DSD").count(), 20)
+        self.assertEqual(Region.objects.of_type("dsd").count(), 20)
+
+    def test_rest_and_graphql(self):
+        request = RequestFactory().get("/api/v1/regions/type/Province/")
+        response = get_regions_by_type(request, region_type="Province")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["region_id"] for row in response.data], ["LK-1"])
+
+        result = schema.execute(
+            '{ regions(type: "PROVINCE") { edges { node { regionId regionType } } } }',
+            context_value=RequestFactory().post("/graphql/"),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data["regions"]["edges"], [{"node": {"regionId": "LK-1", "regionType": "province"}}]
+        )
+
+
+class TestInsertRegionDataType(TestCase):
+    def test_type_normalized_at_import(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "gnds.tsv")
+            with open(path, "w") as handle:
+                handle.write("id\tname\n")
+                handle.write("LK-1127005\tKotahena East\n")
+            call_command("insert_region_data", path, type="GND", skip_closure=True, stdout=StringIO())
+            self.assertEqual(Region.objects.get(region_id="LK-1127005").region_type, "gnd")
+            with self.assertRaises(CommandError):
+                call_command("insert_region_data", path, type="city", stdout=StringIO())
@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from mylocalstats.population_stats.graphql.schema import schema
+from mylocalstats.population_stats.models import Region, RegionRelation
+from mylocalstats.population_stats.relations import parse_id_list, update_region_relations
+from mylocalstats.population_stats.versioning import get_data_version
+from mylocalstats.population_stats.views import get_related_regions_by_id
+
+
+class TestParseIdList(TestCase):
+    def test_formats(self):
+        self.assertEqual(parse_id_list(["LK-1", "LK-2"]), ["LK-1", "LK-2"])
+        self.assertEqual(parse_id_list("['LK-1', 'LK-2', 'LK-1']"), ["LK-1", "LK-2"])
+        # insert_region_data used to store the TSV literal JSON-encoded.
+        self.assertEqual(parse_id_list(json.dumps("['LK-1']")), ["LK-1"])
+        self.assertEqual(parse_id_list('["LK-1"]'), ["LK-1"])
+        self.assertEqual(parse_id_list(None), [])
+        self.assertEqual(parse_id_list("not a list"), [])
+
+
+class TestRegionRelations(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Region.objects.create(region_id="LK-1", name="Western", region_type="Province", subs=["LK-11", "LK-12"])
+        Region.objects.create(region_id="LK-11", name="Colombo", region_type="District", supers="['LK-1']")
+        Region.objects.create(region_id="LK-12", name="Gampaha", region_type="District", supers=["LK-1"])
+        Region.objects.create(region_id="EC-01", name="Colombo ED", region_type="ED", ints=["LK-11"])
+        Region.objects.create(region_id="MOH-1", name="Colombo MOH", region_type="MOH", ints=["LK-11", "EC-01"])
+        cls.row_count = update_region_relations()
+
+    def ids(self, queryset):
+        return sorted(queryset.values_list("region_id", flat=True))
+
+    def test_rebuild(self):
+        self.assertEqual(self.row_count, 7)
+        self.assertEqual(RegionRelation.objects.count(), 7)
+
+    def test_lookups(self):
+        self.assertEqual(self.ids(Region.objects.subs_of("LK-1")), ["LK-11", "LK-12"])
+        self.assertEqual(self.ids(Region.objects.supers_of("LK-11")), ["LK-1"])
+        # Intersection is symmetric even though only EC-01 and MOH-1 list it.
+        self.assertEqual(self.ids(Region.objects.intersecting("LK-11")), ["EC-01", "MOH-1"])
+        self.assertEqual(self.ids(Region.objects.intersecting("EC-01")), ["LK-11", "MOH-1"])
+
+    def test_lookup_is_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            list(Region.objects.intersecting("LK-11"))
+        self.assertEqual(len(queries), 1)
+
+    def test_partial_update(self):
+        Region.objects.filter(region_id="LK-1").update(subs=["LK-11"])
+        update_region_relations(["LK-1"])
+        self.assertEqual(self.ids(Region.objects.subs_of("LK-1")), ["LK-11"])
+        self.assertEqual(self.ids(Region.objects.intersecting("LK-11")), ["EC-01", "MOH-1"])
+
+    def test_rest_endpoint(self):
+        request = RequestFactory().get("/api/v1/region/id/LK-11/related/intersecting/")
+        response = get_related_regions_by_id(request, region_id="LK-11", relation="intersecting")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["region_id"] for row in response.data], ["EC-01", "MOH-1"])
+        response = get_related_regions_by_id(request, region_id="LK-11", relation="neighbours")
+        self.assertEqual(response.status_code, 400)
+
+    def test_graphql(self):
+        result = schema.execute(
+            '{ relatedRegions(regionId: "LK-1", relation: "subs") { edges { node { regionId } } } }',
+            context_value=RequestFactory().post("/graphql/"),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            [edge["node"]["regionId"] for edge in result.data["relatedRegions"]["edges"]],
+            ["LK-11", "LK-12"],
+        )
+
+
+class TestInsertRegionDataRelations(TestCase):
+    def test_import_stores_arrays_and_relations(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "provinces.tsv")
+            with open(path, "w") as handle:
+                handle.write("id\tname\tsubs\tints\n")
+                handle.write("LK-1\tWestern\t['LK-11', 'LK-12']\t[]\n")
+            call_command("insert_region_data", path, type="Province", stdout=StringIO())
+        region = Region.objects.get(region_id="LK-1")
+        self.assertEqual(region.subs, ["LK-11", "LK-12"])
+        self.assertEqual(region.ints, [])
+        self.assertEqual(
+            sorted(RegionRelation.objects.values_list("to_region_id", "kind")),
+            [("LK-11", "sub"), ("LK-12", "sub")],
+        )
+
+
+class TestBuildRegionRelations(TestCase):
+    @override_settings(DATA_VERSION_TTL=0)
+    def test_bumps_data_version(self):
+        before = get_data_version()
+        call_command("build_region_relations", stdout=StringIO())
+        self.assertEqual(get_data_version(), before + 1)
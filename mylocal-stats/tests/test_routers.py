@@ -0,0 +1,108 @@
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db import OperationalError
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, override_settings
+from mylocalstats.population_stats import routers
+from mylocalstats.population_stats.graphql.views import PopulationStatsGraphQLView
+from mylocalstats.population_stats.models import Region
+from mylocalstats.population_stats.routers import ReplicaReadMiddleware, ReplicaRouter, replica_reads
+
+
+@override_settings(
+    DATABASE_REPLICAS=["replica1", "replica2", "replica3"],
+    DATABASE_REPLICA_MAX_LAG=10,
+    DATABASE_REPLICA_CHECK_INTERVAL=60,
+)
+class TestReplicaRouter(SimpleTestCase):
+    def setUp(self):
+        self.lags = {"replica1": 0.0, "replica2": 2.5, "replica3": 0.0}
+        patcher = mock.patch.object(routers, "replica_lag", side_effect=self.lag)
+        self.replica_lag = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = ReplicaRouter()
+
+    def lag(self, alias):
+        if self.lags[alias] is None:
+            raise OperationalError("connection refused")
+        return self.lags[alias]
+
+    def reads(self, count):
+        with replica_reads():
+            return [self.router.db_for_read(Region) for _ in range(count)]
+
+    def test_reads_use_primary_unless_allowed(self):
+        self.assertEqual(self.router.db_for_read(Region), "default")
+        self.assertEqual(self.router.db_for_write(Region), "default")
+        with replica_reads():
+            self.assertEqual(self.router.db_for_write(Region), "default")
+        self.assertFalse(self.router.allow_migrate("replica1", "population_stats"))
+        self.replica_lag.assert_not_called()
+
+    def test_round_robin(self):
+        self.assertEqual(self.reads(4), ["replica1", "replica2", "replica3", "replica1"])
+        # Lag is measured once per check interval, not per query.
+        self.assertEqual(self.replica_lag.call_count, 3)
+
+    def test_lagging_and_unreachable_replicas_are_skipped(self):
+        self.lags.update(replica2=60.0, replica3=None)
+        with self.assertLogs("mylocalstats.population_stats.routers", "WARNING"):
+            self.assertEqual(self.reads(2), ["replica1", "replica1"])
+
+    def test_fallback_to_primary(self):
+        self.lags = dict.fromkeys(self.lags, 60.0)
+        with self.assertLogs("mylocalstats.population_stats.routers", "WARNING"):
+            self.assertEqual(self.reads(1), ["default"])
+
+    def test_recheck_after_interval(self):
+        with override_settings(DATABASE_REPLICA_CHECK_INTERVAL=0):
+            self.reads(1)
+            self.lags["replica1"] = 60.0
+            with self.assertLogs("mylocalstats.population_stats.routers", "WARNING"):
+                self.assertNotIn("replica1", self.reads(3))
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class TestReplicaReadMiddleware(SimpleTestCase):
+    def route(self, request, view):
+        router = ReplicaRouter()
+        seen = []
+        middleware = ReplicaReadMiddleware(lambda r: seen.append(router.db_for_read(Region)))
+        with mock.patch.object(routers, "replica_lag", return_value=0.0):
+            original = middleware.get_response
+
+            def get_response(r):
+                middleware.process_view(r, view, (), {})
+                return original(r)
+
+            middleware.get_response = get_response
+            middleware(request)
+            seen.append(router.db_for_read(Region))
+        return seen
+
+    def test_safe_requests_read_from_replicas(self):
+        factory = RequestFactory()
+        view = mock.Mock(spec=[])
+        self.assertEqual(self.route(factory.get("/api/v1/regions/type/gnd/"), view), ["replica1", "default"])
+        self.assertEqual(self.route(factory.post("/api/v1/regions/type/gnd/"), view), ["default", "default"])
+        self.assertEqual(self.route(factory.get("/admin/population_stats/"), view), ["default", "default"])
+        graphql = PopulationStatsGraphQLView.as_view()
+        self.assertEqual(self.route(factory.post("/graphql/"), graphql), ["replica1", "default"])
+
+    async def test_async(self):
+        router = ReplicaRouter()
+        seen = []
+
+        async def get_response(request):
+            # As the async handler calls a sync process_view.
+            await sync_to_async(middleware.process_view)(request, mock.Mock(spec=[]), (), {})
+            seen.append(await sync_to_async(router.db_for_read)(Region))
+
+        middleware = ReplicaReadMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        factory = AsyncRequestFactory()
+        with mock.patch.object(routers, "replica_lag", return_value=0.0):
+            await middleware(factory.get("/api/v1/regions/type/gnd/"))
+            seen.append(router.db_for_read(Region))
+            await middleware(factory.post("/api/v1/regions/type/gnd/"))
+        self.assertEqual(seen, ["replica1", "default", "default"])
@@ -0,0 +1,135 @@
+import os
+import random
+import string
+import tempfile
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from mylocalstats.population_stats.graphql.schema import schema
+from mylocalstats.population_stats.models import Region, RegionAlternateName
+from mylocalstats.population_stats.search import (
+    RegionNameIndex,
+    autocomplete_regions,
+    reset_region_name_index,
+    search_regions,
+    similarity,
+    trigrams,
+)
+from mylocalstats.population_stats.views import autocomplete_regions_by_name, search_regions_by_name
+
+
+class TestTrigrams(TestCase):
+    def test_matches_pg_trgm(self):
+        # SELECT show_trgm('Col'); -> {"  c"," co","col","ol "}
+        self.assertEqual(trigrams("Col"), {"  c", " co", "col", "ol "})
+        # SELECT similarity('Colombo', 'Colmbo'); -> 0.5
+        self.assertAlmostEqual(similarity("Colombo", "Colmbo"), 0.5)
+        self.assertEqual(similarity("", "Colombo"), 0.0)
+
+
+class TestRegionNameIndex(TestCase):
+    def setUp(self):
+        self.index = RegionNameIndex([
+            {"region_id": "LK-11", "name": "Colombo", "region_type": "District", "population": 2300000},
+            {"region_id": "LK-1127", "name": "Colombo", "region_type": "DSD", "population": 320000},
+            {"region_id": "LK-1103", "name": "Dehiwala-Mount Lavinia", "region_type": "DSD", "population": 180000},
+            {"region_id": "LK-21", "name": "Kandy", "region_type": "District", "population": 1400000,
+             "alternate_names": ["Mahanuwara"]},
+            {"region_id": "LK-1130", "name": "Kolonnawa", "region_type": "DSD", "population": 190000},
+        ])
+
+    def test_typo_tolerant_search(self):
+        results = self.index.search("Colmbo")
+        self.assertEqual([r["region_id"] for r, _ in results], ["LK-11", "LK-1127"])
+        self.assertAlmostEqual(results[0][1], 0.5)
+        self.assertEqual([r["region_id"] for r, _ in self.index.search("colmbo", region_type="dsd")], ["LK-1127"])
+        self.assertEqual(self.index.search("zzzz"), [])
+
+    def test_alternate_names(self):
+        self.assertEqual(self.index.search("Mahanuwra")[0][0]["region_id"], "LK-21")
+        self.assertEqual(self.index.autocomplete("maha")[0]["region_id"], "LK-21")
+
+    def test_autocomplete(self):
+        self.assertEqual([r["region_id"] for r in self.index.autocomplete("Col")], ["LK-11", "LK-1127"])
+        self.assertEqual([r["region_id"] for r in self.index.autocomplete("co", limit=1)], ["LK-11"])
+        # Word-boundary and multi-word prefixes.
+        self.assertEqual([r["region_id"] for r in self.index.autocomplete("mount la")], ["LK-1103"])
+        self.assertEqual([r["region_id"] for r in self.index.autocomplete("k", region_type="DSD")], ["LK-1130"])
+        self.assertEqual(self.index.autocomplete("  "), [])
+
+    def test_autocomplete_latency(self):
+        rng = random.Random(5)
+        regions = [
+            {
+                "region_id": f"GN-{i}",
+                "name": " ".join(
+                    "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))).title()
+                    for _ in range(rng.randint(1, 3))
+                ),
+                "region_type": "GND",
+                "population": rng.randint(100, 5000),
+            }
+            for i in range(15000)
+        ]
+        index = RegionNameIndex(regions)
+        prefixes = [region["name"][:rng.randint(1, 4)] for region in rng.sample(regions, 200)]
+        start = time.perf_counter()
+        for prefix in prefixes:
+            index.autocomplete(prefix)
+        self.assertLess((time.perf_counter() - start) / len(prefixes), 0.01)
+
+
+class TestSearchEndpoints(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Region.objects.create(region_id="LK-11", name="Colombo", region_type="District", population=2300000)
+        Region.objects.create(region_id="LK-1127", name="Colombo", region_type="DSD", population=320000)
+        Region.objects.create(region_id="LK-12", name="Gampaha", region_type="District", population=2300000)
+
+    def setUp(self):
+        reset_region_name_index()
+        self.addCleanup(reset_region_name_index)
+
+    def test_search(self):
+        request = RequestFactory().get("/api/v1/regions/search/", {"q": "Colmbo", "type": "district"})
+        response = search_regions_by_name(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data, [{"region_id": "LK-11", "name": "Colombo", "region_type": "District", "score": 0.5}]
+        )
+        for params in ({}, {"q": "x", "limit": "0"}):
+            request = RequestFactory().get("/api/v1/regions/search/", params)
+            self.assertEqual(search_regions_by_name(request).status_code, 400)
+
+    def test_autocomplete(self):
+        request = RequestFactory().get("/api/v1/regions/autocomplete/", {"q": "gam"})
+        response = autocomplete_regions_by_name(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["region_id"] for row in response.data], ["LK-12"])
+
+    def test_graphql(self):
+        result = schema.execute(
+            '{ searchRegions(query: "colombo", limit: 5) { score region { regionId regionType } } }',
+            context_value=RequestFactory().post("/graphql/"),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            [row["region"]["regionId"] for row in result.data["searchRegions"]], ["LK-11", "LK-1127"]
+        )
+        self.assertEqual(result.data["searchRegions"][0]["score"], 1.0)
+
+    @override_settings(DATA_VERSION_TTL=0)
+    def test_import_alternate_names(self):
+        self.assertEqual(search_regions("Mahanuwara"), [])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "districts.tsv")
+            with open(path, "w") as handle:
+                handle.write("id\tname\tname_si\tname_ta\tprovince_id\n")
+                handle.write("LK-21\tKandy\tMahanuwara\t\tLK-2\n")
+            call_command("insert_region_data", path, type="District", stdout=StringIO())
+        self.assertEqual(list(RegionAlternateName.objects.values_list("region_id", "name")), [("LK-21", "Mahanuwara")])
+        # The import changed the data version, so the index is rebuilt.
+        self.assertEqual(search_regions("Mahanuwra")[0][0]["region_id"], "LK-21")
+        self.assertEqual(autocomplete_regions("maha")[0]["region_id"], "LK-21")
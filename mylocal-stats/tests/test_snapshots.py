@@ -0,0 +1,151 @@
+import gzip
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.urls import path
+from mylocalstats.population_stats import views
+from mylocalstats.population_stats.models import Region, TotalPopulation
+from mylocalstats.population_stats.snapshots import SnapshotMiddleware, serve_snapshot
+from mylocalstats.population_stats.versioning import bump_data_version
+
+urlpatterns = [
+    path('api/v1/regions/type/<str:region_type>/', views.get_regions_by_type, name='get_regions_by_type'),
+    path('api/v1/region/id/<str:region_id>/', views.get_region_by_id, name='get_region_by_id'),
+    path(
+        'api/v1/population/type/<str:region_type>/', views.get_population_by_region_type,
+        name='get_population_by_region_type'
+    ),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestSnapshots(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for region_id, region_type in (("LK-1", "province"), ("LK-11", "district"), ("LK-12", "district")):
+            region = Region.objects.create(region_id=region_id, name=region_id, region_type=region_type)
+            TotalPopulation.objects.create(region=region, total_population=100)
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.factory = RequestFactory()
+
+    def publish(self, *args):
+        out = StringIO()
+        call_command("publish_snapshot", "--output", str(self.directory), "--no-brotli", *args, stdout=out)
+        return out.getvalue()
+
+    def manifest(self):
+        return json.loads((self.directory / "manifest.json").read_text())
+
+    def test_publish(self):
+        output = self.publish()
+        entries = self.manifest()["entries"]
+        self.assertEqual(set(entries), {
+            "/api/v1/regions/type/district/", "/api/v1/regions/type/province/",
+            "/api/v1/population/type/district/", "/api/v1/population/type/province/",
+            "/api/v1/region/id/LK-1/", "/api/v1/region/id/LK-11/", "/api/v1/region/id/LK-12/",
+        })
+        self.assertNotIn("Skipped responses", output)
+
+        entry = entries["/api/v1/regions/type/district/"]
+        body = (self.directory / "objects" / entry["hash"][:2] / f"{entry['hash']}.json").read_bytes()
+        self.assertEqual([region["region_id"] for region in json.loads(body)], ["LK-11", "LK-12"])
+        self.assertEqual(entry["encodings"], ["gzip"])
+
+        entry = entries["/api/v1/region/id/LK-11/"]
+        body = (self.directory / "objects" / entry["hash"][:2] / f"{entry['hash']}.json").read_bytes()
+        self.assertEqual(json.loads(body)["region_id"], "LK-11")
+
+    def test_unchanged_objects_are_reused_and_pruned(self):
+        self.publish()
+        before = self.manifest()["entries"]
+        Region.objects.filter(region_id="LK-12").update(name="Gampaha")
+        output = self.publish("--prune")
+        after = self.manifest()["entries"]
+        self.assertEqual(after["/api/v1/regions/type/province/"], before["/api/v1/regions/type/province/"])
+        self.assertEqual(after["/api/v1/region/id/LK-11/"], before["/api/v1/region/id/LK-11/"])
+        self.assertNotEqual(after["/api/v1/regions/type/district/"], before["/api/v1/regions/type/district/"])
+        self.assertNotEqual(after["/api/v1/region/id/LK-12/"], before["/api/v1/region/id/LK-12/"])
+        # Population rows carry the region name.
+        self.assertNotEqual(after["/api/v1/population/type/district/"], before["/api/v1/population/type/district/"])
+        self.assertIn("Pruned 6 unreferenced objects", output)
+
+    def test_middleware_serves_snapshot(self):
+        self.publish()
+        middleware = SnapshotMiddleware(lambda request: HttpResponse("from view"))
+        with override_settings(SNAPSHOT_DIR=str(self.directory)):
+            response = middleware(self.factory.get("/api/v1/regions/type/district/", HTTP_ACCEPT_ENCODING="gzip, br"))
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertEqual(response["Vary"], "Accept-Encoding")
+            body = gzip.decompress(b"".join(response.streaming_content))
+            self.assertEqual(len(json.loads(body)), 2)
+
+            response = middleware(self.factory.get("/api/v1/regions/type/district/"))
+            self.assertNotIn("Content-Encoding", response)
+            etag = response["ETag"]
+            response.close()
+
+            response = middleware(self.factory.get("/api/v1/regions/type/district/", HTTP_IF_NONE_MATCH=etag))
+            self.assertEqual(response.status_code, 304)
+
+            for request in (
+                self.factory.get("/api/v1/regions/type/gnd/"),
+                self.factory.get("/api/v1/regions/type/district/", {"page": "2"}),
+                self.factory.post("/api/v1/regions/type/district/"),
+            ):
+                self.assertEqual(middleware(request).content, b"from view")
+
+    def test_if_none_match_list(self):
+        self.publish()
+        with override_settings(SNAPSHOT_DIR=str(self.directory)):
+            etag = serve_snapshot(self.factory.get("/api/v1/regions/type/district/"))["ETag"]
+            for if_none_match in (f'"other", {etag}', etag[2:], "*"):
+                response = serve_snapshot(
+                    self.factory.get("/api/v1/regions/type/district/", HTTP_IF_NONE_MATCH=if_none_match)
+                )
+                self.assertEqual(response.status_code, 304, if_none_match)
+            response = serve_snapshot(
+                self.factory.get("/api/v1/regions/type/district/", HTTP_IF_NONE_MATCH=f'"x{etag[3:]}')
+            )
+            self.assertEqual(response.status_code, 200)
+            response.close()
+
+    @override_settings(DATA_VERSION_TTL=0)
+    def test_stale_snapshot_falls_through(self):
+        self.publish()
+        with override_settings(SNAPSHOT_DIR=str(self.directory)):
+            serve_snapshot(self.factory.get("/api/v1/regions/type/district/")).close()
+            bump_data_version()
+            self.assertIsNone(serve_snapshot(self.factory.get("/api/v1/regions/type/district/")))
+            self.publish()
+            serve_snapshot(self.factory.get("/api/v1/regions/type/district/")).close()
+
+    async def test_async(self):
+        await sync_to_async(self.publish)()
+
+        async def view(request):
+            return HttpResponse("from view")
+
+        middleware = SnapshotMiddleware(view)
+        factory = AsyncRequestFactory()
+        with override_settings(SNAPSHOT_DIR=str(self.directory)):
+            response = await middleware(factory.get("/api/v1/regions/type/district/"))
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.from_snapshot)
+            response.close()
+            response = await middleware(factory.get("/api/v1/regions/type/gnd/"))
+            self.assertEqual(response.content, b"from view")
+
+    def test_disabled_without_snapshot_dir(self):
+        self.publish()
+        with override_settings(SNAPSHOT_DIR=None):
+            self.assertIsNone(serve_snapshot(self.factory.get("/api/v1/regions/type/district/")))
@@ -0,0 +1,130 @@
+import os
+import random
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from mylocalstats.population_stats.graphql.schema import schema
+from mylocalstats.population_stats.models import Region
+from mylocalstats.population_stats.spatial import (
+    encode_geohash,
+    haversine_km,
+    nearest_regions,
+    regions_in_bbox,
+)
+from mylocalstats.population_stats.views import get_nearest_regions, get_regions_in_bbox
+
+
+class TestGeohash(TestCase):
+    def test_encode(self):
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 5), "u4pru")
+        self.assertIsNone(encode_geohash(None, 79.8612))
+
+    def test_haversine(self):
+        # Colombo to Kandy is roughly 94 km in a straight line.
+        self.assertAlmostEqual(haversine_km(6.9271, 79.8612, 7.2906, 80.6337), 94, delta=2)
+
+
+class TestSpatialQueries(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(7)
+        regions = []
+        for i in range(300):
+            latitude = round(rng.uniform(5.9, 9.8), 6)
+            longitude = round(rng.uniform(79.6, 81.9), 6)
+            regions.append(Region(
+                region_id=f"GN-{i}", name=f"GND {i}", region_type="gnd" if i % 10 else "dsd",
+                latitude=latitude, longitude=longitude, geohash=encode_geohash(latitude, longitude)
+            ))
+        Region.objects.bulk_create(regions)
+        Region.objects.create(region_id="LK", name="Sri Lanka", region_type="country")
+
+    def brute_force(self, latitude, longitude, k, region_type=None):
+        regions = Region.objects.exclude(latitude=None)
+        if region_type:
+            regions = regions.filter(region_type=region_type)
+        distances = sorted(
+            (haversine_km(latitude, longitude, r.latitude, r.longitude), r.region_id) for r in regions
+        )
+        return [region_id for _, region_id in distances[:k]]
+
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(11)
+        for _ in range(20):
+            latitude, longitude = rng.uniform(5.5, 10.2), rng.uniform(79.3, 82.2)
+            for k, region_type in ((1, None), (7, None), (3, "dsd")):
+                nearest = nearest_regions(latitude, longitude, k=k, region_type=region_type)
+                self.assertEqual(
+                    [region.region_id for region, _ in nearest],
+                    self.brute_force(latitude, longitude, k, region_type),
+                )
+
+    def test_nearest_far_away_falls_back_to_scan(self):
+        nearest = nearest_regions(-33.9, 18.4, k=2)
+        self.assertEqual([r.region_id for r, _ in nearest], self.brute_force(-33.9, 18.4, 2))
+
+    def test_nearest_validates_input(self):
+        with self.assertRaises(ValueError):
+            nearest_regions(91, 0)
+        with self.assertRaises(ValueError):
+            nearest_regions(7, 80, k=0)
+
+    def test_bbox(self):
+        regions = regions_in_bbox(6.5, 79.8, 7.5, 80.5)
+        expected = {
+            r.region_id for r in Region.objects.exclude(latitude=None)
+            if 6.5 <= r.latitude <= 7.5 and 79.8 <= r.longitude <= 80.5
+        }
+        self.assertEqual(set(regions.values_list("region_id", flat=True)), expected)
+        with self.assertRaises(ValueError):
+            regions_in_bbox(8, 79, 7, 80)
+
+    def test_rest_endpoints(self):
+        request = RequestFactory().get("/api/v1/regions/nearest/", {"lat": "7.0", "lon": "80.0", "k": "3"})
+        response = get_nearest_regions(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["region_id"] for row in response.data], self.brute_force(7.0, 80.0, 3))
+        self.assertLessEqual(response.data[0]["distance_km"], response.data[1]["distance_km"])
+
+        request = RequestFactory().get(
+            "/api/v1/regions/bbox/", {"min_lat": "5", "min_lon": "79", "max_lat": "10", "max_lon": "82", "type": "dsd"}
+        )
+        response = get_regions_in_bbox(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 30)
+
+        request = RequestFactory().get("/api/v1/regions/nearest/", {"lat": "7.0"})
+        self.assertEqual(get_nearest_regions(request).status_code, 400)
+
+    def test_graphql(self):
+        result = schema.execute(
+            """
+            {
+              nearestRegions(latitude: 7.0, longitude: 80.0, k: 2) { distanceKm region { regionId } }
+              regionsInBbox(minLatitude: 5, minLongitude: 79, maxLatitude: 10, maxLongitude: 82, first: 5) {
+                totalCount
+              }
+            }
+            """,
+            context_value=RequestFactory().post("/graphql/"),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            [row["region"]["regionId"] for row in result.data["nearestRegions"]],
+            self.brute_force(7.0, 80.0, 2),
+        )
+        self.assertEqual(result.data["regionsInBbox"]["totalCount"], 300)
+
+
+class TestInsertRegionDataGeohash(TestCase):
+    def test_geohash_from_centroid(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "districts.tsv")
+            with open(path, "w") as handle:
+                handle.write("id\tname\tcentroid\n")
+                handle.write("LK-11\tColombo\t[6.9271, 79.8612]\n")
+            call_command("insert_region_data", path, type="District", stdout=StringIO())
+        self.assertEqual(Region.objects.get(region_id="LK-11").geohash, encode_geohash(6.9271, 79.8612))
@@ -0,0 +1,54 @@
+from django.test import RequestFactory, TestCase
+from mylocalstats.population_stats import views
+from mylocalstats.population_stats.aggregation import STATISTIC_MODELS, get_numeric_columns
+from mylocalstats.population_stats.models import Region
+
+# Detail view and statistic name of every ``<statistic>/id/<region_id>/`` endpoint.
+STATISTIC_DETAIL_VIEWS = {
+    'age-distribution': views.get_age_distribution_by_region_id,
+    'ethnicity-distribution': views.get_ethnicity_distribution_by_region_id,
+    'gender-distribution': views.get_gender_distribution_by_region_id,
+    'marital-status': views.get_marital_status_by_region_id,
+    'religious-affiliation': views.get_religious_affiliation_by_region_id,
+}
+
+
+class TestDetailViews(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(region_id='LK-11', name='Colombo', region_type='district')
+        for model in STATISTIC_MODELS.values():
+            for year, total in ((2012, 100), (2024, 120)):
+                values = dict.fromkeys(get_numeric_columns(model), 0)
+                values['total_population'] = total
+                model.objects.create(region=region, year=year, **values)
+
+    def get(self, view, region_id):
+        request = RequestFactory().get(f'/api/v1/id/{region_id}/')
+        return view(request, region_id=region_id)
+
+    def test_region(self):
+        response = self.get(views.get_region_by_id, 'LK-11')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['name'], 'Colombo')
+        self.assertEqual(self.get(views.get_region_by_id, 'LK-99').status_code, 404)
+
+    def test_population(self):
+        response = self.get(views.get_population_by_region_id, 'LK-11')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(row['year'] for row in response.data), [2012, 2024])
+        self.assertEqual(
+            dict(response.data[0]),
+            {'region_id': 'LK-11', 'region_name': 'Colombo', 'year': 2012, 'total_population': 100},
+        )
+
+    def test_statistics_latest_year(self):
+        for statistic, view in STATISTIC_DETAIL_VIEWS.items():
+            with self.subTest(statistic):
+                response = self.get(view, 'LK-11')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    (response.data['region_id'], response.data['year'], response.data['total_population']),
+                    ('LK-11', 2024, 120),
+                )
+                self.assertEqual(self.get(view, 'LK-99').status_code, 404)
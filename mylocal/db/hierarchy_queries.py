@@ -0,0 +1,158 @@
+"""Named, parameterized Cypher queries over the governing-body hierarchy.
+
+``ingest_mylocal.load_files`` stores every region as a ``GoverningBody`` node
+with ``id``, ``name`` and ``type`` (``"Province"``, ``"DSD"``, ``"GND"``, ...)
+and links each one to its parents with ``(child)-[:GOVERNED_BY]->(parent)``,
+following ``ingest_mylocal.HIERARCHY``. The queries here answer the common
+questions about that graph::
+
+    queries = HierarchyQueries(driver)
+    queries.ensure_indexes()
+    queries.children("LK-1", child_type="District")
+    queries.descendants("LK-1", descendant_type="GND")   # all GNDs under a province
+    queries.related_through("EC-01", "Province", "DSD")  # DSDs sharing a province with an ED
+
+Every query text is a constant and all values are passed as parameters, so
+Neo4j plans each query once and reuses the plan, and a ``QueryCache`` on the
+driver sees identical query texts. Each traversal starts from a node looked
+up by ``id`` (or from the nodes of one ``type``), which the indexes created
+by ``ensure_indexes`` serve. Traversals deduplicate their results, since a
+region can be reached through several parents (a DSD through its LG, MOH
+area and district).
+"""
+from typing import Dict, List, NamedTuple, Optional
+
+INDEXES = {
+    "governing_body_id": "CREATE INDEX governing_body_id IF NOT EXISTS FOR (n:GoverningBody) ON (n.id)",
+    "governing_body_type": "CREATE INDEX governing_body_type IF NOT EXISTS FOR (n:GoverningBody) ON (n.type)",
+}
+
+_REGION = "{0}.id AS id, {0}.name AS name, {0}.type AS type"
+
+QUERIES = {
+    "region": f"""
+        MATCH (n:GoverningBody {{id: $id}})
+        RETURN {_REGION.format("n")}
+    """,
+    "children": f"""
+        MATCH (child:GoverningBody)-[:GOVERNED_BY]->(:GoverningBody {{id: $id}})
+        WHERE $type IS NULL OR child.type = $type
+        RETURN {_REGION.format("child")}
+        ORDER BY id
+    """,
+    "parents": f"""
+        MATCH (:GoverningBody {{id: $id}})-[:GOVERNED_BY]->(parent:GoverningBody)
+        WHERE $type IS NULL OR parent.type = $type
+        RETURN {_REGION.format("parent")}
+        ORDER BY id
+    """,
+    "ancestors": f"""
+        MATCH (:GoverningBody {{id: $id}})-[:GOVERNED_BY*1..]->(ancestor:GoverningBody)
+        WHERE $type IS NULL OR ancestor.type = $type
+        RETURN DISTINCT {_REGION.format("ancestor")}
+        ORDER BY id
+    """,
+    "descendants": f"""
+        MATCH (descendant:GoverningBody)-[:GOVERNED_BY*1..]->(:GoverningBody {{id: $id}})
+        WHERE $type IS NULL OR descendant.type = $type
+        RETURN DISTINCT {_REGION.format("descendant")}
+        ORDER BY id
+    """,
+    "count_descendants": """
+        MATCH (descendant:GoverningBody)-[:GOVERNED_BY*1..]->(:GoverningBody {id: $id})
+        WHERE $type IS NULL OR descendant.type = $type
+        RETURN count(DISTINCT descendant) AS count
+    """,
+    "children_by_parent": """
+        MATCH (child:GoverningBody {type: $child_type})-[:GOVERNED_BY]->(parent:GoverningBody {type: $parent_type})
+        WITH parent, child
+        ORDER BY child.id
+        RETURN parent.id AS parent_id, collect({id: child.id, name: child.name, type: child.type}) AS children
+        ORDER BY parent_id
+    """,
+    "related_through": f"""
+        MATCH (:GoverningBody {{id: $id}})-[:GOVERNED_BY*1..]->(ancestor:GoverningBody {{type: $ancestor_type}})
+        WITH DISTINCT ancestor
+        MATCH (related:GoverningBody {{type: $type}})-[:GOVERNED_BY*1..]->(ancestor)
+        RETURN DISTINCT {_REGION.format("related")}
+        ORDER BY id
+    """,
+}
+
+
+class Region(NamedTuple):
+    id: str
+    name: Optional[str]
+    type: str
+
+
+def _region(record) -> Region:
+    return Region(record["id"], record["name"], record["type"])
+
+
+class HierarchyQueries:
+    """Typed access to the queries in ``QUERIES``.
+
+    Args:
+        driver (Neo4jDriver): Driver to run the queries with; its ``cache``,
+            if any, is used for every query.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, name: str, **parameters) -> list:
+        """Run the catalog query ``name`` and return its records."""
+        return self.driver.execute_read_query(QUERIES[name], parameters)
+
+    def ensure_indexes(self) -> None:
+        """Create the indexes the queries (and the loader's MERGE by id) look nodes up with."""
+        for statement in INDEXES.values():
+            self.driver.execute_query(statement)
+
+    def region(self, region_id: str) -> Optional[Region]:
+        """Return the region with ``region_id``, or None."""
+        records = self.run("region", id=region_id)
+        return _region(records[0]) if records else None
+
+    def children(self, region_id: str, child_type: Optional[str] = None) -> List[Region]:
+        """Return the regions directly governed by ``region_id``, optionally of one type."""
+        return [_region(record) for record in self.run("children", id=region_id, type=child_type)]
+
+    def parents(self, region_id: str, parent_type: Optional[str] = None) -> List[Region]:
+        """Return the regions directly governing ``region_id``, optionally of one type."""
+        return [_region(record) for record in self.run("parents", id=region_id, type=parent_type)]
+
+    def ancestors(self, region_id: str, ancestor_type: Optional[str] = None) -> List[Region]:
+        """Return every region above ``region_id``, optionally of one type."""
+        return [_region(record) for record in self.run("ancestors", id=region_id, type=ancestor_type)]
+
+    def descendants(self, region_id: str, descendant_type: Optional[str] = None) -> List[Region]:
+        """Return every region below ``region_id``, optionally of one type."""
+        return [_region(record) for record in self.run("descendants", id=region_id, type=descendant_type)]
+
+    def count_descendants(self, region_id: str, descendant_type: Optional[str] = None) -> int:
+        """Return the number of regions below ``region_id``, optionally of one type."""
+        return self.run("count_descendants", id=region_id, type=descendant_type)[0]["count"]
+
+    def children_by_parent(self, child_type: str, parent_type: str) -> Dict[str, List[Region]]:
+        """Return the ``child_type`` regions of every ``parent_type`` region, by parent id.
+
+        Parents without such children are left out.
+        """
+        return {
+            record["parent_id"]: [_region(child) for child in record["children"]]
+            for record in self.run("children_by_parent", child_type=child_type, parent_type=parent_type)
+        }
+
+    def related_through(self, region_id: str, ancestor_type: str, related_type: str) -> List[Region]:
+        """Return the ``related_type`` regions under the same ``ancestor_type`` region(s) as ``region_id``.
+
+        For example ``related_through(ed_id, "Province", "DSD")`` returns the
+        DSDs in the province of an electoral district.
+        """
+        return [
+            _region(record) for record in self.run(
+                "related_through", id=region_id, ancestor_type=ancestor_type, type=related_type
+            )
+        ]
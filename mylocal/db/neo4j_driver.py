@@ -3,8 +3,21 @@ from neo4j import GraphDatabase
 
 
 class Neo4jDriver:
-    def __init__(self, uri, user, password):
+    """Neo4j connection with helpers to load and query the hierarchy graph.
+
+    Args:
+        uri (str): Bolt URI of the server.
+        user (str): User name.
+        password (str): Password.
+        cache (QueryCache, optional): Cache for ``execute_read_query`` results.
+            ``process_file`` and writing ``execute_query`` calls bump its graph
+            version, so cached results never outlive a change made through
+            this driver.
+    """
+
+    def __init__(self, uri, user, password, cache=None):
         self._driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.cache = cache
 
     def __enter__(self):
         return self
@@ -42,6 +55,13 @@ class Neo4jDriver:
             parent_key (str): Column name that contains the parent node's ID
         """
         df = pd.read_csv(file_path, sep="\t")
+        try:
+            self._process_rows(df, governing_type, parent_key)
+        finally:
+            # Also after a failed load, which may have written some rows.
+            self.bump_graph_version()
+
+    def _process_rows(self, df, governing_type, parent_key):
         with self._driver.session() as session:
             for _, row in df.iterrows():
                 properties = row.dropna().to_dict()
@@ -60,7 +80,10 @@ class Neo4jDriver:
 
     def execute_query(self, query, parameters=None):
         """
-        Execute a read query and return the results.
+        Execute a query and return the results.
+
+        If the query changed the graph (or its indexes), the graph version is
+        bumped so cached read results are not served again.
 
         Args:
             query (str): The Cypher query to execute
@@ -71,18 +94,43 @@ class Neo4jDriver:
         """
         with self._driver.session() as session:
             result = session.run(query, parameters or {})
-            return [record for record in result]
+            records = [record for record in result]
+            counters = result.consume().counters
+        if counters.contains_updates or counters.contains_system_updates:
+            self.bump_graph_version()
+        return records
 
-    def execute_read_query(self, query, parameters=None):
+    def execute_read_query(self, query, parameters=None, use_cache=True):
         """
         Execute a read-only query in a read transaction.
 
+        With a ``cache``, results are reused for the same query text and
+        parameters until the graph version changes.
+
         Args:
             query (str): The Cypher query to execute
             parameters (dict, optional): Query parameters. Defaults to None.
+            use_cache (bool, optional): Set to False to always ask the server.
 
         Returns:
-            list: List of records from the query result
+            list: One dict per record (``Record.data()``), cached or not
         """
+        if self.cache is None or not use_cache:
+            return self._execute_read_query(query, parameters)
+        return self.cache.get_or_execute(
+            query, parameters, lambda: self._execute_read_query(query, parameters)
+        )
+
+    def _execute_read_query(self, query, parameters=None):
         with self._driver.session() as session:
-            return session.execute_read(lambda tx: [record for record in tx.run(query, parameters or {})])
+            return session.execute_read(lambda tx: [record.data() for record in tx.run(query, parameters or {})])
+
+    def bump_graph_version(self):
+        """
+        Invalidate cached read results after the graph changed.
+
+        ``process_file`` and ``execute_query`` call this themselves; call it
+        after changing the graph some other way (e.g. another driver).
+        """
+        if self.cache is not None:
+            self.cache.bump_graph_version()
@@ -0,0 +1,240 @@
+"""Result cache for read-only Cypher queries.
+
+The hierarchy graph only changes when it is ingested, so the results of read
+queries can be reused until the next ingestion. ``QueryCache`` keys results by
+(query text, parameters, graph version); ingestion bumps the graph version
+(``Neo4jDriver.process_file`` does this), which makes every older entry
+unreachable at once::
+
+    cache = QueryCache(InMemoryCacheBackend(max_entries=2048), ttl=3600)
+    driver = Neo4jDriver(uri, user, password, cache=cache)
+    driver.execute_read_query("MATCH (n:GoverningBody {id: $id}) RETURN n.name AS name", {"id": "LK-11"})
+    cache.stats.as_dict()  # {"hits": 0, "misses": 1, ...}
+
+Backends:
+
+* ``InMemoryCacheBackend`` - per process, LRU with a maximum number of
+  entries; a version bump drops all entries.
+* ``SharedCacheBackend`` - any Redis client (``redis.Redis(...)``) shared by
+  several processes, so a bump from the ingesting process reaches all readers.
+  Results are pickled; configure the server with an LRU ``maxmemory-policy``
+  to bound its size.
+
+Driver records are cached as plain dicts (``Record.data()``), and
+``get_or_execute`` returns dicts on a miss too, so callers see the same rows
+from every backend whether or not the result was cached. Entries also expire
+after ``ttl`` seconds, and results with more than ``max_result_rows`` records
+are not cached at all.
+"""
+import hashlib
+import json
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+def as_rows(records):
+    """Return ``records`` with driver records replaced by plain dicts (``Record.data()``)."""
+    return [record.data() if hasattr(record, "data") else record for record in records]
+
+
+def _copy_rows(rows):
+    return [dict(row) if isinstance(row, dict) else row for row in rows]
+
+
+class CacheStats:
+    """Counters of one ``QueryCache``; per process, also for shared backends."""
+
+    FIELDS = ("hits", "misses", "stores", "skipped", "evictions", "expirations", "invalidations")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            for field in self.FIELDS:
+                setattr(self, field, 0)
+
+    def increment(self, field, count=1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + count)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self):
+        stats = {field: getattr(self, field) for field in self.FIELDS}
+        stats["hit_rate"] = round(self.hit_rate, 4)
+        return stats
+
+
+class InMemoryCacheBackend:
+    """LRU cache with per-entry expiry, local to this process.
+
+    Args:
+        max_entries (int): Entries kept before the least recently used is evicted.
+        clock (callable, optional): Returns the current time in seconds.
+    """
+
+    def __init__(self, max_entries=1024, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._version = 0
+        self._lock = threading.Lock()
+        self.stats = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _count(self, field):
+        if self.stats is not None:
+            self.stats.increment(field)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._entries[key]
+                self._count("expirations")
+                return MISSING
+            self._entries.move_to_end(key)
+            # Copy the rows so callers cannot change the cached result.
+            return _copy_rows(value)
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            expires_at = self._clock() + ttl if ttl else None
+            self._entries[key] = (expires_at, _copy_rows(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._count("evictions")
+
+    def get_version(self):
+        return self._version
+
+    def bump_version(self):
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            return self._version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedCacheBackend:
+    """Cache kept in Redis, shared by every process using the same ``prefix``.
+
+    Args:
+        client: A ``redis.Redis`` (or compatible) client.
+        prefix (str): Prefix of all keys written by this cache.
+    """
+
+    def __init__(self, client, prefix="mylocal:cypher:"):
+        self.client = client
+        self.prefix = prefix
+        self.stats = None
+
+    @property
+    def version_key(self):
+        return f"{self.prefix}graph-version"
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            return MISSING
+        return pickle.loads(value)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=int(ttl) if ttl else None)
+
+    def get_version(self):
+        return int(self.client.get(self.version_key) or 0)
+
+    def bump_version(self):
+        # Entries of older versions are never read again and expire by TTL
+        # or the server's eviction policy.
+        return self.client.incr(self.version_key)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            if key not in (self.version_key, self.version_key.encode()):
+                self.client.delete(key)
+
+
+class QueryCache:
+    """Cache of read query results keyed by query text, parameters and graph version.
+
+    Args:
+        backend: ``InMemoryCacheBackend`` (default) or ``SharedCacheBackend``.
+        ttl (float, optional): Seconds an entry stays valid; ``None`` keeps it
+            until the graph version changes or it is evicted.
+        max_result_rows (int, optional): Results with more records are not cached.
+    """
+
+    def __init__(self, backend=None, ttl=300, max_result_rows=10000):
+        self.backend = backend if backend is not None else InMemoryCacheBackend()
+        self.ttl = ttl
+        self.max_result_rows = max_result_rows
+        self.stats = CacheStats()
+        self.backend.stats = self.stats
+
+    def make_key(self, query, parameters=None):
+        """Return the cache key of ``query`` with ``parameters`` at the current graph version."""
+        payload = json.dumps([query, parameters or {}], sort_keys=True, default=str)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return f"{self.backend.get_version()}:{digest}"
+
+    def get(self, query, parameters=None):
+        """Return the cached records, or ``MISSING``."""
+        value = self.backend.get(self.make_key(query, parameters))
+        self.stats.increment("misses" if value is MISSING else "hits")
+        return value
+
+    def set(self, query, parameters, records):
+        """Cache ``records``; results over ``max_result_rows`` or that cannot be stored are skipped."""
+        if self.max_result_rows is not None and len(records) > self.max_result_rows:
+            self.stats.increment("skipped")
+            return False
+        try:
+            self.backend.set(self.make_key(query, parameters), as_rows(records), self.ttl)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            self.stats.increment("skipped")
+            return False
+        self.stats.increment("stores")
+        return True
+
+    def get_or_execute(self, query, parameters, execute):
+        """Return the cached rows of ``query``, or run ``execute()`` and cache its result.
+
+        Driver records are returned as dicts either way.
+        """
+        records = self.get(query, parameters)
+        if records is MISSING:
+            records = as_rows(execute())
+            self.set(query, parameters, records)
+        return records
+
+    @property
+    def graph_version(self):
+        return self.backend.get_version()
+
+    def bump_graph_version(self):
+        """Mark the graph as changed; every entry cached so far becomes stale."""
+        self.stats.increment("invalidations")
+        return self.backend.bump_version()
+
+    def clear(self):
+        self.backend.clear()
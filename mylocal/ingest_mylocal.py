@@ -1,9 +1,101 @@
 import os
 
 from mylocal.db.connect import ConnectorManager
+from mylocal.db.hierarchy_queries import HierarchyQueries
 from mylocal.db.neo4j_driver import Neo4jDriver
 
 
+# Define the hierarchy of governing bodies
+# Format: governing_type: {
+#     'parents': [(parent_type, parent_id_column)],
+#     'children': [child_type]
+# }
+HIERARCHY = {
+    "Country": {
+        "parents": [],
+        "children": ["Province"]
+    },
+    "Province": {
+        "parents": [("Country", "country_id")],
+        "children": ["ED", "District"]
+    },
+    "District": {
+        "parents": [("Province", "province_id")],
+        "children": ["PD", "LG", "MOH", "DSD"]
+    },
+    "PD": {
+        "parents": [("DSD", "dsd_id")], # not sure about this
+        "children": ["GND"]
+    },
+    "DSD": {
+        "parents": [
+            ("LG", "lg_id"),
+            ("MOH", "moh_id"),
+            ("District", "district_id")
+        ],
+        "children": ["PD"]
+    },
+    "ED": {
+        "parents": [("District", "district_id")],
+        "children": ["PD", "LG", "DSD"]
+    },
+    "GND": {
+        "parents": [("PD", "pd_id")],
+        "children": []
+    },
+    "LG": {
+        "parents": [
+            ("District", "district_id"),
+            ("ED", "ed_id")
+        ],
+        "children": ["GND"]
+    },
+    "MOH": {
+        "parents": [
+            ("District", "district_id"),
+            ("ED", "ed_id")
+        ],
+        "children": ["DSD"]
+    }
+}
+
+# Define processing order (important for creating parents before children).
+# The governing types are the keys of HIERARCHY.
+PROCESSING_STEPS = [
+    ("country", "Country"),
+    ("province", "Province"),
+    ("district", "District"),
+    ("ed", "ED"),
+    ("moh", "MOH"),
+    ("lg", "LG"),
+    ("dsd", "DSD"),
+    ("pd", "PD"),
+    ("gnd", "GND"),
+]
+
+
+def load_files(driver, file_paths):
+    """Load the entity TSVs into Neo4j in ``PROCESSING_STEPS`` order.
+
+    Args:
+        driver (Neo4jDriver): Open driver to write with.
+        file_paths (dict): File key (``"province"``, ``"gnd"``, ...) to TSV
+            path. Steps without a path are skipped.
+    """
+    for file_key, governing_type in PROCESSING_STEPS:
+        if file_key not in file_paths:
+            continue
+        # Get all parent relationships for this type; types without
+        # parents (the country) are loaded once without relationships.
+        parent_relationships = HIERARCHY[governing_type]["parents"] or [(None, None)]
+        for parent_type, parent_key in parent_relationships:
+            driver.process_file(
+                file_paths[file_key],
+                governing_type,
+                parent_key
+            )
+
+
 def ingest_data():
     # Get Neo4j connection details from environment variables
     uri = os.getenv("NEO4J_MYLOCAL_DB_URI")
@@ -17,99 +109,17 @@ def ingest_data():
 
     # File paths
     file_paths = {
-        "country": os.path.join(base_dir, "country.tsv"),
-        "province": os.path.join(base_dir, "province.tsv"),
-        "district": os.path.join(base_dir, "district.tsv"),
-        "dsd": os.path.join(base_dir, "dsd.tsv"),
-        "ed": os.path.join(base_dir, "ed.tsv"),
-        "gnd": os.path.join(base_dir, "gnd.tsv"),
-        "lg": os.path.join(base_dir, "lg.tsv"),
-        "moh": os.path.join(base_dir, "moh.tsv"),
-        "pd": os.path.join(base_dir, "pd.tsv"),
-    }
-
-    # Define the hierarchy of governing bodies
-    # Format: governing_type: {
-    #     'parents': [(parent_type, parent_id_column)],
-    #     'children': [child_type]
-    # }
-    hierarchy = {
-        "Country": {
-            "parents": [],
-            "children": ["Province"]
-        },
-        "Province": {
-            "parents": [("Country", "country_id")],
-            "children": ["ED", "District"]
-        },
-        "District": {
-            "parents": [("Province", "province_id")],
-            "children": ["PD", "LG", "MOH", "DSD"]
-        },
-        "PD": {
-            "parents": [("DSD", "dsd_id")], # not sure about this
-            "children": ["GND"]
-        },
-        "DSD": {
-            "parents": [
-                ("LG", "lg_id"),
-                ("MOH", "moh_id"),
-                ("District", "district_id")
-            ],
-            "children": ["PD"]
-        },
-        "ED": {
-            "parents": [("District", "district_id")],
-            "children": ["PD", "LG", "DSD"]
-        },
-        "GND": {
-            "parents": [("PD", "pd_id")],
-            "children": []
-        },
-        "LG": {
-            "parents": [
-                ("District", "district_id"),
-                ("ED", "ed_id")
-            ],
-            "children": ["GND"]
-        },
-        "MOH": {
-            "parents": [
-                ("District", "district_id"),
-                ("ED", "ed_id")
-            ],
-            "children": ["DSD"]
-        }
+        file_key: os.path.join(base_dir, f"{file_key}.tsv")
+        for file_key, _ in PROCESSING_STEPS
     }
 
-    # Define processing order (important for creating parents before children)
-    processing_steps = [
-        ("country", "Country"),
-        ("province", "Province"),
-        ("district", "District"),
-        ("ed", "ElectoralDivision"),
-        ("moh", "MedicalOfficerOfHealth"),
-        ("lg", "LocalGovernment"),
-        ("dsd", "DSD"),
-        ("pd", "PollingDivision"),
-        ("gnd", "GramaNiladhari"),
-    ]
-
     # Process all files using context managers
     with ConnectorManager() as manager:
         with Neo4jDriver(uri, username, password) as driver:
             manager.register_connector("neo4j", driver)
-
-            # Process all files
-            for file_key, governing_type in processing_steps:
-                # Get all parent relationships for this type
-                parent_relationships = hierarchy[governing_type]["parents"]
-                for parent_type, parent_key in parent_relationships:
-                    driver.process_file(
-                        file_paths[file_key],
-                        governing_type,
-                        parent_key
-                    )
+            # The id index also serves the loader's MERGE on id.
+            HierarchyQueries(driver).ensure_indexes()
+            load_files(driver, file_paths)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,425 @@
+"""Synthetic region and census TSVs in the layout of the gig-data repository.
+
+``SyntheticGigData(seed, scale).write(output_dir)`` writes a deterministic
+dataset that the loaders (``ingest_mylocal`` and the ``insert_*`` Django
+commands) and ``tests/test_ents.py`` read like the real files::
+
+    <output_dir>/ents/country.tsv, province.tsv, district.tsv, dsd.tsv, gnd.tsv,
+                      ed.tsv, pd.tsv, lg.tsv, moh.tsv
+    <output_dir>/census/population-gender.regions.2012.tsv, ...
+
+or from the command line::
+
+    python -m mylocal.synthetic /tmp/gig-data-10x --scale 10 --year 2012 --year 2024
+
+At ``scale=1`` the administrative tree has Sri Lanka's size: 9 provinces,
+25 districts, 331 DSDs and 14,022 GNDs. ``scale`` (1-100 in practice)
+multiplies the DSDs, GNDs, polling divisions, local government and MOH
+areas. The cross-links are consistent with ``ingest_mylocal.HIERARCHY``:
+
+* an electoral district (ED) covers whole districts (the five Northern
+  districts form two EDs, every other district its own ED),
+* a polling division (PD) covers neighbouring DSDs of one ED,
+* local government (LG) and MOH areas cover neighbouring DSDs of one
+  district,
+
+and every GND row carries all of its ancestor ids. Census rows are keyed by
+``entity_id``; GND values are random and every other region holds the sums
+over its GNDs, so totals agree across all hierarchies. Entity ``population``
+is the total of the first census year.
+
+GNDs are generated per DSD from their own seed and never held in memory all
+at once, so large scales only cost time.
+"""
+import argparse
+import csv
+import os
+import random
+
+COUNTRY_ID = "LK"
+# Districts per province, in province order (Western, Central, Southern, ...).
+DISTRICTS_PER_PROVINCE = (3, 3, 3, 5, 3, 2, 2, 2, 2)
+# Electoral districts joining several districts, as (province, district
+# numbers); Jaffna ED covers two Northern districts and Vanni ED three.
+MULTI_DISTRICT_EDS = {4: ((1, 2), (3, 4, 5))}
+DSD_COUNT = 331
+GND_COUNT = 14022
+PD_COUNT = 160
+# LG and MOH areas group whole DSDs of one district here, so these are upper
+# bounds (capped at each district's DSDs) and lower than the real 341 and 353.
+LG_COUNT = 300
+MOH_COUNT = 320
+
+LEVELS = ("country", "province", "district", "dsd", "gnd")
+CROSS_LEVELS = ("ed", "pd", "lg", "moh")
+# Every level after the levels its rows link to, as the loaders need them.
+LOAD_ORDER = ("country", "province", "district", "ed", "lg", "moh", "dsd", "pd", "gnd")
+COMMON_COLUMNS = ["area", "population", "centroid_altitude", "centroid", "subs", "supers", "eqs", "ints"]
+ENT_COLUMNS = {
+    "country": ["id", "name"],
+    "province": ["id", "name", "country_id"],
+    "district": ["id", "name", "country_id", "province_id"],
+    "dsd": ["id", "name", "country_id", "province_id", "district_id", "ed_id", "lg_id", "moh_id"],
+    "gnd": [
+        "id", "name", "country_id", "province_id", "district_id", "dsd_id", "ed_id", "pd_id", "lg_id", "moh_id",
+    ],
+    "ed": ["id", "name", "country_id", "province_id", "district_id"],
+    "pd": ["id", "name", "country_id", "province_id", "ed_id", "dsd_id"],
+    "lg": ["id", "name", "country_id", "province_id", "district_id", "ed_id"],
+    "moh": ["id", "name", "country_id", "province_id", "district_id", "ed_id"],
+}
+for _columns in ENT_COLUMNS.values():
+    _columns.extend(COMMON_COLUMNS)
+
+CENSUS_TABLES = {
+    "population-total": ["total_population"],
+    "population-gender": ["total_population", "male", "female"],
+    "population-age-group": [
+        "total_population", "less_than_10", "10_~_19", "20_~_29", "30_~_39", "40_~_49",
+        "50_~_59", "60_~_69", "70_~_79", "80_~_89", "90_and_above",
+    ],
+    "population-ethnicity": [
+        "total_population", "sinhalese", "sl_tamil", "ind_tamil", "sl_moor", "burgher",
+        "malay", "sl_chetty", "bharatha", "other_eth",
+    ],
+    "population-religion": [
+        "total_population", "buddhist", "hindu", "islam", "roman_catholic", "other_christian", "other",
+    ],
+    "population-marital-status": [
+        "total_population", "never_married", "married_((registered)", "married_(customary)",
+        "legally_separated", "separated_(not_legally)", "divorced", "widowed", "not_stated",
+    ],
+}
+# Ancestor id columns of a GND, i.e. every region its values are summed into.
+GND_ANCESTOR_COLUMNS = [column for column in ENT_COLUMNS["gnd"][2:] if column.endswith("_id")]
+
+MIN_LATITUDE, MAX_LATITUDE = 5.9, 9.9
+MIN_LONGITUDE, MAX_LONGITUDE = 79.6, 81.9
+# How far a child's centroid may lie from its parent's, in degrees.
+SPREAD = {"province": 1.0, "district": 0.3, "dsd": 0.1, "gnd": 0.03}
+SYLLABLES = (
+    "ka", "ko", "ma", "na", "pi", "la", "wa", "go", "de", "hi", "ra", "tu",
+    "ga", "mu", "ba", "ya", "ku", "po", "ne", "di", "wi", "ha", "te", "lu",
+)
+
+
+def _name(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def _split(total, parts, rng):
+    """Split ``total`` items over ``parts`` parents, at least one each."""
+    counts = [1] * parts
+    for _ in range(max(0, total - parts)):
+        counts[rng.randrange(parts)] += 1
+    return counts
+
+
+def _groups(items, count, rng):
+    """Split ``items`` into at most ``count`` runs of neighbouring items."""
+    groups, start = [], 0
+    for size in _split(len(items), min(count, len(items)), rng):
+        groups.append(items[start:start + size])
+        start += size
+    return groups
+
+
+def _split_total(total, columns, rng):
+    """Split ``total`` over ``columns`` with random weights; the parts sum to ``total``."""
+    if not columns:
+        return {}
+    weights = [rng.random() + 0.05 for _ in columns]
+    scale = total / sum(weights)
+    values = [int(weight * scale) for weight in weights]
+    values[0] += total - sum(values)
+    return dict(zip(columns, values))
+
+
+def _width(counts, minimum):
+    return max(minimum, len(str(max(counts, default=0))))
+
+
+class SyntheticGigData:
+    """A deterministic synthetic gig-data dataset.
+
+    Args:
+        seed (int): Random seed; the same seed and scale give the same files.
+        scale (float): Size relative to Sri Lanka (``1`` = 14,022 GNDs).
+
+    Attributes:
+        regions (dict): Level name to a list of entity rows, for every level
+            except ``gnd`` (see ``iter_gnds``).
+        gnd_counts (dict): Number of GNDs per DSD id.
+    """
+
+    def __init__(self, seed=42, scale=1.0):
+        self.seed = seed
+        self.scale = scale
+        self.regions = {level: [] for level in LEVELS[:-1] + CROSS_LEVELS}
+        self.gnd_counts = {}
+        self._locations = {}
+        self._build()
+
+    def _rng(self, *key):
+        # String seeds are hashed with SHA-512, so they do not depend on
+        # PYTHONHASHSEED.
+        return random.Random(":".join(str(part) for part in (self.seed,) + key))
+
+    def _scaled(self, count, minimum):
+        return max(minimum, round(count * self.scale))
+
+    def _add(self, level, region_id, rng, location, **ids):
+        self._locations[region_id] = location
+        row = {"id": region_id, "name": _name(rng), "country_id": COUNTRY_ID, **ids}
+        if level == "country":
+            del row["country_id"]
+        row["centroid_altitude"] = round(rng.uniform(0, 2500), 1)
+        row["centroid"] = f"[{location[0]:.6f}, {location[1]:.6f}]"
+        self.regions[level].append(row)
+        return row
+
+    def _place(self, parent_id, level, rng):
+        latitude, longitude = self._locations[parent_id]
+        spread = SPREAD[level]
+        return (
+            min(max(latitude + rng.uniform(-spread, spread), MIN_LATITUDE), MAX_LATITUDE),
+            min(max(longitude + rng.uniform(-spread, spread), MIN_LONGITUDE), MAX_LONGITUDE),
+        )
+
+    def _build(self):
+        rng = self._rng("regions")
+        centre = ((MIN_LATITUDE + MAX_LATITUDE) / 2, (MIN_LONGITUDE + MAX_LONGITUDE) / 2)
+        self._add("country", COUNTRY_ID, rng, centre)
+
+        districts_by_ed = []
+        for province_number, district_count in enumerate(DISTRICTS_PER_PROVINCE, start=1):
+            province_id = f"{COUNTRY_ID}-{province_number}"
+            self._add("province", province_id, rng, self._place(COUNTRY_ID, "province", rng))
+            for number in range(1, district_count + 1):
+                district_id = f"{province_id}{number}"
+                self._add(
+                    "district", district_id, rng, self._place(province_id, "district", rng),
+                    province_id=province_id,
+                )
+            ed_groups = MULTI_DISTRICT_EDS.get(province_number, [(n,) for n in range(1, district_count + 1)])
+            districts_by_ed.extend([f"{province_id}{n}" for n in group] for group in ed_groups)
+
+        ed_of_district = {}
+        for number, district_ids in enumerate(districts_by_ed, start=1):
+            ed_id = f"EC-{number:02d}"
+            province_id = district_ids[0][:-1]
+            self._add(
+                "ed", ed_id, rng, self._locations[district_ids[0]],
+                province_id=province_id, district_id=district_ids[0],
+            )
+            for district_id in district_ids:
+                ed_of_district[district_id] = ed_id
+
+        districts = self.regions["district"]
+        dsd_counts = _split(self._scaled(DSD_COUNT, len(districts)), len(districts), rng)
+        dsd_width = _width(dsd_counts, 2)
+        dsds_by_district = {}
+        for district, count in zip(districts, dsd_counts):
+            district_id = district["id"]
+            dsds_by_district[district_id] = []
+            for number in range(1, count + 1):
+                dsd = self._add(
+                    "dsd", f"{district_id}{number:0{dsd_width}d}", rng, self._place(district_id, "dsd", rng),
+                    province_id=district["province_id"], district_id=district_id, ed_id=ed_of_district[district_id],
+                )
+                dsds_by_district[district_id].append(dsd)
+
+        self._pd_of_dsd = {}
+        eds = self.regions["ed"]
+        pd_counts = _split(self._scaled(PD_COUNT, len(eds)), len(eds), rng)
+        pd_width = _width(pd_counts, 2)
+        for ed, count in zip(eds, pd_counts):
+            dsds = [dsd for district_ids in districts_by_ed[int(ed["id"][3:]) - 1]
+                    for dsd in dsds_by_district[district_ids]]
+            for number, group in enumerate(_groups(dsds, count, rng), start=1):
+                pd_id = f"{ed['id']}-{number:0{pd_width}d}"
+                self._add(
+                    "pd", pd_id, rng, self._locations[group[0]["id"]],
+                    province_id=ed["province_id"], ed_id=ed["id"], dsd_id=group[0]["id"],
+                )
+                for dsd in group:
+                    self._pd_of_dsd[dsd["id"]] = pd_id
+
+        for level, target in (("lg", LG_COUNT), ("moh", MOH_COUNT)):
+            counts = _split(self._scaled(target, len(districts)), len(districts), rng)
+            width = _width(counts, 3)
+            for district, count in zip(districts, counts):
+                district_id = district["id"]
+                for number, group in enumerate(_groups(dsds_by_district[district_id], count, rng), start=1):
+                    area_id = f"{level.upper()}-{district_id[3:]}{number:0{width}d}"
+                    self._add(
+                        level, area_id, rng, self._locations[group[0]["id"]],
+                        province_id=district["province_id"], district_id=district_id,
+                        ed_id=ed_of_district[district_id],
+                    )
+                    for dsd in group:
+                        dsd[f"{level}_id"] = area_id
+
+        dsds = self.regions["dsd"]
+        self.gnd_counts = dict(zip(
+            (dsd["id"] for dsd in dsds), _split(self._scaled(GND_COUNT, len(dsds)), len(dsds), rng)
+        ))
+        self._gnd_width = _width(self.gnd_counts.values(), 3)
+
+        children = {}
+        for level in LEVELS[1:-1]:
+            parent_column = f"{LEVELS[LEVELS.index(level) - 1]}_id"
+            for row in self.regions[level]:
+                children.setdefault(row[parent_column], []).append(row["id"])
+        single_district_eds = {
+            ed["district_id"]: ed["id"] for ed, group in zip(eds, districts_by_ed) if len(group) == 1
+        }
+        for level, rows in self.regions.items():
+            parent_column = f"{LEVELS[LEVELS.index(level) - 1]}_id" if level in LEVELS[1:] else None
+            for row in rows:
+                row["subs"] = str(children.get(row["id"], []))
+                row["supers"] = str([row[parent_column]] if parent_column else [])
+                # A district and the ED covering only that district are equivalent.
+                if level == "district" and row["id"] in single_district_eds:
+                    row["eqs"] = str([single_district_eds[row["id"]]])
+                elif level == "ed" and row["district_id"] in single_district_eds:
+                    row["eqs"] = str([row["district_id"]])
+                else:
+                    row["eqs"] = "[]"
+                row["ints"] = "[]"
+
+    def _gnd_id(self, dsd_id, number):
+        return f"{dsd_id}{number:0{self._gnd_width}d}"
+
+    def _gnds(self, dsd):
+        rng = self._rng("gnd", dsd["id"])
+        ids = {column: dsd[column] for column in ENT_COLUMNS["dsd"] if column.endswith("_id")}
+        for number in range(1, self.gnd_counts[dsd["id"]] + 1):
+            latitude, longitude = self._place(dsd["id"], "gnd", rng)
+            yield {
+                "id": self._gnd_id(dsd["id"], number),
+                "name": _name(rng),
+                **ids,
+                "dsd_id": dsd["id"],
+                "pd_id": self._pd_of_dsd[dsd["id"]],
+                "area": round(rng.uniform(0.5, 20.0), 2),
+                "centroid_altitude": round(rng.uniform(0, 2500), 1),
+                "centroid": f"[{latitude:.6f}, {longitude:.6f}]",
+                "subs": "[]",
+                "supers": str([dsd["id"]]),
+                "eqs": "[]",
+                "ints": "[]",
+            }
+
+    def _gnd_totals(self, dsd_id, year):
+        rng = self._rng("total", year, dsd_id)
+        return [rng.randint(300, 2600) for _ in range(self.gnd_counts[dsd_id])]
+
+    def iter_gnds(self, year=None):
+        """Yield the GND entity rows, DSD by DSD.
+
+        Args:
+            year (int, optional): Census year whose totals fill ``population``.
+        """
+        for dsd in self.regions["dsd"]:
+            totals = self._gnd_totals(dsd["id"], year) if year is not None else None
+            for index, row in enumerate(self._gnds(dsd)):
+                row["population"] = totals[index] if totals else None
+                yield row
+
+    def iter_census(self, table, year):
+        """Yield the rows of one census table: every GND, then every other region."""
+        columns = CENSUS_TABLES[table]
+        sums = {}
+        for dsd in self.regions["dsd"]:
+            rng = self._rng(table, year, dsd["id"])
+            ancestors = [self._pd_of_dsd[dsd["id"]] if column == "pd_id" else dsd["id"] if column == "dsd_id"
+                         else dsd[column] for column in GND_ANCESTOR_COLUMNS]
+            for number, total in enumerate(self._gnd_totals(dsd["id"], year), start=1):
+                values = {"total_population": total, **_split_total(total, columns[1:], rng)}
+                yield {"entity_id": self._gnd_id(dsd["id"], number), **values}
+                for region_id in ancestors:
+                    region_sums = sums.setdefault(region_id, dict.fromkeys(columns, 0))
+                    for name, value in values.items():
+                        region_sums[name] += value
+        for level in LEVELS[:-1] + CROSS_LEVELS:
+            for region in self.regions[level]:
+                yield {"entity_id": region["id"], **sums[region["id"]]}
+
+    def _fill_parent_totals(self, year):
+        """Set ``area`` and ``population`` of the non-GND regions from their GNDs."""
+        area, population = {}, {}
+        for row in self.iter_gnds(year):
+            for column in GND_ANCESTOR_COLUMNS:
+                area[row[column]] = area.get(row[column], 0.0) + row["area"]
+                population[row[column]] = population.get(row[column], 0) + row["population"]
+        for rows in self.regions.values():
+            for row in rows:
+                row["area"] = round(area[row["id"]], 2)
+                row["population"] = population[row["id"]]
+
+    def write(self, output_dir, years=(2012,)):
+        """Write the entity and census TSVs under ``output_dir``.
+
+        Args:
+            output_dir (str): Directory to write ``ents/`` and ``census/`` into.
+            years (tuple): Census years to write; each year has its own values.
+
+        Returns:
+            dict: ``{"ents": {level: path}, "census": {(table, year): path}, "rows": {...}}``
+            where ``rows`` counts the rows per level and per census table.
+        """
+        ents_dir = os.path.join(output_dir, "ents")
+        census_dir = os.path.join(output_dir, "census")
+        os.makedirs(ents_dir, exist_ok=True)
+        os.makedirs(census_dir, exist_ok=True)
+        self._fill_parent_totals(years[0])
+
+        dataset = {"ents": {}, "census": {}, "rows": {}}
+        for level in LEVELS + CROSS_LEVELS:
+            path = os.path.join(ents_dir, f"{level}.tsv")
+            rows = self.iter_gnds(years[0]) if level == "gnd" else self.regions[level]
+            dataset["ents"][level] = path
+            dataset["rows"][level] = _write_tsv(path, ENT_COLUMNS[level], rows)
+        for year in years:
+            for table, columns in CENSUS_TABLES.items():
+                path = os.path.join(census_dir, f"{table}.regions.{year}.tsv")
+                dataset["census"][(table, year)] = path
+                dataset["rows"][f"{table}.{year}"] = _write_tsv(
+                    path, ["entity_id"] + columns, self.iter_census(table, year)
+                )
+        return dataset
+
+
+def _write_tsv(path, columns, rows):
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=columns, delimiter="\t", extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_dataset(output_dir, seed=42, scale=1.0, years=(2012,)):
+    """Write a synthetic dataset; see ``SyntheticGigData.write``."""
+    return SyntheticGigData(seed, scale).write(output_dir, years)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic gig-data TSVs")
+    parser.add_argument("output_dir", help="Directory to write ents/ and census/ into")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Size relative to Sri Lanka (default: 1)")
+    parser.add_argument("--year", type=int, action="append", dest="years",
+                        help="Census year to write (repeatable, default: 2012)")
+    args = parser.parse_args(argv)
+
+    dataset = write_dataset(args.output_dir, args.seed, args.scale, tuple(args.years or (2012,)))
+    for name, count in dataset["rows"].items():
+        print(f"{name}: {count} rows")
+
+
+if __name__ == "__main__":
+    main()
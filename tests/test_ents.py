@@ -37,6 +37,9 @@ Complex Queries (TODO)
 
 
 def ent_dir():
+    # MYLOCAL_ENTS_DIR points the tests at another dataset, e.g. one written by mylocal.synthetic.
+    if os.getenv("MYLOCAL_ENTS_DIR"):
+        return Path(os.environ["MYLOCAL_ENTS_DIR"])
     return Path(__file__).parent.parent / "external" / "gig-data" / "ents"
 
 
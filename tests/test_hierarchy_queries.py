@@ -0,0 +1,84 @@
+import re
+
+from mylocal.db.hierarchy_queries import INDEXES, QUERIES, HierarchyQueries, Region
+from mylocal.db.query_cache import QueryCache
+
+
+class RecordingDriver:
+    """Returns canned records per query name and records every call."""
+
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+        self.cache = None
+
+    def execute_read_query(self, query, parameters=None):
+        self.calls.append((query, parameters))
+        name = next(name for name, text in QUERIES.items() if text == query)
+        if self.cache is None:
+            return self.results[name]
+        return self.cache.get_or_execute(query, parameters, lambda: self.results[name])
+
+    def execute_query(self, query, parameters=None):
+        self.calls.append((query, parameters))
+        return []
+
+
+WESTERN = {"id": "LK-1", "name": "Western", "type": "Province"}
+COLOMBO = {"id": "LK-11", "name": "Colombo", "type": "District"}
+RESULTS = {
+    "region": [WESTERN],
+    "children": [COLOMBO],
+    "parents": [WESTERN],
+    "ancestors": [WESTERN],
+    "descendants": [COLOMBO],
+    "count_descendants": [{"count": 2496}],
+    "children_by_parent": [{"parent_id": "LK-1", "children": [COLOMBO]}],
+    "related_through": [COLOMBO],
+}
+
+
+def call_every_query(queries):
+    return [
+        queries.region("LK-1"),
+        queries.children("LK-1", child_type="District"),
+        queries.parents("LK-11"),
+        queries.ancestors("LK-11", ancestor_type="Province"),
+        queries.descendants("LK-1", descendant_type="District"),
+        queries.count_descendants("LK-1", descendant_type="GND"),
+        queries.children_by_parent("District", "Province"),
+        queries.related_through("EC-01", "Province", "District"),
+    ]
+
+
+def test_typed_results():
+    queries = HierarchyQueries(RecordingDriver(RESULTS))
+    western, colombo = Region("LK-1", "Western", "Province"), Region("LK-11", "Colombo", "District")
+    assert call_every_query(queries) == [
+        western, [colombo], [western], [western], [colombo], 2496, {"LK-1": [colombo]}, [colombo],
+    ]
+    assert HierarchyQueries(RecordingDriver({"region": []})).region("LK-0") is None
+
+
+def test_queries_are_parameterized():
+    driver = RecordingDriver(RESULTS)
+    call_every_query(HierarchyQueries(driver))
+    assert {query for query, _ in driver.calls} == set(QUERIES.values())
+    for query, parameters in driver.calls:
+        assert set(re.findall(r"\$(\w+)", query)) == set(parameters)
+        # Values never end up in the query text.
+        assert not any(str(value) in query for value in parameters.values() if value)
+
+
+def test_ensure_indexes_and_cache():
+    driver = RecordingDriver(RESULTS)
+    queries = HierarchyQueries(driver)
+    queries.ensure_indexes()
+    assert [query for query, _ in driver.calls] == list(INDEXES.values())
+
+    driver.cache = QueryCache()
+    for _ in range(3):
+        queries.children("LK-1", child_type="District")
+    queries.children("LK-1", child_type="DSD")
+    assert driver.cache.stats.hits == 2
+    assert driver.cache.stats.misses == 2
@@ -0,0 +1,181 @@
+import pytest
+
+from mylocal.db.query_cache import MISSING, InMemoryCacheBackend, QueryCache, SharedCacheBackend
+
+QUERY = "MATCH (n:GoverningBody {id: $id}) RETURN n.name AS name"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRecord:
+    """Like ``neo4j.Record``: read by key, converted with ``data()``."""
+
+    def __init__(self, **values):
+        self.values = values
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def data(self):
+        return dict(self.values)
+
+
+class FakeRedis:
+    """The part of the redis-py client API used by SharedCacheBackend."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in list(self.data) if key.startswith(match.rstrip("*"))]
+
+
+def test_hits_misses_and_parameters():
+    cache = QueryCache()
+    assert cache.get(QUERY, {"id": "LK-1"}) is MISSING
+    cache.set(QUERY, {"id": "LK-1"}, [{"name": "Western"}])
+    assert cache.get(QUERY, {"id": "LK-1"}) == [{"name": "Western"}]
+    assert cache.get(QUERY, {"id": "LK-2"}) is MISSING
+
+    calls = []
+    execute = lambda: calls.append(1) or [{"name": "Central"}]  # noqa: E731
+    assert cache.get_or_execute(QUERY, {"id": "LK-2"}, execute) == [{"name": "Central"}]
+    assert cache.get_or_execute(QUERY, {"id": "LK-2"}, execute) == [{"name": "Central"}]
+    assert len(calls) == 1
+    assert cache.stats.as_dict() == {
+        "hits": 2, "misses": 3, "stores": 2, "skipped": 0, "evictions": 0, "expirations": 0,
+        "invalidations": 0, "hit_rate": 0.4,
+    }
+
+
+@pytest.mark.parametrize("backend", [InMemoryCacheBackend, lambda: SharedCacheBackend(FakeRedis())])
+def test_records_are_returned_as_dicts(backend):
+    cache = QueryCache(backend())
+    execute = lambda: [FakeRecord(name="Western")]  # noqa: E731
+    miss = cache.get_or_execute(QUERY, {"id": "LK-1"}, execute)
+    hit = cache.get_or_execute(QUERY, {"id": "LK-1"}, execute)
+    assert miss == hit == [{"name": "Western"}]
+    assert type(miss[0]) is type(hit[0]) is dict
+
+    hit[0]["name"] = "changed"
+    assert cache.get(QUERY, {"id": "LK-1"}) == [{"name": "Western"}]
+
+
+def test_lru_ttl_and_size_limits():
+    clock = FakeClock()
+    cache = QueryCache(InMemoryCacheBackend(max_entries=2, clock=clock), ttl=10, max_result_rows=2)
+    for region_id in ("LK-1", "LK-2"):
+        cache.set(QUERY, {"id": region_id}, [region_id])
+    assert cache.get(QUERY, {"id": "LK-1"}) == ["LK-1"]
+    cache.set(QUERY, {"id": "LK-3"}, ["LK-3"])
+    assert cache.get(QUERY, {"id": "LK-2"}) is MISSING
+    assert cache.stats.evictions == 1
+
+    clock.now = 10
+    assert cache.get(QUERY, {"id": "LK-1"}) is MISSING
+    assert cache.stats.expirations == 1
+
+    assert not cache.set(QUERY, {"id": "LK"}, [1, 2, 3])
+    assert cache.stats.skipped == 1
+
+
+def test_graph_version_invalidates():
+    cache = QueryCache()
+    cache.set(QUERY, {"id": "LK-1"}, ["Western"])
+    assert cache.bump_graph_version() == 1
+    assert cache.get(QUERY, {"id": "LK-1"}) is MISSING
+    assert len(cache.backend) == 0
+    assert cache.stats.invalidations == 1
+
+
+def test_shared_backend():
+    client = FakeRedis()
+    reader = QueryCache(SharedCacheBackend(client))
+    ingester = QueryCache(SharedCacheBackend(client))
+    reader.set(QUERY, {"id": "LK-1"}, [{"name": "Western"}])
+    assert ingester.get(QUERY, {"id": "LK-1"}) == [{"name": "Western"}]
+
+    ingester.bump_graph_version()
+    assert reader.graph_version == 1
+    assert reader.get(QUERY, {"id": "LK-1"}) is MISSING
+    assert not reader.set(QUERY, {"id": "LK-2"}, [lambda: None])
+
+    reader.clear()
+    assert list(client.data) == ["mylocal:cypher:graph-version"]
+
+
+class FakeResult:
+    def __init__(self, records, updates):
+        self.records = records
+        self.counters = type("Counters", (), {"contains_updates": updates, "contains_system_updates": False})()
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def consume(self):
+        return self
+
+
+class FakeSession:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute_read(self, work):
+        self.calls.append(1)
+        return work(self)
+
+    def run(self, query, parameters):
+        updates = query.startswith("MATCH (n) DETACH DELETE")
+        return FakeResult([] if updates else [FakeRecord(name="Western")], updates)
+
+
+def test_neo4j_driver_uses_cache(tmp_path):
+    pytest.importorskip("neo4j")
+    from mylocal.db.neo4j_driver import Neo4jDriver
+
+    calls = []
+    driver = Neo4jDriver.__new__(Neo4jDriver)
+    driver._driver = type("Driver", (), {"session": lambda self: FakeSession(calls)})()
+    driver.cache = QueryCache()
+
+    for _ in range(3):
+        assert driver.execute_read_query(QUERY, {"id": "LK-1"}) == [{"name": "Western"}]
+    driver.execute_read_query(QUERY, {"id": "LK-1"}, use_cache=False)
+    assert len(calls) == 2
+
+    path = tmp_path / "empty.tsv"
+    path.write_text("id\tname\n")
+    driver.process_file(path, "Province", None)
+    driver.execute_read_query(QUERY, {"id": "LK-1"})
+    assert len(calls) == 3
+
+    # Only queries that change the graph invalidate the cache.
+    driver.execute_query(QUERY, {"id": "LK-1"})
+    assert driver.cache.graph_version == 1
+    driver.execute_query("MATCH (n) DETACH DELETE n")
+    assert driver.cache.graph_version == 2
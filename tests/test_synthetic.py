@@ -0,0 +1,85 @@
+import csv
+
+import pytest
+
+from mylocal.synthetic import CENSUS_TABLES, ENT_COLUMNS, LOAD_ORDER, write_dataset
+
+
+def read_tsv(path):
+    with open(path, newline="", encoding="utf-8") as file:
+        return list(csv.DictReader(file, delimiter="\t"))
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    return write_dataset(tmp_path_factory.mktemp("gig-data"), seed=3, scale=0.1, years=(2012, 2024))
+
+
+@pytest.fixture(scope="module")
+def ents(dataset):
+    return {level: read_tsv(path) for level, path in dataset["ents"].items()}
+
+
+def test_files_and_columns(dataset, ents):
+    assert set(dataset["ents"]) == set(ENT_COLUMNS)
+    assert set(dataset["census"]) == {(table, year) for table in CENSUS_TABLES for year in (2012, 2024)}
+    for level, rows in ents.items():
+        assert list(rows[0]) == ENT_COLUMNS[level]
+        assert dataset["rows"][level] == len(rows)
+    assert [len(ents[level]) for level in ("country", "province", "district", "ed")] == [1, 9, 25, 22]
+    assert len(ents["dsd"]) == 33
+    assert len(ents["gnd"]) == 1402
+
+
+def test_cross_links_are_consistent(ents):
+    by_id = {row["id"]: row for rows in ents.values() for row in rows}
+    assert len(by_id) == sum(len(rows) for rows in ents.values())
+
+    for gnd in ents["gnd"]:
+        dsd, pd = by_id[gnd["dsd_id"]], by_id[gnd["pd_id"]]
+        for column in ("province_id", "district_id", "ed_id", "lg_id", "moh_id"):
+            assert gnd[column] == dsd[column]
+        assert pd["ed_id"] == dsd["ed_id"]
+        assert by_id[dsd["lg_id"]]["district_id"] == dsd["district_id"]
+        assert by_id[dsd["moh_id"]]["district_id"] == dsd["district_id"]
+        assert by_id[dsd["ed_id"]]["province_id"] == gnd["province_id"]
+
+
+def test_loader_parents_exist(ents):
+    pytest.importorskip("neo4j")
+    from mylocal.ingest_mylocal import HIERARCHY, PROCESSING_STEPS
+
+    # Every parent the Neo4j loader links to exists and is loaded first.
+    loaded = set()
+    for level in LOAD_ORDER:
+        governing_type = dict(PROCESSING_STEPS)[level]
+        for _, column in HIERARCHY[governing_type]["parents"]:
+            if column:
+                assert {row[column] for row in ents[level]} <= {row["id"] for row in ents[column[:-3]]}
+                assert column[:-3] in loaded
+        loaded.add(level)
+
+
+def test_census_sums(dataset, ents):
+    for (table, year), path in dataset["census"].items():
+        rows = {row["entity_id"]: row for row in read_tsv(path)}
+        assert len(rows) == sum(len(level_rows) for level_rows in ents.values())
+        columns = CENSUS_TABLES[table]
+        for row in rows.values():
+            assert sum(int(row[column]) for column in columns[1:]) in (0, int(row["total_population"]))
+        for level in ("province", "ed", "lg"):
+            total = sum(int(rows[region["id"]]["total_population"]) for region in ents[level])
+            assert total == int(rows["LK"]["total_population"])
+
+    population = {row["entity_id"]: int(row["total_population"])
+                  for row in read_tsv(dataset["census"][("population-total", 2012)])}
+    assert all(int(row["population"]) == population[row["id"]] for rows in ents.values() for row in rows)
+
+
+def test_deterministic(tmp_path):
+    first = write_dataset(tmp_path / "a", seed=5, scale=0.05)
+    second = write_dataset(tmp_path / "b", seed=5, scale=0.05)
+    other = write_dataset(tmp_path / "c", seed=6, scale=0.05)
+    for level, path in first["ents"].items():
+        assert read_tsv(path) == read_tsv(second["ents"][level])
+    assert read_tsv(first["ents"]["gnd"]) != read_tsv(other["ents"]["gnd"])